@@ -0,0 +1,55 @@
+"""add perdas_cliente (rollup de perdas por cálculo/EC) + índice ecs_cliente.ec_id
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'perdas_cliente',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('calc_id', sa.String(50), nullable=False),
+        sa.Column('calc_tipo', sa.String(50), nullable=False),
+        sa.Column('ec_id', sa.String(100), nullable=False),
+        sa.Column('perda', sa.DECIMAL(18, 2), nullable=False, server_default='0'),
+        sa.Column('perda_rr', sa.DECIMAL(18, 2), nullable=False, server_default='0'),
+        sa.Column('qtd_perda', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('volume', sa.DECIMAL(18, 2), nullable=False, server_default='0'),
+        sa.Column('qtd_transacoes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('ultimo_calculo', sa.DateTime(), nullable=True),
+        sa.Column('atualizado_em', sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint('calc_id', 'calc_tipo', 'ec_id', name='uq_perdas_cliente_calc_ec'),
+    )
+    op.create_index('ix_perdas_cliente_ec_id', 'perdas_cliente', ['ec_id'])
+    op.create_index('ix_ecs_cliente_ec_id', 'ecs_cliente', ['ec_id'])
+
+    # Backfill a partir dos cálculos existentes (mesma agregação do repositório)
+    op.execute("""
+        INSERT INTO perdas_cliente
+            (calc_id, calc_tipo, ec_id, perda, perda_rr, qtd_perda, volume, qtd_transacoes, ultimo_calculo)
+        SELECT calc_id, calc_tipo, COALESCE(CAST(ec_id AS CHAR), ''),
+               SUM(CASE WHEN perda > 0 THEN perda ELSE 0 END),
+               SUM(CASE WHEN perda_rr > 0 THEN perda_rr ELSE 0 END),
+               SUM(CASE WHEN perda > 0 THEN 1 ELSE 0 END),
+               COALESCE(SUM(vl_venda), 0),
+               COUNT(*),
+               MAX(calc_data)
+        FROM vendas_calculos
+        WHERE calc_id IS NOT NULL AND calc_tipo IS NOT NULL
+        GROUP BY calc_id, calc_tipo, COALESCE(CAST(ec_id AS CHAR), '')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ecs_cliente_ec_id', table_name='ecs_cliente')
+    op.drop_index('ix_perdas_cliente_ec_id', table_name='perdas_cliente')
+    op.drop_table('perdas_cliente')
@@ -0,0 +1,39 @@
+"""add purge_tasks + controle_processamentos.status (exclusão em lotes)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'controle_processamentos',
+        sa.Column('status', sa.String(20), nullable=True),
+    )
+    op.create_table(
+        'purge_tasks',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('processamento_id', sa.String(100), nullable=False),
+        sa.Column('status', sa.String(20)),
+        sa.Column('progress', sa.Integer()),
+        sa.Column('message', sa.String(1000)),
+        sa.Column('usuario', sa.String(50)),
+        sa.Column('metadata_json', sa.JSON()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_purge_tasks_processamento_id', 'purge_tasks', ['processamento_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_purge_tasks_processamento_id', table_name='purge_tasks')
+    op.drop_table('purge_tasks')
+    op.drop_column('controle_processamentos', 'status')
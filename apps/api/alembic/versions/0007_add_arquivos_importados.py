@@ -0,0 +1,36 @@
+"""add arquivos_importados (hash dos arquivos por processamento)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'arquivos_importados',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('processamento_id', sa.String(100), nullable=False),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('tipo_arquivo', sa.String(10), nullable=False),
+        sa.Column('contexto', sa.String(100)),
+        sa.Column('arquivo', sa.String(255)),
+        sa.Column('bytes', sa.BigInteger()),
+        sa.Column('processadas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('filtradas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('usuario', sa.String(50)),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint('processamento_id', 'sha256', 'tipo_arquivo', name='uq_arquivos_importados_hash'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('arquivos_importados')
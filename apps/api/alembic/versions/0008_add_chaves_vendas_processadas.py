@@ -0,0 +1,58 @@
+"""add chaves normalizadas em vendas_processadas (bandeira_key, forma_key, adquirente_key)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# Cópia congelada das regras de conf/chaves_venda.py (migração não depende do código atual)
+COLUNAS_CHAVE = {
+    'Bandeira': 'bandeira_key',
+    'Forma_de_pagamento': 'forma_key',
+    'Adquirente': 'adquirente_key',
+}
+_ACENTOS = [
+    (r'[áàâã]', 'a'), (r'[éê]', 'e'), (r'í', 'i'), (r'[óôõ]', 'o'), (r'ú', 'u'), (r'ç', 'c'),
+]
+
+
+def _chave(valor):
+    chave = ('Desconhecida' if valor is None else str(valor)).lower().strip()
+    for padrao, troca in _ACENTOS:
+        chave = re.sub(padrao, troca, chave)
+    return chave
+
+
+def upgrade() -> None:
+    for chave in COLUNAS_CHAVE.values():
+        op.add_column('vendas_processadas', sa.Column(chave, sa.String(100), nullable=True))
+
+    # Backfill: um UPDATE por valor distinto (bandeiras/formas/adquirentes são poucos)
+    bind = op.get_bind()
+    for origem, chave in COLUNAS_CHAVE.items():
+        valores = bind.execute(sa.text(f'SELECT DISTINCT {origem} FROM vendas_processadas')).scalars().all()
+        for valor in valores:
+            cond = f'{origem} IS NULL' if valor is None else f'{origem} = :valor'
+            bind.execute(
+                sa.text(f'UPDATE vendas_processadas SET {chave} = :chave WHERE {cond} AND {chave} IS NULL'),
+                {'chave': _chave(valor), 'valor': valor},
+            )
+
+    # Índices depois do backfill: não são mantidos linha a linha durante os UPDATEs
+    for chave in COLUNAS_CHAVE.values():
+        op.create_index(f'ix_vendas_processadas_{chave}', 'vendas_processadas', [chave])
+
+
+def downgrade() -> None:
+    for chave in COLUNAS_CHAVE.values():
+        op.drop_index(f'ix_vendas_processadas_{chave}', table_name='vendas_processadas')
+        op.drop_column('vendas_processadas', chave)
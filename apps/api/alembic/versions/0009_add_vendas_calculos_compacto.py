@@ -0,0 +1,151 @@
+"""layout compacto opcional de vendas_calculos (dimensões + tabela fato + view)
+
+Só altera o banco com VENDAS_CALCULOS_COMPACTO=true no momento do upgrade;
+sem a opção a revisão é registrada sem mudanças. Para ativar/desativar num
+banco já nesta revisão: ``alembic downgrade 0008`` e ``alembic upgrade head``
+com a opção desejada (ver conf/calculos_compactos.py).
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from app.core.config import settings
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# Cópia congelada de conf/calculos_compactos.py
+FATO = 'vendas_calculos_fato'
+DIMENSOES = {
+    'bandeira': 'dim_bandeiras',
+    'forma_pagamento': 'dim_formas_pagamento',
+    'adquirente': 'dim_adquirentes',
+    'arquivo_origem': 'dim_arquivos_origem',
+    'calc_usuario': 'dim_usuarios_calculo',
+    'calc_origem': 'dim_origens_calculo',
+}
+ID_NULO = 1
+
+# Colunas de vendas_calculos, na ordem da tabela
+COLUNAS = [
+    ('id', sa.Integer()), ('id_venda', sa.Integer()), ('calc_id', sa.String(50)), ('calc_tipo', sa.String(50)),
+    ('calc_usuario', sa.String(100)), ('calc_data', sa.DateTime()), ('bandeira', sa.String(100)),
+    ('forma_pagamento', sa.String(100)), ('data_venda', sa.DateTime()), ('ec_id', sa.BigInteger()),
+    ('adquirente', sa.String(100)), ('arquivo_origem', sa.String(255)), ('nsu', sa.String(100)),
+    ('cod_autorizacao', sa.String(100)), ('vl_venda', sa.DECIMAL(18, 2)), ('tx_venda', sa.DECIMAL(18, 4)),
+    ('desc_venda', sa.DECIMAL(18, 2)), ('vl_liq_venda', sa.DECIMAL(18, 2)), ('tx_rr_venda', sa.DECIMAL(18, 4)),
+    ('vl_rr_venda', sa.DECIMAL(18, 2)), ('tx_calc', sa.DECIMAL(18, 4)), ('desc_calc', sa.DECIMAL(18, 2)),
+    ('vl_liq_calc', sa.DECIMAL(18, 2)), ('tx_rr_calc', sa.DECIMAL(18, 4)), ('vl_rr_calc', sa.DECIMAL(18, 2)),
+    ('perda', sa.DECIMAL(18, 2)), ('perda_rr', sa.DECIMAL(18, 2)), ('calc_origem', sa.String(20)),
+]
+
+
+def _alias(coluna: str) -> str:
+    return f'd_{coluna}'
+
+
+def _criar_tabela(nome: str, compacta: bool) -> None:
+    colunas = []
+    for coluna, tipo in COLUNAS:
+        if coluna == 'id':
+            colunas.append(sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True))
+        elif compacta and coluna in DIMENSOES:
+            colunas.append(sa.Column(f'{coluna}_id', sa.Integer(), nullable=False))
+        else:
+            colunas.append(sa.Column(coluna, tipo))
+    op.create_table(nome, *colunas)
+
+    # Índices do model VendasCalculos e da 0001
+    dim = (lambda c: f'{c}_id') if compacta else (lambda c: c)
+    op.create_index(f'ix_{nome}_id_venda', nome, ['id_venda'])
+    op.create_index(f'ix_{nome}_calc_id', nome, ['calc_id'])
+    op.create_index(f'ix_{nome}_calc_tipo', nome, ['calc_tipo'])
+    op.create_index(f'ix_{nome}_calc_data', nome, ['calc_id', 'data_venda'])
+    op.create_index(f'ix_{nome}_bandeira_forma', nome, [dim('bandeira'), dim('forma_pagamento')])
+
+
+def _binario(expr: str, dialeto: str) -> str:
+    # chave = bytes do valor: distingue 'Visa' de 'VISA' mesmo em collation *_ci
+    return f'CAST({expr} AS BLOB)' if dialeto == 'sqlite' else f'CAST({expr} AS BINARY)'
+
+
+def _select_decodificado(dialeto: str) -> str:
+    """SELECT da fato com os valores das dimensões, nas colunas de vendas_calculos."""
+    # MySQL: a view é atualizável (MERGE, INNER JOIN) nas colunas simples; CONCAT() deixa as de
+    # dimensão somente leitura — um UPDATE de bandeira pela view renomearia o valor em todos os cálculos
+    valor = (lambda c: f'CONCAT({_alias(c)}.valor)') if dialeto == 'mysql' else (lambda c: f'{_alias(c)}.valor')
+    selecao = ', '.join(f'{valor(c)} AS {c}' if c in DIMENSOES else f'f.{c}' for c, _ in COLUNAS)
+    joins = ' '.join(
+        f'JOIN {tabela} {_alias(c)} ON {_alias(c)}.id = f.{c}_id' for c, tabela in DIMENSOES.items()
+    )
+    return f'SELECT {selecao} FROM {FATO} f {joins}'
+
+
+def upgrade() -> None:
+    if not settings.VENDAS_CALCULOS_COMPACTO:
+        return
+    dialeto = op.get_bind().dialect.name
+
+    for coluna, tabela in DIMENSOES.items():
+        op.create_table(
+            tabela,
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('valor', dict(COLUNAS)[coluna]),
+            sa.Column('chave', sa.LargeBinary().with_variant(mysql.VARBINARY(1024), 'mysql')),
+            sa.UniqueConstraint('chave', name=f'uq_{tabela}_chave'),
+        )
+        op.execute(f'INSERT INTO {tabela} (id, valor, chave) VALUES ({ID_NULO}, NULL, NULL)')
+        op.execute(
+            f'INSERT INTO {tabela} (valor, chave) '
+            f'SELECT MIN({coluna}), {_binario(coluna, dialeto)} FROM vendas_calculos '
+            f'WHERE {coluna} IS NOT NULL GROUP BY {_binario(coluna, dialeto)}'
+        )
+
+    _criar_tabela(FATO, compacta=True)
+    destino = ', '.join(f'{c}_id' if c in DIMENSOES else c for c, _ in COLUNAS)
+    origem = ', '.join(f'COALESCE({_alias(c)}.id, {ID_NULO})' if c in DIMENSOES else f'vc.{c}' for c, _ in COLUNAS)
+    joins = ' '.join(
+        f'LEFT JOIN {tabela} {_alias(c)} ON {_alias(c)}.chave = {_binario(f"vc.{c}", dialeto)}'
+        for c, tabela in DIMENSOES.items()
+    )
+    op.execute(f'INSERT INTO {FATO} ({destino}) SELECT {origem} FROM vendas_calculos vc {joins}')
+
+    op.drop_table('vendas_calculos')
+    op.execute(f'CREATE VIEW vendas_calculos AS {_select_decodificado(dialeto)}')
+    if dialeto == 'sqlite':
+        # SQLite não atualiza views: o trigger repassa as colunas da fato e recusa as de dimensão
+        sets = ', '.join(f'{c} = NEW.{c}' for c, _ in COLUNAS if c not in DIMENSOES and c != 'id')
+        mudou = ' OR '.join(f'NEW.{c} IS NOT OLD.{c}' for c in DIMENSOES)
+        op.execute(f"""
+            CREATE TRIGGER vendas_calculos_update INSTEAD OF UPDATE ON vendas_calculos
+            BEGIN
+                SELECT RAISE(ABORT, 'colunas de dimensao de vendas_calculos nao sao atualizaveis') WHERE {mudou};
+                UPDATE {FATO} SET {sets} WHERE id = OLD.id;
+            END
+        """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table(FATO):
+        return
+    dialeto = bind.dialect.name
+
+    if dialeto == 'sqlite':
+        op.execute('DROP TRIGGER vendas_calculos_update')
+    op.execute('DROP VIEW vendas_calculos')
+
+    _criar_tabela('vendas_calculos', compacta=False)
+    op.create_index('ix_vendas_calculos_id', 'vendas_calculos', ['id'])
+    colunas = ', '.join(c for c, _ in COLUNAS)
+    op.execute(f'INSERT INTO vendas_calculos ({colunas}) SELECT {colunas} FROM ({_select_decodificado(dialeto)}) v')
+
+    op.drop_table(FATO)
+    for tabela in DIMENSOES.values():
+        op.drop_table(tabela)
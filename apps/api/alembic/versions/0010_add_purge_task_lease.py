@@ -0,0 +1,23 @@
+"""add owner/heartbeat em purge_tasks (lease entre workers)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('purge_tasks', sa.Column('owner', sa.String(100), nullable=True))
+    op.add_column('purge_tasks', sa.Column('heartbeat', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('purge_tasks', 'heartbeat')
+    op.drop_column('purge_tasks', 'owner')
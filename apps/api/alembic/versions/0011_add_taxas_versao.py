@@ -0,0 +1,26 @@
+"""add taxas_versao (versão das taxas compartilhada entre workers)
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tabela = op.create_table(
+        'taxas_versao',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('versao', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.bulk_insert(tabela, [{'id': 1, 'versao': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('taxas_versao')
@@ -8,7 +8,8 @@ from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, ler_da_replica
+from app.core.principal_cache import principal_cache
 from app.models.usuario import Usuario
 
 # from app.core.security import ALGORITHM
@@ -24,17 +25,17 @@ oauth2_scheme = OAuth2PasswordBearer(
 def _resolve_token(request: Request, bearer: Optional[str]) -> str:
     """Aceita token via Bearer header ou cookie HttpOnly."""
     if bearer:
-        logger.info("Token encontrado no Auth Header (Bearer)")
+        logger.debug("Token encontrado no Auth Header (Bearer)")
         return bearer
     cookie = request.cookies.get("access_token")
     if cookie:
-        logger.info("Token encontrado no Cookie 'access_token'")
+        logger.debug("Token encontrado no Cookie 'access_token'")
         return cookie
 
     # Suporte para download direto via link (token na query string)
     token_query = request.query_params.get("token")
     if token_query:
-        logger.info("Token encontrado na Query String")
+        logger.debug("Token encontrado na Query String")
         return token_query
 
     logger.warning("Token não encontrado no header, cookie ou query string")
@@ -53,6 +54,11 @@ def get_current_user(
     # You might need to import TokenPayload or similar
 
     token = _resolve_token(request, bearer)
+    cache = principal_cache()
+    user = cache.obter(token, db)
+    if user is not None:
+        return user
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -88,7 +94,7 @@ def get_current_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
+    return cache.guardar(token, user, db, exp=payload.get("exp"))
 
 
 def get_user_perfil(user: Usuario) -> str:
@@ -115,3 +121,12 @@ def require_role(roles: List[str]):
         return current_user
 
     return _check
+
+
+def usar_replica(db: Session = Depends(get_db)) -> None:
+    """
+    Rotas só de leitura (dashboards, analista): SELECTs da requisição vão para
+    a réplica (DATABASE_READ_URL). Declarar depois da autenticação, que lê do
+    primário; uma escrita na mesma requisição volta a sessão para o primário.
+    """
+    ler_da_replica(db)
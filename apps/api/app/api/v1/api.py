@@ -51,6 +51,8 @@ api_router.include_router(login.router, tags=["login"])
 
 # ── Routers protegidos (requerem JWT válido) ──────────────────────────────────
 _auth = [Depends(deps.get_current_user)]
+# Leituras de painel toleram o atraso da réplica de leitura (se configurada)
+_leitura = [Depends(deps.usar_replica)]
 
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"], dependencies=_auth)
 api_router.include_router(db_ai.router, prefix="/ai", tags=["db-ai"], dependencies=_auth)
@@ -66,8 +68,8 @@ api_router.include_router(processamentos.router, prefix="/processamentos", tags=
 api_router.include_router(correcao.router, prefix="/correcao", tags=["correcao"], dependencies=_auth)
 api_router.include_router(importacao.router, prefix="/importar", tags=["importacao"], dependencies=_auth)
 api_router.include_router(importacao_async.router, prefix="/importacao-async", tags=["importacao-async"], dependencies=_auth)
-api_router.include_router(analista.router, prefix="/analista", tags=["analista"], dependencies=_auth)
-api_router.include_router(analista_filtrado.router, prefix="/analista-filtrado", tags=["analista-filtrado"], dependencies=_auth)
+api_router.include_router(analista.router, prefix="/analista", tags=["analista"], dependencies=_auth + _leitura)
+api_router.include_router(analista_filtrado.router, prefix="/analista-filtrado", tags=["analista-filtrado"], dependencies=_auth + _leitura)
 api_router.include_router(calculos.router, prefix="/calculos", tags=["calculos"], dependencies=_auth)
 api_router.include_router(relatorios.router, prefix="/relatorios", tags=["relatorios"], dependencies=_auth)
 api_router.include_router(relatorio_modelos.router, prefix="/relatorios", tags=["relatorios-modelos"], dependencies=_auth)
@@ -75,7 +77,7 @@ api_router.include_router(relatorio_tags.router, prefix="/relatorio-tags", tags=
 api_router.include_router(usuarios.router, prefix="/usuarios", tags=["usuarios"], dependencies=_auth)
 api_router.include_router(contextos.router, prefix="/contextos", tags=["contextos"], dependencies=_auth)
 api_router.include_router(abusividade.router, prefix="/abusividade", tags=["abusividade"], dependencies=_auth)
-api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"], dependencies=_auth)
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"], dependencies=_auth + _leitura)
 api_router.include_router(contestacoes.router, prefix="/contestacoes", tags=["contestacoes"], dependencies=_auth)
 api_router.include_router(contestacoes_metricas.router, prefix="/contestacoes-metricas", tags=["contestacoes-metricas"], dependencies=_auth)
 api_router.include_router(notificacoes.router, prefix="/notificacoes", tags=["notificacoes"], dependencies=_auth)
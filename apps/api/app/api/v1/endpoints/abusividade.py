@@ -10,7 +10,7 @@ from sqlalchemy import Integer as SAInteger
 from sqlalchemy import cast
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, require_role
+from app.api.deps import get_current_user, require_role, usar_replica
 from app.core.database import get_db
 from app.models.abusividade_task import AbusividadeTask
 from app.models.processamento import Processamento
@@ -26,7 +26,7 @@ from app.services.abusividade_service import AbusividadeService
 router = APIRouter()
 
 
-@router.get("/analise/{processamento_id:path}", response_model=List[dict])
+@router.get("/analise/{processamento_id:path}", response_model=List[dict], dependencies=[Depends(usar_replica)])
 async def analisar_abusividade_processamento(
     processamento_id: str,
     agrupamento: str = Query("hierarquico", description="Janela de agrupamento: dia, 3dias, semana, mes, hierarquico"),
@@ -38,7 +38,11 @@ async def analisar_abusividade_processamento(
     return service.analisar_processamento(processamento_id, agrupamento, tolerancia=tolerancia)
 
 
-@router.get("/analise-detalhada/{processamento_id:path}", response_model=AbusividadeDetalhadaResponse)
+@router.get(
+    "/analise-detalhada/{processamento_id:path}",
+    response_model=AbusividadeDetalhadaResponse,
+    dependencies=[Depends(usar_replica)],
+)
 async def analisar_detalhada(
     processamento_id: str,
     db: Session = Depends(get_db),
@@ -48,7 +52,7 @@ async def analisar_detalhada(
     return service.analisar_detalhado(processamento_id)
 
 
-@router.get("/relatorio", response_model=List[dict])
+@router.get("/relatorio", response_model=List[dict], dependencies=[Depends(usar_replica)])
 async def relatorio_abusividade(
     cliente_id: int = Query(..., description="ID do Cliente"),
     ec_id: Optional[str] = Query(None, description="EC ID (Opcional)"),
@@ -6,9 +6,6 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -18,14 +15,16 @@ from app.core.database import get_db
 from app.repositories.calculo_repository import CalculoRepository
 from app.schemas.calculo import (
     AnalisePeriodosResponse,
+    CalculoCenariosRequest,
     CalculoHistoryItem,
+    CalculoLoteRequest,
     CalculoPreviewRequest,
     CalculoRequest,
     CalculoResultado,
     CalculoStats,
 )
+from app.services.calculo_lote_service import CalculoLoteService, limite_workers, selecionar_processamentos
 from app.services.calculo_service import CalculoService
-from app.services.reconciliation_core import ReconciliationCore
 
 router = APIRouter()
 
@@ -64,6 +63,8 @@ def processar_calculo(req: CalculoRequest, db: Session = Depends(get_db)):
     Runs calculation synchronously using the high-performance Polars engine.
     For very large datasets, use /processar-async.
     """
+    from app.services.reconciliation_core import ReconciliationCore
+
     try:
         repo = CalculoRepository(db)
         custom_id = repo.processar_calculo(req)
@@ -88,6 +89,63 @@ def processar_calculo(req: CalculoRequest, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/processar-cenarios")
+def processar_cenarios(req: CalculoCenariosRequest, db: Session = Depends(get_db)):
+    """
+    Calcula várias periodicidades de LOG numa passada só (leitura e cruzamento
+    com taxas uma vez) e devolve um calc_id por tipo.
+    """
+    from app.services.reconciliation_core import ReconciliationCore
+
+    try:
+        repo = CalculoRepository(db)
+        cenarios = repo.processar_cenarios(req)
+
+        result = ReconciliationCore.calculate_scenarios(
+            engine=db.get_bind(),
+            proc_id=req.processamento_id,
+            cenarios=cenarios,
+            usar_taxa_cad=req.usar_taxa_cad,
+            tem_receba_rapido=req.tem_receba_rapido,
+        )
+        if not result.get("success"):
+            raise HTTPException(status_code=500, detail=result.get("error"))
+
+        return {
+            "status": "success",
+            "message": f"{len(cenarios)} cenários processados com sucesso. {result.get('rows')} registros.",
+            "calc_ids": cenarios,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/processar-cenarios-async")
+async def processar_cenarios_async(
+    req: CalculoCenariosRequest,
+    background_tasks: BackgroundTasks,
+    usuario: str = "api_user",
+    db: Session = Depends(get_db)
+):
+    """/processar-cenarios em background; os calc_ids ficam em metadata da task."""
+    service = CalculoService(db)
+    task = service.create_calculo_task(
+        processamento_id=req.processamento_id,
+        tipo_taxa=req.tipo_taxa,
+        usuario=usuario,
+        usar_taxa_cad=req.usar_taxa_cad,
+        tem_receba_rapido=req.tem_receba_rapido,
+        substituir=req.substituir,
+        tipos_taxa=req.tipos_taxa,
+    )
+
+    background_tasks.add_task(service.run_async_calculo, task.id)
+
+    return {
+        "status": "processing",
+        "task_id": task.id,
+        "message": "Cálculo de cenários iniciado em segundo plano."
+    }
+
 @router.post("/processar-async")
 async def processar_calculo_async(
     req: CalculoRequest,
@@ -114,6 +172,42 @@ async def processar_calculo_async(
         "message": "Cálculo iniciado em segundo plano."
     }
 
+@router.post("/processar-lote")
+async def processar_lote(
+    req: CalculoLoteRequest,
+    background_tasks: BackgroundTasks,
+    usuario: str = "api_user",
+    db: Session = Depends(get_db)
+):
+    """Recalcula vários processamentos numa task só (pool limitado, progresso agregado)."""
+    try:
+        processamentos = selecionar_processamentos(db, req.processamento_ids, req.cliente_id, req.taxa_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not processamentos:
+        raise HTTPException(status_code=400, detail="Nenhum processamento selecionado.")
+
+    service = CalculoLoteService(db)
+    task = service.create_lote_task(
+        processamento_ids=processamentos,
+        usuario=usuario,
+        tipo_taxa=req.tipo_taxa,
+        usar_taxa_cad=req.usar_taxa_cad,
+        tem_receba_rapido=req.tem_receba_rapido,
+        substituir=req.substituir,
+        tipos_taxa=req.tipos_taxa,
+    )
+
+    background_tasks.add_task(service.run_async_lote, task.id)
+
+    return {
+        "status": "processing",
+        "task_id": task.id,
+        "processamentos": len(processamentos),
+        "workers": limite_workers(len(processamentos)),
+        "message": f"Recálculo de {len(processamentos)} processamentos iniciado em segundo plano."
+    }
+
 @router.get("/task/{task_id:path}")
 async def get_task_status(
     task_id: str,
@@ -132,7 +226,10 @@ async def get_task_status(
         "message": task.message,
         "updated_at": task.updated_at,
         "processamento_id": task.processamento_id,
-        "tipo_taxa": task.tipo_taxa
+        "tipo_taxa": task.tipo_taxa,
+        "calc_ids": (task.metadata_json or {}).get("calc_ids"),
+        "itens": (task.metadata_json or {}).get("itens"),
+        "stages": (task.metadata_json or {}).get("stages"),
     }
 
 @router.get("/resultados/{calc_id:path}", response_model=List[CalculoResultado])
@@ -150,6 +247,10 @@ def listar_resultados(
 @router.get("/export/{calc_id:path}")
 def export_calculo_excel(calc_id: str, db: Session = Depends(get_db)):
     """Exporta todos os resultados de um cálculo para Excel (6 sheets analíticas)."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
     from app.models.vendas_calculos import VendasCalculos
 
     registros = (
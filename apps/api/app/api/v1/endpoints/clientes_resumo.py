@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.repositories.perda_cliente_repository import PerdaClienteRepository
 
 router = APIRouter()
 
@@ -18,13 +19,12 @@ def resumo_cliente(
     current_user=Depends(get_current_user),
 ):
     from app.models.calculo_task import CalculoTask
-    from app.models.cliente import Cliente
     from app.models.import_task import ImportTask
     from app.models.notificacao import Notificacao
     from app.models.relatorio_task import RelatorioTask
 
-    # Verificar cliente existe
-    cliente = db.get(Cliente, cliente_id)
+    # Atributos do cliente + totais de perda (rollup perdas_cliente) em um SELECT
+    cliente = PerdaClienteRepository(db).resumo_cliente(cliente_id)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
@@ -98,8 +98,19 @@ def resumo_cliente(
 
     return {
         "cliente_id": cliente_id,
-        "nome": cliente.nome_fantasia or cliente.razao_social or str(cliente_id),
-        "cnpj": cliente.cnpj,
+        "nome": cliente["nome_fantasia"] or cliente["razao_social"] or str(cliente_id),
+        "cnpj": cliente["cnpj"],
+        "perdas": {
+            "total_perda_rs": round(float(cliente["total_perda"] or 0), 2),
+            "total_perda_rr_rs": round(float(cliente["total_perda_rr"] or 0), 2),
+            "count_transacoes": int(cliente["count_transacoes"] or 0),
+            "volume_rs": round(float(cliente["volume"] or 0), 2),
+            "ultimo_calculo": (
+                cliente["ultimo_calculo"].isoformat()
+                if hasattr(cliente["ultimo_calculo"], "isoformat")
+                else cliente["ultimo_calculo"]
+            ),
+        },
         "notificacoes_nao_lidas": notificacoes_nao_lidas,
         "import_tasks_recentes": [fmt_import(t) for t in import_tasks],
         "calculo_tasks_recentes": [fmt_calculo(t) for t in calculo_tasks],
@@ -3,10 +3,9 @@
 from typing import Optional
 
 from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response
 
-from app.services.conversor.conver_service import converter_arquivos
-
 router = APIRouter()
 
 _MIME_ZIP = "application/zip"
@@ -14,6 +13,9 @@ _MIME_ZIP = "application/zip"
 
 @router.post("/rede")
 async def converter_rede(files: Optional[list[UploadFile]] = File(default=None)) -> Response:
+    # openpyxl/numpy só quando há extrato a converter
+    from app.services.conversor.conver_service import converter_arquivos
+
     if not files:
         raise HTTPException(status_code=400, detail="Nenhum arquivo enviado.")
 
@@ -28,7 +30,8 @@ async def converter_rede(files: Optional[list[UploadFile]] = File(default=None))
         conteudo = await f.read()
         arquivos.append((nome, conteudo))
 
-    zip_bytes, nome_saida = converter_arquivos(arquivos)
+    # Parse + XLSX são CPU: fora do event loop
+    zip_bytes, nome_saida = await run_in_threadpool(converter_arquivos, arquivos)
 
     return Response(
         content=zip_bytes,
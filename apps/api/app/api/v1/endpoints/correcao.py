@@ -5,13 +5,14 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import require_role
 from app.core.database import get_db
-from app.repositories.correcao_repository import CorrecaoRepository
-from app.services.preprocessamento_service import invalidar_parquet
+from app.repositories.correcao_repository import CorrecaoRepository, calc_id_taxa_bc
 from app.schemas.correcao import (
     AplicarTaxaBCRequest,
     AtualizarRequest,
     FiltrosBCResponse,
     HistoricoItem,
+    LoteCorrecaoRequest,
+    LoteCorrecaoResponse,
     RemoverRequest,
     ResumoResponse,
 )
@@ -48,6 +49,7 @@ def atualizar_em_massa(
             request.valores_antigos,
             request.valor_novo
         )
+        from app.services.preprocessamento_service import invalidar_parquet
         invalidar_parquet(request.processamento_id)
         return {"message": "Atualizado com sucesso", "linhas_afetadas": count}
     except ValueError as e:
@@ -66,6 +68,7 @@ def remover_em_massa(
             request.campo,
             request.valores
         )
+        from app.services.preprocessamento_service import invalidar_parquet
         invalidar_parquet(request.processamento_id)
         return {"message": "Removido com sucesso (movido para filtrados)", "linhas_afetadas": count}
     except ValueError as e:
@@ -87,6 +90,7 @@ def excluir_filtradas(
             request.campo,
             request.valores
         )
+        from app.services.preprocessamento_service import invalidar_parquet
         invalidar_parquet(request.processamento_id)
         return {"message": "Excluído permanentemente do sistema (tabela de filtrados)", "linhas_afetadas": count}
     except ValueError as e:
@@ -106,6 +110,7 @@ def restaurar_filtradas(
             request.campo,
             request.valores
         )
+        from app.services.preprocessamento_service import invalidar_parquet
         invalidar_parquet(request.processamento_id)
         return {"message": "Registros restaurados para processadas com sucesso", "linhas_afetadas": count}
     except ValueError as e:
@@ -137,6 +142,36 @@ def atualizar_filtradas(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/lote", response_model=LoteCorrecaoResponse)
+def aplicar_lote(
+    request: LoteCorrecaoRequest,
+    db: Session = Depends(get_db),
+    _: Any = Depends(require_role(["admin", "operador"])),
+):
+    """
+    Aplica uma lista ordenada de correções numa única transação, agrupando
+    operações consecutivas compatíveis. Caches invalidados uma vez, após o commit.
+    """
+    repo = CorrecaoRepository(db)
+    try:
+        resultado = repo.aplicar_lote(request.processamento_id, request.operacoes, request.usuario)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    from app.services.preprocessamento_service import invalidar_parquet
+    invalidar_parquet(request.processamento_id)
+    calculos = {
+        calc_id_taxa_bc(request.processamento_id, op)
+        for op in request.operacoes if op.tipo == "aplicar_taxa_bc"
+    }
+    if calculos:
+        from modules.reports import invalidate_calc_cache
+        from app.services.ai_service import invalidar_contexto
+        for calc_id in calculos:
+            invalidate_calc_cache(calc_id)
+            invalidar_contexto(calc_id)
+    return {"message": "Lote de correções aplicado com sucesso", **resultado}
+
 @router.get("/filtros-taxa-bc", response_model=FiltrosBCResponse)
 def obter_filtros_taxa_bc(
     processamento_id: str,
@@ -162,6 +197,7 @@ def aplicar_taxa_bc(
             request.nova_taxa,
             request.usuario
         )
+        from app.services.preprocessamento_service import invalidar_parquet
         invalidar_parquet(request.processamento_id)
         return {"message": "Taxa BC aplicada com sucesso", "linhas_afetadas": count}
     except ValueError as e:
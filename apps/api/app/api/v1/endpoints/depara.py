@@ -1,19 +1,18 @@
-from typing import Any, List, Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Optional
 
-import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
-from app.adapters.proc_importacao_adapter import (
-    is_multisheet_rede_file,
-    read_file_with_header,
-    safe_read_multisheet_file,
-)
 from app.api.deps import require_role
 from app.core.database import get_db
 from app.repositories.depara_repository import DeParaRepository
 from app.schemas.depara import DeParaCreate, DeParaResponse, DeParaUpdate
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 router = APIRouter()
 
 @router.get("/", response_model=List[DeParaResponse])
@@ -85,6 +84,13 @@ async def ler_cabecalhos(
         import tempfile
         from pathlib import Path
 
+        # Importador legado (pandas, openpyxl): só carregado quando um arquivo chega
+        from app.adapters.proc_importacao_adapter import (
+            is_multisheet_rede_file,
+            read_file_with_header,
+            safe_read_multisheet_file,
+        )
+
         # Salvar arquivo temporário
         suffix = Path(filename).suffix
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
@@ -6,7 +6,6 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.schemas.importacao import ImportacaoConfirmar
-from app.services.import_service import ImportService
 
 router = APIRouter()
 
@@ -28,6 +27,7 @@ async def upload_arquivo_preview(
     - Retorna preview dos dados normalizados
     - Retorna file_id para confirmação
     """
+    from app.services.import_service import ImportService
     service = ImportService(db)
     return await service.preview_upload(
         files=files,
@@ -49,6 +49,7 @@ async def confirmar_importacao(
     - Usa file_id retornado no passo anterior
     - Processa e grava os dados definitivamente
     """
+    from app.services.import_service import ImportService
     service = ImportService(db)
     return await service.confirm_import(
         file_id=dados.file_id,
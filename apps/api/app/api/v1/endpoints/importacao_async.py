@@ -6,7 +6,6 @@ from sqlalchemy.orm import Session
 from app.api.deps import require_role
 from app.core.database import get_db
 from app.schemas.importacao import ImportacaoConfirmar
-from app.services.import_service import ImportService
 
 router = APIRouter()
 
@@ -21,6 +20,7 @@ async def confirmar_importacao_async(
     """
     Inicia a gravação dos dados em segundo plano.
     """
+    from app.services.import_service import ImportService
     service = ImportService(db)
     task = service.create_import_task(
         cliente_id=dados.cliente_id,
@@ -49,6 +49,7 @@ async def get_task_status(
     """
     Retorna o status atual de uma tarefa de importação.
     """
+    from app.services.import_service import ImportService
     service = ImportService(db)
     task = service.get_task(task_id)
     if not task:
@@ -61,7 +62,8 @@ async def get_task_status(
         "message": task.message,
         "updated_at": task.updated_at,
         "tipo_arquivo": task.tipo_arquivo,
-        "contexto": task.contexto
+        "contexto": task.contexto,
+        "stages": (task.metadata_json or {}).get("stages"),
     }
 
 @router.get("/active-tasks")
@@ -72,6 +74,7 @@ async def get_active_tasks(
     """
     Retorna a lista de tarefas ativas ou recentes de um cliente.
     """
+    from app.services.import_service import ImportService
     service = ImportService(db)
     tasks = service.get_active_tasks(cliente_id)
     return [
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.core.principal_cache import invalidar_usuario
 from app.models.usuario import Usuario
 
 router = APIRouter()
@@ -60,6 +61,7 @@ def alterar_senha(
     current_user.senha = _hash_senha(req.nova_senha)
     db.add(current_user)
     db.commit()
+    invalidar_usuario(current_user.id)
 
     try:
         from app.services.audit_service import AuditService
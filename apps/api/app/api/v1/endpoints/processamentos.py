@@ -3,13 +3,14 @@ import io
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.repositories.processamento_repository import ProcessamentoRepository
 from app.schemas.processamento import ProcessamentoFilter, ProcessamentoResponse
+from app.services.purge_service import PurgeService
 
 router = APIRouter()
 
@@ -95,10 +96,66 @@ def listar_processamentos(
 @router.post("/batch-delete")
 def deletar_processamentos(
     ids: List[str],
+    background_tasks: BackgroundTasks,
+    usuario: str = "api_user",
     db: Session = Depends(get_db)
 ):
-    repo = ProcessamentoRepository(db)
-    return {"success": repo.deletar_lista(ids), "count": len(ids)}
+    """
+    Marca os processamentos como em exclusão (somem das listagens na hora) e
+    apaga as linhas em lotes, em background. Progresso em /purge/{task_id}.
+    """
+    if not ids:
+        return {"success": False, "count": 0, "task_ids": []}
+
+    ProcessamentoRepository(db).marcar_exclusao(ids)
+    service = PurgeService(db)
+    task_ids = []
+    for pid in ids:
+        task = service.criar_task(pid, usuario=usuario)
+        background_tasks.add_task(service.run_async_purge, task.id)
+        task_ids.append(task.id)
+
+    return {"success": True, "count": len(ids), "task_ids": task_ids}
+
+
+@router.get("/purge/{task_id}")
+def status_exclusao(task_id: str, db: Session = Depends(get_db)):
+    """Progresso da exclusão em lotes de um processamento."""
+    task = PurgeService(db).get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+
+    meta = task.metadata_json or {}
+    return {
+        "id": task.id,
+        "status": task.status,
+        "progress": task.progress,
+        "message": task.message,
+        "updated_at": task.updated_at,
+        "processamento_id": task.processamento_id,
+        "totais": meta.get("totais"),
+        "removidos": meta.get("removidos"),
+        "stages": meta.get("stages"),
+    }
+
+
+@router.post("/purge/{task_id}/retomar")
+def retomar_exclusao(
+    task_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """Retoma uma exclusão que falhou ou foi interrompida, a partir da etapa gravada."""
+    service = PurgeService(db)
+    task = service.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    if task.status == "SUCCESS" or service.em_execucao(task):
+        # PROCESSING sem heartbeat há PURGE_LEASE_S (worker caiu) pode ser retomado
+        return {"status": task.status, "task_id": task.id}
+
+    background_tasks.add_task(service.run_async_purge, task.id)
+    return {"status": "processing", "task_id": task.id}
 
 
 @router.get("/{processamento_id:path}/financeiro")
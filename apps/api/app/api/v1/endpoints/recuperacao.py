@@ -8,61 +8,33 @@ import io
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
-from sqlalchemy import String, cast, func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.repositories.perda_cliente_repository import PerdaClienteRepository
 
 router = APIRouter()
 
 
-def _build_ranking(limit: int, db: Session) -> dict:
-    from app.models.cliente import Cliente, ECCliente
-    from app.models.vendas_calculos import VendasCalculos
-
-    # VendasCalculos.ec_id (BigInteger) → cast to String → ECCliente.ec_id (String)
-    resultados = (
-        db.query(
-            ECCliente.cliente_id,
-            func.sum(VendasCalculos.perda).label("total_perda"),
-            func.count(VendasCalculos.id).label("count_transacoes"),
-        )
-        .join(ECCliente, cast(VendasCalculos.ec_id, String) == ECCliente.ec_id)
-        .filter(VendasCalculos.perda > 0)
-        .group_by(ECCliente.cliente_id)
-        .order_by(func.sum(VendasCalculos.perda).desc())
-        .limit(limit)
-        .all()
-    )
+def _item_ranking(posicao: int, cliente_id, nome: str, row: dict) -> dict:
+    total_perda = float(row["total_perda"] or 0)
+    count = int(row["count_transacoes"] or 0)
+    ultimo = row["ultimo_calculo"]
+    return {
+        "posicao": posicao,
+        "cliente_id": cliente_id,
+        "nome": nome,
+        "total_perda_rs": round(total_perda, 2),
+        "count_transacoes": count,
+        "media_perda_rs": round(total_perda / max(count, 1), 2),
+        "total_perda_rr_rs": round(float(row["total_perda_rr"] or 0), 2),
+        "volume_rs": round(float(row["volume"] or 0), 2),
+        "ultimo_calculo": ultimo.isoformat() if hasattr(ultimo, "isoformat") else ultimo,
+    }
 
-    ranking = []
-    for row in resultados:
-        cliente_id = row.cliente_id
-        if not cliente_id:
-            continue
-        cliente = db.get(Cliente, int(cliente_id))
-        nome = ""
-        if cliente:
-            nome = (
-                getattr(cliente, "nome_fantasia", None)
-                or getattr(cliente, "razao_social", None)
-                or str(cliente_id)
-            )
-        ranking.append(
-            {
-                "posicao": len(ranking) + 1,
-                "cliente_id": cliente_id,
-                "nome": nome,
-                "total_perda_rs": round(float(row.total_perda or 0), 2),
-                "count_transacoes": row.count_transacoes,
-                "media_perda_rs": round(
-                    float(row.total_perda or 0) / max(row.count_transacoes, 1), 2
-                ),
-            }
-        )
 
+def _resultado(ranking: list) -> dict:
     total_geral = sum(r["total_perda_rs"] for r in ranking)
-
     return {
         "total_clientes_com_perda": len(ranking),
         "total_recuperavel_rs": round(total_geral, 2),
@@ -70,42 +42,29 @@ def _build_ranking(limit: int, db: Session) -> dict:
     }
 
 
-def _build_ranking_fallback(limit: int, db: Session) -> dict:
-    """Fallback: agrupa por ec_id quando ECCliente não tem dados."""
-    from app.models.vendas_calculos import VendasCalculos
+def _build_ranking(limit: int, db: Session) -> dict:
+    # Uma única query sobre o rollup perdas_cliente (ec_id já em texto, sem CAST)
+    # com os atributos do cliente no mesmo SELECT.
+    ranking = []
+    for row in PerdaClienteRepository(db).ranking(limit):
+        cliente_id = row["cliente_id"]
+        if not cliente_id:
+            continue
+        nome = ""
+        if row["nome_fantasia"] is not None or row["razao_social"] is not None:
+            nome = row["nome_fantasia"] or row["razao_social"] or str(cliente_id)
+        ranking.append(_item_ranking(len(ranking) + 1, cliente_id, nome, row))
+    return _resultado(ranking)
 
-    resultados = (
-        db.query(
-            VendasCalculos.ec_id,
-            func.sum(VendasCalculos.perda).label("total_perda"),
-            func.count(VendasCalculos.id).label("count_transacoes"),
-        )
-        .filter(VendasCalculos.perda > 0)
-        .group_by(VendasCalculos.ec_id)
-        .order_by(func.sum(VendasCalculos.perda).desc())
-        .limit(limit)
-        .all()
-    )
 
-    ranking = [
-        {
-            "posicao": i + 1,
-            "cliente_id": row.ec_id,
-            "nome": f"EC {row.ec_id}",
-            "total_perda_rs": round(float(row.total_perda or 0), 2),
-            "count_transacoes": row.count_transacoes,
-            "media_perda_rs": round(
-                float(row.total_perda or 0) / max(row.count_transacoes, 1), 2
-            ),
-        }
-        for i, row in enumerate(resultados)
-    ]
-    total_geral = sum(r["total_perda_rs"] for r in ranking)
-    return {
-        "total_clientes_com_perda": len(ranking),
-        "total_recuperavel_rs": round(total_geral, 2),
-        "ranking": ranking,
-    }
+def _build_ranking_fallback(limit: int, db: Session) -> dict:
+    """Fallback: agrupa por ec_id quando ECCliente não tem dados."""
+    ranking = []
+    for i, row in enumerate(PerdaClienteRepository(db).ranking_por_ec(limit)):
+        ec_id = row["ec_id"]
+        ec_id = int(ec_id) if ec_id.isdigit() else ec_id
+        ranking.append(_item_ranking(i + 1, ec_id, f"EC {ec_id}", row))
+    return _resultado(ranking)
 
 
 @router.get("/ranking")
@@ -117,7 +76,7 @@ def ranking_recuperacao(
     Retorna clientes rankeados pelo total de perdas financeiras contestáveis.
 
     Estratégia de join:
-      VendasCalculos.ec_id → ECCliente.ec_id → ECCliente.cliente_id → Cliente
+      perdas_cliente.ec_id → ECCliente.ec_id → ECCliente.cliente_id → Cliente
     """
     try:
         resultado = _build_ranking(limit=limit, db=db)
@@ -152,6 +111,9 @@ def exportar_ranking_csv(
             "Total Perda (R$)",
             "Qtd Transações",
             "Média Perda/Transação (R$)",
+            "Total Perda RR (R$)",
+            "Volume (R$)",
+            "Último Cálculo",
         ]
     )
     for r in dados["ranking"]:
@@ -163,6 +125,9 @@ def exportar_ranking_csv(
                 r["total_perda_rs"],
                 r["count_transacoes"],
                 r["media_perda_rs"],
+                r.get("total_perda_rr_rs"),
+                r.get("volume_rs"),
+                r.get("ultimo_calculo"),
             ]
         )
     output.seek(0)
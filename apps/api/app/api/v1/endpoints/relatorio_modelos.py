@@ -22,15 +22,9 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, require_role
-from app.core.database import engine, get_db
+from app.core.database import get_db, read_engine
 from app.models.modelo_relatorio import ModeloRelatorio
 from app.models.usuario import Usuario
-from app.services.preprocessamento_service import (
-    emitir_modelo,
-    invalidar_parquet,
-    preprocessar_relatorio,
-    status_parquet,
-)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -91,13 +85,15 @@ def preprocessar(
     Executa o pré-processamento completo para um processamento.
     Salva cada seção como .parquet em parquet_cache/{processamento_id}/.
     """
+    from app.services.preprocessamento_service import preprocessar_relatorio
+
     try:
         db.close()
     except Exception:
         pass
     try:
         resultado = preprocessar_relatorio(
-            engine=engine,
+            engine=read_engine,
             processamento_id=request.processamento_id,
             calc_tipo=request.calc_tipo,
             data_inicio=request.data_inicio,
@@ -125,6 +121,8 @@ def status_preprocessamento(
     Verifica se o parquet já existe para o combo (processamento_id + adquirente).
     adquirente=None/"Todos" verifica o slot 'todos'.
     """
+    from app.services.preprocessamento_service import status_parquet
+
     return status_parquet(processamento_id, adquirente)
 
 
@@ -137,6 +135,8 @@ def invalidar(
     """
     Invalida manualmente o cache parquet de um processamento.
     """
+    from app.services.preprocessamento_service import invalidar_parquet
+
     invalidar_parquet(processamento_id)
     return {"message": f"Cache invalidado para {processamento_id}"}
 
@@ -155,6 +155,8 @@ def emitir(
     Emite os modelos selecionados (por checkbox) lendo os parquets.
     Retorna lista de arquivos gerados.
     """
+    from app.services.preprocessamento_service import emitir_modelo, status_parquet
+
     # Fechar a sessão DB antes da operação pesada — evita "Lost connection"
     # durante geração de relatórios longos (a sessão só era usada para auth)
     try:
@@ -176,7 +178,7 @@ def emitir(
             path = emitir_modelo(
                 processamento_id=request.processamento_id,
                 modelo_id=modelo_id,
-                engine=engine,
+                engine=read_engine,
                 opcoes=request.opcoes.model_dump(),
             )
             arquivos.append({"modelo_id": modelo_id, "arquivo": path})
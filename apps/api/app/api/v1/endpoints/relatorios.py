@@ -3,7 +3,6 @@ import os
 from datetime import datetime
 from typing import Any, List
 
-import pandas as pd
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
@@ -14,7 +13,7 @@ logger = logging.getLogger(__name__)
 
 from app.api.deps import get_current_user
 from app.models.usuario import Usuario
-from app.core.database import engine, get_db
+from app.core.database import engine, get_db, read_engine
 from app.schemas.relatorio import RelatorioOptions, RelatorioRequest, RelatorioResponse
 from app.services.relatorio_service import RelatorioService
 
@@ -22,37 +21,19 @@ from app.services.relatorio_service import RelatorioService
 class SaveEditRequest(BaseModel):
     html_content: str
 
-# Importar lógica legada
-# O path já está configurado no main.py, então import direto deve funcionar
-# Tentativa de importar lógica legada com fallbacks robustos
-try:
-    from modules.reports import (
-        gerar_relatorio_html,
-        gerar_relatorio_mensal_html,
-        obter_adquirentes_distintos_processamento,
-    )
-except ImportError as e:
-    logger.warning("Erro ao importar modules.reports: %s", e)
+def _relatorios_legados():
+    """
+    ``modules.reports`` (Panel, Plotly, pandas) importado no primeiro uso.
+    O path já está configurado no main.py; sem a dependência, só as rotas de
+    geração falham.
+    """
     try:
-        import sys
-        from pathlib import Path
-        root_dir = Path(__file__).resolve().parent.parent.parent.parent.parent.parent.parent
-        if str(root_dir) not in sys.path:
-            sys.path.insert(0, str(root_dir))
-        from modules.reports import (
-            gerar_relatorio_html,
-            gerar_relatorio_mensal_html,
-            obter_adquirentes_distintos_processamento,
-        )
-    except Exception as e2:
-        logger.critical("Não foi possível importar relatórios legados: %s", e2)
-        # Definir Stubs para não quebrar a API
-        def generar_stub(*args, **kwargs):
-            raise Exception("Módulo de relatórios indisponível (dependência 'panel' ausente)")
+        import modules.reports as reports
+    except ImportError as e:
+        logger.critical("Não foi possível importar relatórios legados: %s", e)
+        raise HTTPException(status_code=503, detail="Módulo de relatórios indisponível (dependência 'panel' ausente)")
+    return reports
 
-        gerar_relatorio_mensal_html = generar_stub
-        gerar_relatorio_html = generar_stub
-        obter_adquirentes_distintos_processamento = lambda *args: []
 
 router = APIRouter()
 
@@ -71,7 +52,8 @@ def get_opcoes(processamento_id: str = None):
     if processamento_id:
         try:
             # Usar engine direto pois as funcoes legadas esperam engine, nao session
-            adquirentes = obter_adquirentes_distintos_processamento(engine, processamento_id)
+            # (réplica de leitura, se configurada: os relatórios só leem)
+            adquirentes = _relatorios_legados().obter_adquirentes_distintos_processamento(read_engine, processamento_id)
             if adquirentes:
                 opcoes["adquirentes"] = ["Todos"] + sorted(adquirentes)
         except Exception as e:
@@ -86,8 +68,8 @@ def get_adquirentes(
 ):
     """Retorna lista de adquirentes e período disponível para um processamento e tipo de cálculo"""
     try:
-        from modules.reports import obter_adquirentes_e_periodo_processamento
-        adquirentes, periodo, available_types = obter_adquirentes_e_periodo_processamento(engine, processamento_id, calc_tipo=calc_tipo)
+        reports = _relatorios_legados()
+        adquirentes, periodo, available_types = reports.obter_adquirentes_e_periodo_processamento(read_engine, processamento_id, calc_tipo=calc_tipo)
 
         # Converter dates para strings para o JSON
         if periodo:
@@ -123,10 +105,11 @@ def gerar_relatorio(
         sintetico_path = None
 
         logger.info("Gerando relatório %s para %s", req.tipo_relatorio, req.processamento_id)
+        reports = _relatorios_legados()
 
         if req.tipo_relatorio == "mensal":
-            html_path, _, sintetico_path = gerar_relatorio_mensal_html(
-                engine,
+            html_path, _, sintetico_path = reports.gerar_relatorio_mensal_html(
+                read_engine,
                 req.processamento_id,
                 calc_tipo=req.calc_tipo,
                 adquirente=adquirente_filtro,
@@ -138,8 +121,8 @@ def gerar_relatorio(
             )
         else:
             # Retroativo (Padrão)
-            html_path, _, sintetico_path = gerar_relatorio_html(
-                engine,
+            html_path, _, sintetico_path = reports.gerar_relatorio_html(
+                read_engine,
                 req.processamento_id,
                 calc_tipo=req.calc_tipo,
                 return_base=False,
@@ -253,7 +236,8 @@ async def get_task_status(
         "abusividade_path": task.abusividade_path,
         "sintetico_path": task.sintetico_path,
         "excel_path": task.excel_path,
-        "updated_at": task.updated_at
+        "updated_at": task.updated_at,
+        "stages": (task.metadata_json or {}).get("stages"),
     }
 
 @router.get("/download")
@@ -2,7 +2,7 @@
 Status e métricas do sistema.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -98,3 +98,44 @@ def status_sistema(
             "relatorios": ultimas_relatorios,
         },
     }
+
+
+def _profiler():
+    from app.core import sql_profiler
+
+    if sql_profiler.profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler de SQL desativado (SQL_PROFILER_ENABLED=False)")
+    return sql_profiler.profiler
+
+
+@router.get("/sql-profile")
+def sql_profile(
+    ordenar: str = Query("total", pattern="^(total|count|p95|max|rows|n_mais_1)$"),
+    limite: int = Query(50, ge=1, le=500),
+    current_user=Depends(require_role(["admin"])),
+):
+    """
+    Queries agregadas por fingerprint desde o start (ou último reset).
+    ``ordenar=n_mais_1`` ordena pelo maior nº de execuções numa mesma requisição.
+    """
+    prof = _profiler()
+    return {"totais": prof.totais(), "queries": prof.resumo(ordenar=ordenar, limite=limite)}
+
+
+@router.get("/sql-profile/{fingerprint_id}")
+def sql_profile_detalhe(
+    fingerprint_id: str,
+    current_user=Depends(require_role(["admin"])),
+):
+    """Detalhe de um fingerprint: SQL de exemplo e EXPLAIN capturado (se houve execução lenta)."""
+    detalhe = _profiler().detalhe(fingerprint_id)
+    if detalhe is None:
+        raise HTTPException(status_code=404, detail="Fingerprint não encontrado")
+    return detalhe
+
+
+@router.delete("/sql-profile")
+def sql_profile_reset(current_user=Depends(require_role(["admin"]))):
+    """Zera as estatísticas do profiler."""
+    _profiler().reset()
+    return {"ok": True}
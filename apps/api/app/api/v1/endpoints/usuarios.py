@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.api.deps import require_role
+from app.core.principal_cache import invalidar_usuario
 from app.models.usuario_cliente import UsuarioCliente
 from app.models.usuario_contexto import UsuarioContexto
 from app.models.usuario_permissao import UsuarioPermissao
@@ -139,6 +140,7 @@ def set_permissoes(
         db.add(UsuarioCliente(usuario_id=usuario_id, cliente_id=cid))
 
     db.commit()
+    invalidar_usuario(usuario_id)
     db.refresh(usuario)
 
     contextos_ids = [uc.contexto_id for uc in usuario.contextos_permitidos]
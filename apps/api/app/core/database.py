@@ -3,20 +3,23 @@ Database Session Management
 """
 
 import logging
-from typing import Generator
+import random
+import re
+from pathlib import Path
+from typing import Generator, Set
 from urllib.parse import quote_plus
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import GenerativeSelect
 
 from app.core.config import settings
 
-# Logger para SQL queries
-logger = logging.getLogger("sqlalchemy.engine")
-if hasattr(settings, "DEBUG_SQL") and settings.DEBUG_SQL:
-    logger.setLevel(logging.INFO)
-else:
-    logger.setLevel(logging.WARNING)
+# Logger para SQL queries (amostrado). O logger "sqlalchemy.engine" fica em WARNING:
+# em INFO o SQLAlchemy formataria e registraria todas as queries, ignorando a amostragem.
+logger = logging.getLogger("app.sql")
+logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
 def get_database_url() -> str:
     """Get database URL based on DATABASE_TYPE"""
@@ -40,7 +43,8 @@ is_mysql = db_type == "mysql"
 engine_kwargs = {
     "pool_pre_ping": True,
     "pool_recycle": 3600,
-    "echo": settings.DEBUG_SQL if hasattr(settings, "DEBUG_SQL") else False,
+    # Log de SQL é feito pelo listener amostrado abaixo (echo formataria todas as queries)
+    "echo": False,
 }
 
 if is_mysql:
@@ -55,17 +59,100 @@ db_logger.info(f"Database: {db_type} | is_mysql={is_mysql}")
 
 engine = create_engine(db_url, **engine_kwargs)
 
-# SQLite optimization: WAL mode (Write-Ahead Logging)
+# Perfil SQLite: WAL (leitores não bloqueiam o escritor), cache/mmap/temporários
+# em memória para as leituras e busy_timeout para o lock de escrita entre processos.
+# As gravações em massa são serializadas em conf/sqlite_escrita.py.
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     if settings.DATABASE_TYPE == "sqlite":
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_MB) * 1024}")  # negativo = KiB
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_MB) * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 
+# Profiler de SQL por fingerprint (contagem, p95, linhas, EXPLAIN das lentas)
+if settings.SQL_PROFILER_ENABLED:
+    from app.core.sql_profiler import instalar_profiler
+
+    instalar_profiler(engine, settings.SQL_SLOW_QUERY_MS, settings.SQL_PROFILER_EXPLAIN)
+
+# Réplica de leitura (DATABASE_READ_URL); sem ela, read_engine é o próprio engine
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, **engine_kwargs)
+    if read_engine.dialect.name == "sqlite":
+        event.listen(read_engine, "connect", set_sqlite_pragma)
+    db_logger.info("Réplica de leitura: %s", read_engine.url.render_as_string(hide_password=True))
+else:
+    read_engine = engine
+
+_INFO_REPLICA = "ler_da_replica"
+_INFO_PRIMARIO = "fixada_no_primario"
+
+
+def _somente_leitura(clause) -> bool:
+    if isinstance(clause, GenerativeSelect):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        sql = clause.text.lstrip().upper()
+        return sql.startswith(("SELECT", "WITH")) and "FOR UPDATE" not in sql
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Sessão que manda SELECTs para ``leitura`` (réplica) quando marcada por
+    ``ler_da_replica``; INSERT/UPDATE/DELETE, flush e ``get_bind()`` sem
+    statement (engine usado para escrita direta) ficam no primário.
+
+    Read-your-writes: a primeira escrita fixa a sessão no primário até ela ser
+    fechada — leituras depois de um commit não dependem do atraso da réplica.
+    """
+
+    def __init__(self, *args, leitura=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.leitura = leitura
+
+    def usa_replica(self) -> bool:
+        return (
+            self.leitura is not None
+            and self.info.get(_INFO_REPLICA, False)
+            and not self.info.get(_INFO_PRIMARIO, False)
+        )
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        leitura = not self._flushing and _somente_leitura(clause)
+        if leitura and self.usa_replica():
+            return self.leitura
+        if not leitura and (self._flushing or clause is not None):
+            self.info[_INFO_PRIMARIO] = True
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def ler_da_replica(db: Session) -> Session:
+    """Marca ``db`` para ler da réplica (sem efeito sem DATABASE_READ_URL ou fora de RoutingSession)."""
+    db.info[_INFO_REPLICA] = True
+    return db
+
+
+def engine_leitura(db: Session):
+    """Engine para leituras em massa fora do ORM (Polars/pandas) na sessão ``db``."""
+    if isinstance(db, RoutingSession) and db.usa_replica():
+        return db.leitura
+    return db.get_bind()
+
+
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    leitura=read_engine if read_engine is not engine else None,
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -83,13 +170,62 @@ def get_db() -> Generator[Session, None, None]:
             db_logger.warning(f"Erro ao fechar sessão DB (conexão possivelmente encerrada): {e}")
 
 
+_ALEMBIC_VERSIONS = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+_RE_REVISAO = re.compile(r"^(revision|down_revision)\s*=\s*['\"]?(\w+)", re.MULTILINE)
+
+
+def _heads_alembic() -> Set[str]:
+    """
+    Heads das migrações, lidas do texto de alembic/versions (importar o Alembic
+    e carregar as revisões custa mais que o próprio create_all). Merge
+    (down_revision em tupla) ou pasta ausente (bundle) → heads que nunca batem.
+    """
+    revisoes, anteriores = set(), set()
+    for arquivo in _ALEMBIC_VERSIONS.glob("*.py"):
+        campos = dict(_RE_REVISAO.findall(arquivo.read_text(encoding="utf-8")))
+        if "revision" in campos:
+            revisoes.add(campos["revision"])
+            anteriores.add(campos.get("down_revision"))
+    return revisoes - anteriores
+
+
+def schema_na_head(bind) -> bool:
+    """True se ``alembic_version`` do banco é exatamente a head das migrações."""
+    heads = _heads_alembic()
+    if not heads:
+        return False
+    try:
+        with bind.connect() as conn:
+            atual = {r[0] for r in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    except Exception:
+        return False  # banco sem Alembic (criado por create_all / seed)
+    return atual == heads
+
+
 def init_db():
     """
-    Create all tables
+    Create all tables.
+
+    Dispensado quando o banco já está na head do Alembic: o create_all
+    inspeciona tabela a tabela (um round-trip cada no MySQL) a cada start.
     """
+    if not is_mysql:
+        from conf.sqlite_escrita import restaurar_indices
+
+        restaurar_indices(engine)
+
+    if schema_na_head(engine):
+        db_logger.info("Schema na head do Alembic; create_all dispensado")
+        return
+
     from app.models import Base
+    from app.repositories.perda_cliente_repository import popular_se_vazio
 
     Base.metadata.create_all(bind=engine)
+    # Rollup criado agora num banco com cálculos (instalação sem Alembic; com
+    # Alembic o backfill é da migração 0005)
+    with engine.begin() as conn:
+        popular_se_vazio(conn)
 
 
 def get_db_info() -> dict:
@@ -109,18 +245,17 @@ def get_db_info() -> dict:
     }
 
 
-# Event listener para debug de queries SQL
-@event.listens_for(engine, "before_cursor_execute")
-def receive_before_cursor_execute(
-    conn, cursor, statement, params, context, executemany
-):
-    """
-    Log SQL queries antes da execução
-    """
-    if hasattr(settings, "DEBUG_SQL") and settings.DEBUG_SQL:
-        logger.info(f"\n{'='*80}")
-        logger.info("SQL Query:")
-        logger.info(f"{statement}")
-        if params:
-            logger.info(f"Parameters: {params}")
-        logger.info(f"{'='*80}\n")
+# Log de queries SQL (amostrado) — só registrado quando DEBUG_SQL=True,
+# assim o caminho normal não paga nem a chamada do listener.
+if settings.DEBUG_SQL and settings.SQL_LOG_SAMPLE_RATE > 0:
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def receive_before_cursor_execute(
+        conn, cursor, statement, params, context, executemany
+    ):
+        """
+        Log SQL queries antes da execução (fração SQL_LOG_SAMPLE_RATE)
+        """
+        if settings.SQL_LOG_SAMPLE_RATE < 1.0 and random.random() >= settings.SQL_LOG_SAMPLE_RATE:
+            return
+        logger.info("SQL%s: %s | params=%.500r", " (executemany)" if executemany else "", statement, params)
@@ -0,0 +1,121 @@
+"""
+Logging Configuration
+
+Subsistema de logging com escrita em thread de fundo:
+- Os módulos continuam usando ``logging.getLogger(__name__)`` normalmente.
+- O root logger recebe apenas um ``QueueHandler``; a formatação e a escrita em
+  console/arquivo acontecem no ``QueueListener`` (thread dedicada), fora do
+  caminho quente de importação/cálculo.
+- Registros são enfileirados sem formatar (``msg`` + ``args``), então chamadas
+  no estilo ``logger.debug("x=%s", valor)`` não custam nada abaixo do nível.
+- Níveis por módulo via ``LOG_MODULE_LEVELS`` (ex: ``"proc=WARNING,app.services.import_service=DEBUG"``).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+_LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não formata o registro na thread chamadora.
+
+    O ``QueueHandler`` padrão chama ``self.format(record)`` antes de enfileirar.
+    Aqui só o traceback (que mantém frames vivos) é convertido em texto; a
+    interpolação de ``msg % args`` fica para o listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if record.stack_info:
+            record.stack_info = str(record.stack_info)
+        return record
+
+
+def parse_module_levels(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Converte ``"modulo=NIVEL,outro=NIVEL"`` em ``{"modulo": logging.NIVEL}``.
+    Entradas inválidas são ignoradas.
+    """
+    levels: Dict[str, int] = {}
+    if not spec:
+        return levels
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level_name = item.split("=", 1)
+        name = name.strip()
+        level = logging.getLevelName(level_name.strip().upper())
+        if name and isinstance(level, int):
+            levels[name] = level
+    return levels
+
+
+def setup_logging(force: bool = False) -> None:
+    """
+    Instala o QueueHandler no root logger e inicia o listener de fundo.
+    Idempotente: chamadas repetidas não duplicam handlers.
+    """
+    global _listener, _queue_handler
+
+    if _listener is not None and not force:
+        return
+    if force:
+        shutdown_logging()
+
+    formatter = logging.Formatter(_LOG_FORMAT)
+    handlers: list[logging.Handler] = []
+
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+    handlers.append(console)
+
+    if settings.LOG_FILE:
+        file_handler = logging.handlers.RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=settings.LOG_FILE_MAX_BYTES,
+            backupCount=settings.LOG_FILE_BACKUPS,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(logging.getLevelName(settings.LOG_LEVEL.upper()))
+    root.addHandler(_queue_handler)
+
+    for name, level in parse_module_levels(settings.LOG_MODULE_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e para o listener (chamado no shutdown da aplicação)."""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,61 @@
+"""
+Métricas de desempenho da API
+
+- ``/metrics`` (ver ``app.main``) expõe os histogramas de ``conf.perf_metrics``
+  em formato texto do Prometheus, apenas para clientes locais
+  (``METRICS_ALLOWED_HOSTS``).
+- ``salvar_estagios`` grava o detalhamento por estágio de um job em background
+  (span de ``conf.debug_utils.job_trace``) em ``metadata_json["stages"]`` da
+  ImportTask/CalculoTask/RelatorioTask.
+
+É o único ponto de acoplamento da API com ``conf.debug_utils``/``conf.perf_metrics``
+(mesma ideia de ``app.adapters.proc_importacao_adapter``): serviços importam
+``PerformanceTimer``/``job_trace`` daqui.
+"""
+
+import logging
+from typing import Optional
+
+from conf.debug_utils import PerformanceTimer, job_trace
+from conf.perf_metrics import Span, render_prometheus
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+__all__ = [
+    "PROMETHEUS_CONTENT_TYPE",
+    "PerformanceTimer",
+    "cliente_autorizado",
+    "job_trace",
+    "render_prometheus",
+    "salvar_estagios",
+]
+
+
+def cliente_autorizado(host: Optional[str]) -> bool:
+    """True se ``host`` (IP do cliente da requisição) pode ler ``/metrics``."""
+    permitidos = {h.strip() for h in settings.METRICS_ALLOWED_HOSTS.split(",") if h.strip()}
+    return host is not None and ("*" in permitidos or host in permitidos)
+
+
+def salvar_estagios(db, task, span: Optional[Span]) -> None:
+    """
+    Anexa o breakdown do job à task e faz commit. Falhas aqui não podem
+    derrubar um job que já terminou: apenas loga.
+    """
+    if span is None or task is None:
+        return
+    try:
+        # Reatribui o dict: coluna JSON simples não rastreia mutação in-place
+        task.metadata_json = {
+            **(task.metadata_json or {}),
+            "stages": span.breakdown(),
+            "duration_s": round(span.duration or 0.0, 4),
+        }
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.warning("Falha ao gravar estágios da task %s", getattr(task, "id", "?"), exc_info=True)
@@ -0,0 +1,109 @@
+"""
+Cache do usuário autenticado por token (``get_current_user``).
+
+Toda requisição autenticada decodificava o JWT e lia ``usuarios`` (mais
+``usuario_permissoes`` no ``require_role``); uma página do dashboard dispara
+uma dúzia delas. Aqui cada token guarda o ``Usuario`` já carregado (com a
+permissão), destacado da sessão que o leu; a requisição recebe uma cópia
+ligada à própria sessão via ``Session.merge(load=False)``, sem SQL.
+
+Validade de uma entrada:
+
+- ``PRINCIPAL_CACHE_TTL_S`` e o ``exp`` do token, o que vencer antes;
+- ``invalidar_usuario(id)`` — chamado por ``UsuarioRepository.atualizar``/
+  ``deletar``, pela troca de senha e pela alteração de permissões. Escritas
+  de fora deste processo aparecem depois do TTL. ``0`` desliga o cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.usuario import Usuario
+
+
+@dataclass
+class _Entrada:
+    usuario: Usuario  # destacado; nunca ligado a uma sessão
+    expira: float
+
+
+def _chave(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class PrincipalCache:
+    """Usuários autenticados por token, com TTL e limite de entradas (LRU)."""
+
+    def __init__(self, ttl_s: Optional[float] = None, max_itens: Optional[int] = None):
+        self.ttl_s = settings.PRINCIPAL_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.max_itens = settings.PRINCIPAL_CACHE_MAX if max_itens is None else max_itens
+        self._entradas: "OrderedDict[bytes, _Entrada]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, token: str, db: Session) -> Optional[Usuario]:
+        """Usuário do token ligado a ``db`` (sem consulta), ou None se não está no cache."""
+        if self.ttl_s <= 0:
+            return None
+        chave = _chave(token)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            if entrada.expira <= time.monotonic():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+        return db.merge(entrada.usuario, load=False)
+
+    def guardar(self, token: str, usuario: Usuario, db: Session, exp: Optional[float] = None) -> Usuario:
+        """
+        Guarda ``usuario`` (carregado em ``db``) para ``token``; ``exp`` é o
+        ``exp`` do JWT (epoch). Devolve a instância a usar na requisição.
+        """
+        if self.ttl_s <= 0:
+            return usuario
+        usuario.permissao  # carrega antes de destacar: require_role lê o perfil
+        db.expunge(usuario)
+        validade = self.ttl_s if exp is None else min(self.ttl_s, exp - time.time())
+        with self._lock:
+            self._entradas[_chave(token)] = _Entrada(usuario, time.monotonic() + validade)
+            while len(self._entradas) > self.max_itens:
+                self._entradas.popitem(last=False)
+        return db.merge(usuario, load=False)
+
+    def invalidar_usuario(self, usuario_id: int) -> int:
+        """Remove as entradas do usuário; devolve quantas eram."""
+        with self._lock:
+            chaves = [k for k, e in self._entradas.items() if e.usuario.id == usuario_id]
+            for chave in chaves:
+                del self._entradas[chave]
+        return len(chaves)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+_cache: Optional[PrincipalCache] = None
+_cache_lock = threading.Lock()
+
+
+def principal_cache() -> PrincipalCache:
+    """Instância do processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PrincipalCache()
+        return _cache
+
+
+def invalidar_usuario(usuario_id: int) -> None:
+    """Chamado após qualquer escrita no usuário, na senha ou nas permissões."""
+    principal_cache().invalidar_usuario(usuario_id)
@@ -0,0 +1,344 @@
+"""
+SQL Profiler
+
+Agrega as queries executadas pelo engine da aplicação por *fingerprint*
+(texto normalizado: literais, parâmetros e listas ``IN (...)`` viram ``?``):
+
+- contagem, tempo total/médio/máximo e p95 (amostras recentes) por fingerprint;
+- linhas afetadas/retornadas (``cursor.rowcount``, quando o driver informa);
+- maior número de execuções do mesmo fingerprint dentro de uma única
+  requisição HTTP (``max_por_requisicao``) — o sintoma típico de N+1;
+- ``EXPLAIN`` (MySQL) / ``EXPLAIN QUERY PLAN`` (SQLite) da primeira execução
+  lenta de cada SELECT, capturado em thread própria numa conexão separada
+  (o cursor original pode estar em streaming e não pode ser reutilizado).
+
+Resultados em ``GET /api/v1/sistema/sql-profile`` (admin).
+Configuração: ``SQL_PROFILER_ENABLED``, ``SQL_SLOW_QUERY_MS``, ``SQL_PROFILER_EXPLAIN``.
+"""
+
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_AMOSTRAS_POR_FINGERPRINT = 512
+_MAX_FINGERPRINTS = 5000
+_FINGERPRINT_OUTROS = "<outros>"
+_MAX_EXEMPLO = 2000
+_MAX_LINHAS_EXPLAIN = 50
+
+_RE_COMENTARIO = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_PARAM = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):\w+")
+_RE_NUMERO = re.compile(r"(?<![\w\"`.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_RE_LISTAS_REPETIDAS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_RE_ESPACO = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Normaliza o SQL para agrupar execuções do mesmo formato.
+
+    >>> fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND nome = 'x'")
+    'select * from t where id in (?+) and nome = ?'
+    """
+    sql = _RE_COMENTARIO.sub(" ", statement)
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_PARAM.sub("?", sql)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_LISTA.sub("(?+)", sql)
+    sql = _RE_LISTAS_REPETIDAS.sub("(?+)", sql)
+    return _RE_ESPACO.sub(" ", sql).strip().lower()
+
+
+def fingerprint_id(fp: str) -> str:
+    return hashlib.sha1(fp.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class _Estatistica:
+    fingerprint: str
+    exemplo: str
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    rows: int = 0
+    executemany: int = 0
+    lentas: int = 0
+    max_por_requisicao: int = 0
+    ultimo_em: float = 0.0
+    amostras: Deque[float] = field(default_factory=lambda: deque(maxlen=_AMOSTRAS_POR_FINGERPRINT))
+    explain: Optional[dict] = None
+    explain_pendente: bool = False
+
+    def p95_s(self) -> float:
+        if not self.amostras:
+            return 0.0
+        ordenadas = sorted(self.amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(0.95 * len(ordenadas)))]
+
+    def to_dict(self, detalhe: bool = False) -> dict:
+        dados = {
+            "id": fingerprint_id(self.fingerprint),
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_s * 1000, 2),
+            "media_ms": round(self.total_s * 1000 / self.count, 3) if self.count else 0.0,
+            "p95_ms": round(self.p95_s() * 1000, 3),
+            "max_ms": round(self.max_s * 1000, 3),
+            "rows": self.rows,
+            "rows_por_exec": round(self.rows / self.count, 1) if self.count else 0.0,
+            "executemany": self.executemany,
+            "lentas": self.lentas,
+            "max_por_requisicao": self.max_por_requisicao,
+            "ultimo_em": datetime.fromtimestamp(self.ultimo_em).isoformat() if self.ultimo_em else None,
+            "tem_explain": self.explain is not None,
+        }
+        if detalhe:
+            dados["exemplo"] = self.exemplo
+            dados["explain"] = self.explain
+        return dados
+
+
+_ORDENACOES = {
+    "total": lambda e: e.total_s,
+    "count": lambda e: e.count,
+    "p95": lambda e: e.p95_s(),
+    "max": lambda e: e.max_s,
+    "rows": lambda e: e.rows,
+    "n_mais_1": lambda e: e.max_por_requisicao,
+}
+
+# Contagem por fingerprint da requisição HTTP corrente (ver SqlProfiler.escopo_requisicao)
+_contagem_requisicao: ContextVar[Optional[Dict[str, int]]] = ContextVar("sql_profiler_requisicao", default=None)
+
+
+class SqlProfiler:
+    def __init__(self, slow_ms: float = 500.0, explain: bool = True):
+        self.slow_s = slow_ms / 1000.0
+        self.explain_ativo = explain
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _Estatistica] = {}
+        self._engine: Optional[Engine] = None
+        self._fila_explain: "queue.Queue" = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+        self._local = threading.local()
+
+    # ── Instalação ────────────────────────────────────────────────────────────
+    def instalar(self, engine: Engine) -> None:
+        """Registra os listeners de cursor no ``engine``."""
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._antes)
+        event.listen(engine, "after_cursor_execute", self._depois)
+
+    def desinstalar(self) -> None:
+        if self._engine is None:
+            return
+        event.remove(self._engine, "before_cursor_execute", self._antes)
+        event.remove(self._engine, "after_cursor_execute", self._depois)
+        self._engine = None
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._sql_profiler_t0 = time.perf_counter()
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany):
+        t0 = getattr(context, "_sql_profiler_t0", None)
+        if t0 is None or getattr(self._local, "ignorar", False):
+            return
+        duracao = time.perf_counter() - t0
+        rowcount = getattr(cursor, "rowcount", -1)
+        self.registrar(
+            statement,
+            duracao,
+            rows=rowcount if rowcount is not None and rowcount >= 0 else 0,
+            executemany=executemany,
+            parametros=parameters,
+        )
+
+    # ── Registro ──────────────────────────────────────────────────────────────
+    def registrar(
+        self,
+        statement: str,
+        duracao_s: float,
+        rows: int = 0,
+        executemany: bool = False,
+        parametros=None,
+    ) -> None:
+        fp = fingerprint(statement)
+        pedir_explain = False
+        with self._lock:
+            est = self._stats.get(fp)
+            if est is None:
+                if len(self._stats) >= _MAX_FINGERPRINTS:
+                    fp = _FINGERPRINT_OUTROS
+                    est = self._stats.get(fp)
+                if est is None:
+                    est = self._stats[fp] = _Estatistica(fingerprint=fp, exemplo=statement[:_MAX_EXEMPLO])
+            est.count += 1
+            est.total_s += duracao_s
+            est.max_s = max(est.max_s, duracao_s)
+            est.rows += rows
+            est.executemany += int(bool(executemany))
+            est.ultimo_em = time.time()
+            est.amostras.append(duracao_s)
+            if duracao_s >= self.slow_s:
+                est.lentas += 1
+                if (
+                    self.explain_ativo
+                    and not executemany
+                    and est.explain is None
+                    and not est.explain_pendente
+                    and fp != _FINGERPRINT_OUTROS
+                    and _explicavel(statement)
+                ):
+                    est.explain_pendente = pedir_explain = True
+
+        contagem = _contagem_requisicao.get()
+        if contagem is not None:
+            contagem[fp] = contagem.get(fp, 0) + 1
+
+        if duracao_s >= self.slow_s:
+            logger.warning("SQL lenta (%.0f ms): %.300s", duracao_s * 1000, fp)
+        if pedir_explain:
+            self._agendar_explain(fp, statement, parametros, duracao_s)
+
+    @contextmanager
+    def escopo_requisicao(self) -> Iterator[Dict[str, int]]:
+        """
+        Conta execuções por fingerprint dentro do bloco (uma requisição HTTP) e,
+        ao sair, atualiza ``max_por_requisicao``. Endpoints síncronos rodam no
+        threadpool com cópia do contexto, então o dict é compartilhado.
+        """
+        contagem: Dict[str, int] = {}
+        token = _contagem_requisicao.set(contagem)
+        try:
+            yield contagem
+        finally:
+            _contagem_requisicao.reset(token)
+            if contagem:
+                with self._lock:
+                    for fp, n in contagem.items():
+                        est = self._stats.get(fp)
+                        if est is not None and n > est.max_por_requisicao:
+                            est.max_por_requisicao = n
+
+    # ── EXPLAIN ───────────────────────────────────────────────────────────────
+    def _agendar_explain(self, fp: str, statement: str, parametros, duracao_s: float) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._loop_explain, name="sql-profiler-explain", daemon=True)
+            self._worker.start()
+        try:
+            self._fila_explain.put_nowait((fp, statement, parametros, duracao_s))
+        except queue.Full:
+            with self._lock:
+                self._stats[fp].explain_pendente = False
+
+    def _loop_explain(self) -> None:
+        while True:
+            fp, statement, parametros, duracao_s = self._fila_explain.get()
+            try:
+                plano = self.capturar_explain(statement, parametros)
+                resultado = {"plano": plano}
+            except Exception as e:
+                resultado = {"erro": f"{type(e).__name__}: {e}"[:500]}
+            resultado["duracao_ms"] = round(duracao_s * 1000, 1)
+            resultado["capturado_em"] = datetime.now().isoformat()
+            with self._lock:
+                est = self._stats.get(fp)
+                if est is not None:
+                    est.explain = resultado
+                    est.explain_pendente = False
+            self._fila_explain.task_done()
+
+    def capturar_explain(self, statement: str, parametros=None) -> List[dict]:
+        """Executa EXPLAIN numa conexão própria; as queries do EXPLAIN não entram nas estatísticas."""
+        if self._engine is None:
+            raise RuntimeError("SqlProfiler não instalado em nenhum engine")
+        prefixo = "EXPLAIN QUERY PLAN " if self._engine.dialect.name == "sqlite" else "EXPLAIN "
+        self._local.ignorar = True
+        try:
+            with self._engine.connect() as conn:
+                result = conn.exec_driver_sql(prefixo + statement, parametros if parametros else ())
+                return [
+                    {k: _serializavel(v) for k, v in linha.items()}
+                    for linha in result.mappings().fetchmany(_MAX_LINHAS_EXPLAIN)
+                ]
+        finally:
+            self._local.ignorar = False
+
+    def aguardar_explains(self, timeout: float = 5.0) -> None:
+        """Espera a fila de EXPLAIN esvaziar (testes/diagnóstico)."""
+        limite = time.monotonic() + timeout
+        while self._fila_explain.unfinished_tasks and time.monotonic() < limite:
+            time.sleep(0.01)
+
+    # ── Consulta ──────────────────────────────────────────────────────────────
+    def resumo(self, ordenar: str = "total", limite: int = 50) -> List[dict]:
+        chave = _ORDENACOES.get(ordenar, _ORDENACOES["total"])
+        with self._lock:
+            ordenadas = sorted(self._stats.values(), key=chave, reverse=True)[:limite]
+            return [e.to_dict() for e in ordenadas]
+
+    def detalhe(self, fp_id: str) -> Optional[dict]:
+        with self._lock:
+            for est in self._stats.values():
+                if fingerprint_id(est.fingerprint) == fp_id:
+                    return est.to_dict(detalhe=True)
+        return None
+
+    def totais(self) -> dict:
+        with self._lock:
+            return {
+                "fingerprints": len(self._stats),
+                "execucoes": sum(e.count for e in self._stats.values()),
+                "total_ms": round(sum(e.total_s for e in self._stats.values()) * 1000, 2),
+                "lentas": sum(e.lentas for e in self._stats.values()),
+                "slow_ms": self.slow_s * 1000,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def _explicavel(statement: str) -> bool:
+    inicio = statement.lstrip()[:6].lower()
+    return inicio.startswith("select") or inicio.startswith("with")
+
+
+def _serializavel(valor):
+    if valor is None or isinstance(valor, (int, float, str, bool)):
+        return valor
+    if isinstance(valor, bytes):
+        return valor.decode("utf-8", "replace")
+    return str(valor)
+
+
+profiler: Optional[SqlProfiler] = None
+
+
+def instalar_profiler(engine: Engine, slow_ms: float, explain: bool) -> SqlProfiler:
+    """Cria o profiler global e o registra no engine (chamado por app.core.database)."""
+    global profiler
+    if profiler is not None:
+        profiler.desinstalar()
+    profiler = SqlProfiler(slow_ms=slow_ms, explain=explain)
+    profiler.instalar(engine)
+    return profiler
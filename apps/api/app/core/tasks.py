@@ -9,7 +9,6 @@ from uuid import uuid4
 # Structure: { task_id: { status: 'pending'|'processing'|'completed'|'failed', result: Any, error: str } }
 TASK_STORE: Dict[str, Dict[str, Any]] = {}
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("background_tasks")
 
 class TaskManager:
@@ -20,9 +20,13 @@ sys.path.insert(0, str(root_dir))
 
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, Request
+from app.core.logging_config import setup_logging, shutdown_logging
+
+setup_logging()
+
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 
 from app.api.deps import get_current_user
 from app.api.v1.api import api_router
@@ -35,7 +39,36 @@ async def lifespan(app: FastAPI):
     """Inicializar banco de dados ao startar"""
     init_db()
     logger.info("Banco de dados inicializado")
+    if settings.PURGE_RESUME_ON_STARTUP:
+        _retomar_exclusoes()
     yield
+    _encerrar_pool_conversor()
+    shutdown_logging()
+
+
+def _encerrar_pool_conversor() -> None:
+    """Encerra o pool de processos do conversor, se alguma conversão o criou."""
+    pool = sys.modules.get("app.services.conversor.pool")
+    if pool is not None:
+        pool.descartar_pool()
+
+
+def _retomar_exclusoes() -> None:
+    """Reagenda exclusões de processamento interrompidas por um restart."""
+    import threading
+
+    from app.core.database import SessionLocal
+    from app.services.purge_service import PurgeService
+
+    try:
+        with SessionLocal() as db:
+            pendentes = PurgeService(db).retomar_pendentes()
+    except Exception:
+        logger.warning("Não foi possível verificar exclusões pendentes", exc_info=True)
+        return
+    for task_id in pendentes:
+        logger.info("Retomando exclusão %s", task_id)
+        threading.Thread(target=PurgeService.run_async_purge, args=(task_id,), daemon=True).start()
 
 
 app = FastAPI(
@@ -69,6 +102,17 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": detail},
     )
 
+@app.middleware("http")
+async def sql_profile_scope(request: Request, call_next):
+    """Agrupa as queries da requisição para o profiler detectar N+1 (max_por_requisicao)."""
+    from app.core import sql_profiler
+
+    if sql_profiler.profiler is None:
+        return await call_next(request)
+    with sql_profiler.profiler.escopo_requisicao():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info("[IN]  [%s] %s", request.method, request.url.path)
@@ -107,6 +151,18 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Histogramas de estágios (PerformanceTimer) em formato Prometheus. Somente clientes locais."""
+    from app.core.metrics import PROMETHEUS_CONTENT_TYPE, cliente_autorizado, render_prometheus
+
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not cliente_autorizado(request.client.host if request.client else None):
+        raise HTTPException(status_code=403, detail="Métricas disponíveis apenas localmente")
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/debug/db-info")
 async def debug_database_info(_: str = Depends(get_current_user)):
     """Endpoint de debug - informações detalhadas do banco"""
@@ -6,6 +6,7 @@ from app.models.abusividade_task import AbusividadeTask
 from app.models.chat_session import ChatSession
 from app.models.chat_message import ChatMessage
 from app.models.alerta_config import AlertaConfig
+from app.models.arquivo_importado import ArquivoImportado
 from app.models.audit_log import AuditLog
 from app.models.bandeira import BandeiraCliente, BandeiraDisponivel
 from app.models.base import Base
@@ -17,12 +18,15 @@ from app.models.extrato_cliente import ExtratoCliente
 from app.models.import_task import ImportTask
 from app.models.log import LogCorrecao
 from app.models.notificacao import Notificacao
+from app.models.perda_cliente import PerdaCliente
+from app.models.purge_task import PurgeTask
 from app.models.recebiveis import Recebivel, RecebivelFiltrado
 from app.models.modelo_relatorio import ModeloRelatorio
 from app.models.relatorio_tag import RelatorioTag
 from app.models.relatorio_task import RelatorioTask
 from app.models.taxa import Taxa
 from app.models.taxa_contratada import TaxaContratada
+from app.models.taxas_versao import TaxasVersao
 from app.models.termo import TermoFiltravel
 
 ## Removido: formas de pagamento
@@ -35,6 +39,7 @@ from app.models.vendas import Venda, VendaFiltrada
 __all__ = [
     "Base",
     "AbusividadeTask",
+    "ArquivoImportado",
     "AuditLog",
     "Contestacao",
     "Cliente",
@@ -49,12 +54,15 @@ __all__ = [
     "TermoFiltravel",
     "Taxa",
     "TaxaContratada",
+    "TaxasVersao",
     "Venda",
     "VendaFiltrada",
     "Recebivel",
     "RecebivelFiltrado",
     "LogCorrecao",
     "Notificacao",
+    "PerdaCliente",
+    "PurgeTask",
     "ImportTask",
     "CalculoTask",
     "RelatorioTask",
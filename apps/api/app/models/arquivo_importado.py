@@ -0,0 +1,32 @@
+"""
+Registro endereçado por conteúdo dos arquivos importados.
+
+Uma linha por (processamento, sha256 do arquivo, tipo): o mesmo export mensal
+importado de novo no mesmo processamento é reconhecido pelo hash e ignorado
+antes da leitura (ver ``app.services.upload_store``).
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class ArquivoImportado(Base):
+    __tablename__ = "arquivos_importados"
+    __table_args__ = (
+        UniqueConstraint("processamento_id", "sha256", "tipo_arquivo", name="uq_arquivos_importados_hash"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    processamento_id = Column(String(100), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    tipo_arquivo = Column(String(10), nullable=False)  # V | R
+    contexto = Column(String(100))
+    arquivo = Column(String(255))  # nome no lote da primeira importação
+    bytes = Column(BigInteger)
+    processadas = Column(Integer, nullable=False, default=0)
+    filtradas = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    usuario = Column(String(50))
+    created_at = Column(DateTime, server_default=func.now())
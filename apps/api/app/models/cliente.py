@@ -66,4 +66,4 @@ class ECCliente(Base):
     __tablename__ = "ecs_cliente"
 
     cliente_id = Column(Integer, primary_key=True)
-    ec_id = Column(String(100), primary_key=True)
+    ec_id = Column(String(100), primary_key=True, index=True)  # join com perdas_cliente
@@ -2,6 +2,8 @@ from sqlalchemy import Column, DateTime, Integer, String
 
 from app.models.base import Base
 
+STATUS_EXCLUINDO = "deleting"
+
 
 class LegacyProcessamento(Base):
     __tablename__ = "controle_processamentos"
@@ -12,3 +14,4 @@ class LegacyProcessamento(Base):
     adquirente = Column(String(100))
     descricao = Column(String(255))
     data_processamento = Column(DateTime)
+    status = Column(String(20)) # NULL = ativo; STATUS_EXCLUINDO = exclusão em andamento
@@ -0,0 +1,34 @@
+"""
+Rollup de perdas por cálculo e EC.
+
+Uma linha por (calc_id, calc_tipo, ec_id) com os totais de ``vendas_calculos``;
+mantida por ``app.repositories.perda_cliente_repository`` quando um cálculo
+termina ou suas linhas são removidas. ``ec_id`` é texto, como em
+``ecs_cliente``, para o join com o cliente não precisar de CAST.
+"""
+
+from sqlalchemy import DECIMAL, Column, DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class PerdaCliente(Base):
+    __tablename__ = "perdas_cliente"
+    __table_args__ = (
+        UniqueConstraint("calc_id", "calc_tipo", "ec_id", name="uq_perdas_cliente_calc_ec"),
+        Index("ix_perdas_cliente_ec_id", "ec_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    calc_id = Column(String(50), nullable=False)
+    calc_tipo = Column(String(50), nullable=False)
+    ec_id = Column(String(100), nullable=False)
+
+    perda = Column(DECIMAL(18, 2), nullable=False, default=0)  # soma das perdas positivas
+    perda_rr = Column(DECIMAL(18, 2), nullable=False, default=0)  # idem, receba rápido
+    qtd_perda = Column(Integer, nullable=False, default=0)  # transações com perda > 0
+    volume = Column(DECIMAL(18, 2), nullable=False, default=0)  # soma de vl_venda
+    qtd_transacoes = Column(Integer, nullable=False, default=0)
+    ultimo_calculo = Column(DateTime)  # MAX(calc_data)
+    atualizado_em = Column(DateTime, server_default=func.now(), onupdate=func.now())
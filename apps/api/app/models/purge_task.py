@@ -0,0 +1,26 @@
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class PurgeTask(Base):
+    """Exclusão em lotes de um processamento (ver app.services.purge_service)."""
+
+    __tablename__ = "purge_tasks"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    processamento_id = Column(String(100), nullable=False, index=True)
+    status = Column(String(20), default="PENDING") # PENDING, PROCESSING, SUCCESS, FAILED
+    progress = Column(Integer, default=0)
+    message = Column(String(1000))
+    usuario = Column(String(50))
+    metadata_json = Column(JSON) # etapa atual, totais e removidos por tabela
+    # Lease entre workers: quem executa (host:pid) e último lote gravado
+    owner = Column(String(100))
+    heartbeat = Column(DateTime)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,23 @@
+"""
+Versão das taxas (linha única, id=1).
+
+Incrementada na mesma transação de toda escrita em ``taxas`` ou
+``taxas_contratadas`` (``app.services.taxas_snapshot.invalidar_taxas``); cada
+worker compara com a versão do seu snapshot antes de reutilizar uma partição.
+"""
+
+from sqlalchemy import DDL, BigInteger, Column, Integer, event
+
+from app.models.base import Base
+
+
+class TaxasVersao(Base):
+    __tablename__ = "taxas_versao"
+
+    id = Column(Integer, primary_key=True)
+    versao = Column(BigInteger, nullable=False, default=0)
+
+
+event.listen(
+    TaxasVersao.__table__, "after_create", DDL("INSERT INTO taxas_versao (id, versao) VALUES (1, 0)")
+)
@@ -30,6 +30,11 @@ class Venda(Base):
     status = Column("status_da_venda", String(50), default="Pendente", index=True)
     adquirente = Column("Adquirente", String(100))
 
+    # Chaves normalizadas para joins com taxas (conf/chaves_venda.py)
+    bandeira_key = Column(String(100), index=True)
+    forma_key = Column(String(100), index=True)
+    adquirente_key = Column(String(100), index=True)
+
     data_processamento = Column(DateTime, default=datetime.now)
     arquivo_origem = Column(Text)
 
@@ -1,14 +1,23 @@
 import statistics
 import time
+import uuid
 from datetime import date, datetime
 
 from dateutil.relativedelta import relativedelta
 from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
+from conf.calculos_compactos import tabela_calculos
+
 from app.models.vendas_calculos import VendasCalculos
+from app.repositories.perda_cliente_repository import (
+    atualizar_perdas_calculo,
+    atualizar_varios,
+    calculos_das_vendas,
+)
 from app.schemas.calculo import (
     AnalisePeriodosResponse,
+    CalculoCenariosRequest,
     CalculoPreviewRequest,
     CalculoRequest,
     CalculoStats,
@@ -75,7 +84,8 @@ class CalculoRepository:
         )
 
     def processar_calculo(self, req: CalculoRequest, usuario_logado: str = "sistema"):
-        # 0. Generate Unique ID: {ec_id}_{tipo_sem_log}_{timestamp}
+        # 0. Generate Unique ID: {ec_id}_{tipo_sem_log}_{timestamp}_{sufixo}
+        # O sufixo aleatório separa cálculos do mesmo EC iniciados no mesmo segundo (lotes)
         # First, find the ec_id for this processamento
         ec_sql = text("SELECT ec_id FROM vendas_processadas WHERE processamentoid = :pid LIMIT 1")
         ec_res = self.db.execute(ec_sql, {"pid": req.processamento_id}).fetchone()
@@ -83,19 +93,28 @@ class CalculoRepository:
 
         tipo_clean = req.tipo_taxa.replace("log_", "")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        custom_id = f"{ec_id}_{tipo_clean}_{timestamp}"
+        custom_id = f"{ec_id}_{tipo_clean}_{timestamp}_{uuid.uuid4().hex[:6]}"
 
         # 1. Clear previous calculation IF substituir is True
         if req.substituir:
             # We delete calculations of the same TYPE for this PROCESSAMENTO
             # We reference by the sales that belong to this processamento_id
-            sql_del = text("""
-                DELETE FROM vendas_calculos
+            params = {"pid": req.processamento_id, "tipo": req.tipo_taxa}
+            afetados = {
+                c for c in calculos_das_vendas(self.db, "processamentoid = :pid", params)
+                if c[1] == req.tipo_taxa
+            }
+            sql_del = text(f"""
+                DELETE FROM {tabela_calculos(self.db)}
                 WHERE id_venda IN (SELECT id FROM vendas_processadas WHERE processamentoid = :pid)
                 AND calc_tipo = :tipo
             """)
-            self.db.execute(sql_del, {"pid": req.processamento_id, "tipo": req.tipo_taxa})
+            self.db.execute(sql_del, params)
+            atualizar_varios(self.db, afetados)
             self.db.commit()
+            from app.services.ai_service import invalidar_contexto
+            for calc_id, _ in afetados:
+                invalidar_contexto(calc_id)
 
         # 2. Return the generated ID — ReconciliationCore handles the actual INSERT
         return custom_id
@@ -201,6 +220,13 @@ class CalculoRepository:
 
         self.db.commit()
 
+    def processar_cenarios(self, req: CalculoCenariosRequest, usuario_logado: str = "sistema") -> dict:
+        """processar_calculo for each tipo in req.tipos_taxa: {tipo_taxa: calc_id}, in request order."""
+        return {
+            tipo: self.processar_calculo(req.model_copy(update={"tipo_taxa": tipo}), usuario_logado)
+            for tipo in dict.fromkeys(req.tipos_taxa)
+        }
+
     def listar_resultados(self, calc_id_or_pid: str, skip: int = 0, limit: int = 100):
         # We try to match by calc_id first, then fallback to proc_id if no results (for legacy)
         results = self.db.query(VendasCalculos)\
@@ -323,6 +349,11 @@ class CalculoRepository:
         )
 
     def deletar_calculo(self, calc_id: str):
-        self.db.query(VendasCalculos).filter(VendasCalculos.calc_id == calc_id).delete(synchronize_session=False)
+        self.db.execute(
+            text(f"DELETE FROM {tabela_calculos(self.db)} WHERE calc_id = :calc_id"), {"calc_id": calc_id}
+        )
+        atualizar_perdas_calculo(self.db, calc_id)
         self.db.commit()
+        from app.services.ai_service import invalidar_contexto
+        invalidar_contexto(calc_id)
 
@@ -261,6 +261,10 @@ class ClienteRepository(BaseRepository[Cliente]):
         # Delete cliente
         self.db.query(Cliente).filter(Cliente.cliente_id == cliente_id).delete()
 
+        if ecs:
+            from app.services.taxas_snapshot import invalidar_taxas
+
+            invalidar_taxas(self.db)  # taxas dos ECs do cliente foram removidas
         self.db.commit()
 
     def get_ecs_por_cliente(self, cliente_id: int) -> List[str]:
@@ -1,18 +1,115 @@
-from typing import List, Optional
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import collate, delete, func, insert, select, or_
+from sqlalchemy import case, collate, column, delete, func, insert, select, or_, table
 from sqlalchemy.orm import Session
 
+from conf.calculos_compactos import tabela_calculos
+from conf.chaves_venda import normalizar_chave, preencher_chaves
+
 from app.models.log import LogCorrecao
 from app.models.recebiveis import Recebivel, RecebivelFiltrado
 from app.models.vendas import Venda, VendaFiltrada
 from app.models.vendas_calculos import VendasCalculos
-from app.schemas.correcao import HistoricoItem, ResumoItem, ResumoResponse
+from app.repositories.perda_cliente_repository import atualizar_varios
+from app.schemas.correcao import HistoricoItem, OperacaoCorrecao, ResumoItem, ResumoResponse
+
+
+OPERACOES_ATUALIZACAO = ("atualizar", "atualizar_filtradas")
+OPERACOES_CONJUNTO = ("remover", "excluir_filtradas", "restaurar_filtradas")
+OPERACOES_FILTRADAS = ("atualizar_filtradas", "excluir_filtradas", "restaurar_filtradas")
+
+
+# Campo corrigido → chave normalizada mantida junto (conf/chaves_venda.py)
+_CHAVES_VENDA = {"bandeira": Venda.bandeira_key, "forma_pagamento": Venda.forma_key}
+
+
+def _valor_chave(valor: str) -> Optional[str]:
+    """"N/A" na UI = NULL no banco."""
+    return None if valor == "N/A" else valor
+
+
+def sem_caixa_e_acento(valor: str) -> str:
+    """Aproximação da comparação do MySQL (collation ``*_ci``/``*_ai_ci`` padrão)."""
+    return "".join(c for c in unicodedata.normalize("NFKD", valor) if not unicodedata.combining(c)).casefold()
+
+
+def _valores_op(op: OperacaoCorrecao) -> Set[str]:
+    return {v for v in [*op.valores, op.valor_novo] if v is not None}
+
+
+def _conflita(grupo: List[Tuple[int, OperacaoCorrecao]], op: OperacaoCorrecao, chave: Callable[[str], str]) -> bool:
+    """True se ``op`` traz um valor que o banco iguala a outro do grupo, mas o Python não."""
+    do_grupo: Dict[str, Set[str]] = {}
+    for _, anterior in grupo:
+        for valor in _valores_op(anterior):
+            do_grupo.setdefault(chave(valor), set()).add(valor)
+    return any(do_grupo.get(chave(valor), {valor}) - {valor} for valor in _valores_op(op))
+
+
+def compilar_lote(
+    operacoes: List[OperacaoCorrecao], chave: Optional[Callable[[str], str]] = None
+) -> List[List[Tuple[int, OperacaoCorrecao]]]:
+    """
+    Agrupa operações consecutivas do mesmo tipo e campo: cada grupo vira um
+    único statement (UPDATE com CASE para renomeações encadeadas, união dos
+    valores para mover/excluir/restaurar). A ordem entre grupos é preservada;
+    ``aplicar_taxa_bc`` nunca é agrupada (filtros diferentes por operação).
+
+    O agrupamento compara valores como o Python; ``chave`` é a comparação do
+    banco (ex.: ``sem_caixa_e_acento`` no MySQL). Operação com valor que o
+    banco iguala a outro valor diferente do grupo ("VISA"/"visa") começa um
+    grupo novo: composta no CASE, cairia no ramo errado.
+    """
+    grupos: List[List[Tuple[int, OperacaoCorrecao]]] = []
+    for indice, op in enumerate(operacoes):
+        anterior = grupos[-1][0][1] if grupos else None
+        if (
+            anterior is not None
+            and op.tipo != "aplicar_taxa_bc"
+            and (anterior.tipo, anterior.campo) == (op.tipo, op.campo)
+            and not (chave and _conflita(grupos[-1], op, chave))
+        ):
+            grupos[-1].append((indice, op))
+        else:
+            grupos.append([(indice, op)])
+    return grupos
+
+
+def calc_id_taxa_bc(processamento_id: str, op: OperacaoCorrecao) -> str:
+    """Cálculo atingido por uma ``aplicar_taxa_bc`` do lote (sem ``calc_id``: o id do lote)."""
+    return op.calc_id or processamento_id
+
+
+def _compor_mapeamento(operacoes: List[OperacaoCorrecao]) -> Dict[Optional[str], str]:
+    """Valor original → valor final após aplicar as renomeações em ordem."""
+    mapa: Dict[Optional[str], str] = {}
+    for op in operacoes:
+        antigos = {_valor_chave(v) for v in op.valores}
+        for original, atual in mapa.items():
+            if atual in antigos:
+                mapa[original] = op.valor_novo
+        for valor in antigos:
+            mapa.setdefault(valor, op.valor_novo)
+    return mapa
 
 
 class CorrecaoRepository:
     def __init__(self, db: Session):
         self.db = db
+        # Em aplicar_lote: commit, log e rollup de perdas ficam para o fim do lote
+        self._em_lote = False
+        self._perdas_pendentes: Set[Tuple[str, Optional[str]]] = set()
+
+    def _commit(self):
+        if not self._em_lote:
+            self.db.commit()
+
+    def _atualizar_perdas(self, calculos: Iterable[Tuple[str, Optional[str]]]):
+        if self._em_lote:
+            self._perdas_pendentes.update((calc_id, calc_tipo) for calc_id, calc_tipo in calculos)
+        else:
+            atualizar_varios(self.db, calculos)
 
     def listar_resumo(self, processamento_id: str) -> ResumoResponse:
 
@@ -66,6 +163,8 @@ class CorrecaoRepository:
         ]
 
     def _registrar_log(self, processamento_id: str, tipo: str, valor_antigo: Optional[str], valor_novo: Optional[str], linhas: int, usuario: str = "sistema"):
+        if self._em_lote:
+            return  # aplicar_lote registra uma linha por operação do lote
         log = LogCorrecao(
             processamentoid=processamento_id,
             tipo_correcao=tipo,
@@ -124,7 +223,10 @@ class CorrecaoRepository:
             if has_na: conds.append(target_col.is_(None))
 
             if conds:
-                result = query.filter(or_(*conds)).update({target_col: valor_novo}, synchronize_session=False)
+                valores = {target_col: valor_novo}
+                if campo in _CHAVES_VENDA:
+                    valores[_CHAVES_VENDA[campo]] = normalizar_chave(valor_novo)
+                result = query.filter(or_(*conds)).update(valores, synchronize_session=False)
             else:
                 result = 0
 
@@ -137,7 +239,7 @@ class CorrecaoRepository:
                 usuario
             )
 
-        self.db.commit()
+        self._commit()
         return result
 
     def mover_para_filtradas(self, processamento_id: str, campo: str, valores: List[str], usuario: str = "sistema") -> int:
@@ -188,7 +290,7 @@ class CorrecaoRepository:
                     usuario
                 )
 
-                self.db.commit()
+                self._commit()
                 return result
 
             else:
@@ -239,10 +341,19 @@ class CorrecaoRepository:
                     ).count()
 
                     if result > 0:
-                        # Delete from calculations
-                        self.db.query(VendasCalculos).filter(
+                        # Cálculos atingidos, para refazer o rollup de perdas
+                        calculos_afetados = self.db.query(
+                            VendasCalculos.calc_id, VendasCalculos.calc_tipo
+                        ).filter(
                             VendasCalculos.id_venda.in_(select(subquery_ids))
-                        ).delete(synchronize_session=False)
+                        ).distinct().all()
+
+                        # Delete from calculations
+                        calculos = table(tabela_calculos(self.db), column("id_venda"))
+                        self.db.execute(
+                            delete(calculos).where(calculos.c.id_venda.in_(select(subquery_ids)))
+                        )
+                        self._atualizar_perdas(calculos_afetados)
 
                         # Delete from Venda
                         self.db.query(Venda).filter(
@@ -263,7 +374,7 @@ class CorrecaoRepository:
                         usuario
                     )
 
-                self.db.commit()
+                self._commit()
                 return result
 
         except Exception as e:
@@ -304,7 +415,7 @@ class CorrecaoRepository:
                     usuario
                 )
 
-                self.db.commit()
+                self._commit()
                 return result
 
             else:
@@ -340,7 +451,7 @@ class CorrecaoRepository:
                     usuario
                 )
 
-                self.db.commit()
+                self._commit()
                 return result
 
         except Exception as e:
@@ -424,6 +535,8 @@ class CorrecaoRepository:
                     q_select.filter(or_(*conds))
                 )
                 self.db.execute(stmt)
+                # vendas_filtradas não tem as chaves normalizadas
+                preencher_chaves(self.db, processamento_id)
                 result = self.db.query(VendaFiltrada).filter(
                     VendaFiltrada.processamentoid == processamento_id
                 ).filter(or_(*conds)).delete(synchronize_session=False)
@@ -432,7 +545,7 @@ class CorrecaoRepository:
 
             self._registrar_log(processamento_id, f'restauracao_{campo}', ", ".join(valores), None, result, usuario)
 
-        self.db.commit()
+        self._commit()
         return result
 
     def listar_resumo_filtradas(self, processamento_id: str) -> ResumoResponse:
@@ -522,7 +635,7 @@ class CorrecaoRepository:
                 result,
                 usuario
             )
-        self.db.commit()
+        self._commit()
         return result
 
     def listar_filtros_taxa_bc(self, processamento_id: str) -> dict:
@@ -576,6 +689,8 @@ class CorrecaoRepository:
             VendasCalculos.vl_liq_calc: VendasCalculos.vl_venda - (VendasCalculos.vl_venda * nova_taxa / 100),
             VendasCalculos.perda: VendasCalculos.vl_liq_venda - (VendasCalculos.vl_venda - (VendasCalculos.vl_venda * nova_taxa / 100))
         }, synchronize_session=False)
+        if result:
+            self._atualizar_perdas([(processamento_id, None)])
 
         self._registrar_log(
             processamento_id,
@@ -586,5 +701,177 @@ class CorrecaoRepository:
             usuario
         )
 
-        self.db.commit()
+        self._commit()
+        if not self._em_lote:
+            # No lote, o endpoint invalida depois do commit
+            from app.services.ai_service import invalidar_contexto
+            invalidar_contexto(processamento_id)
         return result
+
+    # ------------------------------------------------------------------
+    # Lote de correções (uma transação, um rollup, uma invalidação)
+    # ------------------------------------------------------------------
+
+    def _coluna(self, campo: str, filtradas: bool):
+        if campo == "lancamento":
+            model = RecebivelFiltrado if filtradas else Recebivel
+            return model, model.lancamento
+        if campo not in ("forma_pagamento", "bandeira", "status"):
+            raise ValueError(f"Campo inválido: {campo}")
+        model = VendaFiltrada if filtradas else Venda
+        return model, getattr(model, campo)
+
+    def _contagem_por_valor(self, model, coluna, processamento_id: str) -> Dict[Optional[str], int]:
+        rows = self.db.query(coluna, func.count()).filter(
+            model.processamentoid == processamento_id
+        ).group_by(coluna).all()
+        return {valor: qtd for valor, qtd in rows}
+
+    def _aplicar_mapeamento(self, processamento_id: str, campo: str, filtradas: bool, mapa: Dict[Optional[str], str]) -> int:
+        """Um único UPDATE ... SET col = CASE ... para um conjunto de renomeações."""
+        model, coluna = self._coluna(campo, filtradas)
+        mudancas = {antigo: novo for antigo, novo in mapa.items() if antigo != novo}
+        if not mudancas:
+            return 0
+
+        conds, whens = [], []
+        nao_nulos = [v for v in mudancas if v is not None]
+        if nao_nulos:
+            conds.append(coluna.in_(nao_nulos))
+            whens.extend((coluna == antigo, mudancas[antigo]) for antigo in nao_nulos)
+        if None in mudancas:
+            conds.append(coluna.is_(None))
+            whens.append((coluna.is_(None), mudancas[None]))
+
+        valores = {coluna: case(*whens, else_=coluna)}
+        if model is Venda and campo in _CHAVES_VENDA:
+            chave = _CHAVES_VENDA[campo]
+            valores[chave] = case(*((cond, normalizar_chave(novo)) for cond, novo in whens), else_=chave)
+        return self.db.query(model).filter(
+            model.processamentoid == processamento_id
+        ).filter(or_(*conds)).update(valores, synchronize_session=False)
+
+    def _executar_unica(self, processamento_id: str, op: OperacaoCorrecao, usuario: str) -> int:
+        if op.tipo == "aplicar_taxa_bc":
+            if op.nova_taxa is None:
+                raise ValueError("aplicar_taxa_bc exige nova_taxa")
+            return self.aplicar_taxa_bc(
+                calc_id_taxa_bc(processamento_id, op), op.forma_pagamento or "TODOS", op.bandeira or "TODOS",
+                op.data_ini, op.data_fim, op.nova_taxa, usuario,
+            )
+        metodos = {
+            "atualizar": self.atualizar_em_massa,
+            "atualizar_filtradas": self.atualizar_filtradas,
+            "remover": self.mover_para_filtradas,
+            "excluir_filtradas": self.deletar_filtradas,
+            "restaurar_filtradas": self.restaurar_filtradas,
+        }
+        if op.tipo in OPERACOES_ATUALIZACAO:
+            return metodos[op.tipo](processamento_id, op.campo, op.valores, op.valor_novo, usuario)
+        return metodos[op.tipo](processamento_id, op.campo, op.valores, usuario)
+
+    def _executar_grupo(self, processamento_id: str, grupo: List[Tuple[int, OperacaoCorrecao]], usuario: str) -> Dict[int, int]:
+        """Executa um grupo compilado; devolve linhas afetadas por índice de operação."""
+        if len(grupo) == 1:
+            indice, op = grupo[0]
+            return {indice: self._executar_unica(processamento_id, op, usuario)}
+
+        tipo, campo = grupo[0][1].tipo, grupo[0][1].campo
+        ops = [op for _, op in grupo]
+        model, coluna = self._coluna(campo, tipo in OPERACOES_FILTRADAS)
+        # Linhas por operação simuladas sobre a contagem por valor (um SELECT agrupado)
+        contagem = self._contagem_por_valor(model, coluna, processamento_id)
+        linhas: Dict[int, int] = {}
+
+        if tipo in OPERACOES_ATUALIZACAO:
+            self._aplicar_mapeamento(processamento_id, campo, tipo in OPERACOES_FILTRADAS, _compor_mapeamento(ops))
+            for indice, op in grupo:
+                movidas = sum(contagem.pop(v, 0) for v in {_valor_chave(v) for v in op.valores})
+                contagem[op.valor_novo] = contagem.get(op.valor_novo, 0) + movidas
+                linhas[indice] = movidas
+            return linhas
+
+        valores = list(dict.fromkeys(v for op in ops for v in op.valores))
+        self._executar_unica(processamento_id, ops[0].model_copy(update={"valores": valores}), usuario)
+        for indice, op in grupo:
+            linhas[indice] = sum(contagem.pop(v, 0) for v in {_valor_chave(v) for v in op.valores})
+        return linhas
+
+    def _log_operacao(self, processamento_id: str, op: OperacaoCorrecao, linhas: int, usuario: str):
+        if op.tipo == "aplicar_taxa_bc":
+            tipo = "taxa_bc"
+        elif op.campo == "lancamento":
+            tipo = {
+                "atualizar": "atualizacao_lancamento_recebiveis",
+                "atualizar_filtradas": "atualizacao_lancamento_recebiveis_filtrados",
+                "remover": "remocao_lancamento_recebiveis",
+                "excluir_filtradas": "exclusao_permanente_recebiveis_filtrados",
+                "restaurar_filtradas": "restauracao_lancamento_recebiveis",
+            }[op.tipo]
+        else:
+            tipo = {
+                "atualizar": f"atualizacao_{op.campo}",
+                "atualizar_filtradas": f"atualizacao_{op.campo}_filtradas",
+                "remover": f"remocao_{op.campo}",
+                "excluir_filtradas": f"exclusao_permanente_{op.campo}_filtradas",
+                "restaurar_filtradas": f"restauracao_{op.campo}",
+            }[op.tipo]
+
+        if op.tipo == "aplicar_taxa_bc":
+            antigo, novo = None, f"Taxa: {op.nova_taxa}% | FP: {op.forma_pagamento} | B: {op.bandeira}"
+        else:
+            antigo, novo = ", ".join(op.valores), op.valor_novo
+        self._registrar_log(processamento_id, tipo, antigo, novo, linhas, usuario)
+
+    def aplicar_lote(self, processamento_id: str, operacoes: List[OperacaoCorrecao], usuario: str = "sistema") -> dict:
+        """
+        Aplica uma lista ordenada de correções numa única transação.
+
+        Operações consecutivas compatíveis viram um statement só
+        (``compilar_lote``); o rollup de perdas é refeito uma vez, antes do
+        commit. Qualquer erro desfaz o lote inteiro.
+
+        As correções de linhas filtram ``processamentoid``; ``aplicar_taxa_bc``
+        filtra ``vendas_calculos.calc_id``. Num lote com os dois, cada taxa BC
+        precisa informar o seu ``calc_id``.
+        """
+        misto = any(op.tipo != "aplicar_taxa_bc" for op in operacoes)
+        for op in operacoes:
+            if op.tipo != "aplicar_taxa_bc":
+                self._coluna(op.campo or "", op.tipo in OPERACOES_FILTRADAS)
+            elif misto and not op.calc_id:
+                raise ValueError("aplicar_taxa_bc exige calc_id em lote com correções de linhas")
+            if op.tipo in OPERACOES_ATUALIZACAO and op.valor_novo is None:
+                raise ValueError(f"{op.tipo} exige valor_novo")
+
+        # SQLite compara texto byte a byte; MySQL, pela collation (sem caixa/acento)
+        mysql = self.db.get_bind().dialect.name == "mysql"
+        grupos = compilar_lote(operacoes, sem_caixa_e_acento if mysql else None)
+        linhas: Dict[int, int] = {}
+        self._em_lote = True
+        self._perdas_pendentes = set()
+        try:
+            for grupo in grupos:
+                linhas.update(self._executar_grupo(processamento_id, grupo, usuario))
+            pendentes = sorted(self._perdas_pendentes, key=lambda c: (c[0], c[1] or ""))
+            self._em_lote = False
+
+            for indice, op in enumerate(operacoes):
+                self._log_operacao(processamento_id, op, linhas[indice], usuario)
+            atualizar_varios(self.db, pendentes)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._em_lote = False
+            self._perdas_pendentes = set()
+
+        return {
+            "linhas_afetadas": sum(linhas.values()),
+            "etapas": len(grupos),
+            "operacoes": [
+                {"indice": indice, "tipo": op.tipo, "linhas_afetadas": linhas[indice]}
+                for indice, op in enumerate(operacoes)
+            ],
+        }
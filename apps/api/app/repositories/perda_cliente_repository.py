@@ -0,0 +1,158 @@
+"""
+Rollup de perdas por cliente (tabela ``perdas_cliente``).
+
+Manutenção (funções soltas, aceitam ``Session`` ou ``Connection``; o commit é
+do chamador, para ficar na mesma transação que altera ``vendas_calculos``):
+
+- ``atualizar_perdas_calculo``: refaz as linhas de um cálculo a partir de
+  ``vendas_calculos`` (zero linhas restantes → rollup removido);
+- ``calculos_das_vendas``: (calc_id, calc_tipo) atingidos por uma remoção
+  parcial de vendas, para atualizar depois do DELETE;
+- ``reconstruir_perdas``: recalcula tudo (migração / tabela vazia);
+- ``popular_se_vazio``: backfill único no startup (``init_db``) para bancos
+  que já tinham cálculos antes do rollup e sobem sem Alembic. As leituras
+  nunca escrevem.
+
+Leitura (``PerdaClienteRepository``): ranking, fallback por EC e resumo do
+cliente, cada um em um único SELECT sobre o rollup + ``ecs_cliente``/``clientes``.
+"""
+
+import logging
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# CAST(... AS CHAR) vale para MySQL e SQLite (afinidade TEXT) e só roda aqui,
+# filtrado por calc_id; as leituras juntam texto com texto.
+_SELECT_AGREGADO = """
+    SELECT calc_id, calc_tipo, COALESCE(CAST(ec_id AS CHAR), '') AS ec_id,
+           SUM(CASE WHEN perda > 0 THEN perda ELSE 0 END) AS perda,
+           SUM(CASE WHEN perda_rr > 0 THEN perda_rr ELSE 0 END) AS perda_rr,
+           SUM(CASE WHEN perda > 0 THEN 1 ELSE 0 END) AS qtd_perda,
+           COALESCE(SUM(vl_venda), 0) AS volume,
+           COUNT(*) AS qtd_transacoes,
+           MAX(calc_data) AS ultimo_calculo
+    FROM vendas_calculos
+    {where}
+    GROUP BY calc_id, calc_tipo, COALESCE(CAST(ec_id AS CHAR), '')
+"""
+
+_INSERT_ROLLUP = """
+    INSERT INTO perdas_cliente
+        (calc_id, calc_tipo, ec_id, perda, perda_rr, qtd_perda, volume, qtd_transacoes, ultimo_calculo)
+"""
+
+
+def atualizar_perdas_calculo(executor, calc_id: str, calc_tipo: Optional[str] = None) -> None:
+    """Recalcula o rollup de ``calc_id`` (e ``calc_tipo``, se informado)."""
+    filtro = "WHERE calc_id = :calc_id" + (" AND calc_tipo = :calc_tipo" if calc_tipo else "")
+    params = {"calc_id": calc_id, "calc_tipo": calc_tipo}
+    executor.execute(text(f"DELETE FROM perdas_cliente {filtro}"), params)
+    executor.execute(
+        text(_INSERT_ROLLUP + _SELECT_AGREGADO.format(where=filtro + " AND calc_tipo IS NOT NULL")),
+        params,
+    )
+
+
+def atualizar_varios(executor, calculos: Iterable[Tuple[str, Optional[str]]]) -> None:
+    for calc_id, calc_tipo in calculos:
+        atualizar_perdas_calculo(executor, calc_id, calc_tipo)
+
+
+def calculos_das_vendas(executor, where_vendas: str, params: dict) -> Set[Tuple[str, str]]:
+    """
+    (calc_id, calc_tipo) com linhas cujas vendas atendem ``where_vendas``
+    (condição sobre ``vendas_processadas``). Chamar antes do DELETE.
+    """
+    rows = executor.execute(
+        text(
+            "SELECT DISTINCT calc_id, calc_tipo FROM vendas_calculos "
+            f"WHERE id_venda IN (SELECT id FROM vendas_processadas WHERE {where_vendas})"
+        ),
+        params,
+    ).fetchall()
+    return {(r[0], r[1]) for r in rows}
+
+
+def reconstruir_perdas(executor) -> None:
+    """Apaga e recalcula o rollup de todos os cálculos (um único INSERT ... SELECT)."""
+    executor.execute(text("DELETE FROM perdas_cliente"))
+    executor.execute(
+        text(_INSERT_ROLLUP + _SELECT_AGREGADO.format(where="WHERE calc_id IS NOT NULL AND calc_tipo IS NOT NULL"))
+    )
+
+
+def popular_se_vazio(executor) -> bool:
+    """Bancos que já tinham cálculos antes do rollup: reconstrói uma vez. True se reconstruiu."""
+    if executor.execute(text("SELECT 1 FROM perdas_cliente LIMIT 1")).first():
+        return False
+    if not executor.execute(text("SELECT 1 FROM vendas_calculos LIMIT 1")).first():
+        return False
+    logger.info("perdas_cliente vazio com vendas_calculos populado: reconstruindo rollup")
+    reconstruir_perdas(executor)
+    return True
+
+
+_RANKING_SQL = text("""
+    SELECT e.cliente_id,
+           c.nome_fantasia, c.razao_social,
+           SUM(p.perda) AS total_perda,
+           SUM(p.perda_rr) AS total_perda_rr,
+           SUM(p.qtd_perda) AS count_transacoes,
+           SUM(p.volume) AS volume,
+           MAX(p.ultimo_calculo) AS ultimo_calculo
+    FROM perdas_cliente p
+    JOIN ecs_cliente e ON e.ec_id = p.ec_id
+    LEFT JOIN clientes c ON c.cliente_id = e.cliente_id
+    WHERE p.qtd_perda > 0
+    GROUP BY e.cliente_id, c.nome_fantasia, c.razao_social
+    ORDER BY total_perda DESC
+    LIMIT :limit
+""")
+
+_RANKING_POR_EC_SQL = text("""
+    SELECT p.ec_id,
+           SUM(p.perda) AS total_perda,
+           SUM(p.perda_rr) AS total_perda_rr,
+           SUM(p.qtd_perda) AS count_transacoes,
+           SUM(p.volume) AS volume,
+           MAX(p.ultimo_calculo) AS ultimo_calculo
+    FROM perdas_cliente p
+    WHERE p.qtd_perda > 0
+    GROUP BY p.ec_id
+    ORDER BY total_perda DESC
+    LIMIT :limit
+""")
+
+_RESUMO_CLIENTE_SQL = text("""
+    SELECT c.cliente_id, c.nome_fantasia, c.razao_social, c.cnpj,
+           COALESCE(SUM(p.perda), 0) AS total_perda,
+           COALESCE(SUM(p.perda_rr), 0) AS total_perda_rr,
+           COALESCE(SUM(p.qtd_perda), 0) AS count_transacoes,
+           COALESCE(SUM(p.volume), 0) AS volume,
+           MAX(p.ultimo_calculo) AS ultimo_calculo
+    FROM clientes c
+    LEFT JOIN ecs_cliente e ON e.cliente_id = c.cliente_id
+    LEFT JOIN perdas_cliente p ON p.ec_id = e.ec_id
+    WHERE c.cliente_id = :cliente_id
+    GROUP BY c.cliente_id, c.nome_fantasia, c.razao_social, c.cnpj
+""")
+
+
+class PerdaClienteRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ranking(self, limit: int) -> List[dict]:
+        return [dict(r) for r in self.db.execute(_RANKING_SQL, {"limit": limit}).mappings()]
+
+    def ranking_por_ec(self, limit: int) -> List[dict]:
+        return [dict(r) for r in self.db.execute(_RANKING_POR_EC_SQL, {"limit": limit}).mappings()]
+
+    def resumo_cliente(self, cliente_id: int) -> Optional[dict]:
+        """Atributos do cliente + totais de perda; ``None`` se o cliente não existe."""
+        row = self.db.execute(_RESUMO_CLIENTE_SQL, {"cliente_id": cliente_id}).mappings().first()
+        return dict(row) if row else None
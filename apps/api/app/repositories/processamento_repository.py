@@ -1,12 +1,12 @@
 from datetime import datetime
 from typing import List, Optional, Tuple
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, or_, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from app.core.db_helpers import exec_sql, fetch_one
-from app.models.legacy_processamento import LegacyProcessamento
+from app.models.legacy_processamento import STATUS_EXCLUINDO, LegacyProcessamento
 from app.schemas.processamento import ProcessamentoFilter, ProcessamentoResponse
 
 # ---------------------------------------------------------------------------
@@ -53,7 +53,9 @@ class ProcessamentoRepository:
 
     def listar(self, skip: int = 0, limit: int = 20, filtros: ProcessamentoFilter = None, simple: bool = False) -> List[ProcessamentoResponse]:
         # Base query for processamentos
-        query = self.db.query(LegacyProcessamento)
+        query = self.db.query(LegacyProcessamento).filter(
+            or_(LegacyProcessamento.status.is_(None), LegacyProcessamento.status != STATUS_EXCLUINDO)
+        )
 
         if filtros:
             if filtros.cliente_id:
@@ -180,68 +182,49 @@ class ProcessamentoRepository:
     def criar(self, dados: dict) -> ProcessamentoResponse:
         pass
 
+    def marcar_exclusao(self, ids: List[str]) -> int:
+        """
+        Marca os processamentos como em exclusão: somem das listagens na hora,
+        antes de o job em lotes apagar as linhas. Perdas do próprio cálculo
+        saem do rollup no mesmo commit.
+        """
+        if not ids:
+            return 0
+        res = self.db.execute(
+            text(
+                "UPDATE controle_processamentos SET status = :status WHERE id_processamento IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"status": STATUS_EXCLUINDO, "ids": list(ids)},
+        )
+        self.db.execute(
+            text("DELETE FROM perdas_cliente WHERE calc_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(ids)},
+        )
+        self.db.commit()
+        return res.rowcount
+
     def deletar_lista(self, ids: List[str]) -> bool:
         """
-        Remove múltiplos processamentos e todas as tabelas relacionadas de forma otimizada.
-        Usa DELETE direto para performance máxima.
+        Remove múltiplos processamentos e todas as tabelas relacionadas, de forma
+        síncrona, com a mesma exclusão em lotes do job em background
+        (``app.services.purge_service``).
         """
         import logging
         logger = logging.getLogger(__name__)
 
+        from app.services.purge_service import PurgeService
+
         if not ids:
             return False
 
+        self.marcar_exclusao(ids)
+        service = PurgeService(self.db)
         success_count = 0
-
-        # Tabelas filhas (ordem de dependência)
-        tables_map = [
-            ("vendas_calculos", "calc_id"),
-            ("vendas_processadas", "processamentoid"),
-            ("vendas_filtradas", "processamentoid"),
-            ("recebiveis_processados", "processamentoid"),
-            ("recebiveis_filtrados", "processamentoid")
-        ]
-
         for pid in ids:
-            logger.info(f"--- Iniciando deleção rápida do Processamento: {pid} ---")
+            task = service.criar_task(pid)
             try:
-                # 1a. Garantir que vendas_calculos seja limpa pelas DUAS chaves possíveis:
-                #     calc_id = pid  (caminho normal)
-                #     id_venda IN (SELECT id FROM vendas_processadas WHERE processamentoid = pid)
-                #     Necessário porque calc_id pode diferir do processamentoid em alguns registros.
-                res = self.db.execute(
-                    text("DELETE FROM vendas_calculos WHERE calc_id = :pid"),
-                    {"pid": pid}
-                )
-                logger.info(f"[{pid}] vendas_calculos por calc_id: {res.rowcount} linhas")
-
-                res = self.db.execute(
-                    text("""
-                        DELETE vc FROM vendas_calculos vc
-                        INNER JOIN vendas_processadas vp ON vp.id = vc.id_venda
-                        WHERE vp.processamentoid = :pid
-                    """),
-                    {"pid": pid}
-                )
-                logger.info(f"[{pid}] vendas_calculos por id_venda: {res.rowcount} linhas")
-
-                # 1b. Remover registros das demais tabelas filhas
-                for table, col_fk in tables_map:
-                    if table == "vendas_calculos":
-                        continue  # já tratada acima
-                    delete_sql = text(f"DELETE FROM {table} WHERE {col_fk} = :pid")
-                    res = self.db.execute(delete_sql, {"pid": pid})
-                    logger.info(f"[{pid}] Removidos registros de {table}. Linhas afetadas: {res.rowcount}")
-
-                # 2. Remover tabela pai
-                sql_pai = text("DELETE FROM controle_processamentos WHERE id_processamento = :pid")
-                self.db.execute(sql_pai, {"pid": pid})
-                
-                # Commit único por processamento para garantir integridade e velocidade
-                self.db.commit()
-                logger.info(f"[{pid}] DELEÇÃO CONCLUÍDA COM SUCESSO.")
+                service.executar(task)
                 success_count += 1
-
             except Exception as e:
                 self.db.rollback()
                 logger.error(f"ERRO ao deletar processamento {pid}: {e}")
@@ -41,8 +41,11 @@ class TaxaRepository:
 
     def adicionar(self, taxa_data: Dict[str, Any]) -> Taxa:
         """Add taxa"""
+        from app.services.taxas_snapshot import invalidar_taxas
+
         nova_taxa = Taxa(**taxa_data)
         self.db.add(nova_taxa)
+        invalidar_taxas(self.db)
         self.db.commit()
         self.db.refresh(nova_taxa)
         return nova_taxa
@@ -52,7 +55,10 @@ class TaxaRepository:
         taxa = self.db.query(Taxa).filter(Taxa.id == taxa_id).first()
 
         if taxa:
+            from app.services.taxas_snapshot import invalidar_taxas
+
             self.db.delete(taxa)
+            invalidar_taxas(self.db)
             self.db.commit()
             return True
         return False
@@ -106,6 +112,9 @@ class TaxaRepository:
                 self.db.add(nova_taxa)
                 copiadas += 1
 
+        from app.services.taxas_snapshot import invalidar_taxas
+
+        invalidar_taxas(self.db)
         self.db.commit()
 
         return {
@@ -5,9 +5,10 @@ Repository de Taxas — sem dependências de conf.funcoesbd.
 import logging
 from typing import Any, Dict, List
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.core.db_helpers import exec_sql, fetch_all, normalize_compare
+from app.core.db_helpers import fetch_all, normalize_compare
 from app.schemas.taxa import TaxaCopiarRequest, TaxaCreate, TaxaUpdate
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,16 @@ class TaxasRepository:
         self.db = db
         self.engine = db.get_bind()
 
+    def _executar(self, sql: str, params: Dict[str, Any]) -> None:
+        self.db.execute(text(sql), params)
+
+    def _confirmar(self) -> None:
+        """Commit com a versão das taxas na mesma transação (snapshot dos outros workers)."""
+        from app.services.taxas_snapshot import invalidar_taxas
+
+        invalidar_taxas(self.db)
+        self.db.commit()
+
     def listar_por_ec(self, ec: str, contexto: str = "padrao") -> List[Dict[str, Any]]:
         sql = (
             "SELECT id, ec, bandeira, forma_pagamento, parcelado, "
@@ -42,9 +53,11 @@ class TaxasRepository:
             ":parcelas_fim, :data_ini, :data_fim, :taxa, :contexto)"
         )
         try:
-            exec_sql(self.engine, sql, taxa_dict)
+            self._executar(sql, taxa_dict)
+            self._confirmar()
             return True
         except Exception as e:
+            self.db.rollback()
             logger.error("Erro ao inserir taxa: %s", e)
             return False
 
@@ -58,17 +71,21 @@ class TaxasRepository:
         taxa_dict["id"] = taxa_id
         sql = f"UPDATE taxas SET {set_clause} WHERE id=:id"
         try:
-            exec_sql(self.engine, sql, taxa_dict)
+            self._executar(sql, taxa_dict)
+            self._confirmar()
             return True
         except Exception as e:
+            self.db.rollback()
             logger.error("Erro ao atualizar taxa: %s", e)
             return False
 
     def deletar(self, taxa_id: int) -> bool:
         try:
-            exec_sql(self.engine, "DELETE FROM taxas WHERE id = :id", {"id": taxa_id})
+            self._executar("DELETE FROM taxas WHERE id = :id", {"id": taxa_id})
+            self._confirmar()
             return True
         except Exception as e:
+            self.db.rollback()
             logger.error("Erro ao excluir taxa: %s", e)
             return False
 
@@ -85,12 +102,10 @@ class TaxasRepository:
                 continue
             try:
                 if request.sobrescrever:
-                    exec_sql(
-                        self.engine,
+                    self._executar(
                         f"DELETE FROM taxas WHERE ec = :ec AND {normalize_compare(self.engine, 'contexto', 'contexto')}",
                         {"ec": ec_dest, "contexto": request.contexto},
                     )
-                    resultado["removidas"] += 1
 
                 for taxa in taxas_origem:
                     nova = {k: v for k, v in taxa.items() if k != "id"}
@@ -103,9 +118,13 @@ class TaxasRepository:
                         "VALUES (:ec, :bandeira, :forma_pagamento, :parcelado, :parcelas_ini, "
                         ":parcelas_fim, :data_ini, :data_fim, :taxa, :contexto)"
                     )
-                    exec_sql(self.engine, sql, nova)
-                    resultado["copiadas"] += 1
+                    self._executar(sql, nova)
+                # Um EC por transação: contagens só do que foi confirmado
+                self._confirmar()
+                resultado["removidas"] += int(request.sobrescrever)
+                resultado["copiadas"] += len(taxas_origem)
             except Exception as e:
+                self.db.rollback()
                 logger.error("Erro ao copiar taxas para %s: %s", ec_dest, e)
                 resultado["erros"].append(str(e))
 
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.principal_cache import invalidar_usuario
 from app.models.usuario import Usuario
 from app.repositories.base import BaseRepository
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
@@ -48,6 +49,7 @@ class UsuarioRepository(BaseRepository[Usuario]):
 
         self.db.add(db_obj)
         self.db.commit()
+        invalidar_usuario(usuario_id)
         self.db.refresh(db_obj)
         return db_obj
 
@@ -57,4 +59,5 @@ class UsuarioRepository(BaseRepository[Usuario]):
             return False
         self.db.delete(db_obj)
         self.db.commit()
+        invalidar_usuario(usuario_id)
         return True
@@ -14,6 +14,25 @@ class CalculoPreviewRequest(BaseModel):
 class CalculoRequest(CalculoPreviewRequest):
     substituir: bool = False
 
+TIPOS_LOG = ["log_mensal", "log_trimestral", "log_semestral", "log_anual"]
+
+class CalculoCenariosRequest(CalculoRequest):
+    """Várias periodicidades de LOG num cálculo só (um calc_id por tipo; ``tipo_taxa`` é ignorado)."""
+    tipos_taxa: List[Literal["log_mensal", "log_trimestral", "log_semestral", "log_anual"]] = Field(
+        default_factory=lambda: list(TIPOS_LOG), min_length=1
+    )
+
+class CalculoLoteRequest(BaseModel):
+    """Recálculo de vários processamentos: união de ``processamento_ids``, ``cliente_id`` e ``taxa_id``."""
+    processamento_ids: List[str] = Field(default_factory=list)
+    cliente_id: Optional[int] = None
+    taxa_id: Optional[int] = None  # processamentos com vendas do EC da taxa dentro da vigência
+    tipo_taxa: str = Field("log_mensal", max_length=50)
+    tipos_taxa: Optional[List[Literal["log_mensal", "log_trimestral", "log_semestral", "log_anual"]]] = None
+    usar_taxa_cad: bool = False
+    tem_receba_rapido: bool = False
+    substituir: bool = False
+
 class CalculoStats(BaseModel):
     total_vendas: int
     valor_total: Decimal
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -39,6 +39,38 @@ class FiltrosBCResponse(BaseModel):
     formas: List[str]
     bandeiras: List[str]
 
+class OperacaoCorrecao(BaseModel):
+    tipo: Literal[
+        "atualizar", "atualizar_filtradas", "remover",
+        "excluir_filtradas", "restaurar_filtradas", "aplicar_taxa_bc",
+    ]
+    campo: Optional[str] = None  # obrigatório exceto em aplicar_taxa_bc
+    valores: List[str] = []  # valores (ou valores antigos, em atualizar*)
+    valor_novo: Optional[str] = None  # atualizar*
+    # aplicar_taxa_bc
+    calc_id: Optional[str] = None  # cálculo alvo; obrigatório se o lote tem correções de linhas
+    forma_pagamento: Optional[str] = None
+    bandeira: Optional[str] = None
+    data_ini: Optional[str] = None
+    data_fim: Optional[str] = None
+    nova_taxa: Optional[float] = None
+
+class LoteCorrecaoRequest(BaseModel):
+    processamento_id: str
+    operacoes: List[OperacaoCorrecao]  # aplicadas nesta ordem
+    usuario: str = "sistema"
+
+class ResultadoOperacao(BaseModel):
+    indice: int
+    tipo: str
+    linhas_afetadas: int
+
+class LoteCorrecaoResponse(BaseModel):
+    message: str
+    linhas_afetadas: int
+    etapas: int  # statements após agrupar operações consecutivas compatíveis
+    operacoes: List[ResultadoOperacao]
+
 class AplicarTaxaBCRequest(BaseModel):
     processamento_id: str
     forma_pagamento: str  # 'TODOS' ou valor específico
@@ -1,13 +1,18 @@
+from __future__ import annotations
+
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Literal, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
 
 logger = logging.getLogger(__name__)
 
-import polars as pl
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:  # Polars importado nos métodos de análise, não no startup da API
+    import polars as pl
+
+from app.core.database import engine_leitura
 from app.models.processamento import Processamento
 from app.models.vendas_calculos import VendasCalculos
 from app.schemas.abusividade import (
@@ -111,7 +116,9 @@ class AbusividadeService:
         1. Carrega dados do banco via query SQL direta (mais rápido que ORM).
         2. Processamento vetorizado para detectar variações de taxa.
         """
-        engine = self.db.get_bind()
+        import polars as pl
+
+        engine = engine_leitura(self.db)
 
         # 1. Construir query SQL eficiente
         sql = "SELECT id, calc_id, data_venda, ec_id, bandeira, forma_pagamento, tx_venda, vl_venda, cod_autorizacao, nsu FROM vendas_calculos WHERE 1=1"
@@ -213,7 +220,9 @@ class AbusividadeService:
 
     def analisar_detalhado(self, processamento_id: str) -> AbusividadeDetalhadaResponse:
         """Análise detalhada por bandeira/forma_pagamento com granularidade temporal."""
-        engine = self.db.get_bind()
+        import polars as pl
+
+        engine = engine_leitura(self.db)
         sql = (
             "SELECT bandeira, forma_pagamento, tx_venda, data_venda "
             "FROM vendas_calculos WHERE calc_id = :calc_id"
@@ -276,6 +285,8 @@ class AbusividadeService:
         )
 
     def _agrupar_granularidade(self, df: pl.DataFrame, chave: pl.Series, media_geral: float, label_fn) -> List[GranularidadeItem]:
+        import polars as pl
+
         tmp = df.with_columns(chave.alias("_g"))
         agr = (
             tmp.group_by("_g")
@@ -1,14 +1,13 @@
 import json
 import logging
 import re
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from langchain_community.agent_toolkits import create_sql_agent
-from langchain_community.utilities import SQLDatabase
-from langchain_openai import ChatOpenAI
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -37,6 +36,56 @@ def check_rate_limit(user_id: str, max_per_minute: int = 10) -> bool:
     return True
 
 
+# Cache do contexto do chat: calc_id -> (versão, texto, dados). LRU pequeno,
+# compartilhado entre usuários; a versão é conferida a cada mensagem e quem
+# altera linhas do cálculo no lugar chama ``invalidar_contexto``.
+_CONTEXTO_CACHE_MAX = 64
+_contexto_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_contexto_lock = threading.Lock()
+
+_SQL_VERSAO_CALCULO = text(
+    "SELECT COUNT(*) AS n, MAX(id) AS max_id FROM vendas_calculos WHERE calc_id = :calc_id"
+)
+
+_SQL_AGREGADO_CONTEXTO = text("""
+    SELECT bandeira, forma_pagamento,
+           COUNT(*) AS tx,
+           SUM(vl_venda) AS valor,
+           SUM(perda) AS perda,
+           SUM(CASE WHEN tx_venda <> 0 THEN tx_venda END) AS soma_taxa,
+           SUM(CASE WHEN tx_venda <> 0 THEN 1 ELSE 0 END) AS n_taxa
+    FROM vendas_calculos
+    WHERE calc_id = :calc_id
+    GROUP BY bandeira, forma_pagamento
+""")
+
+
+def invalidar_contexto(calc_id: str) -> None:
+    """Descarta o contexto em cache de ``calc_id`` (UPDATE que não muda COUNT/MAX(id))."""
+    with _contexto_lock:
+        _contexto_cache.pop(calc_id, None)
+
+
+def _versao_calculo(db: Session, calc_id: str) -> Optional[tuple]:
+    row = db.execute(_SQL_VERSAO_CALCULO, {"calc_id": calc_id}).first()
+    return (int(row[0] or 0), row[1]) if row else None
+
+
+def _agregar_por_grupo(db: Session, calc_id: str) -> dict:
+    """Totais por "Bandeira Forma" em um único SELECT agrupado."""
+    grupos: dict = defaultdict(lambda: {"tx": 0, "valor": 0.0, "soma_taxa": 0.0, "perda": 0.0, "n_taxa": 0})
+    for r in db.execute(_SQL_AGREGADO_CONTEXTO, {"calc_id": calc_id}).mappings():
+        # Mesma chave do agrupamento anterior: NULL/"" de bandeira viram "Desconhecida"
+        chave = f"{r['bandeira'] or 'Desconhecida'} {r['forma_pagamento'] or ''}".strip()
+        g = grupos[chave]
+        g["tx"] += int(r["tx"] or 0)
+        g["valor"] += float(r["valor"] or 0)
+        g["perda"] += float(r["perda"] or 0)
+        g["soma_taxa"] += float(r["soma_taxa"] or 0)
+        g["n_taxa"] += int(r["n_taxa"] or 0)
+    return dict(grupos)
+
+
 class AIService:
 
     def __init__(self):
@@ -46,6 +95,9 @@ class AIService:
              self.llm = None
         else:
             try:
+                # LangChain/OpenAI só são importados quando o agente é usado (startup da API)
+                from langchain_openai import ChatOpenAI
+
                 # Initialize LLM with support for custom base URL (e.g. Abacus.AI)
                 self.llm = ChatOpenAI(
                     model=settings.AI_MODEL,
@@ -84,6 +136,9 @@ class AIService:
             }
 
         try:
+            from langchain_community.agent_toolkits import create_sql_agent
+            from langchain_community.utilities import SQLDatabase
+
             # Connect directly to Database (Real-time)
             # include_tables limits scope for safety and focus
             db = SQLDatabase(engine, include_tables=['vendas_processadas', 'clientes'])
@@ -139,38 +194,46 @@ class AIService:
             }
 
     def montar_contexto(self, processamento_id: str, db: Session) -> tuple[str, dict]:
-        """Monta sumário estruturado do processamento para o contexto do LLM."""
-        from app.models.vendas_calculos import VendasCalculos
+        """
+        Monta sumário estruturado do processamento para o contexto do LLM.
+
+        Os totais saem de um único SELECT agrupado por bandeira/forma (sem
+        carregar as linhas de ``vendas_calculos``) e o resultado fica em cache
+        por (calc_id, versão do cálculo), compartilhado entre usuários e turnos
+        do chat. A versão é ``COUNT(*)``/``MAX(id)`` das linhas do cálculo
+        (consulta só no índice de ``calc_id``): recalcular troca os ids e
+        invalida a entrada. Correções no lugar (taxa BC) não mudam a versão e
+        descartam a entrada com ``invalidar_contexto``.
+        """
+        try:
+            versao = _versao_calculo(db, processamento_id)
+        except Exception as e:
+            logger.warning("Erro ao consultar versão do cálculo para contexto: %s", e)
+            versao = None
+
+        if not versao or not versao[0]:
+            contexto = f"Processamento ID: {processamento_id}\nNenhum dado encontrado para este processamento."
+            return contexto, {}
+
+        with _contexto_lock:
+            em_cache = _contexto_cache.get(processamento_id)
+            if em_cache and em_cache[0] == versao:
+                _contexto_cache.move_to_end(processamento_id)
+                return em_cache[1], dict(em_cache[2])
 
         try:
-            rows = (
-                db.query(VendasCalculos)
-                .filter(VendasCalculos.calc_id == processamento_id)
-                .all()
-            )
+            grupos = _agregar_por_grupo(db, processamento_id)
         except Exception as e:
-            logger.warning("Erro ao buscar VendasCalculos para contexto: %s", e)
-            rows = []
+            logger.warning("Erro ao agregar VendasCalculos para contexto: %s", e)
+            grupos = {}
 
-        if not rows:
+        if not grupos:
             contexto = f"Processamento ID: {processamento_id}\nNenhum dado encontrado para este processamento."
             return contexto, {}
 
-        total_tx = len(rows)
-        total_valor = sum(float(r.vl_venda or 0) for r in rows)
-        total_perda = sum(float(r.perda or 0) for r in rows)
-
-        # Agrupamento por bandeira
-        grupos: dict = defaultdict(lambda: {"tx": 0, "valor": 0.0, "soma_taxa": 0.0, "perda": 0.0, "n_taxa": 0})
-        for r in rows:
-            chave = f"{r.bandeira or 'Desconhecida'} {r.forma_pagamento or ''}".strip()
-            g = grupos[chave]
-            g["tx"] += 1
-            g["valor"] += float(r.vl_venda or 0)
-            g["perda"] += float(r.perda or 0)
-            if r.tx_venda:
-                g["soma_taxa"] += float(r.tx_venda)
-                g["n_taxa"] += 1
+        total_tx = sum(g["tx"] for g in grupos.values())
+        total_valor = sum(g["valor"] for g in grupos.values())
+        total_perda = sum(g["perda"] for g in grupos.values())
 
         linhas_grupos = []
         for nome, g in sorted(grupos.items(), key=lambda x: -x[1]["tx"])[:10]:
@@ -194,6 +257,12 @@ class AIService:
             f"Por bandeira/modalidade (top 10):\n"
             + "\n".join(linhas_grupos)
         )
+
+        with _contexto_lock:
+            _contexto_cache[processamento_id] = (versao, contexto, dict(dados_contexto))
+            _contexto_cache.move_to_end(processamento_id)
+            while len(_contexto_cache) > _CONTEXTO_CACHE_MAX:
+                _contexto_cache.popitem(last=False)
         return contexto, dados_contexto
 
     def chat(
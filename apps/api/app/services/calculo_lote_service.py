@@ -0,0 +1,235 @@
+"""
+Recálculo em lote: vários processamentos numa task só.
+
+Recalcular uma carteira (ex.: depois de mudar a tabela de taxas) era chamar
+``/calculos/processar-async`` uma vez por processamento — tasks independentes,
+cada uma relendo as taxas e disputando o banco sem coordenação. Aqui:
+
+- ``selecionar_processamentos``: lista explícita, "todos do cliente X" e/ou
+  "todos atingidos pela taxa Y" (mesmo EC, venda dentro da vigência);
+- ``CalculoLoteService.create_lote_task``: uma ``CalculoTask`` por processamento
+  (acompanháveis como qualquer cálculo) e uma task-mãe ``tipo_taxa='lote'``;
+- ``run_lote``: aquece o snapshot de taxas com os ECs do lote uma vez e roda
+  as tasks filhas num pool limitado (``limite_workers``). A task-mãe guarda o
+  progresso agregado e o resultado de cada processamento em ``metadata_json``.
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import PerformanceTimer, job_trace, salvar_estagios
+from app.models.calculo_task import CalculoTask
+from app.models.taxa import Taxa
+from app.services.calculo_service import CalculoService
+
+logger = logging.getLogger(__name__)
+
+# CalculoTask.tipo_taxa da task-mãe (os processamentos ficam em metadata_json["itens"])
+TIPO_LOTE = "lote"
+
+_MB = 1024 * 1024
+_FINAIS = ("SUCCESS", "FAILED")
+
+
+def _memoria_disponivel() -> Optional[int]:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available
+
+
+def limite_workers(n_itens: int) -> int:
+    """Cálculos simultâneos: o configurado, limitado por CPUs, memória livre e tamanho do lote."""
+    limite = min(settings.CALCULO_LOTE_WORKERS, os.cpu_count() or 1, n_itens)
+    livre = _memoria_disponivel()
+    if livre is not None:
+        limite = min(limite, livre // (settings.CALCULO_LOTE_MEM_POR_WORKER_MB * _MB))
+    return max(1, limite)
+
+
+def selecionar_processamentos(
+    db: Session,
+    processamento_ids: Optional[Iterable[str]] = None,
+    cliente_id: Optional[int] = None,
+    taxa_id: Optional[int] = None,
+) -> List[str]:
+    """União dos critérios, sem repetição, na ordem em que aparecem."""
+    ids = [str(p) for p in processamento_ids or []]
+
+    if cliente_id is not None:
+        rows = db.execute(
+            text("""
+                SELECT DISTINCT vp.processamentoid
+                FROM vendas_processadas vp
+                JOIN ecs_cliente ec ON CAST(vp.ec_id AS CHAR) = CAST(ec.ec_id AS CHAR)
+                WHERE ec.cliente_id = :cliente_id
+                ORDER BY vp.processamentoid
+            """),
+            {"cliente_id": cliente_id},
+        ).fetchall()
+        ids += [r[0] for r in rows]
+
+    if taxa_id is not None:
+        taxa = db.get(Taxa, taxa_id)
+        if taxa is None:
+            raise ValueError(f"Taxa {taxa_id} não encontrada.")
+        # Data_da_venda pode vir com hora: compara só a parte da data
+        rows = db.execute(
+            text("""
+                SELECT DISTINCT processamentoid
+                FROM vendas_processadas
+                WHERE CAST(ec_id AS CHAR) = :ec
+                  AND SUBSTR(CAST(Data_da_venda AS CHAR), 1, 10) BETWEEN :ini AND :fim
+                ORDER BY processamentoid
+            """),
+            {"ec": str(taxa.ec), "ini": taxa.data_ini.isoformat(), "fim": taxa.data_fim.isoformat()},
+        ).fetchall()
+        ids += [r[0] for r in rows]
+
+    return [p for p in dict.fromkeys(ids) if p]
+
+
+def _aquecer_taxas(engine: Engine, processamento_ids: List[str]) -> None:
+    """Carrega no snapshot as taxas de todos os ECs do lote numa leitura só."""
+    from app.services.taxas_snapshot import taxas_snapshot
+
+    try:
+        with PerformanceTimer("CALCULO", "Aquecer Taxas do Lote", {"processamentos": len(processamento_ids)}) as timer:
+            query = text(
+                "SELECT DISTINCT ec_id FROM vendas_processadas WHERE processamentoid IN :pids"
+            ).bindparams(bindparam("pids", expanding=True))
+            with engine.connect() as conn:
+                ecs = [r[0] for r in conn.execute(query, {"pids": processamento_ids})]
+            timer.set(rows=len(taxas_snapshot().taxas(engine, ecs)))
+    except Exception as e:
+        # Só otimização: cada cálculo carrega o que faltar
+        logger.warning("[CALCULO-LOTE] Snapshot de taxas não aquecido: %s", e)
+
+
+class CalculoLoteService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_lote_task(
+        self,
+        processamento_ids: List[str],
+        usuario: str,
+        tipo_taxa: str,
+        usar_taxa_cad: bool,
+        tem_receba_rapido: bool,
+        substituir: bool = False,
+        tipos_taxa: Optional[List[str]] = None,
+    ) -> CalculoTask:
+        calculos = CalculoService(self.db)
+        itens: Dict[str, dict] = {}
+        for pid in processamento_ids:
+            filha = calculos.create_calculo_task(
+                processamento_id=pid,
+                tipo_taxa=tipo_taxa,
+                usuario=usuario,
+                usar_taxa_cad=usar_taxa_cad,
+                tem_receba_rapido=tem_receba_rapido,
+                substituir=substituir,
+                tipos_taxa=tipos_taxa,
+            )
+            itens[pid] = {"task_id": filha.id, "status": filha.status, "progress": 0}
+
+        task = CalculoTask(
+            processamento_id=f"lote:{len(itens)}",
+            status="PENDING",
+            progress=0,
+            message=f"Aguardando início ({len(itens)} processamentos)...",
+            tipo_taxa=TIPO_LOTE,
+            usuario=usuario,
+            metadata_json={"itens": itens},
+        )
+        self.db.add(task)
+        self.db.commit()
+        self.db.refresh(task)
+        return task
+
+    @staticmethod
+    def _atualizar(db: Session, task: CalculoTask) -> Dict[str, dict]:
+        """Copia status/progresso das filhas para a task-mãe e devolve os itens."""
+        itens = {pid: dict(item) for pid, item in (task.metadata_json or {})["itens"].items()}
+        por_id = {item["task_id"]: pid for pid, item in itens.items()}
+        filhas = (
+            db.query(CalculoTask)
+            .filter(CalculoTask.id.in_(list(por_id)))
+            .populate_existing()
+            .all()
+        )
+        for filha in filhas:
+            item = itens[por_id[filha.id]]
+            item.update(status=filha.status, progress=filha.progress or 0)
+            if filha.status in _FINAIS:
+                item["message"] = filha.message
+                item["calc_ids"] = (filha.metadata_json or {}).get("calc_ids")
+
+        concluidos = sum(1 for item in itens.values() if item["status"] in _FINAIS)
+        task.progress = min(99, sum(item["progress"] for item in itens.values()) // max(1, len(itens)))
+        task.message = f"{concluidos}/{len(itens)} processamentos concluídos."
+        # Reatribui o dict: coluna JSON simples não rastreia mutação in-place
+        task.metadata_json = {**(task.metadata_json or {}), "itens": itens}
+        db.commit()
+        return itens
+
+    async def run_async_lote(self, task_id: str):
+        """Worker da task de lote (BackgroundTasks)."""
+        from fastapi.concurrency import run_in_threadpool
+
+        await run_in_threadpool(self.run_lote, task_id)
+
+    def run_lote(self, task_id: str):
+        from app.core.database import SessionLocal
+
+        with SessionLocal() as db:
+            task = db.query(CalculoTask).filter(CalculoTask.id == task_id).first()
+            if not task:
+                return
+
+            with job_trace("calculo_lote", task_id) as trace:
+                try:
+                    itens = (task.metadata_json or {}).get("itens", {})
+                    n_workers = limite_workers(len(itens))
+                    task.status = "PROCESSING"
+                    task.message = f"Calculando {len(itens)} processamentos ({n_workers} simultâneos)..."
+                    task.metadata_json = {**task.metadata_json, "workers": n_workers}
+                    db.commit()
+                    logger.info("[CALCULO-LOTE] %s: %d processamentos, %d workers", task_id, len(itens), n_workers)
+
+                    _aquecer_taxas(db.get_bind(), list(itens))
+
+                    calculos = CalculoService(db)
+                    with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="calculo_lote") as pool:
+                        pendentes = {pool.submit(calculos.run_calculo, item["task_id"]) for item in itens.values()}
+                        while pendentes:
+                            _, pendentes = wait(
+                                pendentes, timeout=settings.CALCULO_LOTE_POLL_S, return_when=FIRST_COMPLETED
+                            )
+                            itens = self._atualizar(db, task)
+
+                    falhas = sum(1 for item in itens.values() if item["status"] != "SUCCESS")
+                    task.status = "FAILED" if itens and falhas == len(itens) else "SUCCESS"
+                    task.progress = 100
+                    task.message = (
+                        f"Lote concluído: {len(itens) - falhas} de {len(itens)} processamentos calculados"
+                        + (f", {falhas} com falha." if falhas else ".")
+                    )
+                    db.commit()
+
+                except Exception as e:
+                    db.rollback()
+                    task.status = "FAILED"
+                    task.message = f"Erro inesperado: {str(e)}"[:255]
+                    db.commit()
+                    logger.exception("Erro inesperado na task de lote")
+            salvar_estagios(db, task, trace)
@@ -2,19 +2,30 @@ import logging
 
 from sqlalchemy.orm import Session
 
+from app.core.metrics import PerformanceTimer, job_trace, salvar_estagios
 from app.models.calculo_task import CalculoTask
 
 logger = logging.getLogger(__name__)
-from typing import Optional
+from typing import List, Optional
 
-from app.services.reconciliation_core import ReconciliationCore
+# CalculoTask.tipo_taxa de uma task multi-cenário (os tipos ficam em metadata_json)
+TIPO_CENARIOS = "cenarios"
 
 
 class CalculoService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_calculo_task(self, processamento_id: str, tipo_taxa: str, usuario: str, usar_taxa_cad: bool, tem_receba_rapido: bool, substituir: bool = False) -> CalculoTask:
+    def create_calculo_task(self, processamento_id: str, tipo_taxa: str, usuario: str, usar_taxa_cad: bool, tem_receba_rapido: bool, substituir: bool = False, tipos_taxa: Optional[List[str]] = None) -> CalculoTask:
+        metadata = {
+            "usar_taxa_cad": usar_taxa_cad,
+            "tem_receba_rapido": tem_receba_rapido,
+            "substituir": substituir
+        }
+        if tipos_taxa:
+            # Multi-cenário: um calc_id por periodicidade, numa passada só
+            metadata["tipos_taxa"] = list(tipos_taxa)
+            tipo_taxa = TIPO_CENARIOS
         task = CalculoTask(
             processamento_id=processamento_id,
             status="PENDING",
@@ -22,11 +33,7 @@ class CalculoService:
             message="Aguardando início...",
             tipo_taxa=tipo_taxa,
             usuario=usuario,
-            metadata_json={
-                "usar_taxa_cad": usar_taxa_cad,
-                "tem_receba_rapido": tem_receba_rapido,
-                "substituir": substituir
-            }
+            metadata_json=metadata
         )
         self.db.add(task)
         self.db.commit()
@@ -46,84 +53,116 @@ class CalculoService:
         """Worker function for async calculation."""
         from fastapi.concurrency import run_in_threadpool
 
+        await run_in_threadpool(self.run_calculo, task_id)
+
+    def run_calculo(self, task_id: str):
+        """Executa a task de cálculo (sessão própria). Síncrono: usado pelo worker async e pelo lote."""
         from app.core.database import SessionLocal
+        from app.services.reconciliation_core import ReconciliationCore  # Polars/pandas: só quando há cálculo
 
         with SessionLocal() as db:
             task = db.query(CalculoTask).filter(CalculoTask.id == task_id).first()
             if not task:
                 return
 
-            try:
-                task.status = "PROCESSING"
-                task.message = "Iniciando reconciliação..."
-                task.progress = 5
-                db.commit()
-
-                meta = task.metadata_json or {}
-                usar_taxa_cad = meta.get("usar_taxa_cad", True)
-                tem_receba_rapido = meta.get("tem_receba_rapido", False)
-
-                def progress_callback(progress_val: int, message: Optional[str] = None):
-                    task.progress = progress_val
-                    if message:
-                        task.message = message
+            with job_trace("calculo", task_id) as trace:
+                try:
+                    task.status = "PROCESSING"
+                    task.message = "Iniciando reconciliação..."
+                    task.progress = 5
                     db.commit()
 
-                engine = db.get_bind()
-
-                from app.repositories.calculo_repository import CalculoRepository
-                from app.schemas.calculo import CalculoRequest
-                repo = CalculoRepository(db)
-
-                # 1. Prepare/Clean and generate ID
-                req = CalculoRequest(
-                    processamento_id=task.processamento_id,
-                    tipo_taxa=task.tipo_taxa,
-                    usar_taxa_cad=meta.get("usar_taxa_cad", True),
-                    tem_receba_rapido=meta.get("tem_receba_rapido", False),
-                    substituir=meta.get("substituir", False)
-                )
-                custom_id = repo.processar_calculo(req, usuario_logado=task.usuario)
-
-                # 2. Heavy work in threadpool
-                result = await run_in_threadpool(
-                    ReconciliationCore.calculate_rates,
-                    engine=engine,
-                    proc_id=task.processamento_id,
-                    tipo_taxa=task.tipo_taxa,
-                    usar_taxa_cad=req.usar_taxa_cad,
-                    tem_receba_rapido=req.tem_receba_rapido,
-                    progress_callback=progress_callback,
-                    custom_calc_id=custom_id
-                )
-
-                if result.get("success"):
-                    task.status = "SUCCESS"
-                    task.progress = 100
-                    task.message = f"Cálculo concluído! {result.get('rows')} registros processados em {result.get('time'):.2f}s."
-
-                    # Notificação (não-bloqueante)
-                    try:
-                        from app.services.notificacao_service import NotificacaoService
-                        NotificacaoService.criar(
-                            db,
-                            tipo="calculo_ok",
-                            titulo="Cálculo concluído",
-                            mensagem=f"Reconciliação finalizada: {result.get('rows')} registros processados.",
-                            link="/calculos",
-                            usuario_id=None,
+                    meta = task.metadata_json or {}
+                    usar_taxa_cad = meta.get("usar_taxa_cad", True)
+                    tem_receba_rapido = meta.get("tem_receba_rapido", False)
+
+                    def progress_callback(progress_val: int, message: Optional[str] = None):
+                        task.progress = progress_val
+                        if message:
+                            task.message = message
+                        db.commit()
+
+                    engine = db.get_bind()
+
+                    from app.repositories.calculo_repository import CalculoRepository
+                    from app.schemas.calculo import CalculoCenariosRequest, CalculoRequest
+                    repo = CalculoRepository(db)
+
+                    if meta.get("tipos_taxa"):
+                        req = CalculoCenariosRequest(
+                            processamento_id=task.processamento_id,
+                            tipos_taxa=meta["tipos_taxa"],
+                            usar_taxa_cad=usar_taxa_cad,
+                            tem_receba_rapido=tem_receba_rapido,
+                            substituir=meta.get("substituir", False)
                         )
-                    except Exception:
-                        pass
-                else:
-                    task.status = "FAILED"
-                    task.message = f"Erro: {result.get('error')}"
+                        with PerformanceTimer("CALCULO", "Preparar Cálculo"):
+                            cenarios = repo.processar_cenarios(req, usuario_logado=task.usuario)
+                        meta = {**meta, "calc_ids": cenarios}
+                        task.metadata_json = meta
+                        db.commit()
+
+                        result = ReconciliationCore.calculate_scenarios(
+                            engine=engine,
+                            proc_id=task.processamento_id,
+                            cenarios=cenarios,
+                            usar_taxa_cad=req.usar_taxa_cad,
+                            tem_receba_rapido=req.tem_receba_rapido,
+                            progress_callback=progress_callback,
+                        )
+                    else:
+                        # 1. Prepare/Clean and generate ID
+                        req = CalculoRequest(
+                            processamento_id=task.processamento_id,
+                            tipo_taxa=task.tipo_taxa,
+                            usar_taxa_cad=meta.get("usar_taxa_cad", True),
+                            tem_receba_rapido=meta.get("tem_receba_rapido", False),
+                            substituir=meta.get("substituir", False)
+                        )
+                        with PerformanceTimer("CALCULO", "Preparar Cálculo"):
+                            custom_id = repo.processar_calculo(req, usuario_logado=task.usuario)
+                        task.metadata_json = {**meta, "calc_ids": {task.tipo_taxa: custom_id}}
+                        db.commit()
+
+                        # 2. Heavy work (já fora do event loop)
+                        result = ReconciliationCore.calculate_rates(
+                            engine=engine,
+                            proc_id=task.processamento_id,
+                            tipo_taxa=task.tipo_taxa,
+                            usar_taxa_cad=req.usar_taxa_cad,
+                            tem_receba_rapido=req.tem_receba_rapido,
+                            progress_callback=progress_callback,
+                            custom_calc_id=custom_id
+                        )
+
+                    if result.get("success"):
+                        task.status = "SUCCESS"
+                        task.progress = 100
+                        task.message = f"Cálculo concluído! {result.get('rows')} registros processados em {result.get('time'):.2f}s."
+
+                        # Notificação (não-bloqueante)
+                        try:
+                            from app.services.notificacao_service import NotificacaoService
+                            NotificacaoService.criar(
+                                db,
+                                tipo="calculo_ok",
+                                titulo="Cálculo concluído",
+                                mensagem=f"Reconciliação finalizada: {result.get('rows')} registros processados.",
+                                link="/calculos",
+                                usuario_id=None,
+                            )
+                        except Exception:
+                            pass
+                    else:
+                        task.status = "FAILED"
+                        task.message = f"Erro: {result.get('error')}"
 
-                db.commit()
+                    db.commit()
 
-            except Exception as e:
-                db.rollback()
-                task.status = "FAILED"
-                task.message = f"Erro inesperado: {str(e)}"[:255]
-                db.commit()
-                logger.exception("Erro inesperado na task de cálculo")
+                except Exception as e:
+                    db.rollback()
+                    task.status = "FAILED"
+                    task.message = f"Erro inesperado: {str(e)}"[:255]
+                    db.commit()
+                    logger.exception("Erro inesperado na task de cálculo")
+            salvar_estagios(db, task, trace)
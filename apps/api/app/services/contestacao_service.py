@@ -3,7 +3,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
-from jinja2 import Environment, FileSystemLoader
 from sqlalchemy.orm import Session
 
 from app.models.cliente import Cliente
@@ -21,6 +20,8 @@ _TEMPLATES_DIR = Path(__file__).parent.parent.parent / "relatorios"
 
 
 def _render_template(context: dict) -> str:
+    from jinja2 import Environment, FileSystemLoader
+
     env = Environment(loader=FileSystemLoader(str(_TEMPLATES_DIR)), autoescape=False)
     tmpl = env.get_template("template_contestacao.html")
     return tmpl.render(**context)
@@ -1,11 +1,22 @@
-"""Orquestrador: parser → fallback Gemini → xlsx."""
+"""Orquestrador: parser → fallback Gemini → xlsx.
+
+Com vários arquivos (ou arquivos grandes) o parse roda no pool de processos
+compartilhado (``pool.pool_conversor``), assim como a serialização das 4
+planilhas; o fallback
+Gemini fica no processo principal, na ordem de entrada dos arquivos.
+"""
 
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional
 
-from app.services.conversor.gemini_fallback import processar_linhas_nao_reconhecidas
+from app.core.config import settings
+from app.core.metrics import PerformanceTimer
+from app.services.conversor import pool
+from app.services.conversor.gemini_fallback import Resolvedor, processar_linhas_nao_reconhecidas
 from app.services.conversor.rede_parser import RedeParser, ResultadoParsing
 from app.services.conversor.xlsx_builder import gerar_zip, nome_arquivo_saida
 
@@ -20,23 +31,34 @@ def _agrupar_por_secao(
     return {"credito": linhas_nao_rec}
 
 
-def processar_arquivo(conteudo: bytes, nome_arquivo: str) -> ResultadoParsing:
+def _parse_arquivo(arquivo: tuple[str, bytes]) -> ResultadoParsing:
+    """Só o parse (sem rede/banco): é o que roda nos processos do pool."""
+    nome_arquivo, conteudo = arquivo
     try:
         texto = conteudo.decode("latin-1")
     except Exception:
         texto = conteudo.decode("utf-8", errors="replace")
 
-    parser = RedeParser(nome_arquivo=nome_arquivo)
-    resultado = parser.parse(texto)
+    return RedeParser(nome_arquivo=nome_arquivo).parse(texto)
+
+
+def processar_arquivo(
+    conteudo: bytes, nome_arquivo: str, resolvedor: Optional[Resolvedor] = None
+) -> ResultadoParsing:
+    return _finalizar(_parse_arquivo((nome_arquivo, conteudo)), nome_arquivo, resolvedor)
+
 
+def _finalizar(
+    resultado: ResultadoParsing, nome_arquivo: str, resolvedor: Optional[Resolvedor] = None
+) -> ResultadoParsing:
     linhas_nao_rec = resultado.linhas_nao_reconhecidas
     if linhas_nao_rec:
         logger.info(
-            "%s: %d linha(s) não reconhecida(s) pelo parser — enviando ao Gemini",
+            "%s: %d linha(s) não reconhecida(s) pelo parser — padrões aprendidos/Gemini",
             nome_arquivo, len(linhas_nao_rec)
         )
         # Por simplicidade, tentamos interpretar como crédito (Gemini decide)
-        _processar_fallback(linhas_nao_rec, resultado)
+        _processar_fallback(linhas_nao_rec, resultado, resolvedor)
 
     logger.info(
         "%s: crédito=%d débito=%d pagamentos=%d tarifas=%d",
@@ -50,14 +72,14 @@ def processar_arquivo(conteudo: bytes, nome_arquivo: str) -> ResultadoParsing:
 
 
 def _processar_fallback(
-    linhas: list[tuple[int, str]], resultado: ResultadoParsing
+    linhas: list[tuple[int, str]], resultado: ResultadoParsing, resolvedor: Optional[Resolvedor] = None
 ) -> None:
     from app.services.conversor.rede_parser import (
         Pagamento, TarifaDebito, VendaCredito, VendaDebito, _parse_data, _parse_valor
     )
 
     registros = processar_linhas_nao_reconhecidas(
-        linhas, "credito", resultado.estabelecimento, ""
+        linhas, "credito", resultado.estabelecimento, "", resolvedor=resolvedor
     )
 
     for reg in registros:
@@ -88,13 +110,41 @@ def _processar_fallback(
             ))
 
 
-def converter_arquivos(arquivos: list[tuple[str, bytes]]) -> tuple[bytes, str]:
+def _workers_para(arquivos: list[tuple[str, bytes]], workers: Optional[int]) -> int:
+    """Processos a usar: 1 (sequencial) quando o pool não compensa o custo de subir."""
+    if workers is None:
+        workers = min(settings.CONVERSOR_WORKERS, os.cpu_count() or 1)
+    total_bytes = sum(len(conteudo) for _, conteudo in arquivos)
+    if total_bytes < settings.CONVERSOR_PARALELO_MIN_BYTES:
+        return 1
+    return max(1, workers)
+
+
+def parsear_arquivos(
+    arquivos: list[tuple[str, bytes]], workers: Optional[int] = None
+) -> list[ResultadoParsing]:
+    """Parse de N arquivos, em paralelo quando vale a pena. Mantém a ordem de entrada."""
+    n_workers = min(_workers_para(arquivos, workers), len(arquivos))
+    if n_workers > 1:
+        try:
+            return list(pool.pool_conversor().map(_parse_arquivo, arquivos))
+        except (BrokenProcessPool, OSError) as e:
+            # Ambientes sem semáforos (executável congelado, sandbox) ou worker morto: segue sequencial
+            logger.warning("Pool do conversor indisponível (%s) — parse sequencial", e)
+            pool.descartar_pool()
+    return [_parse_arquivo(arquivo) for arquivo in arquivos]
+
+
+def converter_arquivos(
+    arquivos: list[tuple[str, bytes]], workers: Optional[int] = None
+) -> tuple[bytes, str]:
     """Processa N arquivos TXT e retorna (zip_bytes, nome_arquivo) com os 4 xlsx separados."""
-    resultados = []
-    for nome, conteudo in arquivos:
-        resultado = processar_arquivo(conteudo, nome)
-        resultados.append(resultado)
+    with PerformanceTimer("CONVERSOR", "Parse TXT Rede") as timer:
+        resultados = parsear_arquivos(arquivos, workers)
+        timer.set(rows=len(arquivos))
+    resultados = [_finalizar(res, nome) for res, (nome, _) in zip(resultados, arquivos)]
 
-    zip_bytes = gerar_zip(resultados)
+    with PerformanceTimer("CONVERSOR", "Gerar ZIP"):
+        zip_bytes = gerar_zip(resultados, _workers_para(arquivos, workers))
     nome = nome_arquivo_saida(resultados)
     return zip_bytes, nome
@@ -1,12 +1,23 @@
-"""Fallback Gemini Flash para linhas não reconhecidas pelo parser posicional."""
+"""Fallback Gemini Flash para linhas não reconhecidas pelo parser posicional.
+
+Antes do Gemini, cada linha passa pelo cache de layouts aprendidos
+(``padroes_aprendidos``): só formatos de linha nunca vistos vão ao resolvedor
+remoto, uma linha por formato; o resultado ensina o cache e as demais linhas do
+mesmo formato são extraídas localmente.
+"""
 from __future__ import annotations
 
 import json
 import logging
-from typing import Optional
+from typing import Callable, Optional
 
 import httpx
 
+from app.services.conversor.padroes_aprendidos import PadroesAprendidos, assinatura, padroes_aprendidos
+
+# (linhas [(número, texto)], seção) → registros; cada registro traz "linha" = número de origem
+Resolvedor = Callable[[list[tuple[int, str]], str], list[dict]]
+
 logger = logging.getLogger(__name__)
 
 _MAX_LINHAS_POR_CHAMADA = 20
@@ -41,18 +52,19 @@ Linhas não reconhecidas:
 {linhas}
 
 Retorne um JSON com a lista de registros extraídos no formato abaixo.
+Em todo registro inclua "linha": o número entre colchetes da linha de origem.
 Para seção "credito" ou "debito":
-{{"registros": [{{"data_venda": "DD/MM/AAAA", "data_recebimento": "DD/MM/AAAA",
+{{"registros": [{{"linha": 0, "data_venda": "DD/MM/AAAA", "data_recebimento": "DD/MM/AAAA",
   "resumo_vendas": "string", "bandeira": "XX", "quantidade": 0,
   "modalidade": "string", "valor_bruto": 0.0, "valor_correcao": 0.0,
   "valor_liquido": 0.0, "banco_agencia_conta": ""}}]}}
 
 Para seção "financeiro":
-{{"registros": [{{"data_recebimento": "DD/MM/AAAA", "ordem_credito": "string",
+{{"registros": [{{"linha": 0, "data_recebimento": "DD/MM/AAAA", "ordem_credito": "string",
   "valor_liquido": 0.0, "banco_agencia_conta": "string"}}]}}
 
 Para seção "tarifa":
-{{"registros": [{{"data_inclusao": "DD/MM/AAAA", "data_pagamento": "DD/MM/AAAA",
+{{"registros": [{{"linha": 0, "data_inclusao": "DD/MM/AAAA", "data_pagamento": "DD/MM/AAAA",
   "motivo_debito": "string", "resumo": "string",
   "valor_devido": 0.0, "valor_debitado": 0.0, "meio_pagamento": "string"}}]}}
 
@@ -60,18 +72,13 @@ Se não houver dados válidos nas linhas, retorne {{"registros": []}}.
 Retorne APENAS o JSON, sem texto adicional."""
 
 
-def processar_linhas_nao_reconhecidas(
-    linhas: list[tuple[int, str]],
-    secao: str,
-    estabelecimento: str,
-    origem_arquivo: str,
-) -> list[dict]:
-    if not linhas:
-        return []
+def resolver_com_gemini(linhas: list[tuple[int, str]], secao: str) -> list[dict]:
+    """Resolvedor remoto padrão. Desligado sem ``CONVERSOR_FALLBACK_REMOTO`` (chamada síncrona, lenta)."""
+    from app.core.config import settings
 
-    # Fallback desabilitado: evita timeouts no processamento síncrono
-    logger.debug("Gemini fallback desabilitado — %d linha(s) ignorada(s) na seção '%s'", len(linhas), secao)
-    return []
+    if not settings.CONVERSOR_FALLBACK_REMOTO:
+        logger.debug("Gemini fallback desabilitado — %d linha(s) ignorada(s) na seção '%s'", len(linhas), secao)
+        return []
 
     resultados = []
     for i in range(0, len(linhas), _MAX_LINHAS_POR_CHAMADA):
@@ -91,11 +98,91 @@ def processar_linhas_nao_reconhecidas(
             if texto.endswith("```"):
                 texto = '\n'.join(texto.split('\n')[:-1])
             dados = json.loads(texto)
-            for reg in dados.get("registros", []):
-                reg["estabelecimento"] = estabelecimento
-                reg["origem_arquivo"] = origem_arquivo
-                resultados.append(reg)
+            resultados.extend(dados.get("registros", []))
         except Exception as e:
             logger.error("Erro ao parsear resposta Gemini (lote %d): %s", i, e)
 
     return resultados
+
+
+def _extrair_locais(
+    linhas: list[tuple[int, str]], secao: str, padroes: PadroesAprendidos
+) -> tuple[list[dict], list[tuple[int, str]]]:
+    """(registros extraídos pelos padrões aprendidos, linhas de formato desconhecido)."""
+    registros, pendentes = [], []
+    for numero, texto in linhas:
+        reg = padroes.aplicar(secao, texto)
+        if reg is None:
+            pendentes.append((numero, texto))
+        else:
+            reg["linha"] = numero
+            registros.append(reg)
+    return registros, pendentes
+
+
+def _aprender(
+    linhas: list[tuple[int, str]], registros: list[dict], secao: str, padroes: PadroesAprendidos
+) -> set[str]:
+    """Ensina o cache com os registros resolvidos. Retorna as assinaturas que tiveram registro."""
+    por_numero = dict(linhas)
+    com_registro = set()
+    for reg in registros:
+        numero = reg.get("linha")
+        if numero in por_numero:
+            com_registro.add(assinatura(secao, por_numero[numero]))
+            padroes.aprender(secao, por_numero[numero], reg)
+            continue
+        # Resolvedor sem "linha": aprende na primeira linha do lote que reproduz o registro
+        com_registro.update(assinatura(secao, texto) for _, texto in linhas)
+        for _, texto in linhas:
+            if not padroes.conhece(secao, texto) and padroes.aprender(secao, texto, reg):
+                break
+    return com_registro
+
+
+def processar_linhas_nao_reconhecidas(
+    linhas: list[tuple[int, str]],
+    secao: str,
+    estabelecimento: str,
+    origem_arquivo: str,
+    resolvedor: Optional[Resolvedor] = None,
+    padroes: Optional[PadroesAprendidos] = None,
+) -> list[dict]:
+    if not linhas:
+        return []
+
+    resolvedor = resolvedor or resolver_com_gemini
+    padroes = padroes if padroes is not None else padroes_aprendidos()
+
+    registros, pendentes = _extrair_locais(linhas, secao, padroes)
+    n_locais = len(registros)
+    if pendentes:
+        # 1ª rodada: uma linha por formato novo; o que for aprendido sai local na sequência
+        representantes: dict[str, tuple[int, str]] = {}
+        for numero, texto in pendentes:
+            representantes.setdefault(assinatura(secao, texto), (numero, texto))
+        lote = list(representantes.values())
+        resolvidos = resolvedor(lote, secao)
+        com_registro = _aprender(lote, resolvidos, secao, padroes)
+        registros.extend(resolvidos)
+
+        enviados = {numero for numero, _ in lote}
+        locais, pendentes = _extrair_locais([p for p in pendentes if p[0] not in enviados], secao, padroes)
+        registros.extend(locais)
+        n_locais += len(locais)
+
+        # 2ª rodada: formatos com dados que não deu para aprender vão linha a linha
+        pendentes = [p for p in pendentes if assinatura(secao, p[1]) in com_registro]
+        if pendentes:
+            registros.extend(resolvedor(pendentes, secao))
+        padroes.salvar()
+
+    logger.info(
+        "Fallback conversor: %d linha(s) na seção '%s' — %d via padrões aprendidos (%d formato(s) conhecido(s))",
+        len(linhas), secao, n_locais, len(padroes),
+    )
+    for reg in registros:
+        reg["estabelecimento"] = estabelecimento
+        reg["origem_arquivo"] = origem_arquivo
+    registros.sort(key=lambda r: r["linha"] if isinstance(r.get("linha"), int) else 0)
+    return registros
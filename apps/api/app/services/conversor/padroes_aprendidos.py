@@ -0,0 +1,209 @@
+"""Cache local de layouts aprendidos pelo fallback do conversor.
+
+As linhas que o ``RedeParser`` não reconhece se repetem com o mesmo formato em
+todo extrato da mesma credenciadora. Na primeira vez o resolvedor remoto
+(Gemini) extrai os campos; aqui guardamos, pela *assinatura* da linha (seção +
+classe de cada token: data, valor, número, conta, texto), de qual token saiu
+cada campo. Nas próximas ocorrências a extração é local, sem chamada externa.
+
+Formato do arquivo (``CONVERSOR_PADROES_PATH``)::
+
+    {"versao": 1, "padroes": {"credito|D D N A V": {"data_venda": {"tokens": [0, 1]},
+                                                     "tipo_lancamento": {"const": "EFETUADO"}}}}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Optional
+
+from app.services.conversor.rede_parser import _parse_data, _parse_valor
+
+logger = logging.getLogger(__name__)
+
+_VERSAO = 1
+_MAX_TOKENS_TEXTO = 4  # campos texto podem ocupar até N tokens ("À VISTA")
+
+_CAMPOS_DATA = {"data_venda", "data_recebimento", "data_inclusao", "data_pagamento"}
+_CAMPOS_VALOR = {
+    "valor_bruto", "valor_correcao", "valor_saque", "valor_liquido", "valor_devido", "valor_debitado",
+}
+_CAMPOS_INTEIRO = {"quantidade"}
+# Preenchidos pelo chamador, não pelo layout
+_CAMPOS_CONTEXTO = {"estabelecimento", "origem_arquivo", "linha"}
+# Domínio fechado, derivado da seção/formato e não de um token: pode virar constante
+_CAMPOS_CONSTANTES = {"tipo_lancamento"}
+
+_RE_TOKEN_DATA = re.compile(r'\d{2}/\d{2}/\d{2,4}\*?')
+_RE_TOKEN_VALOR = re.compile(r'[\d\.]+,\d{2}')
+_RE_TOKEN_CONTA = re.compile(r'\d{4}/\d+/\d+')
+
+
+def _classe_token(token: str) -> str:
+    if _RE_TOKEN_DATA.fullmatch(token):
+        return "D"
+    if _RE_TOKEN_VALOR.fullmatch(token):
+        return "V"
+    if _RE_TOKEN_CONTA.fullmatch(token):
+        return "B"
+    if token.isdigit():
+        return "N"
+    if token == "-":
+        return "-"
+    if any(c.isdigit() for c in token):
+        return "X"
+    return "A"
+
+
+def assinatura(secao: str, linha: str) -> str:
+    """Formato da linha, independente dos valores: ``secao|D D N N A ...``."""
+    return f"{secao}|{' '.join(_classe_token(t) for t in linha.split())}"
+
+
+def _normalizar(campo: str, valor: Any) -> Any:
+    """Forma comparável de um valor vindo do resolvedor ou de um token."""
+    if valor is None:
+        return None
+    if campo in _CAMPOS_DATA:
+        return _parse_data(str(valor).rstrip("*"))
+    if campo in _CAMPOS_VALOR:
+        return round(valor if isinstance(valor, (int, float)) else _parse_valor(str(valor)), 2)
+    if campo in _CAMPOS_INTEIRO:
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            return 0
+    return str(valor).strip().upper()
+
+
+def _converter(campo: str, texto: str) -> Any:
+    """Valor extraído localmente, no mesmo formato que o resolvedor devolve."""
+    if campo in _CAMPOS_DATA:
+        return texto.rstrip("*")
+    if campo in _CAMPOS_VALOR:
+        return _parse_valor(texto)
+    if campo in _CAMPOS_INTEIRO:
+        return int(texto) if texto.isdigit() else 0
+    return texto
+
+
+def _localizar(campo: str, alvo: Any, tokens: list[str], usados: set[int]) -> Optional[tuple[int, int]]:
+    """Intervalo [ini, fim) de tokens cujo valor normalizado é ``alvo`` (tokens livres primeiro)."""
+    largura_max = _MAX_TOKENS_TEXTO if campo not in (_CAMPOS_DATA | _CAMPOS_VALOR | _CAMPOS_INTEIRO) else 1
+    candidatos = []
+    for largura in range(1, largura_max + 1):
+        for ini in range(len(tokens) - largura + 1):
+            fim = ini + largura
+            if _normalizar(campo, " ".join(tokens[ini:fim])) == alvo:
+                candidatos.append((ini, fim))
+    livres = [c for c in candidatos if not usados.intersection(range(*c))]
+    return (livres or candidatos or [None])[0]
+
+
+def _deduzir_regras(linha: str, registro: dict) -> Optional[dict]:
+    """Regras campo → tokens/constante que reproduzem ``registro`` a partir de ``linha``.
+
+    None quando um campo não vazio não aparece na linha (salvo os de domínio
+    fechado, ``_CAMPOS_CONSTANTES``): uma bandeira ou resumo que só o resolvedor
+    viu viraria constante e seria copiado para todas as próximas ocorrências.
+    """
+    tokens = linha.split()
+    usados: set[int] = set()
+    regras = {}
+    for campo, valor in registro.items():
+        if campo in _CAMPOS_CONTEXTO:
+            continue
+        alvo = _normalizar(campo, valor)
+        intervalo = _localizar(campo, alvo, tokens, usados) if alvo not in (None, "") else None
+        if intervalo is None:
+            if alvo and campo not in _CAMPOS_CONSTANTES:
+                return None
+            regras[campo] = {"const": valor}
+            continue
+        usados.update(range(*intervalo))
+        regras[campo] = {"tokens": list(intervalo)}
+    return regras or None
+
+
+class PadroesAprendidos:
+    """Assinatura de linha → regras de extração. ``caminho=None`` mantém só em memória."""
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._padroes: dict[str, dict] = {}
+        self._alterado = False
+        self._lock = threading.Lock()
+        if caminho and os.path.exists(caminho):
+            try:
+                with open(caminho, "r", encoding="utf-8") as f:
+                    dados = json.load(f)
+                if dados.get("versao") == _VERSAO:
+                    self._padroes = dados.get("padroes", {})
+            except (OSError, ValueError) as e:
+                logger.warning("Padrões aprendidos do conversor ignorados (%s): %s", caminho, e)
+
+    def __len__(self) -> int:
+        return len(self._padroes)
+
+    def conhece(self, secao: str, linha: str) -> bool:
+        return assinatura(secao, linha) in self._padroes
+
+    def aplicar(self, secao: str, linha: str) -> Optional[dict]:
+        """Registro extraído localmente, ou None se o formato da linha ainda é desconhecido."""
+        regras = self._padroes.get(assinatura(secao, linha))
+        if regras is None:
+            return None
+        tokens = linha.split()
+        registro = {}
+        for campo, regra in regras.items():
+            if "const" in regra:
+                registro[campo] = regra["const"]
+            else:
+                ini, fim = regra["tokens"]
+                registro[campo] = _converter(campo, " ".join(tokens[ini:fim]))
+        return registro
+
+    def aprender(self, secao: str, linha: str, registro: dict) -> bool:
+        """Guarda o layout de ``linha`` a partir do registro resolvido. False se não deu para deduzir."""
+        regras = _deduzir_regras(linha, registro)
+        if regras is None:
+            return False
+        with self._lock:
+            self._padroes[assinatura(secao, linha)] = regras
+            self._alterado = True
+        return True
+
+    def salvar(self) -> None:
+        if not self.caminho or not self._alterado:
+            return
+        with self._lock:
+            pasta = os.path.dirname(self.caminho) or "."
+            os.makedirs(pasta, exist_ok=True)
+            # Temporário único por gravação: vários workers gravam o mesmo arquivo
+            fd, tmp = tempfile.mkstemp(dir=pasta, prefix=".padroes_", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"versao": _VERSAO, "padroes": self._padroes}, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.caminho)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._alterado = False
+
+
+_padroes: Optional[PadroesAprendidos] = None
+
+
+def padroes_aprendidos() -> PadroesAprendidos:
+    """Instância do processo, carregada de ``CONVERSOR_PADROES_PATH`` no primeiro uso."""
+    global _padroes
+    if _padroes is None:
+        from app.core.config import settings
+
+        _padroes = PadroesAprendidos(settings.CONVERSOR_PADROES_PATH or None)
+    return _padroes
@@ -0,0 +1,49 @@
+"""Pool de processos do conversor, compartilhado entre as requisições.
+
+Um único ``ProcessPoolExecutor`` de vida longa (``CONVERSOR_WORKERS``
+processos), criado na primeira conversão que precisa dele e encerrado no
+shutdown da API. Os processos nascem por ``forkserver`` (``spawn`` onde não
+existe): um ``fork`` do worker da API copiaria threads, locks e conexões do
+processo pai no meio de outras requisições.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _contexto():
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+def pool_conversor() -> ProcessPoolExecutor:
+    """Pool compartilhado do conversor (criado sob demanda)."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            workers = max(1, min(settings.CONVERSOR_WORKERS, os.cpu_count() or 1))
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_contexto())
+            logger.info("Pool do conversor criado (%d processos)", workers)
+        return _pool
+
+
+def descartar_pool() -> None:
+    """Descarta o pool (quebrado ou no shutdown); a próxima conversão cria outro."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
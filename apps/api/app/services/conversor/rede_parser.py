@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Iterator, Optional
 
 
 # ── Tipos de dados ─────────────────────────────────────────────────────────────
@@ -65,15 +66,59 @@ class TarifaDebito:
     meio_pagamento: str
 
 
+class Colunas:
+    """
+    Buffer colunar de registros de um tipo (uma lista por campo do dataclass).
+
+    O parser grava valores direto nas colunas (``adicionar``), sem instanciar um
+    dataclass por linha; o buffer também serializa bem mais rápido entre
+    processos (listas de primitivos). ``append``/iteração com dataclasses ficam
+    para compatibilidade (fallback Gemini, testes).
+    """
+
+    def __init__(self, tipo: type):
+        self.tipo = tipo
+        self.nomes: tuple[str, ...] = tuple(f.name for f in fields(tipo))
+        self._colunas: list[list[Any]] = [[] for _ in self.nomes]
+
+    def adicionar(self, *valores: Any) -> None:
+        for coluna, valor in zip(self._colunas, valores):
+            coluna.append(valor)
+
+    def append(self, registro: Any) -> None:
+        self.adicionar(*(getattr(registro, nome) for nome in self.nomes))
+
+    def extend(self, outro: "Colunas") -> None:
+        for coluna, valores in zip(self._colunas, outro._colunas):
+            coluna.extend(valores)
+
+    def coluna(self, nome: str) -> list[Any]:
+        return self._colunas[self.nomes.index(nome)]
+
+    def linhas(self) -> Iterator[tuple]:
+        """Registros como tuplas, na ordem dos campos do dataclass."""
+        return zip(*self._colunas)
+
+    def __len__(self) -> int:
+        return len(self._colunas[0]) if self._colunas else 0
+
+    def __iter__(self) -> Iterator[Any]:
+        tipo = self.tipo
+        return (tipo(*linha) for linha in self.linhas())
+
+    def __getitem__(self, indice: int) -> Any:
+        return self.tipo(*(coluna[indice] for coluna in self._colunas))
+
+
 @dataclass
 class ResultadoParsing:
     estabelecimento: str = ""
     periodo: str = ""
     data_emissao: Optional[datetime] = None
-    vendas_credito: list[VendaCredito] = field(default_factory=list)
-    vendas_debito: list[VendaDebito] = field(default_factory=list)
-    pagamentos: list[Pagamento] = field(default_factory=list)
-    tarifas_debitos: list[TarifaDebito] = field(default_factory=list)
+    vendas_credito: Colunas = field(default_factory=lambda: Colunas(VendaCredito))
+    vendas_debito: Colunas = field(default_factory=lambda: Colunas(VendaDebito))
+    pagamentos: Colunas = field(default_factory=lambda: Colunas(Pagamento))
+    tarifas_debitos: Colunas = field(default_factory=lambda: Colunas(TarifaDebito))
     linhas_nao_reconhecidas: list[tuple[int, str]] = field(default_factory=list)
 
 
@@ -128,7 +173,9 @@ _RE_CREDITADO_SEM_DATA = re.compile(
 _RE_ORDEM = re.compile(r'(\d{2}/\d{2}/\d{2})\s+(\d{9})\s+([\d\.]+,\d{2})\s+(\d{4}/\d+/\d+)')
 
 
+@lru_cache(maxsize=4096)
 def _parse_data(s: str) -> Optional[datetime]:
+    # Extratos repetem poucas datas em milhares de linhas: strptime só na 1ª vez
     s = s.strip()
     for fmt in ('%d/%m/%Y', '%d/%m/%y'):
         try:
@@ -177,29 +224,27 @@ def _detectar_secao(linha: str) -> Optional[str]:
     if 'VENDAS COM CART' in upper and 'BITO' in upper:
         return _SECAO_DEBITO
     # Seção de tarifas/débitos: detectada pelo cabeçalho de colunas
-    if re.search(r'INCLUS', upper) and 'PGTO' in upper and 'ESTABELEC' in upper:
+    if 'INCLUS' in upper and 'PGTO' in upper and 'ESTABELEC' in upper:
         return _SECAO_TARIFA
     return None
 
 
+_SKIP_CABECALHO = (
+    'DATA DA', 'QTDE', 'VALOR BRUTO', 'TOTAL DO PER',
+    'MASTERCARD', 'VISA', 'ELO', 'HIPERCARD', 'AMEX', 'CABAL',
+    'ATEN', 'DEMONSTR', '____', 'BANDEIRA', 'MODALIDADE',
+    'VALORES PAGOS', 'VALOR L', 'TOTAL DO', 'USEREDE',
+    'NUMERO', 'MOTIVO', 'MEIO DE',
+    'CB-CABAL', 'MT-MAEST', 'VE-VISA', 'AX-AMEX',
+    'ACESSE', 'PARA DETAL',
+)
+
+
 def _eh_linha_cabecalho(linha: str) -> bool:
-    upper = linha.upper()
-    skip_patterns = [
-        'DATA DA', 'QTDE', 'VALOR BRUTO', 'TOTAL DO PER',
-        'MASTERCARD', 'VISA', 'ELO', 'HIPERCARD', 'AMEX', 'CABAL',
-        'ATEN', 'DEMONSTR', '____', 'BANDEIRA', 'MODALIDADE',
-        'VALORES PAGOS', 'VALOR L', 'TOTAL DO', 'USEREDE',
-        'NUMERO', 'MOTIVO', 'MEIO DE',
-        'CB-CABAL', 'MT-MAEST', 'VE-VISA', 'AX-AMEX',
-        'ACESSE', 'PARA DETAL',
-    ]
-    linha_strip = linha.strip()
-    if len(linha_strip) < 10:
+    if len(linha.strip()) < 10:
         return True
-    for p in skip_patterns:
-        if p in upper:
-            return True
-    return False
+    upper = linha.upper()
+    return any(p in upper for p in _SKIP_CABECALHO)
 
 
 # ── Parser principal ───────────────────────────────────────────────────────────
@@ -283,20 +328,21 @@ class RedeParser:
         modalidade = m.group(7).strip()
         tipo = "FUTURO" if re.search(r'PARC', modalidade, re.IGNORECASE) else "EFETUADO"
 
-        resultado.vendas_credito.append(VendaCredito(
-            estabelecimento=resultado.estabelecimento,
-            origem_arquivo=self._nome,
-            data_venda=_parse_data(m.group(1)),
-            data_recebimento=_parse_data(m.group(2)),
-            resumo_vendas=m.group(4),
-            bandeira=m.group(5),
-            quantidade=int(m.group(6)) if m.group(6) != '-' else 0,
-            modalidade=modalidade,
-            valor_bruto=_parse_valor(m.group(8)),
-            valor_correcao=_parse_valor(m.group(9)),
-            valor_liquido=_parse_valor(m.group(10)),
-            tipo_lancamento=tipo,
-        ))
+        # Ordem dos campos de VendaCredito
+        resultado.vendas_credito.adicionar(
+            resultado.estabelecimento,
+            self._nome,
+            _parse_data(m.group(1)),
+            _parse_data(m.group(2)),
+            m.group(4),
+            m.group(5),
+            int(m.group(6)) if m.group(6) != '-' else 0,
+            modalidade,
+            _parse_valor(m.group(8)),
+            _parse_valor(m.group(9)),
+            _parse_valor(m.group(10)),
+            tipo,
+        )
         return True
 
     def _parse_linha_debito(self, linha: str, resultado: ResultadoParsing) -> bool:
@@ -306,20 +352,21 @@ class RedeParser:
 
         banco_ag_conta = _extrair_banco_ag_conta(linha)
 
-        resultado.vendas_debito.append(VendaDebito(
-            estabelecimento=resultado.estabelecimento,
-            origem_arquivo=self._nome,
-            data_venda=_parse_data(m.group(1)),
-            data_recebimento=_parse_data(m.group(2)),
-            resumo_vendas=m.group(4),
-            bandeira=m.group(5),
-            quantidade=int(m.group(6)) if m.group(6) != '-' else 0,
-            modalidade=m.group(7).strip(),
-            valor_bruto=_parse_valor(m.group(8)),
-            valor_saque=_parse_valor(m.group(9)),
-            valor_liquido=_parse_valor(m.group(10)),
-            banco_agencia_conta=banco_ag_conta,
-        ))
+        # Ordem dos campos de VendaDebito
+        resultado.vendas_debito.adicionar(
+            resultado.estabelecimento,
+            self._nome,
+            _parse_data(m.group(1)),
+            _parse_data(m.group(2)),
+            m.group(4),
+            m.group(5),
+            int(m.group(6)) if m.group(6) != '-' else 0,
+            m.group(7).strip(),
+            _parse_valor(m.group(8)),
+            _parse_valor(m.group(9)),
+            _parse_valor(m.group(10)),
+            banco_ag_conta,
+        )
         return True
 
     def _parse_linha_financeiro(
@@ -330,42 +377,37 @@ class RedeParser:
         if m_data:
             data_atual = m_data.group(1)
 
+        pagamentos = resultado.pagamentos
+
         # Padrão: data recebimento + ordem + valor + banco
         m = _RE_ORDEM.search(linha)
         if m:
-            resultado.pagamentos.append(Pagamento(
-                estabelecimento=resultado.estabelecimento,
-                origem_arquivo=self._nome,
-                data_recebimento=_parse_data(m.group(1)),
-                ordem_credito=m.group(2),
-                valor_liquido=_parse_valor(m.group(3)),
-                banco_agencia_conta=m.group(4),
-            ))
+            pagamentos.adicionar(
+                resultado.estabelecimento, self._nome, _parse_data(m.group(1)),
+                m.group(2), _parse_valor(m.group(3)), m.group(4),
+            )
             return True, data_atual
 
+        # Os dois padrões abaixo exigem o literal: evita rodar as regex à toa
+        if 'CREDITADO' not in linha.upper():
+            return False, data_atual
+
         # Padrão: VALOR CREDITADO EM banco/ag/conta + valor (com ou sem data)
         m2 = _RE_CREDITADO.search(linha)
         if m2:
-            resultado.pagamentos.append(Pagamento(
-                estabelecimento=resultado.estabelecimento,
-                origem_arquivo=self._nome,
-                data_recebimento=_parse_data(m2.group(1)),
-                ordem_credito="",
-                valor_liquido=_parse_valor(m2.group(3)),
-                banco_agencia_conta=m2.group(2),
-            ))
+            pagamentos.adicionar(
+                resultado.estabelecimento, self._nome, _parse_data(m2.group(1)),
+                "", _parse_valor(m2.group(3)), m2.group(2),
+            )
             return True, data_atual
 
         m3 = _RE_CREDITADO_SEM_DATA.search(linha)
         if m3:
-            resultado.pagamentos.append(Pagamento(
-                estabelecimento=resultado.estabelecimento,
-                origem_arquivo=self._nome,
-                data_recebimento=_parse_data(data_atual) if data_atual else None,
-                ordem_credito="",
-                valor_liquido=_parse_valor(m3.group(2)),
-                banco_agencia_conta=m3.group(1),
-            ))
+            pagamentos.adicionar(
+                resultado.estabelecimento, self._nome,
+                _parse_data(data_atual) if data_atual else None,
+                "", _parse_valor(m3.group(2)), m3.group(1),
+            )
             return True, data_atual
 
         return False, data_atual
@@ -375,15 +417,16 @@ class RedeParser:
         if not m:
             return False
 
-        resultado.tarifas_debitos.append(TarifaDebito(
-            estabelecimento=resultado.estabelecimento,
-            origem_arquivo=self._nome,
-            data_inclusao=_parse_data(m.group(1)),
-            data_pagamento=_parse_data(m.group(2)),
-            motivo_debito=m.group(3).strip(),
-            resumo=m.group(4).strip(),
-            valor_devido=_parse_valor(m.group(5)),
-            valor_debitado=_parse_valor(m.group(6)),
-            meio_pagamento=m.group(7).strip(),
-        ))
+        # Ordem dos campos de TarifaDebito
+        resultado.tarifas_debitos.adicionar(
+            resultado.estabelecimento,
+            self._nome,
+            _parse_data(m.group(1)),
+            _parse_data(m.group(2)),
+            m.group(3).strip(),
+            m.group(4).strip(),
+            _parse_valor(m.group(5)),
+            _parse_valor(m.group(6)),
+            m.group(7).strip(),
+        )
         return True
@@ -1,193 +1,193 @@
-"""Geração dos XLSX de conciliação Rede (4 arquivos separados, agrupados em um ZIP)."""
+"""Geração dos XLSX de conciliação Rede (4 arquivos separados, agrupados em um ZIP).
+
+Cada planilha é escrita em modo ``write_only`` do openpyxl (memória constante:
+as linhas vão para o XML conforme são geradas) direto na entrada do ZIP, sem
+montar o workbook nem o ``.xlsx`` inteiro em memória antes. Com ``workers > 1``
+as 4 planilhas são serializadas em paralelo (pool compartilhado do conversor) em
+arquivos temporários
+e copiadas para o ZIP na ordem fixa.
+"""
 
 from __future__ import annotations
 
 import io
+import logging
+import os
+import tempfile
 import zipfile
-from datetime import datetime
-from typing import Optional
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Iterator
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 
+from app.services.conversor import pool
 from app.services.conversor.rede_parser import ResultadoParsing
 
+logger = logging.getLogger(__name__)
+
 _AZUL_HEADER = "1e3a5f"
 _FONT_HEADER = Font(bold=True, color="FFFFFF", name="Calibri", size=10)
 _FILL_HEADER = PatternFill(start_color=_AZUL_HEADER, end_color=_AZUL_HEADER, fill_type="solid")
 _ALIGN_CENTER = Alignment(horizontal="center", vertical="center")
 _FMT_MOEDA = 'R$ #,##0.00'
 _FMT_DATA = 'DD/MM/YYYY'
+_LARGURA_MIN = 12
+_LARGURA_MAX = 40
+
+# (arquivo, aba, atributo do ResultadoParsing, cabeçalhos, colunas moeda, colunas data)
+# Cabeçalhos na ordem dos campos do dataclass correspondente; índices 1-based.
+_PLANILHAS = [
+    (
+        "Vendas_Credito.xlsx", "Vendas_Credito", "vendas_credito",
+        [
+            "Estabelecimento", "Origem_Arquivo", "Data_Venda", "Data_Recebimento",
+            "Resumo_Vendas", "Bandeira", "Quantidade", "Modalidade",
+            "Valor_Bruto", "Valor_Correcao", "Valor_Liquido", "Tipo_Lancamento",
+        ],
+        [9, 10, 11], [3, 4],
+    ),
+    (
+        "Vendas_Debito.xlsx", "Vendas_Debito", "vendas_debito",
+        [
+            "Estabelecimento", "Origem_Arquivo", "Data_Venda", "Data_Recebimento",
+            "Resumo_Vendas", "Bandeira", "Quantidade", "Modalidade",
+            "Valor_Bruto", "Valor_Saque", "Valor_Liquido", "Banco_Agencia_Conta",
+        ],
+        [9, 10, 11], [3, 4],
+    ),
+    (
+        "Pagamentos.xlsx", "Pagamentos", "pagamentos",
+        [
+            "Estabelecimento", "Origem_Arquivo", "Data_Recebimento",
+            "Ordem_Credito", "Valor_Liquido", "Banco_Agencia_Conta",
+        ],
+        [5], [3],
+    ),
+    (
+        # Antiga aba 'Tarifas_e_Debitos', renomeada para 'Recebiveis'
+        "Recebiveis.xlsx", "Recebiveis", "tarifas_debitos",
+        [
+            "Estabelecimento", "Origem_Arquivo", "Data_Inclusao", "Data_Pagamento",
+            "Motivo_Debito", "Resumo", "Valor_Devido", "Valor_Debitado", "Meio_Pagamento",
+        ],
+        [7, 8], [3, 4],
+    ),
+]
+
+
+def _larguras(buffers: list, colunas: list[str]) -> list[int]:
+    """Largura por coluna (maior texto, entre 12 e 40) calculada sobre as colunas do parser.
+
+    No modo write_only as larguras precisam ser definidas antes da primeira linha.
+    """
+    larguras = []
+    for idx, nome in enumerate(colunas):
+        largura = max(len(nome), _LARGURA_MIN)
+        for buf in buffers:
+            for valor in buf.coluna(buf.nomes[idx]):
+                if valor is not None and len(str(valor)) > largura:
+                    largura = len(str(valor))
+                    if largura >= _LARGURA_MAX:
+                        break
+            if largura >= _LARGURA_MAX:
+                break
+        larguras.append(min(largura, _LARGURA_MAX) + 2)
+    return larguras
+
+
+def _linhas_formatadas(ws, buffers: list, indices_valor: list[int], indices_data: list[int]) -> Iterator[list]:
+    """Linhas prontas para ``ws.append``: só as colunas com formato viram WriteOnlyCell."""
+    formatos = {i - 1: _FMT_MOEDA for i in indices_valor}
+    formatos.update({i - 1: _FMT_DATA for i in indices_data})
+    for buf in buffers:
+        for linha in buf.linhas():
+            valores = list(linha)
+            for idx, fmt in formatos.items():
+                cell = WriteOnlyCell(ws, value=valores[idx])
+                cell.number_format = fmt
+                valores[idx] = cell
+            yield valores
+
+
+def _escrever_planilha(
+    destino: BinaryIO,
+    titulo: str,
+    colunas: list[str],
+    buffers: list,
+    indices_valor: list[int],
+    indices_data: list[int],
+) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo)
+    ws.freeze_panes = "A2"
+    for col_idx, largura in enumerate(_larguras(buffers, colunas), 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = largura
 
-
-def _escrever_cabecalho(ws, colunas: list[str]) -> None:
-    for col_idx, nome in enumerate(colunas, 1):
-        cell = ws.cell(row=1, column=col_idx, value=nome)
+    cabecalho = []
+    for nome in colunas:
+        cell = WriteOnlyCell(ws, value=nome)
         cell.font = _FONT_HEADER
         cell.fill = _FILL_HEADER
         cell.alignment = _ALIGN_CENTER
-    ws.freeze_panes = "A2"
-
-
-def _ajustar_larguras(ws, colunas: list[str]) -> None:
-    for col_idx, nome in enumerate(colunas, 1):
-        col_letter = get_column_letter(col_idx)
-        max_len = max(len(nome), 12)
-        for cell in ws.iter_cols(min_col=col_idx, max_col=col_idx, min_row=2):
-            for c in cell:
-                if c.value is not None:
-                    val_len = len(str(c.value))
-                    max_len = min(max(max_len, val_len), 40)
-        ws.column_dimensions[col_letter].width = max_len + 2
-
-
-def _formatar_colunas_valor(ws, indices_valor: list[int], indices_data: list[int]) -> None:
-    for row in ws.iter_rows(min_row=2):
-        for cell in row:
-            if cell.column in indices_valor:
-                cell.number_format = _FMT_MOEDA
-            elif cell.column in indices_data:
-                cell.number_format = _FMT_DATA
-
-
-def _wb_vendas_credito(resultados: list[ResultadoParsing]) -> Workbook:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Vendas_Credito"
-    cols = [
-        "Estabelecimento", "Origem_Arquivo", "Data_Venda", "Data_Recebimento",
-        "Resumo_Vendas", "Bandeira", "Quantidade", "Modalidade",
-        "Valor_Bruto", "Valor_Correcao", "Valor_Liquido", "Tipo_Lancamento",
-    ]
-    _escrever_cabecalho(ws, cols)
-    row = 2
-    for res in resultados:
-        for v in res.vendas_credito:
-            ws.cell(row, 1, v.estabelecimento)
-            ws.cell(row, 2, v.origem_arquivo)
-            ws.cell(row, 3, v.data_venda)
-            ws.cell(row, 4, v.data_recebimento)
-            ws.cell(row, 5, v.resumo_vendas)
-            ws.cell(row, 6, v.bandeira)
-            ws.cell(row, 7, v.quantidade)
-            ws.cell(row, 8, v.modalidade)
-            ws.cell(row, 9, v.valor_bruto)
-            ws.cell(row, 10, v.valor_correcao)
-            ws.cell(row, 11, v.valor_liquido)
-            ws.cell(row, 12, v.tipo_lancamento)
-            row += 1
-    _formatar_colunas_valor(ws, [9, 10, 11], [3, 4])
-    _ajustar_larguras(ws, cols)
-    return wb
-
-
-def _wb_vendas_debito(resultados: list[ResultadoParsing]) -> Workbook:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Vendas_Debito"
-    cols = [
-        "Estabelecimento", "Origem_Arquivo", "Data_Venda", "Data_Recebimento",
-        "Resumo_Vendas", "Bandeira", "Quantidade", "Modalidade",
-        "Valor_Bruto", "Valor_Saque", "Valor_Liquido", "Banco_Agencia_Conta",
-    ]
-    _escrever_cabecalho(ws, cols)
-    row = 2
-    for res in resultados:
-        for v in res.vendas_debito:
-            ws.cell(row, 1, v.estabelecimento)
-            ws.cell(row, 2, v.origem_arquivo)
-            ws.cell(row, 3, v.data_venda)
-            ws.cell(row, 4, v.data_recebimento)
-            ws.cell(row, 5, v.resumo_vendas)
-            ws.cell(row, 6, v.bandeira)
-            ws.cell(row, 7, v.quantidade)
-            ws.cell(row, 8, v.modalidade)
-            ws.cell(row, 9, v.valor_bruto)
-            ws.cell(row, 10, v.valor_saque)
-            ws.cell(row, 11, v.valor_liquido)
-            ws.cell(row, 12, v.banco_agencia_conta)
-            row += 1
-    _formatar_colunas_valor(ws, [9, 10, 11], [3, 4])
-    _ajustar_larguras(ws, cols)
-    return wb
-
-
-def _wb_pagamentos(resultados: list[ResultadoParsing]) -> Workbook:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Pagamentos"
-    cols = [
-        "Estabelecimento", "Origem_Arquivo", "Data_Recebimento",
-        "Ordem_Credito", "Valor_Liquido", "Banco_Agencia_Conta",
-    ]
-    _escrever_cabecalho(ws, cols)
-    row = 2
-    for res in resultados:
-        for p in res.pagamentos:
-            ws.cell(row, 1, p.estabelecimento)
-            ws.cell(row, 2, p.origem_arquivo)
-            ws.cell(row, 3, p.data_recebimento)
-            ws.cell(row, 4, p.ordem_credito)
-            ws.cell(row, 5, p.valor_liquido)
-            ws.cell(row, 6, p.banco_agencia_conta)
-            row += 1
-    _formatar_colunas_valor(ws, [5], [3])
-    _ajustar_larguras(ws, cols)
-    return wb
-
-
-def _wb_recebiveis(resultados: list[ResultadoParsing]) -> Workbook:
-    """Antiga aba 'Tarifas_e_Debitos', renomeada para 'Recebiveis'."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Recebiveis"
-    cols = [
-        "Estabelecimento", "Origem_Arquivo", "Data_Inclusao", "Data_Pagamento",
-        "Motivo_Debito", "Resumo", "Valor_Devido", "Valor_Debitado", "Meio_Pagamento",
-    ]
-    _escrever_cabecalho(ws, cols)
-    row = 2
-    for res in resultados:
-        for t in res.tarifas_debitos:
-            ws.cell(row, 1, t.estabelecimento)
-            ws.cell(row, 2, t.origem_arquivo)
-            ws.cell(row, 3, t.data_inclusao)
-            ws.cell(row, 4, t.data_pagamento)
-            ws.cell(row, 5, t.motivo_debito)
-            ws.cell(row, 6, t.resumo)
-            ws.cell(row, 7, t.valor_devido)
-            ws.cell(row, 8, t.valor_debitado)
-            ws.cell(row, 9, t.meio_pagamento)
-            row += 1
-    _formatar_colunas_valor(ws, [7, 8], [3, 4])
-    _ajustar_larguras(ws, cols)
-    return wb
-
-
-def _wb_para_bytes(wb: Workbook) -> bytes:
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf.read()
-
-
-def gerar_zip(resultados: list[ResultadoParsing]) -> bytes:
+        cabecalho.append(cell)
+    ws.append(cabecalho)
+
+    for valores in _linhas_formatadas(ws, buffers, indices_valor, indices_data):
+        ws.append(valores)
+    wb.save(destino)
+
+
+def _escrever_planilha_em_arquivo(caminho: str, *args) -> None:
+    with open(caminho, "wb") as f:
+        _escrever_planilha(f, *args)
+
+
+def _argumentos(resultados: list[ResultadoParsing]) -> Iterator[tuple]:
+    for arquivo, titulo, atributo, colunas, indices_valor, indices_data in _PLANILHAS:
+        buffers = [getattr(res, atributo) for res in resultados]
+        yield arquivo, (titulo, colunas, buffers, indices_valor, indices_data)
+
+
+def _planilhas_em_paralelo(resultados: list[ResultadoParsing], pasta: str) -> bool:
+    """Gera os XLSX em ``pasta`` no pool do conversor. False se o pool não estiver disponível."""
+    try:
+        executor = pool.pool_conversor()
+        futuros = [
+            executor.submit(_escrever_planilha_em_arquivo, os.path.join(pasta, arquivo), *args)
+            for arquivo, args in _argumentos(resultados)
+        ]
+        for futuro in futuros:
+            futuro.result()
+        return True
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning("Pool do conversor indisponível (%s) — XLSX sequencial", e)
+        pool.descartar_pool()
+        return False
+
+
+def escrever_zip(resultados: list[ResultadoParsing], destino: BinaryIO, workers: int = 1) -> None:
+    """Escreve o ZIP com os 4 XLSX em ``destino`` (arquivo ou buffer), em streaming."""
+    with tempfile.TemporaryDirectory(prefix="conversor_") as pasta:
+        paralelo = workers > 1 and _planilhas_em_paralelo(resultados, pasta)
+        # O .xlsx já é um ZIP comprimido: a entrada externa vai STORED (comprimir de novo só gasta CPU)
+        with zipfile.ZipFile(destino, "w", zipfile.ZIP_STORED) as zf:
+            for arquivo, args in _argumentos(resultados):
+                if paralelo:
+                    zf.write(os.path.join(pasta, arquivo), arquivo)
+                    continue
+                with zf.open(arquivo, "w", force_zip64=True) as entrada:
+                    _escrever_planilha(entrada, *args)
+
+
+def gerar_zip(resultados: list[ResultadoParsing], workers: int = 1) -> bytes:
     """Gera um ZIP contendo os 4 XLSX separados (Vendas_Credito, Vendas_Debito,
     Pagamentos, Recebiveis) e retorna como bytes."""
-    arquivos = {
-        "Vendas_Credito.xlsx": _wb_para_bytes(_wb_vendas_credito(resultados)),
-        "Vendas_Debito.xlsx": _wb_para_bytes(_wb_vendas_debito(resultados)),
-        "Pagamentos.xlsx": _wb_para_bytes(_wb_pagamentos(resultados)),
-        "Recebiveis.xlsx": _wb_para_bytes(_wb_recebiveis(resultados)),
-    }
-
     buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for nome, conteudo in arquivos.items():
-            zf.writestr(nome, conteudo)
-    buf.seek(0)
-    return buf.read()
+    escrever_zip(resultados, buf, workers)
+    return buf.getvalue()
 
 
 def nome_arquivo_saida(resultados: list[ResultadoParsing]) -> str:
@@ -4,7 +4,6 @@ from __future__ import annotations
 import json
 import logging
 
-import httpx
 from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
@@ -35,6 +34,8 @@ def get_schema_summary() -> str:
 
 
 def _call_gemini(messages: list[dict]) -> str:
+    import httpx
+
     model = settings.GEMINI_MODEL or "gemini-2.5-flash"
     url = _GEMINI_URL.format(model=model)
     contents = [{"role": m["role"], "parts": [{"text": m["text"]}]} for m in messages]
@@ -0,0 +1,175 @@
+"""
+Motor de divergências (taxas contratadas vs cobradas) para um conjunto de
+clientes ou a carteira inteira.
+
+Em vez de consultar cliente a cliente, faz três SELECTs para o conjunto todo:
+
+- taxas cobradas agregadas (MAX(taxa)) por cliente, bandeira e forma de
+  pagamento, via ``ecs_cliente`` → ``taxas``;
+- taxas contratadas dos clientes;
+- atributos dos clientes.
+
+Depois cruza tudo em um único join do Polars pela chave normalizada
+(cliente_id, bandeira, modalidade). Os endpoints por cliente e consolidado
+são apenas visões sobre ``DivergenciaService.calcular``.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import polars as pl
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.cliente import Cliente, ECCliente
+from app.models.taxa import Taxa
+from app.models.taxa_contratada import TaxaContratada
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_COBRADAS = {"cliente_id": pl.Int64, "bandeira": pl.Utf8, "forma": pl.Utf8, "taxa_cobrada": pl.Float64}
+_SCHEMA_CONTRATADAS = {
+    "id": pl.Int64,
+    "cliente_id": pl.Int64,
+    "bandeira": pl.Utf8,
+    "modalidade": pl.Utf8,
+    "taxa_contratada": pl.Float64,
+}
+
+
+def _chave(coluna: str) -> pl.Expr:
+    # Mesma normalização da versão por cliente: strip + lower
+    return pl.col(coluna).fill_null("").str.strip_chars().str.to_lowercase()
+
+
+class DivergenciaService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _filtrar(self, query, coluna, cliente_ids: Optional[List[int]]):
+        return query.filter(coluna.in_(cliente_ids)) if cliente_ids is not None else query
+
+    def calcular(self, cliente_ids: Optional[Iterable[int]] = None) -> pl.DataFrame:
+        """
+        Todas as divergências (cliente, bandeira, modalidade) dos clientes
+        informados (``None`` = carteira inteira), na ordem das taxas contratadas.
+
+        Colunas: cliente_id, bandeira, modalidade, taxa_contratada,
+        taxa_cobrada (maior taxa cobrada da chave) e diferenca_pct.
+        """
+        ids = list(cliente_ids) if cliente_ids is not None else None
+
+        cobradas_q = (
+            self.db.query(
+                ECCliente.cliente_id,
+                Taxa.bandeira,
+                Taxa.forma_pagamento,
+                func.max(Taxa.taxa),
+            )
+            .join(Taxa, Taxa.ec == ECCliente.ec_id)
+            .group_by(ECCliente.cliente_id, Taxa.bandeira, Taxa.forma_pagamento)
+        )
+        cobradas = pl.DataFrame(
+            [
+                (int(cid), bandeira, forma, float(taxa))
+                for cid, bandeira, forma, taxa in self._filtrar(cobradas_q, ECCliente.cliente_id, ids).all()
+                if cid is not None and taxa is not None
+            ],
+            schema=_SCHEMA_COBRADAS,
+            orient="row",
+        )
+
+        contratadas_q = self.db.query(
+            TaxaContratada.id,
+            TaxaContratada.cliente_id,
+            TaxaContratada.bandeira,
+            TaxaContratada.modalidade,
+            TaxaContratada.taxa_contratada,
+        ).order_by(TaxaContratada.id)
+        contratadas = pl.DataFrame(
+            [tuple(r) for r in self._filtrar(contratadas_q, TaxaContratada.cliente_id, ids).all()],
+            schema=_SCHEMA_CONTRATADAS,
+            orient="row",
+        )
+
+        # Bandeira/forma iguais após normalização colapsam na maior taxa
+        cobradas = (
+            cobradas.with_columns(_chave("bandeira").alias("k_bandeira"), _chave("forma").alias("k_modalidade"))
+            .group_by("cliente_id", "k_bandeira", "k_modalidade")
+            .agg(pl.col("taxa_cobrada").max())
+        )
+
+        return (
+            contratadas.with_columns(_chave("bandeira").alias("k_bandeira"), _chave("modalidade").alias("k_modalidade"))
+            .join(cobradas, on=["cliente_id", "k_bandeira", "k_modalidade"], how="inner")
+            .filter(pl.col("taxa_cobrada") > pl.col("taxa_contratada"))
+            .sort("id")
+            .select(
+                "cliente_id",
+                "bandeira",
+                "modalidade",
+                "taxa_contratada",
+                pl.col("taxa_cobrada").round(4),
+                (pl.col("taxa_cobrada") - pl.col("taxa_contratada")).round(4).alias("diferenca_pct"),
+            )
+        )
+
+    def _clientes(self, cliente_ids: Optional[List[int]]) -> Dict[int, Cliente]:
+        query = self._filtrar(self.db.query(Cliente), Cliente.cliente_id, cliente_ids)
+        return {c.cliente_id: c for c in query.all()}
+
+    @staticmethod
+    def _nome(cliente: Cliente) -> str:
+        return cliente.nome_fantasia or cliente.razao_social or str(cliente.cliente_id)
+
+    def por_cliente(self, cliente_id: int) -> Optional[Dict[str, Any]]:
+        """Divergências de um cliente; ``None`` se o cliente não existe."""
+        cliente = self._clientes([cliente_id]).get(cliente_id)
+        if cliente is None:
+            return None
+
+        divergencias = [
+            {**row, "status": "divergente"}
+            for row in self.calcular([cliente_id]).drop("cliente_id").iter_rows(named=True)
+        ]
+        tem_ec = (
+            self.db.query(ECCliente.ec_id).filter(ECCliente.cliente_id == cliente_id).first() is not None
+        )
+        return {
+            "cliente_id": cliente_id,
+            "nome": self._nome(cliente),
+            "total_divergencias": len(divergencias),
+            "nota": None if tem_ec else "Nenhum EC vinculado ao cliente — sem taxas cobradas para comparar.",
+            "divergencias": divergencias,
+        }
+
+    def consolidado(self, cliente_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Um item por cliente com divergência, ordenado por total_divergencias DESC.
+        Clientes inexistentes em ``clientes`` ficam de fora.
+        """
+        ids = list(cliente_ids) if cliente_ids is not None else None
+        resumo = (
+            self.calcular(ids)
+            .group_by("cliente_id")
+            .agg(
+                pl.len().alias("total_divergencias"),
+                pl.col("diferenca_pct").sum().round(4).alias("valor_total_divergente"),
+            )
+            .sort(["total_divergencias", "cliente_id"], descending=[True, False])
+        )
+        if resumo.is_empty():
+            return []
+
+        clientes = self._clientes(resumo["cliente_id"].to_list())
+        return [
+            {
+                "cliente_id": row["cliente_id"],
+                "nome_cliente": self._nome(clientes[row["cliente_id"]]),
+                "total_divergencias": row["total_divergencias"],
+                "valor_total_divergente": row["valor_total_divergente"],
+                "ultima_divergencia": None,
+            }
+            for row in resumo.iter_rows(named=True)
+            if row["cliente_id"] in clientes
+        ]
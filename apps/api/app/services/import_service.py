@@ -24,9 +24,12 @@ from app.adapters.proc_importacao_adapter import (
     preparar_dataframe_de_arquivo,
 )
 from app.core.config import settings
+from app.core.metrics import job_trace, salvar_estagios
 from app.models.import_task import ImportTask
 from app.repositories.processamento_repository import gerar_novo_id as processamento_gerar_novo_id
 from app.repositories.processamento_repository import salvar as processamento_salvar
+from app.services.import_spill import agendar_spill, carregar_spill, listar_arquivos_lote
+from app.services.upload_store import UploadStore, hash_arquivo, salvar_com_hash
 
 
 class ImportService:
@@ -72,8 +75,8 @@ class ImportService:
                 filename = f"{uuid.uuid4()}_{file.filename}"
                 temp_path = batch_dir / filename
 
-                with temp_path.open("wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
+                # sha256 calculado no mesmo passe da gravação (reusado no spill e na confirmação)
+                salvar_com_hash(file.file, temp_path)
 
                 # Check if it's a ZIP
                 if file.filename.lower().endswith(".zip"):
@@ -133,6 +136,12 @@ class ImportService:
             # 4. Prepare Preview Data (First 50 rows)
             preview_data = df_norm.head(50).fillna("").astype(str).to_dict(orient="records")
 
+            # 5. Leitura completa de todos os arquivos do lote em segundo plano (spill
+            # em Parquet), para a confirmação não reler os arquivos brutos
+            engine = self.db.get_bind()
+            for file_id in file_ids:
+                agendar_spill(self.temp_dir / file_id, batch_dir, cliente_id, contexto, tipo, engine=engine)
+
             return {
                 "file_id": batch_id,
                 "file_ids": file_ids,
@@ -201,6 +210,50 @@ class ImportService:
 
         return df_norm
 
+    def _dataframe_mapeado(self, file_path: Path, batch_dir: Path, engine, cliente_id: int, contexto: str, tipo: str, progress_callback=None, log_callback=None) -> pd.DataFrame:
+        """df_mapeado do arquivo: do spill gerado no preview, ou relendo o arquivo bruto."""
+        df_mapeado = carregar_spill(file_path, batch_dir, engine, cliente_id, contexto, tipo)
+        if df_mapeado is not None:
+            if progress_callback:
+                progress_callback(30, "Usando leitura feita no preview")
+            return df_mapeado
+
+        df_mapeado, transf, idx = preparar_dataframe_de_arquivo(
+            path=str(file_path),
+            engine=engine,
+            cliente_id=cliente_id,
+            contexto=contexto,
+            tipo_origem=tipo,
+            progress_callback=progress_callback,
+            log_callback=log_callback
+        )
+        return df_mapeado
+
+    @staticmethod
+    def _decisao_arquivo(file_path: Path, file_hash: str, decisao: str, result_data: Optional[dict] = None, anterior=None) -> Dict[str, Any]:
+        """Linha do resumo da importação para um arquivo do lote."""
+        result_data = result_data or {}
+        item = {
+            "arquivo": file_path.name,
+            "sha256": file_hash,
+            "decisao": decisao,
+            "processadas": result_data.get("processadas", 0),
+            "filtradas": result_data.get("filtradas", 0),
+            "total": result_data.get("total", 0),
+        }
+        if anterior is not None:
+            item["importado_como"] = anterior.arquivo
+            item["importado_em"] = anterior.created_at.isoformat() if anterior.created_at else None
+            item["linhas_importadas"] = anterior.total
+        return item
+
+    @staticmethod
+    def _mensagem_resumo(aggregated_result: Dict[str, Any]) -> str:
+        message = f"Successfully processed {aggregated_result['files_processed']} files."
+        if aggregated_result["files_skipped"]:
+            message += f" {aggregated_result['files_skipped']} already imported into this processamento (skipped)."
+        return message
+
     def confirm_import(
         self,
         file_id: str,
@@ -229,6 +282,8 @@ class ImportService:
             "filtradas": 0,
             "total": 0,
             "files_processed": 0,
+            "files_skipped": 0,
+            "arquivos": [],  # decisão por arquivo: importado | duplicado
             "processamentoid": processamentoid
         }
 
@@ -236,25 +291,28 @@ class ImportService:
             engine = self.db.get_bind()
 
             # Find all files in the batch dir (including extracted ones)
-            all_files = []
-            for root, _, filenames in os.walk(batch_dir):
-                for f in filenames:
-                    all_files.append(Path(root) / f)
+            all_files = listar_arquivos_lote(batch_dir)
 
             if not all_files:
                  raise HTTPException(status_code=400, detail="No files found in batch for confirmation.")
 
+            store = UploadStore(self.db)
             for file_path in all_files:
-                # Re-parse
+                # Mesmo arquivo já importado neste processamento: nada a ler
+                file_hash = hash_arquivo(file_path)
+                anterior = store.procurar(aggregated_result["processamentoid"], file_hash, tipo)
+                if anterior is not None:
+                    logger.info("Arquivo %s já importado no processamento %s — ignorado", file_path.name, anterior.processamento_id)
+                    aggregated_result["files_skipped"] += 1
+                    aggregated_result["arquivos"].append(self._decisao_arquivo(file_path, file_hash, "duplicado", anterior=anterior))
+                    continue
+
+                # Spill do preview ou re-parse
                 def progress_cb(val): pass
                 def log_cb(msg): pass
 
-                df_mapeado, transf, idx = preparar_dataframe_de_arquivo(
-                    path=str(file_path),
-                    engine=engine,
-                    cliente_id=cliente_id,
-                    contexto=contexto,
-                    tipo_origem=tipo,
+                df_mapeado = self._dataframe_mapeado(
+                    file_path, batch_dir, engine, cliente_id, contexto, tipo,
                     progress_callback=progress_cb,
                     log_callback=log_cb
                 )
@@ -293,9 +351,13 @@ class ImportService:
                 if not aggregated_result["processamentoid"]:
                     aggregated_result["processamentoid"] = result_data.get("processamentoid")
 
+                if aggregated_result["processamentoid"]:
+                    store.registrar(aggregated_result["processamentoid"], file_hash, tipo, file_path, result_data, contexto, usuario)
+                aggregated_result["arquivos"].append(self._decisao_arquivo(file_path, file_hash, "importado", result_data))
+
             return {
                 "status": "success",
-                "message": f"Successfully processed {aggregated_result['files_processed']} files.",
+                "message": self._mensagem_resumo(aggregated_result),
                 "data": aggregated_result
             }
 
@@ -364,94 +426,97 @@ class ImportService:
                 logger.warning("Task %s not found in background worker", task_id)
                 return
 
-            try:
-                task.status = "PROCESSING"
-                task.message = "Processando arquivo..."
-                task.progress = 5
-                db.commit()
-
-                # Retrieve metadata
-                meta = task.metadata_json or {}
-                file_id = meta.get("file_id")
-                ec_id = meta.get("ec_id")
-                contexto = task.contexto
-                tipo = task.tipo_arquivo
-                processamentoid = meta.get("processamentoid")
-
-                # Callback that uses the background DB session
-                def progress_callback(progress_val: int, message: Optional[str] = None):
-                    # Scale the underlying progress (0-100) to 5-95 range
-                    scaled_progress = 5 + int(progress_val * 0.9)
-                    task.progress = min(scaled_progress, 99)
-                    if message:
-                        task.message = message
-                    try:
-                        logger.debug(f"[ASYNC] Atualizando progresso no DB: {task.progress}% - {task.message}")
-                        db.commit()
-                        logger.debug("[ASYNC] Progresso atualizado.")
-                    except Exception as e_commit:
-                        db.rollback()
-                        logger.error(f"[ASYNC] Erro ao commitar progresso: {e_commit}")
-
-                # RUN HEAVY SYNC WORK IN THREADPOOL
-                # This is CRITICAL to keep the FastAPI event loop free for other requests (like Status)
-                await run_in_threadpool(
-                    self.confirm_import_v2,
-                    file_id=file_id,
-                    cliente_id=task.cliente_id,
-                    ec_id=ec_id,
-                    contexto=contexto,
-                    tipo=tipo,
-                    usuario=task.usuario,
-                    processamentoid=processamentoid,
-                    progress_callback=progress_callback,
-                    worker_db=db # Pass the background session
-                )
-
-                task.status = "SUCCESS"
-                task.progress = 100
-                task.message = "Importação concluída com sucesso!"
-                db.commit()
-
-                # Notificação (não-bloqueante)
+            with job_trace("importacao", task_id) as trace:
                 try:
-                    from app.services.notificacao_service import NotificacaoService
-                    NotificacaoService.criar(
-                        db,
-                        tipo="importacao_ok",
-                        titulo="Importação concluída",
-                        mensagem="Arquivo importado com sucesso.",
-                        link="/importar/processamentos",
-                        usuario_id=None,
+                    task.status = "PROCESSING"
+                    task.message = "Processando arquivo..."
+                    task.progress = 5
+                    db.commit()
+
+                    # Retrieve metadata
+                    meta = task.metadata_json or {}
+                    file_id = meta.get("file_id")
+                    ec_id = meta.get("ec_id")
+                    contexto = task.contexto
+                    tipo = task.tipo_arquivo
+                    processamentoid = meta.get("processamentoid")
+
+                    # Callback that uses the background DB session
+                    def progress_callback(progress_val: int, message: Optional[str] = None):
+                        # Scale the underlying progress (0-100) to 5-95 range
+                        scaled_progress = 5 + int(progress_val * 0.9)
+                        task.progress = min(scaled_progress, 99)
+                        if message:
+                            task.message = message
+                        try:
+                            logger.debug(f"[ASYNC] Atualizando progresso no DB: {task.progress}% - {task.message}")
+                            db.commit()
+                            logger.debug("[ASYNC] Progresso atualizado.")
+                        except Exception as e_commit:
+                            db.rollback()
+                            logger.error(f"[ASYNC] Erro ao commitar progresso: {e_commit}")
+
+                    # RUN HEAVY SYNC WORK IN THREADPOOL
+                    # This is CRITICAL to keep the FastAPI event loop free for other requests (like Status)
+                    await run_in_threadpool(
+                        self.confirm_import_v2,
+                        file_id=file_id,
+                        cliente_id=task.cliente_id,
+                        ec_id=ec_id,
+                        contexto=contexto,
+                        tipo=tipo,
+                        usuario=task.usuario,
+                        processamentoid=processamentoid,
+                        progress_callback=progress_callback,
+                        worker_db=db # Pass the background session
                     )
-                except Exception:
-                    pass
-
-            except Exception as e:
-                db.rollback()
-                error_msg = str(e)
-                if len(error_msg) > 500:
-                    error_msg = error_msg[:500] + "... [TRUNCATED]"
 
-                task.status = "FAILED"
-                task.message = f"Erro: {error_msg}"[:255]
-                db.commit()
-                logger.error("Async Task Error: %s", error_msg)
-                traceback.print_exc()
+                    task.status = "SUCCESS"
+                    task.progress = 100
+                    task.message = "Importação concluída com sucesso!"
+                    db.commit()
 
-                # Notificação (não-bloqueante)
-                try:
-                    from app.services.notificacao_service import NotificacaoService
-                    NotificacaoService.criar(
-                        db,
-                        tipo="importacao_erro",
-                        titulo="Erro na importação",
-                        mensagem=f"Ocorreu um erro durante a importação: {error_msg[:200]}",
-                        link="/importar/processamentos",
-                        usuario_id=None,
-                    )
-                except Exception:
-                    pass
+                    # Notificação (não-bloqueante)
+                    try:
+                        from app.services.notificacao_service import NotificacaoService
+                        NotificacaoService.criar(
+                            db,
+                            tipo="importacao_ok",
+                            titulo="Importação concluída",
+                            mensagem="Arquivo importado com sucesso.",
+                            link="/importar/processamentos",
+                            usuario_id=None,
+                        )
+                    except Exception:
+                        pass
+
+                except Exception as e:
+                    db.rollback()
+                    error_msg = str(e)
+                    if len(error_msg) > 500:
+                        error_msg = error_msg[:500] + "... [TRUNCATED]"
+
+                    task.status = "FAILED"
+                    task.message = f"Erro: {error_msg}"[:255]
+                    db.commit()
+                    logger.error("Async Task Error: %s", error_msg)
+                    traceback.print_exc()
+
+                    # Notificação (não-bloqueante)
+                    try:
+                        from app.services.notificacao_service import NotificacaoService
+                        NotificacaoService.criar(
+                            db,
+                            tipo="importacao_erro",
+                            titulo="Erro na importação",
+                            mensagem=f"Ocorreu um erro durante a importação: {error_msg[:200]}",
+                            link="/importar/processamentos",
+                            usuario_id=None,
+                        )
+                    except Exception:
+                        pass
+
+            salvar_estagios(db, task, trace)
 
     def confirm_import_v2(
         self,
@@ -482,6 +547,8 @@ class ImportService:
             "filtradas": 0,
             "total": 0,
             "files_processed": 0,
+            "files_skipped": 0,
+            "arquivos": [],  # decisão por arquivo: importado | duplicado
             "processamentoid": processamentoid
         }
 
@@ -489,20 +556,28 @@ class ImportService:
             engine = db.get_bind()
 
             # Find all files in the batch dir (including extracted ones)
-            all_files = []
-            for root, _, filenames in os.walk(batch_dir):
-                for f in filenames:
-                    all_files.append(Path(root) / f)
+            all_files = listar_arquivos_lote(batch_dir)
 
             if not all_files:
                  raise HTTPException(status_code=400, detail="No files found in batch for confirmation.")
 
             total_files = len(all_files)
+            store = UploadStore(db)
             for i, file_path in enumerate(all_files):
                 if progress_callback:
                     file_progress_start = int((i / total_files) * 100)
                     progress_callback(file_progress_start, f"Processando arquivo {i+1}/{total_files}: {file_path.name}")
 
+                file_hash = hash_arquivo(file_path)
+                anterior = store.procurar(aggregated_result["processamentoid"], file_hash, tipo)
+                if anterior is not None:
+                    logger.info("Arquivo %s já importado no processamento %s — ignorado", file_path.name, anterior.processamento_id)
+                    if progress_callback:
+                        progress_callback(file_progress_start, f"Arquivo {file_path.name} já importado neste processamento — ignorado")
+                    aggregated_result["files_skipped"] += 1
+                    aggregated_result["arquivos"].append(self._decisao_arquivo(file_path, file_hash, "duplicado", anterior=anterior))
+                    continue
+
                 # Inner callback for the processing logic
                 def inner_progress(val, message=None):
                     if progress_callback:
@@ -511,12 +586,8 @@ class ImportService:
                         current_file_progress = file_progress_start + int(val * (share / 100))
                         progress_callback(current_file_progress, message)
 
-                df_mapeado, transf, idx = preparar_dataframe_de_arquivo(
-                    path=str(file_path),
-                    engine=engine,
-                    cliente_id=cliente_id,
-                    contexto=contexto,
-                    tipo_origem=tipo,
+                df_mapeado = self._dataframe_mapeado(
+                    file_path, batch_dir, engine, cliente_id, contexto, tipo,
                     progress_callback=inner_progress,
                     log_callback=print
                 )
@@ -557,6 +628,10 @@ class ImportService:
                 if not aggregated_result["processamentoid"]:
                     aggregated_result["processamentoid"] = result_data.get("processamentoid")
 
+                if aggregated_result["processamentoid"]:
+                    store.registrar(aggregated_result["processamentoid"], file_hash, tipo, file_path, result_data, contexto, usuario)
+                aggregated_result["arquivos"].append(self._decisao_arquivo(file_path, file_hash, "importado", result_data))
+
             # Cleanup only on success — on error keep files so the user can retry
             if batch_dir.exists():
                 try:
@@ -566,7 +641,7 @@ class ImportService:
 
             return {
                 "status": "success",
-                "message": f"Successfully processed {aggregated_result['files_processed']} files.",
+                "message": self._mensagem_resumo(aggregated_result),
                 "data": aggregated_result
             }
 
@@ -0,0 +1,202 @@
+"""
+Spill colunar dos arquivos enviados no preview de importação.
+
+O preview lê só as primeiras linhas de cada arquivo. Logo depois de responder,
+cada arquivo do lote é convertido por inteiro em segundo plano — a mesma
+chamada de ``preparar_dataframe_de_arquivo`` que a confirmação faria (leitura,
+detecção de cabeçalho, De-Para) — e o ``df_mapeado`` vai para um Parquet em
+``<lote>/_spill/``, chaveado pelo sha256 do arquivo + cliente + contexto +
+tipo + versão das regras De-Para do contexto (``versao_depara``: hash das
+regras ativas). Regra criada, alterada ou desativada entre o preview e a
+confirmação muda a chave e o spill antigo deixa de ser usado.
+
+Na confirmação, se o spill do arquivo existe (ou ainda está sendo gravado),
+o DataFrame vem direto dele e o arquivo bruto não é lido de novo. Sem spill
+(desligado, falhou, lote de outro processo ainda sem spill) a confirmação
+faz a leitura completa como antes.
+
+A gravação é atômica (``.tmp`` + ``os.replace``): só spill completo é usado.
+A pasta some junto com o lote (``shutil.rmtree`` do fim da confirmação).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.adapters.proc_importacao_adapter import preparar_dataframe_de_arquivo
+from app.core.config import settings
+from app.core.metrics import PerformanceTimer
+from app.services.upload_store import hash_arquivo
+
+logger = logging.getLogger(__name__)
+
+DIR_SPILL = "_spill"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pendentes: Dict[Tuple[str, int, str, str], Future] = {}
+_lock = threading.Lock()
+
+
+def _safe(s: str) -> str:
+    return "".join(c if c.isalnum() or c in "_-" else "_" for c in s)
+
+
+def versao_depara(engine, contexto: str, tipo: str) -> str:
+    """Hash curto das regras De-Para ativas que a leitura de ``contexto``/``tipo`` aplica."""
+    from conf.funcoesbd import depara_carregar_mapa_completo
+
+    regras = depara_carregar_mapa_completo(engine, contexto=contexto, tipo_origem=tipo)
+    return hashlib.sha256(json.dumps(regras, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def caminho_spill(
+    batch_dir: Path, file_hash: str, cliente_id: int, contexto: str, tipo: str, versao: str
+) -> Path:
+    nome = f"{file_hash}_{cliente_id}_{_safe(contexto)}_{_safe(tipo)}_{versao}.parquet"
+    return Path(batch_dir) / DIR_SPILL / nome
+
+
+def listar_arquivos_lote(batch_dir: Path) -> List[Path]:
+    """Arquivos enviados no lote (inclusive os extraídos de ZIP), sem a pasta de spill."""
+    arquivos = []
+    for root, dirnames, filenames in os.walk(batch_dir):
+        dirnames[:] = [d for d in dirnames if d != DIR_SPILL]
+        for f in filenames:
+            arquivos.append(Path(root) / f)
+    return arquivos
+
+
+def _chave(path: Path, cliente_id: int, contexto: str, tipo: str) -> Tuple[str, int, str, str]:
+    return str(Path(path).resolve()), cliente_id, contexto, tipo
+
+
+def gerar_spill(path: Path, batch_dir: Path, engine, cliente_id: int, contexto: str, tipo: str) -> Optional[Path]:
+    """Leitura completa de ``path`` gravada em Parquet. None se o DataFrame não cabe em Parquet."""
+    path = Path(path)
+    file_hash = hash_arquivo(path)
+    # Versão lida antes da leitura: regra alterada durante o spill invalida o resultado
+    versao = versao_depara(engine, contexto, tipo)
+    destino = caminho_spill(batch_dir, file_hash, cliente_id, contexto, tipo, versao)
+    if destino.exists():
+        return destino
+
+    with PerformanceTimer("IMPORT", "Spill do Preview", {"bytes": path.stat().st_size, "tipo": tipo}) as timer:
+        # Mesmos argumentos da confirmação: o spill substitui exatamente aquela leitura
+        df_mapeado, _transf, header_idx = preparar_dataframe_de_arquivo(
+            path=str(path),
+            engine=engine,
+            cliente_id=cliente_id,
+            contexto=contexto,
+            tipo_origem=tipo,
+        )
+        timer.set(rows=len(df_mapeado))
+
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destino.with_suffix(".parquet.tmp")
+        try:
+            df_mapeado.to_parquet(tmp, index=False)
+        except (TypeError, ValueError, NotImplementedError, ImportError) as e:
+            # Coluna object com tipos misturados etc.: a confirmação relê o arquivo
+            logger.warning("[IMPORT_SPILL] %s sem spill (%s)", path.name, e)
+            tmp.unlink(missing_ok=True)
+            return None
+        os.replace(tmp, destino)
+
+        meta = {
+            "arquivo": path.name,
+            "sha256": file_hash,
+            "cliente_id": cliente_id,
+            "versao_depara": versao,
+            "linhas": len(df_mapeado),
+            "header_idx": int(header_idx or 0),
+            "gerado_em": datetime.now().isoformat(),
+        }
+        with open(destino.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    logger.info("[IMPORT_SPILL] %s → %s (%d linhas)", path.name, destino.name, len(df_mapeado))
+    return destino
+
+
+def _gerar_spill_seguro(*args) -> Optional[Path]:
+    try:
+        return gerar_spill(*args)
+    except Exception as e:
+        # Lote removido no meio, arquivo ilegível...: a confirmação faz a leitura completa
+        logger.warning("[IMPORT_SPILL] Spill falhou para %s: %s", Path(args[0]).name, e)
+        return None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.IMPORT_SPILL_WORKERS), thread_name_prefix="import_spill"
+            )
+        return _executor
+
+
+def agendar_spill(
+    path: Path, batch_dir: Path, cliente_id: int, contexto: str, tipo: str, engine=None
+) -> Optional[Future]:
+    """Agenda a leitura completa de ``path`` em segundo plano (None se o spill está desligado)."""
+    if not settings.IMPORT_SPILL_ENABLED:
+        return None
+    if engine is None:
+        from app.core.database import engine
+
+    chave = _chave(path, cliente_id, contexto, tipo)
+    futuro = _pool().submit(_gerar_spill_seguro, path, batch_dir, engine, cliente_id, contexto, tipo)
+    with _lock:
+        _pendentes[chave] = futuro
+
+    def _concluido(f: Future) -> None:
+        with _lock:
+            if _pendentes.get(chave) is f:
+                del _pendentes[chave]
+
+    futuro.add_done_callback(_concluido)
+    return futuro
+
+
+def carregar_spill(
+    path: Path, batch_dir: Path, engine, cliente_id: int, contexto: str, tipo: str
+) -> Optional[pd.DataFrame]:
+    """
+    ``df_mapeado`` de ``path`` vindo do spill, ou None (a confirmação lê o arquivo).
+
+    Spill ainda na fila é cancelado (ler aqui mesmo é tão rápido quanto esperar);
+    spill em andamento é aguardado — é a mesma leitura que seria refeita. Só vale
+    o spill gerado com as regras De-Para atuais do contexto.
+    """
+    with _lock:
+        futuro = _pendentes.get(_chave(path, cliente_id, contexto, tipo))
+    if futuro is not None and not futuro.cancel():
+        futuro.result()
+
+    try:
+        versao = versao_depara(engine, contexto, tipo)
+    except Exception as e:
+        logger.warning("[IMPORT_SPILL] Versão do De-Para indisponível (%s) — relendo o arquivo", e)
+        return None
+    destino = caminho_spill(batch_dir, hash_arquivo(path), cliente_id, contexto, tipo, versao)
+    if not destino.exists():
+        return None
+    try:
+        with PerformanceTimer("IMPORT", "Ler Spill", {"bytes": destino.stat().st_size}) as timer:
+            df = pd.read_parquet(destino)
+            timer.set(rows=len(df))
+    except Exception as e:
+        logger.warning("[IMPORT_SPILL] Spill ilegível %s (%s) — relendo o arquivo", destino.name, e)
+        return None
+    logger.info("[IMPORT_SPILL] %s lido do spill (%d linhas)", Path(path).name, len(df))
+    return df
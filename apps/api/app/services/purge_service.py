@@ -0,0 +1,217 @@
+"""
+Exclusão de processamentos em lotes (job em background).
+
+Um DELETE único por tabela em processamentos com milhões de linhas segura
+locks do InnoDB por minutos (``innodb_lock_wait_timeout``) e trava importações
+concorrentes. Aqui cada etapa apaga no máximo ``PURGE_BATCH_SIZE`` linhas por
+transação, em ordem de chave primária, e grava o progresso na mesma transação
+do DELETE:
+
+1. ``ProcessamentoRepository.marcar_exclusao`` marca o processamento como
+   ``deleting`` (some das listagens na hora) e ``criar_task`` cria a ``PurgeTask``;
+2. ``PurgeService.executar`` percorre ``ETAPAS``; a etapa atual e os totais
+   ficam em ``metadata_json``, então uma task interrompida é retomada de onde
+   parou (``retomar_pendentes`` no startup ou ``/purge/{id}/retomar``);
+   ``reivindicar`` garante um só executor entre os workers do gunicorn: a task
+   é tomada com um UPDATE condicional e cada lote renova o ``heartbeat``; só
+   uma task parada há mais de ``PURGE_LEASE_S`` pode ser assumida por outro;
+3. por fim, rollup de perdas + registro em ``controle_processamentos`` numa
+   única transação curta.
+"""
+
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, bindparam, or_, text, update
+from sqlalchemy.orm import Session
+
+from conf import sqlite_escrita
+from conf.calculos_compactos import TABELA_VISAO, tabela_calculos
+
+from app.core.config import settings
+from app.core.metrics import PerformanceTimer, job_trace, salvar_estagios
+from app.models.legacy_processamento import STATUS_EXCLUINDO
+from app.models.purge_task import PurgeTask
+from app.repositories.perda_cliente_repository import (
+    atualizar_perdas_calculo,
+    atualizar_varios,
+    calculos_das_vendas,
+)
+
+logger = logging.getLogger(__name__)
+
+# (nome da etapa, tabela, FROM ... WHERE das linhas do processamento, coluna id)
+ETAPAS = [
+    ("vendas_calculos", "vendas_calculos", "vendas_calculos WHERE calc_id = :pid", "id"),
+    (
+        # calc_id pode diferir do processamentoid: limpa também pela venda de origem
+        "vendas_calculos_por_venda",
+        "vendas_calculos",
+        "vendas_calculos vc JOIN vendas_processadas vp ON vp.id = vc.id_venda "
+        "WHERE vp.processamentoid = :pid AND (vc.calc_id IS NULL OR vc.calc_id <> :pid)",
+        "vc.id",
+    ),
+] + [
+    (tabela, tabela, f"{tabela} WHERE processamentoid = :pid", "id")
+    for tabela in ("vendas_processadas", "vendas_filtradas", "recebiveis_processados", "recebiveis_filtrados")
+]
+
+class PurgeService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def criar_task(self, processamento_id: str, usuario: Optional[str] = None) -> PurgeTask:
+        task = PurgeTask(
+            processamento_id=processamento_id,
+            status="PENDING",
+            progress=0,
+            message="Aguardando início...",
+            usuario=usuario,
+            metadata_json={},
+        )
+        self.db.add(task)
+        self.db.commit()
+        self.db.refresh(task)
+        return task
+
+    def get_task(self, task_id: str) -> Optional[PurgeTask]:
+        return self.db.query(PurgeTask).filter(PurgeTask.id == task_id).first()
+
+    @staticmethod
+    def _lease_vencido():
+        limite = datetime.now() - timedelta(seconds=settings.PURGE_LEASE_S)
+        return and_(
+            PurgeTask.status == "PROCESSING",
+            or_(PurgeTask.heartbeat.is_(None), PurgeTask.heartbeat < limite),
+        )
+
+    def retomar_pendentes(self) -> List[str]:
+        """Ids das tasks PENDING ou PROCESSING sem heartbeat recente (worker reiniciado no meio)."""
+        return [
+            t.id
+            for t in self.db.query(PurgeTask.id).filter(or_(PurgeTask.status == "PENDING", self._lease_vencido())).all()
+        ]
+
+    def em_execucao(self, task: PurgeTask) -> bool:
+        """True se algum worker está executando a task (lease em dia)."""
+        if task.status != "PROCESSING" or task.heartbeat is None:
+            return False
+        return task.heartbeat >= datetime.now() - timedelta(seconds=settings.PURGE_LEASE_S)
+
+    def reivindicar(self, task_id: str, dono: Optional[str] = None) -> bool:
+        """
+        Toma a task para este worker num UPDATE atômico: PENDING, FAILED ou
+        PROCESSING com lease vencido. False se outro worker a executa (ou terminou).
+        """
+        dono = dono or f"{socket.gethostname()}:{os.getpid()}"
+        resultado = self.db.execute(
+            update(PurgeTask)
+            .where(
+                PurgeTask.id == task_id,
+                or_(PurgeTask.status.in_(["PENDING", "FAILED"]), self._lease_vencido()),
+            )
+            .values(status="PROCESSING", owner=dono, heartbeat=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return resultado.rowcount == 1
+
+    def _inicializar(self, task: PurgeTask) -> dict:
+        """Totais e cálculos atingidos: só na primeira execução, para o resume não perdê-los."""
+        meta = dict(task.metadata_json or {})
+        if "totais" in meta:
+            return meta
+        pid = task.processamento_id
+        meta["totais"] = {
+            nome: int(self.db.execute(text(f"SELECT COUNT(*) FROM {origem}"), {"pid": pid}).scalar() or 0)
+            for nome, _, origem, _ in ETAPAS
+        }
+        meta["removidos"] = {nome: 0 for nome, _, _, _ in ETAPAS}
+        meta["etapa"] = 0
+        meta["calculos_afetados"] = sorted(
+            [list(c) for c in calculos_das_vendas(self.db, "processamentoid = :pid", {"pid": pid})]
+        )
+        task.metadata_json = meta
+        self.db.commit()
+        return meta
+
+    def _atualizar_progresso(self, task: PurgeTask, meta: dict, mensagem: str) -> None:
+        total = sum(meta["totais"].values())
+        removidos = sum(meta["removidos"].values())
+        # Reatribui o dict: coluna JSON simples não rastreia mutação in-place
+        task.metadata_json = {**meta, "removidos": dict(meta["removidos"])}
+        task.progress = min(95, 5 + int(90 * removidos / total)) if total else 95
+        task.message = mensagem
+        task.heartbeat = datetime.now()
+
+    def executar(self, task: PurgeTask) -> None:
+        """Roda (ou retoma) a exclusão em lotes. Cada lote é uma transação."""
+        pid = task.processamento_id
+        lote = max(1, settings.PURGE_BATCH_SIZE)
+        task.status = "PROCESSING"
+        task.heartbeat = datetime.now()
+        self.db.commit()
+
+        meta = self._inicializar(task)
+        for indice in range(meta["etapa"], len(ETAPAS)):
+            nome, tabela, origem, coluna_id = ETAPAS[indice]
+            if tabela == TABELA_VISAO:
+                tabela = tabela_calculos(self.db)
+            select_ids = text(
+                f"SELECT {coluna_id} FROM {origem} AND {coluna_id} > :ultimo ORDER BY {coluna_id} LIMIT :lote"
+            )
+            delete = text(f"DELETE FROM {tabela} WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+            ultimo = 0
+            with PerformanceTimer("PURGE", f"Excluir {nome}") as timer:
+                while True:
+                    with sqlite_escrita.escritor(self.db):
+                        ids = self.db.execute(select_ids, {"pid": pid, "ultimo": ultimo, "lote": lote}).scalars().all()
+                        if not ids:
+                            break
+                        self.db.execute(delete, {"ids": ids})
+                        ultimo = ids[-1]
+                        meta["removidos"][nome] += len(ids)
+                        self._atualizar_progresso(task, meta, f"{nome}: {meta['removidos'][nome]} linhas removidas")
+                        self.db.commit()
+                timer.set(rows=meta["removidos"][nome])
+
+            meta["etapa"] = indice + 1
+            self._atualizar_progresso(task, meta, f"{nome}: concluído")
+            self.db.commit()
+
+        # Rollup + registro pai numa transação curta
+        atualizar_perdas_calculo(self.db, pid)
+        atualizar_varios(self.db, [tuple(c) for c in meta.get("calculos_afetados", [])])
+        self.db.execute(text("DELETE FROM arquivos_importados WHERE processamento_id = :pid"), {"pid": pid})
+        self.db.execute(text("DELETE FROM controle_processamentos WHERE id_processamento = :pid"), {"pid": pid})
+        task.status = "SUCCESS"
+        task.progress = 100
+        task.message = f"Processamento excluído: {sum(meta['removidos'].values())} linhas removidas."
+        self.db.commit()
+        logger.info("[%s] exclusão concluída: %s", pid, meta["removidos"])
+
+    @staticmethod
+    def run_async_purge(task_id: str):
+        """Worker da exclusão em background (sessão própria, como run_async_calculo)."""
+        from app.core.database import SessionLocal
+
+        with SessionLocal() as db:
+            service = PurgeService(db)
+            if not service.reivindicar(task_id):
+                logger.info("Exclusão %s já concluída ou em execução em outro worker", task_id)
+                return
+            task = service.get_task(task_id)
+
+            with job_trace("purge", task_id) as trace:
+                try:
+                    service.executar(task)
+                except Exception as e:
+                    db.rollback()
+                    task.status = "FAILED"
+                    task.message = f"Erro (retomável): {str(e)}"[:255]
+                    db.commit()
+                    logger.exception("Erro na exclusão do processamento %s", task.processamento_id)
+            salvar_estagios(db, task, trace)
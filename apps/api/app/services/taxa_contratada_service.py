@@ -144,6 +144,8 @@ def criar(cliente_id: int, data: TaxaContratadaCreate, db: Session) -> TaxaContr
     # editada explicitamente (via `atualizar`), nunca inferida pelo sistema.
     obj = TaxaContratada(cliente_id=cliente_id, **data.model_dump())
     db.add(obj)
+    from app.services.taxas_snapshot import invalidar_taxas
+    invalidar_taxas(db)
     db.commit()
     db.refresh(obj)
     return obj
@@ -158,6 +160,8 @@ def atualizar(id: int, cliente_id: int, data: TaxaContratadaUpdate, db: Session)
         return None
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(obj, field, value)
+    from app.services.taxas_snapshot import invalidar_taxas
+    invalidar_taxas(db)
     db.commit()
     db.refresh(obj)
     return obj
@@ -171,6 +175,8 @@ def remover(id: int, cliente_id: int, db: Session) -> bool:
     if not obj:
         return False
     db.delete(obj)
+    from app.services.taxas_snapshot import invalidar_taxas
+    invalidar_taxas(db)
     db.commit()
     return True
 
@@ -0,0 +1,241 @@
+"""
+Snapshot em memória das taxas usadas pelo motor de reconciliação.
+
+``ReconciliationCore.calculate_rates`` lia ``SELECT * FROM taxas`` inteiro e
+re-normalizava todas as linhas (``_normalize_str``, datas) a cada cálculo,
+para depois usar só as taxas dos ECs do processamento. Aqui os frames já
+normalizados ficam em memória, particionados por EC (``taxas``) e por cliente
+(``taxas_contratadas``); um cálculo busca no banco só as partições que faltam.
+
+Validade de uma partição:
+
+- ``taxas_versao`` (banco): incrementada por ``invalidar_taxas(db)`` na mesma
+  transação das escritas do CRUD de taxas (endpoints ``/taxas``, gestão,
+  ``copiar``, exclusão de cliente) e de taxas contratadas. Cada leitura do
+  snapshot confere a versão do banco antes de reutilizar partições, então uma
+  taxa editada por outro worker vale já no próximo cálculo;
+- ``TAXAS_SNAPSHOT_TTL_S``: só rede de segurança para escritas que não passam
+  pelo CRUD (Streamlit legado, SQL manual). ``0`` desliga o cache.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import polars as pl
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.metrics import PerformanceTimer
+
+logger = logging.getLogger(__name__)
+
+_LOTE_IN = 500  # ECs por SELECT ... IN
+
+# Colunas que o motor usa, já normalizadas (ver _apply_taxas / passo 3.0)
+SCHEMA_TAXAS = {
+    "ec_str": pl.String,
+    "contexto_clean": pl.String,
+    "bandeira_clean": pl.String,
+    "forma_pgto_clean": pl.String,
+    "data_ini": pl.Date,
+    "data_fim": pl.Date,
+    "taxa": pl.Float64,
+}
+SCHEMA_CONTRATADAS = {
+    "bandeira_clean": pl.String,
+    "forma_pgto_clean": pl.String,
+    "taxa_contratada": pl.Float64,
+    "vigencia_inicio": pl.Date,
+    "vigencia_fim": pl.Date,
+}
+
+
+def _normalizar_taxas(df: pl.DataFrame) -> pl.DataFrame:
+    from app.services.reconciliation_core import _normalize_str
+
+    if df.is_empty():
+        return pl.DataFrame(schema=SCHEMA_TAXAS)
+    # Cast antes de normalizar: coluna toda nula vem como pl.Null e não tem .str
+    df = df.with_columns([pl.col(c).cast(pl.String) for c in ("bandeira", "forma_pagamento", "contexto")])
+    return df.select([
+        pl.col("ec").cast(pl.String).alias("ec_str"),
+        pl.col("contexto").str.to_lowercase().str.strip_chars().alias("contexto_clean"),
+        _normalize_str(pl.col("bandeira")).alias("bandeira_clean"),
+        _normalize_str(pl.col("forma_pagamento")).alias("forma_pgto_clean"),
+        pl.col("data_ini").cast(pl.Date, strict=False),
+        pl.col("data_fim").cast(pl.Date, strict=False),
+        pl.col("taxa").cast(pl.Float64),
+    ])
+
+
+def _normalizar_contratadas(df: pl.DataFrame) -> pl.DataFrame:
+    from app.services.reconciliation_core import _normalize_str
+
+    if df.is_empty():
+        return pl.DataFrame(schema=SCHEMA_CONTRATADAS)
+    df = df.with_columns([pl.col(c).cast(pl.String) for c in ("bandeira", "modalidade")])
+    return df.select([
+        _normalize_str(pl.col("bandeira")).alias("bandeira_clean"),
+        _normalize_str(pl.col("modalidade")).alias("forma_pgto_clean"),
+        pl.col("taxa_contratada").cast(pl.Float64),
+        pl.col("vigencia_inicio").cast(pl.Date, strict=False),
+        pl.col("vigencia_fim").cast(pl.Date, strict=False),
+    ])
+
+
+_avisou_sem_versao = False
+
+
+def versao_taxas(engine: Engine) -> Optional[int]:
+    """Versão das taxas no banco (None sem a tabela ``taxas_versao``: só o TTL vale)."""
+    global _avisou_sem_versao
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT versao FROM taxas_versao WHERE id = 1")).scalar()
+    except DBAPIError:
+        if not _avisou_sem_versao:
+            _avisou_sem_versao = True
+            logger.warning("taxas_versao indisponível (migração 0011?); snapshot de taxas só com TTL")
+        return None
+
+
+@dataclass
+class _Particao:
+    df: pl.DataFrame
+    versao: int
+    carregada_em: float
+
+
+class TaxasSnapshot:
+    """Partições normalizadas de ``taxas`` (por EC) e ``taxas_contratadas`` (por cliente)."""
+
+    def __init__(self, ttl_s: Optional[float] = None):
+        self.ttl_s = settings.TAXAS_SNAPSHOT_TTL_S if ttl_s is None else ttl_s
+        self.versao = 0
+        self.versao_banco: Optional[int] = None
+        self._versao_lida = False
+        self._taxas: Dict[str, _Particao] = {}
+        self._contratadas: Dict[int, _Particao] = {}
+        self._lock = threading.Lock()
+
+    def invalidar(self) -> int:
+        """Descarta o snapshot (próximo cálculo relê do banco). Devolve a nova versão."""
+        with self._lock:
+            self.versao += 1
+            self._taxas.clear()
+            self._contratadas.clear()
+            return self.versao
+
+    def _sincronizar(self, engine: Engine) -> None:
+        """Descarta o snapshot se outro processo gravou taxas (versão do banco mudou)."""
+        if self.ttl_s <= 0:
+            return
+        versao_banco = versao_taxas(engine)
+        with self._lock:
+            if self._versao_lida and versao_banco != self.versao_banco:
+                self.versao += 1
+                self._taxas.clear()
+                self._contratadas.clear()
+            self.versao_banco = versao_banco
+            self._versao_lida = True
+
+    def _valida(self, particao: Optional[_Particao]) -> bool:
+        return (
+            particao is not None
+            and particao.versao == self.versao
+            and time.monotonic() - particao.carregada_em < self.ttl_s
+        )
+
+    def taxas(self, engine: Engine, ecs: Iterable) -> pl.DataFrame:
+        """Taxas CAD normalizadas dos ``ecs`` (comparados como texto, como no join do motor)."""
+        ecs = sorted({str(ec) for ec in ecs if ec is not None})
+        self._sincronizar(engine)
+        with self._lock:
+            versao = self.versao
+            frames = {ec: self._taxas[ec].df for ec in ecs if self._valida(self._taxas.get(ec))}
+        faltando = [ec for ec in ecs if ec not in frames]
+
+        if faltando:
+            with PerformanceTimer("RECONCILIATION", "Carregar Taxas CAD (DB)", {"ecs": len(faltando)}) as timer:
+                query = text("SELECT * FROM taxas WHERE ec IN :ecs").bindparams(bindparam("ecs", expanding=True))
+                partes = []
+                with engine.connect() as conn:
+                    for i in range(0, len(faltando), _LOTE_IN):
+                        partes.append(_normalizar_taxas(pl.read_database(
+                            query, connection=conn, execute_options={"parameters": {"ecs": faltando[i:i + _LOTE_IN]}},
+                        )))
+                novas = pl.concat(partes)
+                timer.set(rows=len(novas))
+            por_ec = novas.partition_by("ec_str", as_dict=True)
+            vazio = pl.DataFrame(schema=SCHEMA_TAXAS)
+            carregadas = {ec: por_ec.get((ec,), vazio) for ec in faltando}
+            frames.update(carregadas)
+            with self._lock:
+                # Invalidada durante a leitura: usa o que leu, mas não guarda
+                if self.versao == versao and self.ttl_s > 0:
+                    agora = time.monotonic()
+                    for ec, df in carregadas.items():
+                        self._taxas[ec] = _Particao(df, versao, agora)
+
+        if not frames:
+            return pl.DataFrame(schema=SCHEMA_TAXAS)
+        return pl.concat([frames[ec] for ec in ecs])
+
+    def taxas_contratadas(self, engine: Engine, cliente_id: int) -> pl.DataFrame:
+        """Taxas contratadas normalizadas do cliente."""
+        cliente_id = int(cliente_id)
+        self._sincronizar(engine)
+        with self._lock:
+            versao = self.versao
+            particao = self._contratadas.get(cliente_id)
+            if self._valida(particao):
+                return particao.df
+
+        with engine.connect() as conn:
+            df = _normalizar_contratadas(pl.read_database(
+                text(
+                    "SELECT bandeira, modalidade, taxa_contratada, vigencia_inicio, vigencia_fim "
+                    "FROM taxas_contratadas WHERE cliente_id = :cliente_id"
+                ),
+                connection=conn,
+                execute_options={"parameters": {"cliente_id": cliente_id}},
+            ))
+        with self._lock:
+            if self.versao == versao and self.ttl_s > 0:
+                self._contratadas[cliente_id] = _Particao(df, versao, time.monotonic())
+        return df
+
+
+_snapshot: Optional[TaxasSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def taxas_snapshot() -> TaxasSnapshot:
+    """Instância do processo."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = TaxasSnapshot()
+        return _snapshot
+
+
+def invalidar_taxas(executor=None) -> None:
+    """
+    Chamado em toda escrita em ``taxas`` ou ``taxas_contratadas``. ``executor``
+    (Session/Connection da escrita) incrementa ``taxas_versao`` na mesma
+    transação, antes do commit do chamador; um Engine abre transação própria.
+    """
+    if executor is not None:
+        bump = text("UPDATE taxas_versao SET versao = versao + 1 WHERE id = 1")
+        if isinstance(executor, Engine):
+            with executor.begin() as conn:
+                conn.execute(bump)
+        else:
+            executor.execute(bump)
+    versao = taxas_snapshot().invalidar()
+    logger.debug("Snapshot de taxas invalidado (versão %d)", versao)
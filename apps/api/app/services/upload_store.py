@@ -0,0 +1,122 @@
+"""
+Upload endereçado por conteúdo.
+
+Os arquivos do preview são gravados em disco calculando o sha256 no mesmo
+passe (``salvar_com_hash``). Na confirmação, cada arquivo importado fica
+registrado em ``arquivos_importados`` (processamento, hash, tipo → linhas
+gravadas). Se o mesmo arquivo chega de novo para um processamento que já o
+contém, ``UploadStore.procurar`` o encontra e a confirmação o ignora na hora —
+sem leitura, De-Para, normalização, INSERT e dedup só para descartar tudo.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.arquivo_importado import ArquivoImportado
+
+logger = logging.getLogger(__name__)
+
+_BLOCO = 1024 * 1024
+_MAX_MEMO = 1024
+
+# (caminho, tamanho, mtime) → sha256: o hash do upload é reusado pelo spill e pela confirmação
+_memo: Dict[Tuple[str, int, int], str] = {}
+_lock = threading.Lock()
+
+
+def _chave(path: Path) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return str(Path(path).resolve()), st.st_size, st.st_mtime_ns
+
+
+def _memorizar(path: Path, sha256: str) -> None:
+    with _lock:
+        if len(_memo) >= _MAX_MEMO:
+            _memo.pop(next(iter(_memo)))
+        _memo[_chave(path)] = sha256
+
+
+def salvar_com_hash(origem: BinaryIO, destino: Path) -> str:
+    """Copia ``origem`` para ``destino`` (como ``shutil.copyfileobj``) e devolve o sha256."""
+    sha = hashlib.sha256()
+    with open(destino, "wb") as f:
+        for bloco in iter(lambda: origem.read(_BLOCO), b""):
+            sha.update(bloco)
+            f.write(bloco)
+    digest = sha.hexdigest()
+    _memorizar(destino, digest)
+    return digest
+
+
+def hash_arquivo(path: Path) -> str:
+    """sha256 de ``path`` (memorizado enquanto o arquivo não muda)."""
+    with _lock:
+        digest = _memo.get(_chave(path))
+    if digest is not None:
+        return digest
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(_BLOCO), b""):
+            sha.update(bloco)
+    digest = sha.hexdigest()
+    _memorizar(path, digest)
+    return digest
+
+
+class UploadStore:
+    """Arquivos já importados por processamento (tabela ``arquivos_importados``)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def procurar(self, processamento_id: Optional[str], sha256: str, tipo: str) -> Optional[ArquivoImportado]:
+        if not processamento_id:
+            return None
+        return (
+            self.db.query(ArquivoImportado)
+            .filter(
+                ArquivoImportado.processamento_id == str(processamento_id),
+                ArquivoImportado.sha256 == sha256,
+                ArquivoImportado.tipo_arquivo == tipo,
+            )
+            .first()
+        )
+
+    def registrar(
+        self,
+        processamento_id: str,
+        sha256: str,
+        tipo: str,
+        path: Path,
+        resultado: dict,
+        contexto: Optional[str] = None,
+        usuario: Optional[str] = None,
+    ) -> ArquivoImportado:
+        registro = ArquivoImportado(
+            processamento_id=str(processamento_id),
+            sha256=sha256,
+            tipo_arquivo=tipo,
+            contexto=contexto,
+            arquivo=Path(path).name[:255],
+            bytes=os.path.getsize(path),
+            processadas=int(resultado.get("processadas", 0) or 0),
+            filtradas=int(resultado.get("filtradas", 0) or 0),
+            total=int(resultado.get("total", 0) or 0),
+            usuario=usuario,
+        )
+        self.db.add(registro)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Outra confirmação registrou o mesmo arquivo no meio tempo
+            logger.info("Arquivo %s já registrado no processamento %s", sha256[:12], processamento_id)
+            self.db.rollback()
+            return self.procurar(processamento_id, sha256, tipo)
+        return registro
@@ -0,0 +1,10 @@
+"""
+Benchmark reproduzível do pipeline de conciliação.
+
+- ``generators``: arquivos sintéticos determinísticos (Cielo, Rede XLSX/TXT, Stone)
+- ``harness``: medição de tempo, linhas/s e pico de RSS por estágio; baseline
+- ``pipeline``: estágios reais (importação, gravação, cálculo, pré-processamento,
+  PDF, conversor TXT) sobre SQLite local
+
+Execução: ``python -m benchmarks --help`` a partir de ``apps/api``.
+"""
@@ -0,0 +1,135 @@
+"""
+Executa o benchmark do pipeline (importação → cálculo → relatório) em SQLite.
+
+Uso:
+    cd apps/api
+    python -m benchmarks
+    python -m benchmarks --update-baseline
+    python -m benchmarks --rows 5000 --layouts cielo --no-pdf --json resultado.json
+
+Sai com código 1 se algum estágio regredir além de ``--tolerance`` em relação
+à baseline (mesmo ``--rows``) ou terminar com erro.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+_api_dir = Path(__file__).resolve().parent.parent
+_root_dir = _api_dir.parent.parent
+for _p in (str(_api_dir), str(_root_dir)):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+_BASELINE_PADRAO = str(Path(__file__).resolve().parent / "baseline.json")
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000, help="linhas por arquivo sintético")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="rodadas por estágio (vale a mais rápida)")
+    parser.add_argument("--layouts", default="cielo,rede,stone", help="lista separada por vírgula")
+    parser.add_argument("--calc-tipo", default="log_mensal")
+    parser.add_argument("--no-txt", action="store_true", help="não executa o conversor TXT da Rede")
+    parser.add_argument("--no-pdf", action="store_true", help="não executa o estágio de PDF")
+    parser.add_argument("--workdir", default=None, help="diretório de trabalho (padrão: temporário)")
+    parser.add_argument("--keep", action="store_true", help="mantém workdir, banco e arquivos gerados")
+    parser.add_argument("--baseline", default=_BASELINE_PADRAO)
+    parser.add_argument("--update-baseline", action="store_true", help="grava os resultados como nova baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="queda de throughput tolerada (0.25 = 25%%)")
+    parser.add_argument("--json", dest="json_out", default=None, help="grava os resultados em JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="concilie_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    # O engine da aplicação é criado no import: apontar para o banco do benchmark antes
+    os.environ["DATABASE_TYPE"] = "sqlite"
+    os.environ["SQLITE_DB_PATH"] = db_path
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.core.database import engine
+    from app.core.logging_config import setup_logging
+    from app.services import preprocessamento_service
+    from benchmarks.harness import (
+        carregar_baseline,
+        combinar_repeticoes,
+        comparar_com_baseline,
+        formatar_tabela,
+        salvar_baseline,
+    )
+    from benchmarks.pipeline import executar, preparar_banco, resetar_banco
+    from modules import reports
+
+    setup_logging()
+    # Caches de parquet ficam no workdir, não na árvore do projeto
+    preprocessamento_service._PREPROC_CACHE_DIR = os.path.join(workdir, "parquet_cache")
+    reports._PARQUET_CACHE_DIR = os.path.join(workdir, "relatorios_cache")
+
+    parametros = {"rows": args.rows, "seed": args.seed, "calc_tipo": args.calc_tipo, "repeat": args.repeat}
+    layouts = [layout.strip() for layout in args.layouts.split(",") if layout.strip()]
+
+    rodadas = []
+    try:
+        for i in range(max(1, args.repeat)):
+            resetar_banco(engine)
+            preparar_banco(engine)
+            rodadas.append(executar(
+                engine,
+                os.path.join(workdir, "arquivos"),
+                args.rows,
+                seed=args.seed,
+                layouts=layouts,
+                incluir_txt=not args.no_txt,
+                incluir_pdf=not args.no_pdf,
+                calc_tipo=args.calc_tipo,
+                progresso=lambda msg, i=i: print(f"[BENCH] rodada {i + 1}/{args.repeat} {msg}", file=sys.stderr),
+            ))
+    finally:
+        engine.dispose()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    resultados = combinar_repeticoes(rodadas)
+    print(formatar_tabela(resultados))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"parametros": parametros, "estagios": [r.to_dict() for r in resultados]}, f, indent=2, ensure_ascii=False)
+
+    falhas = [r for r in resultados if r.status == "erro"]
+    if args.update_baseline:
+        salvar_baseline(args.baseline, resultados, parametros)
+        print(f"\nBaseline atualizada: {args.baseline}")
+        return 1 if falhas else 0
+
+    baseline = carregar_baseline(args.baseline)
+    regressoes = []
+    if baseline is None:
+        print(f"\nSem baseline em {args.baseline} (use --update-baseline).")
+    elif baseline.get("parametros", {}).get("rows") != args.rows:
+        print(f"\nBaseline gerada com rows={baseline['parametros'].get('rows')}; comparação ignorada.")
+    else:
+        regressoes = comparar_com_baseline(resultados, baseline, args.tolerance, parametros)
+        print("\nRegressões:" if regressoes else "\nSem regressões em relação à baseline.")
+        for msg in regressoes:
+            print(f"  - {msg}")
+
+    for r in falhas:
+        print(f"ERRO em {r.nome}: {r.detalhe}")
+    return 1 if (regressoes or falhas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
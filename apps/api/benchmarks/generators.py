@@ -0,0 +1,257 @@
+"""
+Geradores determinísticos de arquivos sintéticos de adquirentes.
+
+Cada gerador recebe ``n_rows`` e ``seed`` e produz sempre o mesmo arquivo,
+com cabeçalhos reconhecidos pelos importadores modulares
+(``proc.importers.cielo``/``rede``/``stone``) e pelo ``RedeParser`` do conversor.
+Os nomes de coluna de ``DEPARA_REGRAS`` mapeiam esses cabeçalhos para o layout
+padrão de ``vendas_processadas``.
+"""
+
+import os
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+BANDEIRAS = ["Mastercard", "Visa", "Elo", "Amex", "Hipercard"]
+# Siglas usadas no extrato TXT da Rede
+BANDEIRAS_TXT = ["MC", "VI", "EL", "AX", "HC"]
+FORMAS = ["Crédito à vista", "Débito", "Crédito parcelado loja", "Pré-pago"]
+MODALIDADES_TXT = ["A VISTA", "PARC.ESTAB."]
+
+EC_PADRAO = "1234567890"
+
+_COLUNAS_CIELO = [
+    "Data da venda", "Bandeira", "Forma de pagamento", "Quantidade de parcelas",
+    "Valor bruto", "Taxa/tarifa", "Valor descontado", "Valor líquido",
+    "Resumo de venda", "Nº PV", "Nº RLV", "Nº RO", "Cartão", "Nº NSU",
+    "Código de autorização",
+]
+_COLUNAS_REDE = [
+    "data da venda", "bandeira", "modalidade", "tipo", "número de parcelas",
+    "valor da venda original", "taxa MDR", "valor MDR", "valor líquido",
+    "NSU/CV", "número da autorização",
+]
+_COLUNAS_STONE = [
+    "Stonecode", "Data da venda", "Bandeira", "Produto", "Qtd de parcelas",
+    "Valor bruto", "Taxa", "Desconto", "Valor líquido", "Serial Number",
+    "Stone ID", "Código de autorização",
+]
+
+# (contexto, origem_nome, destino_nome) — semeados em depara_colunas pelo runner
+DEPARA_REGRAS: List[Tuple[str, str, str]] = [
+    ("CIELO", "Data da venda", "Data_da_venda"),
+    ("CIELO", "Bandeira", "Bandeira"),
+    ("CIELO", "Forma de pagamento", "Forma_de_pagamento"),
+    ("CIELO", "Quantidade de parcelas", "Quantidade_de_parcelas"),
+    ("CIELO", "Valor bruto", "Valor_da_venda"),
+    ("CIELO", "Taxa/tarifa", "Taxas_Perc"),
+    ("CIELO", "Valor descontado", "Valor_descontado"),
+    ("CIELO", "Valor líquido", "Valor_líquido_da_venda"),
+    ("CIELO", "Resumo de venda", "Resumo_da_operação"),
+    ("CIELO", "Nº NSU", "NSU"),
+    ("CIELO", "Cartão", "Número_do_cartão"),
+    ("CIELO", "Código de autorização", "Código_de_autorização"),
+    ("REDE", "data da venda", "Data_da_venda"),
+    ("REDE", "bandeira", "Bandeira"),
+    ("REDE", "modalidade", "modalidade"),
+    ("REDE", "tipo", "tipo"),
+    ("REDE", "número de parcelas", "Quantidade_de_parcelas"),
+    ("REDE", "valor da venda original", "Valor_da_venda"),
+    ("REDE", "taxa MDR", "Taxas_Perc"),
+    ("REDE", "valor MDR", "Valor_descontado"),
+    ("REDE", "valor líquido", "Valor_líquido_da_venda"),
+    ("REDE", "NSU/CV", "NSU"),
+    ("REDE", "número da autorização", "Código_de_autorização"),
+    ("STONE", "Data da venda", "Data_da_venda"),
+    ("STONE", "Bandeira", "Bandeira"),
+    ("STONE", "Produto", "Forma_de_pagamento"),
+    ("STONE", "Qtd de parcelas", "Quantidade_de_parcelas"),
+    ("STONE", "Valor bruto", "Valor_da_venda"),
+    ("STONE", "Taxa", "Taxas_Perc"),
+    ("STONE", "Desconto", "Valor_descontado"),
+    ("STONE", "Valor líquido", "Valor_líquido_da_venda"),
+    ("STONE", "Stone ID", "NSU"),
+    ("STONE", "Código de autorização", "Código_de_autorização"),
+]
+
+
+def _vendas_base(n_rows: int, seed: int, inicio: date = date(2024, 1, 1), dias: int = 180) -> Dict[str, np.ndarray]:
+    """Colunas comuns a todos os layouts, geradas de forma vetorizada."""
+    rng = np.random.default_rng(seed)
+    forma_idx = rng.integers(0, len(FORMAS), n_rows)
+    parcelas = np.where(forma_idx == 2, rng.integers(2, 13, n_rows), 1)
+    bruto = np.round(rng.gamma(2.0, 80.0, n_rows) + 1.0, 2)
+    taxa = np.round(np.where(forma_idx == 1, 1.2, 2.9) + rng.normal(0, 0.15, n_rows) + (parcelas - 1) * 0.25, 2)
+    descontado = np.round(bruto * taxa / 100, 2)
+    datas = np.datetime64(inicio) + rng.integers(0, dias, n_rows).astype("timedelta64[D]")
+    return {
+        "data": pd.to_datetime(datas),
+        "bandeira_idx": rng.integers(0, len(BANDEIRAS), n_rows),
+        "forma_idx": forma_idx,
+        "parcelas": parcelas,
+        "bruto": bruto,
+        "taxa": taxa,
+        "descontado": descontado,
+        "liquido": np.round(bruto - descontado, 2),
+        "nsu": rng.integers(10**8, 10**9, n_rows),
+        "autorizacao": rng.integers(10**5, 10**6, n_rows),
+    }
+
+
+def _fmt_br(valores: np.ndarray) -> np.ndarray:
+    """Formata floats como '1.234,56' (formato dos relatórios das adquirentes)."""
+    s = pd.Series(valores).map("{:,.2f}".format)
+    return s.str.replace(",", "_", regex=False).str.replace(".", ",", regex=False).str.replace("_", ".", regex=False).to_numpy()
+
+
+def _escrever_xlsx(path: str, df: pd.DataFrame, preambulo: List[str]) -> str:
+    """Grava ``df`` com linhas de preâmbulo antes do cabeçalho (como nos extratos reais)."""
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, startrow=len(preambulo) + 1, sheet_name="Vendas")
+        ws = writer.sheets["Vendas"]
+        for i, linha in enumerate(preambulo):
+            ws.write(i, 0, linha)
+    return path
+
+
+def gerar_cielo_xlsx(path: str, n_rows: int, seed: int = 42) -> str:
+    """Extrato 'Histórico detalhe' da Cielo."""
+    b = _vendas_base(n_rows, seed)
+    df = pd.DataFrame({
+        "Data da venda": b["data"].strftime("%d/%m/%Y"),
+        "Bandeira": np.take(BANDEIRAS, b["bandeira_idx"]),
+        "Forma de pagamento": np.take(FORMAS, b["forma_idx"]),
+        "Quantidade de parcelas": b["parcelas"],
+        "Valor bruto": _fmt_br(b["bruto"]),
+        "Taxa/tarifa": _fmt_br(b["taxa"]),
+        "Valor descontado": _fmt_br(b["descontado"]),
+        "Valor líquido": _fmt_br(b["liquido"]),
+        "Resumo de venda": (b["nsu"] % 10**7).astype(str),
+        "Nº PV": EC_PADRAO,
+        "Nº RLV": (b["nsu"] % 10**6).astype(str),
+        "Nº RO": (b["nsu"] % 10**5).astype(str),
+        "Cartão": "************1234",
+        "Nº NSU": b["nsu"].astype(str),
+        "Código de autorização": b["autorizacao"].astype(str),
+    }, columns=_COLUNAS_CIELO)
+    return _escrever_xlsx(path, df, ["Relatório de vendas - Histórico detalhe", f"Estabelecimento: {EC_PADRAO}"])
+
+
+def gerar_rede_xlsx(path: str, n_rows: int, seed: int = 43) -> str:
+    """Relatório de vendas da Rede (planilha única com 'modalidade' + 'tipo')."""
+    b = _vendas_base(n_rows, seed)
+    modalidade = np.where(b["forma_idx"] == 1, "débito", "crédito")
+    tipo = np.where(b["forma_idx"] == 2, "parcelado", "à vista")
+    df = pd.DataFrame({
+        "data da venda": b["data"].strftime("%d/%m/%Y"),
+        "bandeira": np.take(BANDEIRAS, b["bandeira_idx"]),
+        "modalidade": modalidade,
+        "tipo": tipo,
+        "número de parcelas": b["parcelas"],
+        "valor da venda original": b["bruto"],
+        "taxa MDR": b["taxa"],
+        "valor MDR": b["descontado"],
+        "valor líquido": b["liquido"],
+        "NSU/CV": b["nsu"].astype(str),
+        "número da autorização": b["autorizacao"].astype(str),
+    }, columns=_COLUNAS_REDE)
+    return _escrever_xlsx(path, df, ["Rede - relatório de vendas"])
+
+
+def gerar_stone_xlsx(path: str, n_rows: int, seed: int = 44) -> str:
+    """Extrato de vendas do portal Stone."""
+    b = _vendas_base(n_rows, seed)
+    df = pd.DataFrame({
+        "Stonecode": EC_PADRAO,
+        "Data da venda": b["data"].strftime("%Y-%m-%d %H:%M:%S"),
+        "Bandeira": np.take(BANDEIRAS, b["bandeira_idx"]),
+        "Produto": np.take(FORMAS, b["forma_idx"]),
+        "Qtd de parcelas": b["parcelas"],
+        "Valor bruto": b["bruto"],
+        "Taxa": b["taxa"],
+        "Desconto": b["descontado"],
+        "Valor líquido": b["liquido"],
+        "Serial Number": "SN" + (b["nsu"] % 10**6).astype(str),
+        "Stone ID": b["nsu"].astype(str),
+        "Código de autorização": b["autorizacao"].astype(str),
+    }, columns=_COLUNAS_STONE)
+    return _escrever_xlsx(path, df, ["Stone - extrato de vendas"])
+
+
+def gerar_rede_txt(path: str, n_rows: int, seed: int = 45) -> str:
+    """
+    Extrato TXT posicional da Rede no formato lido por ``RedeParser``:
+    seções de crédito, débito e movimento financeiro.
+    """
+    b = _vendas_base(n_rows, seed)
+    rng = np.random.default_rng(seed + 1)
+    datas = b["data"].strftime("%d/%m/%y").to_numpy()
+    receb = (b["data"] + pd.Timedelta(days=30)).strftime("%d/%m/%y").to_numpy()
+    bandeiras = np.take(BANDEIRAS_TXT, b["bandeira_idx"])
+    bruto, liquido = _fmt_br(b["bruto"]), _fmt_br(b["liquido"])
+    debito = b["forma_idx"] == 1
+    modalidade = np.where(b["parcelas"] > 1, MODALIDADES_TXT[1], MODALIDADES_TXT[0])
+
+    def _linhas_venda(mask: np.ndarray) -> List[str]:
+        idx = np.flatnonzero(mask)
+        return [
+            f"{datas[i]}  {receb[i]}  {1000 + i % 97:>6} {b['nsu'][i] % 10**7:>9}  {bandeiras[i]}"
+            f"  {b['parcelas'][i]:>3}  {modalidade[i]:<14}  {bruto[i]:>12}  {'-':>10}  {liquido[i]:>12}"
+            for i in idx
+        ]
+
+    n_pag = max(1, n_rows // 20)
+    ordens = rng.integers(10**8, 10**9, n_pag)
+    valores_pag = _fmt_br(np.round(rng.gamma(2.0, 2000.0, n_pag), 2))
+    datas_pag = (pd.Timestamp(2024, 2, 1) + pd.to_timedelta(np.arange(n_pag) % 180, unit="D")).strftime("%d/%m/%y")
+
+    linhas = [
+        f"{EC_PADRAO[:9]} 001",
+        f"Nº DO ESTABELECIMENTO: {EC_PADRAO[:9]}",
+        "PERÍODO: 01/01/24 A 30/06/24",
+        "DATA DA EMISSÃO: 01/07/24",
+        "",
+        "VENDAS COM CARTÕES DE CRÉDITO",
+        *_linhas_venda(~debito),
+        "",
+        "VENDAS COM CARTÕES DE DÉBITO",
+        *_linhas_venda(debito),
+        "",
+        "MOVIMENTO FINANCEIRO",
+        *[f"{datas_pag[i]}  {ordens[i]}  {valores_pag[i]:>12}  0341/1234/{123456 + i % 1000}" for i in range(n_pag)],
+    ]
+    with open(path, "w", encoding="latin-1") as f:
+        f.write("\n".join(linhas))
+    return path
+
+
+GERADORES = {
+    "cielo": (gerar_cielo_xlsx, "CIELO", ".xlsx"),
+    "rede": (gerar_rede_xlsx, "REDE", ".xlsx"),
+    "stone": (gerar_stone_xlsx, "STONE", ".xlsx"),
+}
+
+
+def gerar_todos(pasta: str, n_rows: int, seed: int = 42) -> Dict[str, str]:
+    """Gera um arquivo de cada layout em ``pasta``. Retorna ``{nome: caminho}``."""
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = {}
+    for i, (nome, (gerador, _ctx, ext)) in enumerate(GERADORES.items()):
+        arquivos[nome] = gerador(os.path.join(pasta, f"bench_{nome}_{n_rows}{ext}"), n_rows, seed + i)
+    arquivos["rede_txt"] = gerar_rede_txt(os.path.join(pasta, f"bench_rede_{n_rows}.txt"), n_rows, seed + 10)
+    return arquivos
+
+
+__all__ = [
+    "DEPARA_REGRAS",
+    "EC_PADRAO",
+    "GERADORES",
+    "gerar_cielo_xlsx",
+    "gerar_rede_txt",
+    "gerar_rede_xlsx",
+    "gerar_stone_xlsx",
+    "gerar_todos",
+]
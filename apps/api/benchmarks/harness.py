@@ -0,0 +1,182 @@
+"""
+Medição de estágios e comparação com baseline.
+
+``medir_estagio`` é um context manager que registra tempo de parede, linhas/s
+e pico de RSS (amostrado por uma thread em segundo plano) de um bloco.
+``comparar_com_baseline`` aponta estágios cujo throughput caiu ou cujo pico
+de memória subiu além da tolerância.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Iterator, List, Optional
+
+import psutil
+
+_MB = 1024 * 1024
+_PIORA_MINIMA_S = 0.1
+_CAMPOS_BASELINE = ("linhas", "wall_s", "linhas_por_s", "pico_rss_mb", "delta_rss_mb")
+
+
+@dataclass
+class StageResult:
+    nome: str
+    linhas: int = 0
+    wall_s: float = 0.0
+    linhas_por_s: float = 0.0
+    pico_rss_mb: float = 0.0
+    delta_rss_mb: float = 0.0
+    status: str = "ok"  # ok | erro | pulado
+    detalhe: str = ""
+    extras: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _AmostradorRSS:
+    """Thread que amostra o RSS do processo e guarda o maior valor visto."""
+
+    def __init__(self, intervalo_s: float = 0.01):
+        self._proc = psutil.Process(os.getpid())
+        self._intervalo = intervalo_s
+        self._parar = threading.Event()
+        self.inicio = self._proc.memory_info().rss
+        self.pico = self.inicio
+        self._thread = threading.Thread(target=self._loop, name="bench-rss", daemon=True)
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self._intervalo):
+            rss = self._proc.memory_info().rss
+            if rss > self.pico:
+                self.pico = rss
+
+    def __enter__(self) -> "_AmostradorRSS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, self._proc.memory_info().rss)
+
+
+@contextmanager
+def medir_estagio(nome: str, linhas: int = 0) -> Iterator[StageResult]:
+    """
+    Mede o bloco e preenche o ``StageResult`` devolvido. O bloco pode ajustar
+    ``resultado.linhas`` (ex: linhas efetivamente gravadas) antes de sair.
+    Exceções são registradas como ``status="erro"`` e não propagam.
+    """
+    resultado = StageResult(nome=nome, linhas=linhas)
+    t0 = time.perf_counter()
+    with _AmostradorRSS() as rss:
+        try:
+            yield resultado
+        except Exception as e:
+            resultado.status = "erro"
+            resultado.detalhe = f"{type(e).__name__}: {e}"[:500]
+    resultado.wall_s = time.perf_counter() - t0
+    resultado.pico_rss_mb = rss.pico / _MB
+    resultado.delta_rss_mb = (rss.pico - rss.inicio) / _MB
+    if resultado.status == "ok" and resultado.wall_s > 0 and resultado.linhas:
+        resultado.linhas_por_s = resultado.linhas / resultado.wall_s
+
+
+def combinar_repeticoes(rodadas: List[List[StageResult]]) -> List[StageResult]:
+    """
+    Best-of-N: para cada estágio fica a rodada mais rápida (menos sensível a
+    ruído do host); memória usa o maior pico/delta observado entre as rodadas.
+    """
+    por_nome: Dict[str, List[StageResult]] = {}
+    for rodada in rodadas:
+        for r in rodada:
+            por_nome.setdefault(r.nome, []).append(r)
+
+    combinados = []
+    for nome, lista in por_nome.items():
+        ok = [r for r in lista if r.status == "ok"]
+        if len(ok) < len(lista):
+            # Qualquer falha prevalece: uma regressão intermitente não pode sumir no best-of
+            combinados.append(next(r for r in lista if r.status != "ok"))
+            continue
+        melhor = replace(min(ok, key=lambda r: r.wall_s))
+        melhor.pico_rss_mb = max(r.pico_rss_mb for r in ok)
+        melhor.delta_rss_mb = max(r.delta_rss_mb for r in ok)
+        melhor.extras = {**melhor.extras, "rodadas": len(ok)}
+        combinados.append(melhor)
+    return combinados
+
+
+def carregar_baseline(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_baseline(path: str, resultados: List[StageResult], parametros: dict) -> None:
+    dados = {
+        "parametros": parametros,
+        "estagios": {
+            r.nome: {k: getattr(r, k) for k in _CAMPOS_BASELINE}
+            for r in resultados
+            if r.status == "ok"
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def comparar_com_baseline(
+    resultados: List[StageResult],
+    baseline: dict,
+    tolerancia: float = 0.25,
+    parametros: Optional[dict] = None,
+) -> List[str]:
+    """
+    Retorna a lista de regressões (mensagens legíveis). Só compara estágios
+    ``ok`` presentes na baseline e, se ``parametros`` for informado, apenas
+    quando o tamanho dos arquivos coincide com o da baseline.
+    """
+    if parametros is not None and baseline.get("parametros", {}).get("rows") != parametros.get("rows"):
+        return []
+
+    regressoes = []
+    base = baseline.get("estagios", {})
+    for r in resultados:
+        ref = base.get(r.nome)
+        if r.status != "ok" or not ref:
+            continue
+        ref_tput = ref.get("linhas_por_s") or 0
+        # Estágios sub-segundo oscilam muito: exige também piora absoluta mínima
+        piora_s = r.wall_s - (ref.get("wall_s") or 0)
+        if ref_tput and r.linhas_por_s < ref_tput * (1 - tolerancia) and piora_s > _PIORA_MINIMA_S:
+            regressoes.append(
+                f"{r.nome}: throughput {r.linhas_por_s:,.0f} linhas/s < baseline {ref_tput:,.0f} "
+                f"(-{(1 - r.linhas_por_s / ref_tput) * 100:.0f}%)"
+            )
+        ref_rss = ref.get("delta_rss_mb") or 0
+        # Deltas pequenos são ruído do alocador; só compara acima de 16 MB
+        if ref_rss > 16 and r.delta_rss_mb > ref_rss * (1 + tolerancia):
+            regressoes.append(
+                f"{r.nome}: memória +{r.delta_rss_mb:,.0f} MB > baseline +{ref_rss:,.0f} MB"
+            )
+    return regressoes
+
+
+def formatar_tabela(resultados: List[StageResult]) -> str:
+    linhas = [f"{'Estágio':<28} {'Linhas':>9} {'Tempo (s)':>10} {'Linhas/s':>12} {'Pico RSS':>10} {'Δ RSS':>8}  Status"]
+    linhas.append("-" * len(linhas[0]))
+    for r in resultados:
+        status = r.status if not r.detalhe else f"{r.status} ({r.detalhe[:60]})"
+        linhas.append(
+            f"{r.nome:<28} {r.linhas:>9,} {r.wall_s:>10.3f} {r.linhas_por_s:>12,.0f} "
+            f"{r.pico_rss_mb:>8.0f}MB {r.delta_rss_mb:>6.0f}MB  {status}"
+        )
+    return "\n".join(linhas)
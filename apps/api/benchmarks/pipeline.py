@@ -0,0 +1,259 @@
+"""
+Execução dos estágios reais do pipeline sobre um banco SQLite local.
+
+Estágios por layout (cielo/rede/stone):
+- ``importar``: detecção do importador + leitura + De-Para + normalização
+  (``preparar_dataframe_de_arquivo`` → ``ImporterFactory``)
+- ``gravar``: classificação e bulk insert (``classificar_e_gravar_vendas``)
+- ``calcular``: ``ReconciliationCore.calculate_rates``
+- ``preprocessar``: ``preprocessar_relatorio`` (parquets de seção)
+- ``pdf``: ``PdfService.html_to_pdf`` sobre as seções pré-processadas
+
+Mais ``rede_txt.conversor``: ``RedeParser`` + geração dos XLSX do conversor.
+
+O banco é preparado do zero: ``vendas_processadas``/``vendas_filtradas`` com o
+layout largo de produção (ver ``apps/api/schema.txt``), tabelas dos models e
+seeds mínimos (cliente, EC, regras De-Para e taxas cadastradas).
+"""
+
+import contextlib
+import os
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+from benchmarks.generators import (
+    BANDEIRAS,
+    DEPARA_REGRAS,
+    EC_PADRAO,
+    FORMAS,
+    GERADORES,
+    gerar_rede_txt,
+)
+from benchmarks.harness import StageResult, medir_estagio
+
+CLIENTE_ID = 1
+USUARIO = "benchmark"
+
+# Layout de produção de vendas_processadas (schema.txt), em sintaxe SQLite
+_COLUNAS_VENDAS = """
+    "Data_da_venda" DATETIME, "Data_da_autorização_da_venda" DATETIME,
+    "status_da_venda" VARCHAR(45), "Adquirente" VARCHAR(45), "Bandeira" TEXT,
+    "Forma_de_pagamento" TEXT, "Quantidade_de_parcelas" BIGINT, "Resumo_da_operação" TEXT,
+    "Valor_da_venda" DOUBLE, "Taxas_Perc" DOUBLE, "Valor_descontado" DOUBLE,
+    "Taxas_RR" DOUBLE, "Valor_RR" DOUBLE, "Previsão_de_pagamento" DATETIME,
+    "Valor_líquido_da_venda" DOUBLE, "Número_da_máquina" TEXT, "Código_de_autorização" TEXT,
+    "NSU" BIGINT, "Número_do_cartão" TEXT, "Receba_rápido" TEXT, "Status" TEXT,
+    "Tratar_ou_Ignorar" TEXT, "Filtrado" TINYINT, "arquivo_origem" TEXT,
+    "processamentoid" TEXT, "cliente_id" BIGINT, "ec_id" BIGINT,
+    "data_processamento" DATETIME, "usuario_processamento" TEXT,
+    "bandeira_key" VARCHAR(45), "forma_key" VARCHAR(45), "adquirente_key" VARCHAR(45),
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT
+"""
+_INDICES_VENDAS = [
+    'CREATE INDEX idx_{t}_proc ON {t} ("processamentoid")',
+    'CREATE INDEX idx_{t}_ec ON {t} ("ec_id")',
+    'CREATE INDEX idx_{t}_data ON {t} ("Data_da_venda")',
+    'CREATE INDEX idx_{t}_group ON {t} ("ec_id", "Bandeira", "Forma_de_pagamento")',
+]
+
+
+def resetar_banco(engine) -> None:
+    """Remove todas as tabelas (entre rodadas de ``--repeat``)."""
+    from sqlalchemy import MetaData
+
+    meta = MetaData()
+    meta.reflect(bind=engine)
+    meta.drop_all(bind=engine)
+
+
+def preparar_banco(engine) -> None:
+    """Cria o schema e os seeds usados pelo benchmark."""
+    # Models fora de app.models.__init__ que o pipeline legado usa
+    import app.models.legacy_depara  # noqa: F401
+    import app.models.legacy_processamento  # noqa: F401
+    import app.models.processamento  # noqa: F401
+    import app.models.vendas_calculos  # noqa: F401
+    from app.models import Base
+
+    with engine.begin() as conn:
+        for tabela in ("vendas_processadas", "vendas_filtradas"):
+            conn.exec_driver_sql(f'CREATE TABLE IF NOT EXISTS {tabela} ({_COLUNAS_VENDAS})')
+            for ddl in _INDICES_VENDAS:
+                conn.exec_driver_sql(ddl.format(t=tabela))
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO clientes (cliente_id, nome_fantasia) VALUES (:c, 'Cliente Benchmark')"),
+            {"c": CLIENTE_ID},
+        )
+        conn.execute(
+            text("INSERT INTO ecs_cliente (cliente_id, ec_id) VALUES (:c, :ec)"),
+            {"c": CLIENTE_ID, "ec": EC_PADRAO},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO depara_colunas (origem_nome, destino_nome, contexto, tipo_origem, ativo, tipo_preenchimento) "
+                "VALUES (:o, :d, :ctx, 'V', 1, 'importado')"
+            ),
+            [{"o": o, "d": d, "ctx": ctx} for ctx, o, d in DEPARA_REGRAS],
+        )
+        conn.execute(
+            text(
+                "INSERT INTO taxas (ec, bandeira, forma_pagamento, parcelado, parcelas_ini, parcelas_fim, "
+                "data_ini, data_fim, taxa, contexto) "
+                "VALUES (:ec, :b, :f, 'N', 1, 12, :ini, :fim, :tx, 'padrao')"
+            ),
+            [
+                {"ec": EC_PADRAO, "b": b, "f": f, "ini": date(2020, 1, 1), "fim": date(2030, 12, 31), "tx": 1.1 if f == "Débito" else 2.5}
+                for b in BANDEIRAS
+                for f in FORMAS
+            ],
+        )
+
+
+@contextlib.contextmanager
+def _silenciar_stdout(ativo: bool):
+    """O pipeline legado ainda usa print; mantém o custo mas não polui a saída."""
+    if not ativo:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _html_das_secoes(pasta: str) -> str:
+    import pandas as pd
+
+    partes = ["<html><head><meta charset='utf-8'></head><body><h1>Benchmark</h1>"]
+    for nome in sorted(os.listdir(pasta)):
+        if nome.endswith(".parquet"):
+            df = pd.read_parquet(os.path.join(pasta, nome))
+            partes.append(f"<h2>{nome[:-8]}</h2>")
+            partes.append(df.head(500).to_html(index=False))
+    partes.append("</body></html>")
+    return "".join(partes)
+
+
+def executar_layout(
+    engine,
+    layout: str,
+    path: str,
+    linhas: int,
+    calc_tipo: str = "log_mensal",
+    incluir_pdf: bool = True,
+    silenciar: bool = True,
+) -> List[StageResult]:
+    from app.services import preprocessamento_service
+    from app.services.pdf_service import PdfService
+    from app.services.reconciliation_core import ReconciliationCore
+    from proc.proc_importacao import classificar_e_gravar_vendas, preparar_dataframe_de_arquivo
+
+    contexto = GERADORES[layout][1]
+    resultados: List[StageResult] = []
+    estado: Dict[str, object] = {}
+
+    with _silenciar_stdout(silenciar):
+        with medir_estagio(f"{layout}.importar", linhas) as r:
+            df, _transf, _header = preparar_dataframe_de_arquivo(
+                path, engine, CLIENTE_ID, EC_PADRAO, USUARIO, contexto, "V"
+            )
+            df["Adquirente"] = contexto
+            r.linhas = len(df)
+            estado["df"] = df
+        resultados.append(r)
+        if "df" not in estado:
+            return resultados
+
+        with medir_estagio(f"{layout}.gravar", linhas) as r:
+            res = classificar_e_gravar_vendas(
+                engine,
+                estado["df"],
+                cliente_id=CLIENTE_ID,
+                ec_id=EC_PADRAO,
+                contexto=contexto,
+                usuario=USUARIO,
+                arquivo_origem=os.path.basename(path),
+            )
+            r.linhas = int(res.get("total", 0))
+            estado["proc_id"] = str(res["processamentoid"])
+        resultados.append(r)
+        if "proc_id" not in estado:
+            return resultados
+        proc_id = estado["proc_id"]
+
+        with medir_estagio(f"{layout}.calcular", linhas) as r:
+            res = ReconciliationCore.calculate_rates(engine, proc_id, calc_tipo)
+            if not res.get("success"):
+                raise RuntimeError(res.get("error", "cálculo sem sucesso"))
+            r.linhas = int(res.get("rows", 0))
+        resultados.append(r)
+
+        with medir_estagio(f"{layout}.preprocessar", linhas) as r:
+            res = preprocessamento_service.preprocessar_relatorio(engine, proc_id, calc_tipo)
+            r.extras = {"secoes": len(res.get("secoes_geradas", [])), "erros_secao": len(res.get("erros", []))}
+            if res.get("erros"):
+                r.detalhe = f"{len(res['erros'])} seção(ões) com erro"
+        resultados.append(r)
+
+        if incluir_pdf:
+            pasta = preprocessamento_service._pasta_processamento(proc_id)
+            with medir_estagio(f"{layout}.pdf", linhas) as r:
+                try:
+                    import weasyprint  # noqa: F401
+                except (ImportError, OSError) as e:
+                    r.status, r.detalhe = "pulado", f"WeasyPrint indisponível: {e}"[:200]
+                else:
+                    pdf = PdfService.html_to_pdf(_html_das_secoes(pasta), skip_charts=True)
+                    r.extras = {"bytes": len(pdf)}
+            resultados.append(r)
+
+    return resultados
+
+
+def executar_conversor_txt(path: str, linhas: int, silenciar: bool = True) -> StageResult:
+    from app.services.conversor.conver_service import converter_arquivos
+
+    with open(path, "rb") as f:
+        conteudo = f.read()
+    with _silenciar_stdout(silenciar), medir_estagio("rede_txt.conversor", linhas) as r:
+        zip_bytes, _nome = converter_arquivos([(os.path.basename(path), conteudo)])
+        r.extras = {"zip_bytes": len(zip_bytes)}
+    return r
+
+
+def executar(
+    engine,
+    pasta_arquivos: str,
+    rows: int,
+    seed: int = 42,
+    layouts: Iterable[str] = ("cielo", "rede", "stone"),
+    incluir_txt: bool = True,
+    incluir_pdf: bool = True,
+    calc_tipo: str = "log_mensal",
+    progresso: Optional[Callable[[str], None]] = None,
+) -> List[StageResult]:
+    """
+    Gera os arquivos sintéticos (reaproveitando os já gerados em ``pasta_arquivos``)
+    e executa todos os estágios selecionados.
+    """
+    os.makedirs(pasta_arquivos, exist_ok=True)
+    resultados: List[StageResult] = []
+    for i, layout in enumerate(layouts):
+        gerador, _ctx, ext = GERADORES[layout]
+        path = os.path.join(pasta_arquivos, f"bench_{layout}_{rows}_{seed + i}{ext}")
+        if not os.path.exists(path):
+            gerador(path, rows, seed + i)
+        if progresso:
+            progresso(f"{layout}: {rows:,} linhas")
+        resultados.extend(executar_layout(engine, layout, path, rows, calc_tipo, incluir_pdf))
+    if incluir_txt:
+        path = os.path.join(pasta_arquivos, f"bench_rede_{rows}_{seed + 10}.txt")
+        if not os.path.exists(path):
+            gerar_rede_txt(path, rows, seed + 10)
+        if progresso:
+            progresso(f"rede_txt: {rows:,} linhas")
+        resultados.append(executar_conversor_txt(path, rows))
+    return resultados
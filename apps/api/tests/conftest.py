@@ -2,6 +2,7 @@
 Test configuration and shared fixtures.
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -15,6 +16,11 @@ from sqlalchemy.pool import StaticPool
 root_dir = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
+# Registros aprendidos (layouts de importação, padrões do conversor) só em memória:
+# os testes não gravam em data/ do repositório
+os.environ.setdefault("CONCILIE_LAYOUTS_PATH", "")
+os.environ.setdefault("CONVERSOR_PADROES_PATH", "")
+
 from app.core import security
 from app.core.database import get_db
 from app.main import app
@@ -0,0 +1,78 @@
+"""Testes unitários para o pacote benchmarks (geradores e comparação com baseline)."""
+
+import pandas as pd
+
+from app.services.conversor.rede_parser import RedeParser
+from benchmarks.generators import gerar_cielo_xlsx, gerar_rede_txt
+from benchmarks.harness import (
+    StageResult,
+    combinar_repeticoes,
+    comparar_com_baseline,
+    medir_estagio,
+)
+
+
+class TestGeradores:
+    def test_cielo_deterministico(self, tmp_path):
+        a = gerar_cielo_xlsx(str(tmp_path / "a.xlsx"), 50, seed=7)
+        b = gerar_cielo_xlsx(str(tmp_path / "b.xlsx"), 50, seed=7)
+        df_a = pd.read_excel(a, header=3)
+        df_b = pd.read_excel(b, header=3)
+        assert len(df_a) == 50
+        assert "Nº NSU" in df_a.columns
+        pd.testing.assert_frame_equal(df_a, df_b)
+
+    def test_rede_txt_reconhecido_pelo_parser(self, tmp_path):
+        path = gerar_rede_txt(str(tmp_path / "rede.txt"), 200, seed=3)
+        with open(path, encoding="latin-1") as f:
+            resultado = RedeParser("rede.txt").parse(f.read())
+
+        assert resultado.linhas_nao_reconhecidas == []
+        assert len(resultado.vendas_credito) + len(resultado.vendas_debito) == 200
+        assert resultado.pagamentos
+        assert resultado.estabelecimento
+
+
+class TestHarness:
+    def test_medir_estagio_registra_erro_sem_propagar(self):
+        with medir_estagio("x", 10) as r:
+            raise ValueError("falhou")
+        assert r.status == "erro"
+        assert "falhou" in r.detalhe
+        assert r.linhas_por_s == 0
+
+    def test_medir_estagio_calcula_throughput(self):
+        with medir_estagio("x", 1000) as r:
+            sum(range(1000))
+        assert r.status == "ok"
+        assert r.linhas_por_s > 0
+
+    def test_comparar_aponta_queda_de_throughput(self):
+        baseline = {
+            "parametros": {"rows": 1000},
+            "estagios": {"a.importar": {"linhas_por_s": 1000.0, "wall_s": 1.0}},
+        }
+        lento = [StageResult(nome="a.importar", linhas=1000, wall_s=2.0, linhas_por_s=500.0)]
+        ok = [StageResult(nome="a.importar", linhas=1000, wall_s=1.1, linhas_por_s=900.0)]
+
+        assert len(comparar_com_baseline(lento, baseline, 0.25, {"rows": 1000})) == 1
+        assert comparar_com_baseline(ok, baseline, 0.25, {"rows": 1000}) == []
+        # Tamanho diferente da baseline: não compara
+        assert comparar_com_baseline(lento, baseline, 0.25, {"rows": 2000}) == []
+
+    def test_comparar_ignora_oscilacao_em_estagio_curto(self):
+        baseline = {"parametros": {"rows": 1000}, "estagios": {"a.calc": {"linhas_por_s": 10000.0, "wall_s": 0.1}}}
+        rapido = [StageResult(nome="a.calc", linhas=1000, wall_s=0.15, linhas_por_s=6666.0)]
+        assert comparar_com_baseline(rapido, baseline, 0.25, {"rows": 1000}) == []
+
+    def test_combinar_usa_rodada_mais_rapida_e_preserva_erros(self):
+        r1 = [StageResult(nome="a", wall_s=2.0, linhas_por_s=50, delta_rss_mb=30),
+              StageResult(nome="b", wall_s=1.0)]
+        r2 = [StageResult(nome="a", wall_s=1.0, linhas_por_s=100, delta_rss_mb=10),
+              StageResult(nome="b", status="erro", detalhe="boom")]
+
+        combinados = {r.nome: r for r in combinar_repeticoes([r1, r2])}
+
+        assert combinados["a"].linhas_por_s == 100
+        assert combinados["a"].delta_rss_mb == 30
+        assert combinados["b"].status == "erro"
@@ -0,0 +1,110 @@
+"""Testes unitários para ReconciliationCore.calculate_scenarios (várias periodicidades de LOG numa passada)."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.models.perda_cliente import PerdaCliente
+from app.models.taxa import Taxa
+from app.models.vendas_calculos import VendasCalculos
+from app.services import taxas_snapshot
+from app.services.reconciliation_core import ReconciliationCore
+from app.services.taxas_snapshot import TaxasSnapshot
+
+TIPOS = ["log_mensal", "log_trimestral", "log_semestral", "log_anual"]
+
+_DDL_VENDAS = """
+    CREATE TABLE vendas_processadas (
+        id INTEGER PRIMARY KEY, processamentoid TEXT, Bandeira TEXT, Forma_de_pagamento TEXT,
+        data_processamento TEXT, Data_da_venda TEXT, Adquirente TEXT, Valor_da_venda REAL,
+        "Valor_líquido_da_venda" REAL, Quantidade_de_parcelas INTEGER, ec_id TEXT, Taxas_Perc REAL,
+        Valor_descontado REAL, Taxas_RR REAL, Valor_RR REAL, arquivo_origem TEXT, NSU TEXT,
+        "Código_de_autorização" TEXT, bandeira_key TEXT, forma_key TEXT, adquirente_key TEXT
+    )
+"""
+
+
+@pytest.fixture()
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(taxas_snapshot, "_snapshot", TaxasSnapshot(ttl_s=0))
+    engine = create_engine(f"sqlite:///{tmp_path / 'calculo.db'}")
+    for model in (Taxa, VendasCalculos, PerdaCliente):
+        model.__table__.create(engine)
+    vendas = []
+    # Taxa cobrada cai ao longo do ano: cada periodicidade acha outro mínimo
+    for i, (dia, taxa) in enumerate([
+        ("2024-01-10", 2.0), ("2024-02-10", 1.8), ("2024-04-10", 1.6),
+        ("2024-05-10", 1.9), ("2024-08-10", 1.4), ("2024-11-10", 1.7),
+    ]):
+        for bandeira in ("Visa", "Master"):
+            vendas.append({
+                "id": len(vendas) + 1, "processamentoid": "P1", "Bandeira": bandeira,
+                "Forma_de_pagamento": "Crédito à Vista", "data_processamento": "2024-12-01",
+                "Data_da_venda": dia, "Adquirente": "Cielo", "Valor_da_venda": 100.0 + i,
+                "Valor_líquido_da_venda": 100.0 + i - taxa, "Quantidade_de_parcelas": 1, "ec_id": "10",
+                "Taxas_Perc": taxa, "Valor_descontado": -taxa, "Taxas_RR": 0.0, "Valor_RR": 0.0,
+                "arquivo_origem": "a.csv", "NSU": str(i), "Código_de_autorização": "X",
+            })
+    with engine.begin() as conn:
+        conn.execute(text(_DDL_VENDAS))
+        conn.execute(text("CREATE TABLE ecs_cliente (ec_id TEXT, cliente_id INTEGER)"))
+        pd.DataFrame(vendas).to_sql("vendas_processadas", conn, if_exists="append", index=False)
+        # Master tem taxa cadastrada: origem 'cad' nos quatro cenários
+        conn.execute(Taxa.__table__.insert(), [{
+            "ec": "10", "bandeira": "Master", "forma_pagamento": "Crédito à Vista", "parcelado": "N",
+            "parcelas_ini": 1, "parcelas_fim": 1, "data_ini": date(2024, 1, 1), "data_fim": date(2024, 12, 31),
+            "taxa": 1.5, "contexto": "padrao",
+        }])
+    engine.consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: engine.consultas.append(a[2]))
+    yield engine
+    engine.dispose()
+
+
+def _calculo(engine, calc_id):
+    colunas = "id_venda, calc_tipo, tx_calc, desc_calc, vl_liq_calc, tx_rr_calc, vl_rr_calc, perda, perda_rr, calc_origem"
+    return pd.read_sql(
+        text(f"SELECT {colunas} FROM vendas_calculos WHERE calc_id = :c ORDER BY id_venda"), engine, params={"c": calc_id}
+    )
+
+
+class TestCalculoCenarios:
+    def test_cenarios_iguais_aos_calculos_separados(self, engine):
+        cenarios = {tipo: f"multi_{tipo}" for tipo in TIPOS}
+        resultado = ReconciliationCore.calculate_scenarios(engine, "P1", cenarios, usar_taxa_cad=True)
+
+        assert resultado["success"], resultado
+        assert resultado["rows"] == 48
+        assert {t: c["calc_id"] for t, c in resultado["cenarios"].items()} == cenarios
+        # Vendas e taxas lidas uma vez para os quatro cenários
+        assert sum("SELECT id as id_venda" in sql for sql in engine.consultas) == 1
+        assert sum("FROM taxas " in sql for sql in engine.consultas) == 1
+
+        for tipo in TIPOS:
+            assert ReconciliationCore.calculate_rates(engine, "P1", tipo, custom_calc_id=f"single_{tipo}")["success"]
+            pd.testing.assert_frame_equal(_calculo(engine, f"multi_{tipo}"), _calculo(engine, f"single_{tipo}"))
+
+        visa = {tipo: _calculo(engine, f"multi_{tipo}").iloc[::2]["tx_calc"].tolist() for tipo in TIPOS}
+        assert visa["log_mensal"] == [2.0, 1.8, 1.6, 1.9, 1.4, 1.7]
+        assert visa["log_trimestral"] == [1.8, 1.8, 1.6, 1.6, 1.4, 1.7]
+        assert visa["log_semestral"] == [1.6] * 4 + [1.4] * 2
+        assert visa["log_anual"] == [1.4] * 6
+        master = _calculo(engine, "multi_log_anual").iloc[1::2]
+        assert set(master["calc_origem"]) == {"cad"} and set(master["tx_calc"]) == {1.5}
+
+    def test_rollup_de_perdas_por_cenario(self, engine):
+        cenarios = {"log_mensal": "m", "log_anual": "a"}
+        assert ReconciliationCore.calculate_scenarios(engine, "P1", cenarios)["success"]
+
+        with engine.connect() as conn:
+            rollup = dict(conn.execute(text("SELECT calc_id, calc_tipo FROM perdas_cliente")).fetchall())
+        assert rollup == {"m": "log_mensal", "a": "log_anual"}
+
+    def test_processamento_sem_vendas(self, engine):
+        resultado = ReconciliationCore.calculate_scenarios(engine, "P2", {"log_mensal": "x"})
+
+        assert not resultado["success"] and "P2" in resultado["error"]
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM vendas_calculos")).scalar() == 0
@@ -0,0 +1,146 @@
+"""Testes unitários para app.services.calculo_lote_service (recálculo de vários processamentos)."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from conf.chaves_venda import adicionar_chaves
+
+from app.core import database
+from app.core.config import settings
+from app.models.calculo_task import CalculoTask
+from app.models.notificacao import Notificacao
+from app.models.perda_cliente import PerdaCliente
+from app.models.taxa import Taxa
+from app.models.taxa_contratada import TaxaContratada
+from app.models.vendas_calculos import VendasCalculos
+from app.services import calculo_lote_service, taxas_snapshot
+from app.services.calculo_lote_service import CalculoLoteService, limite_workers, selecionar_processamentos
+from app.services.taxas_snapshot import TaxasSnapshot
+
+_DDL_VENDAS = """
+    CREATE TABLE vendas_processadas (
+        id INTEGER PRIMARY KEY, processamentoid TEXT, Bandeira TEXT, Forma_de_pagamento TEXT,
+        data_processamento TEXT, Data_da_venda TEXT, Adquirente TEXT, Valor_da_venda REAL,
+        "Valor_líquido_da_venda" REAL, Quantidade_de_parcelas INTEGER, ec_id TEXT, Taxas_Perc REAL,
+        Valor_descontado REAL, Taxas_RR REAL, Valor_RR REAL, arquivo_origem TEXT, NSU TEXT,
+        "Código_de_autorização" TEXT, bandeira_key TEXT, forma_key TEXT, adquirente_key TEXT
+    )
+"""
+
+
+def _venda(i, pid, ec, dia):
+    return {
+        "id": i, "processamentoid": pid, "Bandeira": "Visa", "Forma_de_pagamento": "Débito",
+        "data_processamento": "2024-12-01", "Data_da_venda": f"{dia} 10:00:00", "Adquirente": "Cielo",
+        "Valor_da_venda": 100.0, "Valor_líquido_da_venda": 99.0, "Quantidade_de_parcelas": 1, "ec_id": ec,
+        "Taxas_Perc": 1.0, "Valor_descontado": -1.0, "Taxas_RR": 0.0, "Valor_RR": 0.0,
+        "arquivo_origem": "a.csv", "NSU": str(i), "Código_de_autorização": "X",
+    }
+
+
+@pytest.fixture()
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(taxas_snapshot, "_snapshot", TaxasSnapshot(ttl_s=300))
+    engine = create_engine(f"sqlite:///{tmp_path / 'lote.db'}")
+    for model in (Taxa, TaxaContratada, VendasCalculos, PerdaCliente, CalculoTask, Notificacao):
+        model.__table__.create(engine)
+    vendas = [
+        _venda(1, "P1", "10", "2024-01-10"), _venda(2, "P1", "10", "2024-02-10"),
+        _venda(3, "P2", "10", "2023-06-10"),
+        _venda(4, "P3", "20", "2024-03-31"),
+    ]
+    with engine.begin() as conn:
+        conn.execute(text(_DDL_VENDAS))
+        conn.execute(text("CREATE TABLE ecs_cliente (ec_id TEXT, cliente_id INTEGER)"))
+        conn.execute(text("INSERT INTO ecs_cliente VALUES ('10', 7), ('20', 8)"))
+        # Chaves gravadas como na importação
+        adicionar_chaves(pd.DataFrame(vendas)).to_sql("vendas_processadas", conn, if_exists="append", index=False)
+        conn.execute(Taxa.__table__.insert(), [{
+            "ec": ec, "bandeira": "Visa", "forma_pagamento": "Débito", "parcelado": "N", "parcelas_ini": 1,
+            "parcelas_fim": 1, "data_ini": date(2024, 1, 1), "data_fim": date(2024, 3, 31), "taxa": 0.8,
+            "contexto": "padrao",
+        } for ec in ("10", "20")])
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine))
+    engine.consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: engine.consultas.append(a[2]))
+    yield engine
+    engine.dispose()
+
+
+class TestSelecao:
+    def test_uniao_de_cliente_taxa_e_lista(self, engine):
+        with database.SessionLocal() as db:
+            assert selecionar_processamentos(db, cliente_id=7) == ["P1", "P2"]
+            # Taxa do EC 20 vigente em 2024-01..03: a venda do último dia (com hora) entra
+            assert selecionar_processamentos(db, taxa_id=2) == ["P3"]
+            # Taxa do EC 10: P2 é de 2023, fora da vigência
+            assert selecionar_processamentos(db, ["P3", "P1"], taxa_id=1) == ["P3", "P1"]
+            with pytest.raises(ValueError):
+                selecionar_processamentos(db, taxa_id=99)
+
+    def test_limite_por_cpu_memoria_e_tamanho_do_lote(self, monkeypatch):
+        monkeypatch.setattr(settings, "CALCULO_LOTE_WORKERS", 8)
+        monkeypatch.setattr(settings, "CALCULO_LOTE_MEM_POR_WORKER_MB", 100)
+        monkeypatch.setattr(calculo_lote_service.os, "cpu_count", lambda: 4)
+        monkeypatch.setattr(calculo_lote_service, "_memoria_disponivel", lambda: 250 * 1024 * 1024)
+        assert limite_workers(10) == 2
+        assert limite_workers(1) == 1
+        monkeypatch.setattr(calculo_lote_service, "_memoria_disponivel", lambda: 10 * 1024 * 1024)
+        assert limite_workers(10) == 1
+        monkeypatch.setattr(calculo_lote_service, "_memoria_disponivel", lambda: None)
+        assert limite_workers(10) == 4
+
+
+class TestRunLote:
+    def test_lote_agrega_progresso_e_resultado_por_item(self, engine, monkeypatch):
+        monkeypatch.setattr(settings, "CALCULO_LOTE_WORKERS", 2)
+        with database.SessionLocal() as db:
+            service = CalculoLoteService(db)
+            task = service.create_lote_task(["P1", "P2", "P3", "P9"], "teste", "log_mensal", True, False)
+            service.run_lote(task.id)
+
+        with database.SessionLocal() as db:
+            lote = db.get(CalculoTask, task.id)
+            itens = lote.metadata_json["itens"]
+            assert (lote.status, lote.progress, lote.tipo_taxa) == ("SUCCESS", 100, "lote")
+            assert "3 de 4" in lote.message and "1 com falha" in lote.message
+            assert {pid: item["status"] for pid, item in itens.items()} == {
+                "P1": "SUCCESS", "P2": "SUCCESS", "P3": "SUCCESS", "P9": "FAILED",
+            }
+            # Mesmo EC, mesmo segundo: calc_ids distintos
+            assert itens["P1"]["calc_ids"] != itens["P2"]["calc_ids"]
+            assert "P9" in itens["P9"]["message"]
+            calc_p1 = itens["P1"]["calc_ids"]["log_mensal"]
+            assert db.get(CalculoTask, itens["P1"]["task_id"]).processamento_id == "P1"
+
+        with engine.connect() as conn:
+            origens = conn.execute(
+                text("SELECT calc_origem FROM vendas_calculos WHERE calc_id = :c"), {"c": calc_p1}
+            ).scalars().all()
+        assert origens == ["cad", "cad"]
+        # Taxas dos ECs do lote lidas uma vez (aquecimento); os cálculos usam o snapshot
+        assert sum("FROM taxas " in sql for sql in engine.consultas) == 1
+
+    def test_lote_de_cenarios(self, engine):
+        with database.SessionLocal() as db:
+            service = CalculoLoteService(db)
+            task = service.create_lote_task(["P1", "P2"], "teste", "log_mensal", False, False,
+                                            tipos_taxa=["log_mensal", "log_anual"])
+            service.run_lote(task.id)
+
+        with database.SessionLocal() as db:
+            itens = db.get(CalculoTask, task.id).metadata_json["itens"]
+        assert all(set(item["calc_ids"]) == {"log_mensal", "log_anual"} for item in itens.values())
+        # P1 e P2 são do mesmo EC e começam no mesmo segundo: cada um com os seus calc_ids
+        calc_ids = [c for item in itens.values() for c in item["calc_ids"].values()]
+        assert len(set(calc_ids)) == 4
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM vendas_calculos")).scalar() == 6
+            por_calc = dict(conn.execute(text("SELECT calc_id, COUNT(*) FROM vendas_calculos GROUP BY calc_id")).all())
+        for tipo in ("log_mensal", "log_anual"):
+            assert por_calc[itens["P1"]["calc_ids"][tipo]] == 2
+            assert por_calc[itens["P2"]["calc_ids"][tipo]] == 1
@@ -0,0 +1,118 @@
+"""Testes unitários para o layout compacto de vendas_calculos (migração 0009 + conf.calculos_compactos)."""
+
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import sessionmaker
+
+from conf import calculos_compactos
+from conf.calculos_compactos import TABELA_FATO, gravar_calculos, tabela_calculos
+
+from app.core.config import settings
+from app.models.perda_cliente import PerdaCliente
+from app.models.vendas_calculos import VendasCalculos
+from app.repositories.calculo_repository import CalculoRepository
+
+_MIGRACAO = Path(__file__).resolve().parents[2] / "alembic" / "versions" / "0009_add_vendas_calculos_compacto.py"
+
+
+def _migracao():
+    spec = importlib.util.spec_from_file_location("migracao_0009", _MIGRACAO)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _rodar(engine, funcao):
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            funcao()
+    calculos_compactos.limpar_cache()
+
+
+def _linha(i, bandeira, calc_id="C1", origem="log"):
+    return {
+        "id_venda": i, "calc_id": calc_id, "calc_tipo": "log_mensal", "calc_usuario": "ana",
+        "calc_data": datetime(2024, 5, 1), "bandeira": bandeira, "forma_pagamento": "Crédito",
+        "data_venda": datetime(2024, 4, i), "ec_id": 10, "adquirente": "Cielo",
+        "arquivo_origem": f"3f2a_{calc_id}.csv", "vl_venda": 100.0, "tx_venda": 2.0, "tx_calc": 1.5,
+        "perda": 0.5, "calc_origem": origem,
+    }
+
+
+def _calculos(engine):
+    colunas = "id, id_venda, calc_id, bandeira, forma_pagamento, adquirente, arquivo_origem, calc_usuario, " \
+              "calc_origem, tx_calc, perda"
+    return pd.read_sql(text(f"SELECT {colunas} FROM vendas_calculos ORDER BY id"), engine)
+
+
+@pytest.fixture()
+def engine(tmp_path, monkeypatch):
+    calculos_compactos.limpar_cache()
+    engine = create_engine(f"sqlite:///{tmp_path / 'compacto.db'}")
+    for model in (VendasCalculos, PerdaCliente):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        gravar_calculos(conn, pd.DataFrame(
+            [_linha(1, "Visa"), _linha(2, "VISA"), _linha(3, None, origem=None), _linha(4, "Elo", "C2")]
+        ))
+    monkeypatch.setattr(settings, "VENDAS_CALCULOS_COMPACTO", True)
+    yield engine
+    engine.dispose()
+    calculos_compactos.limpar_cache()
+
+
+class TestMigracao:
+    def test_view_preserva_colunas_e_valores(self, engine):
+        antes = _calculos(engine)
+        assert tabela_calculos(engine) == "vendas_calculos"
+
+        _rodar(engine, _migracao().upgrade)
+
+        assert tabela_calculos(engine) == TABELA_FATO
+        assert inspect(engine).get_view_names() == ["vendas_calculos"]
+        pd.testing.assert_frame_equal(_calculos(engine), antes)
+        with engine.connect() as conn:
+            # 'Visa' e 'VISA' continuam distintos; nulo é a linha semeada
+            assert conn.execute(text("SELECT COUNT(*) FROM dim_bandeiras")).scalar() == 4
+            assert conn.execute(text(f"SELECT bandeira_id FROM {TABELA_FATO} WHERE id_venda = 3")).scalar() == 1
+
+        _rodar(engine, _migracao().downgrade)
+
+        assert tabela_calculos(engine) == "vendas_calculos"
+        assert inspect(engine).get_view_names() == []
+        pd.testing.assert_frame_equal(_calculos(engine), antes)
+
+    def test_sem_opcao_nao_altera_o_banco(self, engine, monkeypatch):
+        monkeypatch.setattr(settings, "VENDAS_CALCULOS_COMPACTO", False)
+        _rodar(engine, _migracao().upgrade)
+        assert not inspect(engine).has_table(TABELA_FATO)
+
+
+class TestEscrita:
+    def test_gravar_atualizar_e_excluir_no_layout_compacto(self, engine):
+        _rodar(engine, _migracao().upgrade)
+
+        with engine.begin() as conn:
+            gravar_calculos(conn, pd.DataFrame([_linha(5, "Visa", "C3"), _linha(6, "Hipercard", "C3", "cad")]))
+            conn.execute(text("UPDATE vendas_calculos SET tx_calc = 1.0, perda = 1.0 WHERE calc_id = 'C3'"))
+
+        c3 = _calculos(engine).query("calc_id == 'C3'")
+        assert c3[["bandeira", "calc_origem", "tx_calc"]].values.tolist() == [["Visa", "log", 1.0], ["Hipercard", "cad", 1.0]]
+        with engine.connect() as conn:
+            # 'Visa' reaproveita a dimensão; só 'Hipercard' e 'cad' são novos
+            assert conn.execute(text("SELECT COUNT(*) FROM dim_bandeiras")).scalar() == 5
+            assert conn.execute(text("SELECT COUNT(*) FROM dim_origens_calculo")).scalar() == 3
+            with pytest.raises(DatabaseError):
+                conn.execute(text("UPDATE vendas_calculos SET bandeira = 'Master' WHERE calc_id = 'C3'"))
+
+        with sessionmaker(bind=engine)() as db:
+            CalculoRepository(db).deletar_calculo("C3")
+        assert set(_calculos(engine)["calc_id"]) == {"C1", "C2"}
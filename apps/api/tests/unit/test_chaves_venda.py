@@ -0,0 +1,105 @@
+"""Testes unitários para conf.chaves_venda (chaves normalizadas de vendas_processadas)."""
+
+import pandas as pd
+import polars as pl
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from conf.chaves_venda import adicionar_chaves, normalizar_chave, preencher_chaves
+from conf.funcoesbd import vendas_processadas_bulk_insert
+
+from app.models.log import LogCorrecao
+from app.models.perda_cliente import PerdaCliente
+from app.models.vendas import Venda, VendaFiltrada
+from app.models.vendas_calculos import VendasCalculos
+from app.repositories.correcao_repository import CorrecaoRepository
+from app.schemas.correcao import OperacaoCorrecao
+from app.services.reconciliation_core import _colunas_chave_sql, _normalize_str
+
+PID = "P1"
+VALORES = [None, "VISA", " Crédito à Vista ", "DÉBITO", "Elo\t", "Maestro Pré-Pago", "AMEX CONVERSÃO", ""]
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chaves.db'}")
+    for model in (LogCorrecao, PerdaCliente, Venda, VendaFiltrada, VendasCalculos):
+        model.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+def _chaves(db, coluna=Venda.bandeira):
+    return sorted(db.query(coluna, Venda.bandeira_key).filter(Venda.processamentoid == PID).distinct(),
+                  key=lambda r: r[1])
+
+
+class TestNormalizacao:
+    def test_mesmas_regras_do_motor_polars(self):
+        esperado = pl.Series(VALORES, dtype=pl.String).to_frame("v").select(_normalize_str(pl.col("v")))["v"].to_list()
+        assert [normalizar_chave(v) for v in VALORES] == esperado
+        serie = adicionar_chaves(pd.DataFrame({"Bandeira": VALORES}))["bandeira_key"]
+        assert serie.tolist() == esperado
+
+
+class TestManutencao:
+    def test_importacao_grava_chaves(self, engine):
+        df = pd.DataFrame({
+            "processamentoid": [PID] * 3, "Bandeira": ["VISA", None, "Mastercard "],
+            "Forma_de_pagamento": ["Crédito", "Débito", "Crédito"], "Adquirente": ["Cielo"] * 3,
+        })
+        assert vendas_processadas_bulk_insert(engine, df) == 3
+        assert "bandeira_key" not in df.columns
+
+        with sessionmaker(bind=engine)() as db:
+            linhas = db.query(Venda.bandeira_key, Venda.forma_key, Venda.adquirente_key).order_by(Venda.id).all()
+        assert linhas == [("visa", "credito", "cielo"), ("desconhecida", "debito", "cielo"),
+                          ("mastercard", "credito", "cielo")]
+
+    def test_correcoes_mantem_chaves(self, engine):
+        with sessionmaker(bind=engine)() as db:
+            db.add_all(Venda(processamentoid=PID, bandeira=b, forma_pagamento="Crédito", ec_id=100,
+                             bandeira_key=normalizar_chave(b), forma_key="credito")
+                       for b in ["VISA", "visa", None, "Elo", "Elo"])
+            db.commit()
+            repo = CorrecaoRepository(db)
+
+            repo.atualizar_em_massa(PID, "bandeira", ["VISA", "visa"], "Visa Electron")
+            repo.aplicar_lote(PID, [
+                OperacaoCorrecao(tipo="atualizar", campo="bandeira", valores=["N/A"], valor_novo="Hipercard"),
+                OperacaoCorrecao(tipo="atualizar", campo="bandeira", valores=["Hipercard"], valor_novo="HIPER"),
+                OperacaoCorrecao(tipo="atualizar", campo="forma_pagamento", valores=["Crédito"], valor_novo="Débito"),
+            ])
+            repo.mover_para_filtradas(PID, "bandeira", ["Elo"])
+            repo.restaurar_filtradas(PID, "bandeira", ["Elo"])
+
+            assert _chaves(db) == [("Elo", "elo"), ("HIPER", "hiper"), ("Visa Electron", "visa electron")]
+            assert set(db.query(Venda.forma_key).distinct()) == {("debito",)}
+
+    def test_preencher_chaves_so_nas_linhas_sem_chave(self, engine):
+        with sessionmaker(bind=engine)() as db:
+            db.add_all([
+                Venda(processamentoid=PID, bandeira="Visa", forma_pagamento="Crédito"),
+                Venda(processamentoid=PID, bandeira="Visa", forma_pagamento="Crédito",
+                      bandeira_key="corrigida", forma_key="credito", adquirente_key="cielo"),
+                Venda(processamentoid="P2", bandeira="Elo"),
+            ])
+            db.commit()
+
+            # 3 chaves da primeira linha
+            assert preencher_chaves(db, PID) == 3
+            assert _chaves(db) == [("Visa", "corrigida"), ("Visa", "visa")]
+            assert db.query(Venda.bandeira_key).filter(Venda.processamentoid == "P2").scalar() is None
+
+    def test_motor_sem_migracao_0008_normaliza_do_texto(self, engine, tmp_path):
+        assert _colunas_chave_sql(engine) == "bandeira_key, forma_key, adquirente_key"
+
+        antigo = create_engine(f"sqlite:///{tmp_path / 'antigo.db'}")
+        with antigo.begin() as conn:
+            conn.execute(text("CREATE TABLE vendas_processadas (id INTEGER PRIMARY KEY, Bandeira TEXT, forma_key TEXT)"))
+            conn.execute(text("INSERT INTO vendas_processadas (Bandeira) VALUES ('VISA')"))
+            colunas = _colunas_chave_sql(antigo)
+            assert colunas == "NULL AS bandeira_key, forma_key, NULL AS adquirente_key"
+            assert conn.execute(text(f"SELECT Bandeira, {colunas} FROM vendas_processadas")).one() == ("VISA", None, None, None)
+        antigo.dispose()
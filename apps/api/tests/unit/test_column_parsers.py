@@ -0,0 +1,60 @@
+"""Testes unitários para proc.importers.parsers (datas BR/ISO e decimais BR)."""
+
+import numpy as np
+import pandas as pd
+
+from proc.importers.parsers import detect_date_format, parse_dates_br, parse_decimal_br
+
+
+class TestDetectDateFormat:
+    def test_formato_br(self):
+        assert detect_date_format(["05/01/2024", "31/12/2023"]) == "%d/%m/%Y"
+
+    def test_formato_br_com_hora(self):
+        assert detect_date_format(["05/01/2024 10:20:30"]) == "%d/%m/%Y %H:%M:%S"
+
+    def test_formato_iso(self):
+        assert detect_date_format(["2024-01-05", ""]) == "%Y-%m-%d"
+
+    def test_formatos_misturados_retorna_none(self):
+        assert detect_date_format(["05/01/2024", "2024-01-05"]) is None
+
+
+class TestParseDatesBr:
+    def test_dia_primeiro(self):
+        res = parse_dates_br(pd.Series(["05/01/2024", "05/01/2024", "31/12/2023"]))
+        assert res.tolist() == [
+            pd.Timestamp(2024, 1, 5),
+            pd.Timestamp(2024, 1, 5),
+            pd.Timestamp(2023, 12, 31),
+        ]
+
+    def test_mistura_br_iso_e_vazios(self):
+        res = parse_dates_br(pd.Series(["05/01/2024", "2024-01-06", "", None, "lixo"]))
+        assert res.iloc[0] == pd.Timestamp(2024, 1, 5)
+        assert res.iloc[1] == pd.Timestamp(2024, 1, 6)
+        assert res.iloc[2:].isna().all()
+
+    def test_preserva_indice(self):
+        s = pd.Series(["05/01/2024", "06/01/2024"], index=[10, 20])
+        assert parse_dates_br(s).index.tolist() == [10, 20]
+
+    def test_datetime_passa_direto_com_limite_mysql(self):
+        s = pd.Series(pd.to_datetime(["2024-01-05", "0999-12-31"], format="%Y-%m-%d", errors="coerce"))
+        res = parse_dates_br(s)
+        assert res.iloc[0] == pd.Timestamp(2024, 1, 5)
+
+
+class TestParseDecimalBr:
+    def test_formato_brasileiro_e_ponto_decimal(self):
+        res = parse_decimal_br(pd.Series(["1.234,56", "12.5", "-3,2", "1.234,56"]))
+        assert res.tolist() == [1234.56, 12.5, -3.2, 1234.56]
+
+    def test_invalidos_e_infinitos_viram_nan(self):
+        res = parse_decimal_br(pd.Series(["abc", None, "inf", np.nan]))
+        assert res.isna().all()
+
+    def test_numericos_passam_direto(self):
+        assert parse_decimal_br(pd.Series([1, 2])).dtype == float
+        res = parse_decimal_br(pd.Series([1.5, np.inf]))
+        assert res.iloc[0] == 1.5 and np.isnan(res.iloc[1])
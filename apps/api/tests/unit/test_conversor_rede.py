@@ -0,0 +1,101 @@
+"""Testes unitários para o conversor TXT Rede (parse colunar, pool de processos, ZIP em streaming)."""
+
+import io
+import zipfile
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from app.services.conversor import conver_service, pool
+from app.services.conversor.conver_service import converter_arquivos, parsear_arquivos
+from app.services.conversor.rede_parser import Pagamento, RedeParser, VendaCredito
+from benchmarks.generators import gerar_rede_txt
+
+
+def _arquivo(tmp_path, nome, linhas, seed):
+    path = gerar_rede_txt(str(tmp_path / nome), linhas, seed=seed)
+    with open(path, "rb") as f:
+        return nome, f.read()
+
+
+class TestParserColunar:
+    def test_colunas_e_compatibilidade_com_dataclass(self, tmp_path):
+        nome, conteudo = _arquivo(tmp_path, "rede.txt", 50, 3)
+        resultado = RedeParser(nome).parse(conteudo.decode("latin-1"))
+
+        vendas = resultado.vendas_credito
+        primeira = vendas[0]
+        assert isinstance(primeira, VendaCredito)
+        assert primeira.origem_arquivo == "rede.txt"
+        assert isinstance(primeira.data_venda, datetime)
+        assert next(vendas.linhas()) == tuple(vars(primeira).values())
+        assert vendas.coluna("valor_bruto")[0] == primeira.valor_bruto
+
+        # Fallback continua anexando dataclasses
+        n = len(resultado.pagamentos)
+        resultado.pagamentos.append(Pagamento("1", "x.txt", None, "", 10.0, "0341/1/2"))
+        assert len(resultado.pagamentos) == n + 1
+        assert list(resultado.pagamentos)[-1].valor_liquido == 10.0
+
+
+class TestConverterArquivos:
+    def test_pool_mantem_ordem_e_resultado_do_sequencial(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(conver_service.settings, "CONVERSOR_PARALELO_MIN_BYTES", 0)
+        arquivos = [_arquivo(tmp_path, f"r{i}.txt", 40 + 10 * i, i) for i in range(3)]
+
+        paralelo = parsear_arquivos(arquivos, workers=2)
+        sequencial = parsear_arquivos(arquivos, workers=1)
+
+        assert [r.vendas_credito.coluna("origem_arquivo")[0] for r in paralelo] == ["r0.txt", "r1.txt", "r2.txt"]
+        for a, b in zip(paralelo, sequencial):
+            assert list(a.vendas_debito.linhas()) == list(b.vendas_debito.linhas())
+            assert list(a.pagamentos.linhas()) == list(b.pagamentos.linhas())
+
+    def test_zip_com_xlsx_formatados(self, tmp_path):
+        arquivos = [_arquivo(tmp_path, f"r{i}.txt", 30, i) for i in range(2)]
+        resultados = parsear_arquivos(arquivos, workers=1)
+
+        zip_bytes, nome = converter_arquivos(arquivos, workers=1)
+
+        assert nome == "Conciliacao_Rede_Consolidado.zip"
+        with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+            assert zf.namelist() == [
+                "Vendas_Credito.xlsx", "Vendas_Debito.xlsx", "Pagamentos.xlsx", "Recebiveis.xlsx",
+            ]
+            ws = load_workbook(io.BytesIO(zf.read("Vendas_Credito.xlsx"))).active
+        assert ws.title == "Vendas_Credito"
+        assert ws.freeze_panes == "A2"
+        assert ws["A1"].value == "Estabelecimento" and ws["A1"].font.bold
+        assert ws.max_row == 1 + sum(len(r.vendas_credito) for r in resultados)
+        assert ws["C2"].number_format == "DD/MM/YYYY"
+        assert ws["I2"].number_format == "R$ #,##0.00"
+        assert ws["I2"].value == resultados[0].vendas_credito[0].valor_bruto
+        assert ws.column_dimensions["A"].width == len("Estabelecimento") + 2
+
+    def test_planilhas_em_paralelo_iguais_ao_sequencial(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(conver_service.settings, "CONVERSOR_PARALELO_MIN_BYTES", 0)
+        arquivos = [_arquivo(tmp_path, "r.txt", 60, 5)]
+
+        paralelo, _ = converter_arquivos(arquivos, workers=2)
+        sequencial, _ = converter_arquivos(arquivos, workers=1)
+
+        with zipfile.ZipFile(io.BytesIO(paralelo)) as zp, zipfile.ZipFile(io.BytesIO(sequencial)) as zs:
+            assert zp.namelist() == zs.namelist()
+            for nome in zs.namelist():
+                linhas_p = list(load_workbook(io.BytesIO(zp.read(nome))).active.values)
+                linhas_s = list(load_workbook(io.BytesIO(zs.read(nome))).active.values)
+                assert linhas_p == linhas_s
+
+    def test_pool_compartilhado_entre_conversoes(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(conver_service.settings, "CONVERSOR_PARALELO_MIN_BYTES", 0)
+        arquivos = [_arquivo(tmp_path, f"r{i}.txt", 20, i) for i in range(2)]
+
+        converter_arquivos(arquivos, workers=2)
+        executor = pool.pool_conversor()
+        converter_arquivos(arquivos, workers=2)
+
+        assert pool.pool_conversor() is executor
+        assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        pool.descartar_pool()
+        assert pool.pool_conversor() is not executor
+        pool.descartar_pool()
@@ -0,0 +1,136 @@
+"""Testes unitários para o lote de correções (CorrecaoRepository.aplicar_lote)."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.log import LogCorrecao
+from app.models.perda_cliente import PerdaCliente
+from app.models.recebiveis import Recebivel, RecebivelFiltrado
+from app.models.vendas import Venda, VendaFiltrada
+from app.models.vendas_calculos import VendasCalculos
+from app.repositories.correcao_repository import CorrecaoRepository, compilar_lote, sem_caixa_e_acento
+from app.schemas.correcao import OperacaoCorrecao
+
+PID = "P1"
+
+
+@pytest.fixture()
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'correcao.db'}")
+    for model in (LogCorrecao, PerdaCliente, Recebivel, RecebivelFiltrado, Venda, VendaFiltrada, VendasCalculos):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    bandeiras = ["VISA"] * 3 + ["visa"] * 2 + [None] + ["Elo"] * 2
+    session.add_all(Venda(processamentoid=PID, bandeira=b, forma_pagamento="Crédito", ec_id=100) for b in bandeiras)
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _op(tipo, campo="bandeira", valores=(), valor_novo=None, **kwargs):
+    return OperacaoCorrecao(tipo=tipo, campo=campo, valores=list(valores), valor_novo=valor_novo, **kwargs)
+
+
+def _bandeiras(db, model=Venda):
+    return sorted((b or "") for (b,) in db.query(model.bandeira).filter(model.processamentoid == PID))
+
+
+class TestCompilarLote:
+    def test_agrupa_consecutivas_do_mesmo_tipo_e_campo(self):
+        ops = [
+            _op("atualizar", valores=["a"], valor_novo="b"),
+            _op("atualizar", valores=["b"], valor_novo="c"),
+            _op("atualizar", campo="status", valores=["x"], valor_novo="y"),
+            _op("aplicar_taxa_bc", campo=None, nova_taxa=1.0),
+            _op("aplicar_taxa_bc", campo=None, nova_taxa=2.0),
+            _op("remover", valores=["c"]),
+        ]
+        assert [[i for i, _ in g] for g in compilar_lote(ops)] == [[0, 1], [2], [3], [4], [5]]
+
+    def test_nao_agrupa_valores_que_o_banco_iguala_sem_caixa(self):
+        # no MySQL ("visa" = "VISA"), a 2ª renomeação pega a saída da 1ª
+        ops = [
+            _op("atualizar", valores=["VISA"], valor_novo="Visa"),
+            _op("atualizar", valores=["visa"], valor_novo="X"),
+        ]
+        assert [[i for i, _ in g] for g in compilar_lote(ops)] == [[0, 1]]
+        assert [[i for i, _ in g] for g in compilar_lote(ops, sem_caixa_e_acento)] == [[0], [1]]
+
+    def test_sem_caixa_so_separa_a_operacao_em_conflito(self):
+        ops = [
+            _op("atualizar", valores=["VISA", "visa"], valor_novo="Visa"),
+            _op("atualizar", valores=["Elo"], valor_novo="ELO"),
+            _op("atualizar", valores=["élo"], valor_novo="X"),
+        ]
+        assert [[i for i, _ in g] for g in compilar_lote(ops, sem_caixa_e_acento)] == [[0, 1], [2]]
+
+
+class TestAplicarLote:
+    def test_renomeacoes_encadeadas_em_um_update(self, db):
+        resultado = CorrecaoRepository(db).aplicar_lote(PID, [
+            _op("atualizar", valores=["VISA", "visa"], valor_novo="Visa"),
+            _op("atualizar", valores=["Visa", "N/A"], valor_novo="VISA CREDITO"),
+        ])
+
+        assert resultado["etapas"] == 1
+        assert [o["linhas_afetadas"] for o in resultado["operacoes"]] == [5, 6]
+        assert _bandeiras(db) == ["Elo", "Elo"] + ["VISA CREDITO"] * 6
+        logs = db.query(LogCorrecao).order_by(LogCorrecao.id).all()
+        assert [(l.tipo_correcao, l.linhas_afetadas) for l in logs] == [
+            ("atualizacao_bandeira", 5),
+            ("atualizacao_bandeira", 6),
+        ]
+
+    def test_remover_em_uniao_e_restaurar_na_ordem(self, db):
+        resultado = CorrecaoRepository(db).aplicar_lote(PID, [
+            _op("remover", valores=["Elo"]),
+            _op("remover", valores=["visa", "Elo"]),
+            _op("restaurar_filtradas", valores=["Elo"]),
+        ])
+
+        assert resultado["etapas"] == 2
+        assert [o["linhas_afetadas"] for o in resultado["operacoes"]] == [2, 2, 2]
+        assert _bandeiras(db) == ["", "Elo", "Elo", "VISA", "VISA", "VISA"]
+        assert _bandeiras(db, VendaFiltrada) == ["visa", "visa"]
+
+    def test_erro_desfaz_o_lote_inteiro(self, db):
+        repo = CorrecaoRepository(db)
+        with pytest.raises(ValueError):
+            repo.aplicar_lote(PID, [
+                _op("atualizar", valores=["VISA"], valor_novo="Visa"),
+                _op("remover", campo="inexistente", valores=["x"]),
+            ])
+
+        assert _bandeiras(db).count("VISA") == 3
+        assert db.query(LogCorrecao).count() == 0
+        assert repo._em_lote is False
+
+    def test_lote_misto_taxa_bc_no_calc_id_e_linhas_no_processamento(self, db):
+        db.add_all([
+            VendasCalculos(calc_id="100_mensal_x", calc_tipo="log_mensal", ec_id=100, bandeira="Visa",
+                           forma_pagamento="Crédito", vl_venda=100, vl_liq_venda=98, tx_calc=2.0),
+            VendasCalculos(calc_id="outro", calc_tipo="log_mensal", ec_id=100, bandeira="Visa",
+                           forma_pagamento="Crédito", vl_venda=100, vl_liq_venda=98, tx_calc=2.0),
+        ])
+        db.commit()
+
+        resultado = CorrecaoRepository(db).aplicar_lote(PID, [
+            _op("atualizar", valores=["Elo"], valor_novo="ELO"),
+            _op("aplicar_taxa_bc", campo=None, calc_id="100_mensal_x", nova_taxa=1.0),
+        ])
+
+        assert [o["linhas_afetadas"] for o in resultado["operacoes"]] == [2, 1]
+        assert _bandeiras(db).count("ELO") == 2
+        taxas = dict(db.query(VendasCalculos.calc_id, VendasCalculos.tx_calc))
+        assert taxas == {"100_mensal_x": 1.0, "outro": 2.0}
+        assert [p.calc_id for p in db.query(PerdaCliente)] == ["100_mensal_x"]
+
+    def test_lote_misto_sem_calc_id_e_recusado(self, db):
+        with pytest.raises(ValueError):
+            CorrecaoRepository(db).aplicar_lote(PID, [
+                _op("atualizar", valores=["Elo"], valor_novo="ELO"),
+                _op("aplicar_taxa_bc", campo=None, nova_taxa=1.0),
+            ])
+        assert _bandeiras(db).count("Elo") == 2
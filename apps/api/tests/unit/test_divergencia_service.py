@@ -0,0 +1,89 @@
+"""Testes unitários para app.services.divergencia_service."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cliente import Cliente, ECCliente
+from app.models.taxa import Taxa
+from app.models.taxa_contratada import TaxaContratada
+from app.services.divergencia_service import DivergenciaService
+
+
+def _taxa(ec, bandeira, forma, taxa):
+    return Taxa(
+        ec=ec, bandeira=bandeira, forma_pagamento=forma, taxa=taxa,
+        parcelas_ini=1, parcelas_fim=1, data_ini=date(2026, 1, 1), data_fim=date(2026, 12, 31),
+    )
+
+
+def _contratada(cliente_id, bandeira, modalidade, taxa):
+    return TaxaContratada(
+        cliente_id=cliente_id, bandeira=bandeira, modalidade=modalidade,
+        taxa_contratada=taxa, vigencia_inicio=date(2026, 1, 1),
+    )
+
+
+@pytest.fixture()
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'div.db'}")
+    for model in (Cliente, ECCliente, Taxa, TaxaContratada):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Cliente(cliente_id=1, nome_fantasia="Loja Um"),
+        Cliente(cliente_id=2, razao_social="Loja Dois LTDA"),
+        Cliente(cliente_id=3, nome_fantasia="Sem EC"),
+        ECCliente(cliente_id=1, ec_id="100"),
+        ECCliente(cliente_id=1, ec_id="101"),
+        ECCliente(cliente_id=2, ec_id="200"),
+        _taxa("100", "Visa", "Crédito", 2.10),
+        _taxa("101", " VISA ", "crédito", 2.50),
+        _taxa("100", "Master", "Débito", 1.00),
+        _taxa("200", "Visa", "Crédito", 3.00),
+        _contratada(1, "VISA", "Crédito", 2.00),
+        _contratada(1, "Master", "Débito", 1.20),
+        _contratada(2, "visa", "CRÉDITO", 2.00),
+        _contratada(2, "Elo", "Crédito", 1.00),
+        _contratada(3, "Visa", "Crédito", 1.00),
+        _contratada(99, "Visa", "Crédito", 1.00),  # cliente inexistente
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestDivergenciaService:
+    def test_join_unico_usa_maior_taxa_cobrada_normalizada(self, db):
+        df = DivergenciaService(db).calcular()
+        assert df.select("cliente_id", "bandeira", "taxa_cobrada", "diferenca_pct").rows() == [
+            (1, "VISA", 2.5, 0.5),
+            (2, "visa", 3.0, 1.0),
+        ]
+
+    def test_por_cliente(self, db):
+        service = DivergenciaService(db)
+        dados = service.por_cliente(1)
+        assert dados["nome"] == "Loja Um" and dados["nota"] is None
+        assert dados["divergencias"] == [
+            {
+                "bandeira": "VISA",
+                "modalidade": "Crédito",
+                "taxa_contratada": 2.0,
+                "taxa_cobrada": 2.5,
+                "diferenca_pct": 0.5,
+                "status": "divergente",
+            }
+        ]
+        assert service.por_cliente(3)["nota"].startswith("Nenhum EC")
+        assert service.por_cliente(42) is None
+
+    def test_consolidado_ignora_cliente_inexistente(self, db):
+        itens = DivergenciaService(db).consolidado()
+        assert [(i["cliente_id"], i["nome_cliente"], i["total_divergencias"]) for i in itens] == [
+            (1, "Loja Um", 1),
+            (2, "Loja Dois LTDA", 1),
+        ]
@@ -75,3 +75,90 @@ def test_montar_contexto_sem_dados_retorna_mensagem_vazia():
     contexto, dados = service.montar_contexto("proc-inexistente", db)
     assert "Nenhum dado encontrado" in contexto
     assert dados == {}
+
+
+# ---------------------------------------------------------------------------
+# AIService.montar_contexto — agregação SQL + cache por versão do cálculo
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def sessao_calculos(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.vendas_calculos import VendasCalculos
+    from app.services import ai_service
+
+    eng = create_engine(f"sqlite:///{tmp_path / 'ctx.db'}")
+    VendasCalculos.__table__.create(eng)
+    ai_service._contexto_cache.clear()
+    sessao = sessionmaker(bind=eng)()
+    yield sessao
+    sessao.close()
+    eng.dispose()
+
+
+def _linha(calc_id, bandeira, forma, valor, taxa, perda):
+    from app.models.vendas_calculos import VendasCalculos
+
+    return VendasCalculos(
+        calc_id=calc_id, calc_tipo="log_mensal", bandeira=bandeira, forma_pagamento=forma,
+        vl_venda=valor, tx_venda=taxa, perda=perda,
+    )
+
+
+def test_montar_contexto_agrega_por_bandeira_e_forma(sessao_calculos):
+    sessao_calculos.add_all([
+        _linha("P1", "Visa", "Crédito", 100, 2.0, 1.5),
+        _linha("P1", "Visa", "Crédito", 300, 3.0, 0),
+        _linha("P1", None, "Débito", 50, 0, None),
+        _linha("P1", "", "Débito", 25, 1.0, 0.25),
+        _linha("OUTRO", "Visa", "Crédito", 999, 9.0, 9),
+    ])
+    sessao_calculos.commit()
+
+    contexto, dados = AIService.__new__(AIService).montar_contexto("P1", sessao_calculos)
+
+    assert dados == {"total_transacoes": 4, "valor_total": 475.0, "perda_total": 1.75}
+    assert "  - Visa Crédito: 2 transações, R$ 400.00, taxa média 2.50%, perda R$ 1.50" in contexto
+    # NULL e "" caem no mesmo grupo; taxa zero não entra na média
+    assert "  - Desconhecida Débito: 2 transações, R$ 75.00, taxa média 1.00%, perda R$ 0.25" in contexto
+
+
+def test_montar_contexto_usa_cache_ate_recalculo(sessao_calculos):
+    from app.services import ai_service
+
+    sessao_calculos.add(_linha("P2", "Elo", "Crédito", 10, 2.0, 0))
+    sessao_calculos.commit()
+    service = AIService.__new__(AIService)
+    service.montar_contexto("P2", sessao_calculos)
+
+    with patch.object(ai_service, "_agregar_por_grupo", side_effect=AssertionError("não deveria reagregar")):
+        _, dados = service.montar_contexto("P2", sessao_calculos)
+    assert dados["total_transacoes"] == 1
+
+    # Recalcular (novas linhas) muda a versão e invalida o cache
+    sessao_calculos.add(_linha("P2", "Elo", "Crédito", 20, 2.0, 0))
+    sessao_calculos.commit()
+    _, dados = service.montar_contexto("P2", sessao_calculos)
+    assert dados["total_transacoes"] == 2
+
+
+def test_taxa_bc_aplicada_no_lugar_invalida_contexto(sessao_calculos, monkeypatch):
+    from app.models.log import LogCorrecao
+    from app.repositories import correcao_repository
+    from app.repositories.correcao_repository import CorrecaoRepository
+
+    LogCorrecao.__table__.create(sessao_calculos.get_bind())
+    monkeypatch.setattr(correcao_repository, "atualizar_varios", lambda db, calculos: None)
+    linha = _linha("P3", "Elo", "Crédito", 100, 2.0, 0)
+    linha.vl_liq_venda = 98
+    sessao_calculos.add(linha)
+    sessao_calculos.commit()
+    service = AIService.__new__(AIService)
+    assert service.montar_contexto("P3", sessao_calculos)[1]["perda_total"] == 0
+
+    # UPDATE no lugar: COUNT/MAX(id) iguais, mas o contexto não pode ficar velho
+    CorrecaoRepository(sessao_calculos).aplicar_taxa_bc("P3", "TODOS", "TODOS", None, None, 1.0)
+
+    assert service.montar_contexto("P3", sessao_calculos)[1]["perda_total"] == -1.0
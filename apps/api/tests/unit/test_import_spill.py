@@ -0,0 +1,137 @@
+"""Testes unitários para app.services.import_spill (leitura do preview reusada na confirmação)."""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.arquivo_importado import ArquivoImportado
+from app.models.legacy_depara import DeParaColunasLegacy
+from app.services import import_service, import_spill
+from app.services.import_service import ImportService
+from app.services.import_spill import DIR_SPILL, agendar_spill, carregar_spill, listar_arquivos_lote
+
+
+class _Preparar:
+    """Substitui a leitura completa do arquivo (De-Para precisa de banco) contando as chamadas."""
+
+    def __init__(self, df):
+        self.df = df
+        self.chamadas = []
+
+    def __call__(self, path, engine, cliente_id, contexto="", tipo_origem="V", **kwargs):
+        self.chamadas.append(path)
+        return self.df.copy(), {}, 0
+
+
+@pytest.fixture()
+def sessao(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    ArquivoImportado.__table__.create(engine)
+    DeParaColunasLegacy.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture()
+def lote(tmp_path):
+    batch_dir = tmp_path / "lote"
+    (batch_dir / "extracted_1").mkdir(parents=True)
+    (batch_dir / "a_vendas.csv").write_text("x;y\n1;2\n")
+    (batch_dir / "extracted_1" / "b_vendas.csv").write_text("x;y\n3;4\n")
+    return batch_dir
+
+
+def _instalar(monkeypatch, df):
+    preparar = _Preparar(df)
+    monkeypatch.setattr(import_spill, "preparar_dataframe_de_arquivo", preparar)
+    monkeypatch.setattr(import_service, "preparar_dataframe_de_arquivo", preparar)
+    return preparar
+
+
+def _df_mapeado():
+    return pd.DataFrame({
+        "Data_Venda": pd.to_datetime(["2024-01-02", "2024-01-03", None]),
+        "Valor_Bruto": [10.5, 20.0, None],
+        "Bandeira": ["VISA", None, "ELO"],
+    })
+
+
+class TestSpillPreview:
+    def test_confirmacao_usa_spill_sem_reler_arquivo(self, lote, sessao, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        preparar = _instalar(monkeypatch, _df_mapeado())
+        gravados = []
+
+        def gravar(**kwargs):
+            gravados.append(kwargs["df"])
+            return {"processadas": len(kwargs["df"]), "filtradas": 0, "total": len(kwargs["df"]), "processamentoid": "P1"}
+
+        monkeypatch.setattr(import_service, "classificar_e_gravar_vendas", gravar)
+
+        for path in listar_arquivos_lote(lote):
+            agendar_spill(path, lote, 1, "CIELO", "V", engine=sessao.get_bind()).result()
+        assert len(preparar.chamadas) == 2
+        assert len(list((lote / DIR_SPILL).glob("*.parquet"))) == 2
+        # A pasta de spill não entra como arquivo do lote
+        assert sorted(p.name for p in listar_arquivos_lote(lote)) == ["a_vendas.csv", "b_vendas.csv"]
+
+        service = ImportService(sessao)
+        service.temp_dir = tmp_path
+        resultado = service.confirm_import_v2("lote", 1, "100", "CIELO", "V", "teste")
+
+        assert len(preparar.chamadas) == 2
+        assert resultado["data"]["processadas"] == 6 and resultado["data"]["files_processed"] == 2
+        pd.testing.assert_frame_equal(gravados[0], _df_mapeado())
+        assert not lote.exists()
+
+    def test_spill_de_outro_contexto_nao_e_usado(self, lote, sessao, monkeypatch):
+        preparar = _instalar(monkeypatch, _df_mapeado())
+        engine = sessao.get_bind()
+        path = lote / "a_vendas.csv"
+        agendar_spill(path, lote, 1, "CIELO", "V", engine=engine).result()
+
+        assert carregar_spill(path, lote, engine, 1, "CIELO", "R") is None
+        assert carregar_spill(path, lote, engine, 1, "REDE", "V") is None
+        assert carregar_spill(path, lote, engine, 2, "CIELO", "V") is None
+        pd.testing.assert_frame_equal(carregar_spill(path, lote, engine, 1, "CIELO", "V"), _df_mapeado())
+        assert len(preparar.chamadas) == 1
+
+    def test_regra_de_para_alterada_invalida_spill(self, lote, sessao, monkeypatch):
+        _instalar(monkeypatch, _df_mapeado())
+        engine = sessao.get_bind()
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO depara_colunas (id, origem_nome, destino_nome, contexto, tipo_origem, ativo)"
+                " VALUES (1, 'VALOR', 'Valor_Bruto', 'CIELO', 'V', 1)"
+            ))
+        path = lote / "a_vendas.csv"
+        agendar_spill(path, lote, 1, "CIELO", "V", engine=engine).result()
+        assert carregar_spill(path, lote, engine, 1, "CIELO", "V") is not None
+
+        # Alteração no lugar (mesmo id, mesma contagem de regras)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE depara_colunas SET destino_nome = 'Valor_Liquido' WHERE id = 1"))
+        assert carregar_spill(path, lote, engine, 1, "CIELO", "V") is None
+
+    def test_sem_spill_confirmacao_le_o_arquivo(self, lote, sessao, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        # Tipos misturados numa coluna object não vão para Parquet
+        preparar = _instalar(monkeypatch, pd.DataFrame({"Valor": [1.5, "abc", datetime(2024, 1, 1)]}))
+        monkeypatch.setattr(
+            import_service, "classificar_e_gravar_vendas",
+            lambda **kwargs: {"processadas": len(kwargs["df"]), "total": len(kwargs["df"]), "processamentoid": "P1"},
+        )
+        assert agendar_spill(lote / "a_vendas.csv", lote, 1, "CIELO", "V", engine=sessao.get_bind()).result() is None
+
+        service = ImportService(sessao)
+        service.temp_dir = tmp_path
+        resultado = service.confirm_import_v2("lote", 1, "100", "CIELO", "V", "teste")
+
+        # 1 tentativa de spill + 2 leituras na confirmação
+        assert len(preparar.chamadas) == 3
+        assert resultado["data"]["processadas"] == 6
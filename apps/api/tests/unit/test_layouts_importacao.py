@@ -0,0 +1,97 @@
+"""Testes unitários para proc.importers.layouts (registro de layouts do ImporterFactory)."""
+
+import threading
+
+import pandas as pd
+import pytest
+
+from benchmarks.generators import gerar_cielo_xlsx
+from proc.importers import layouts
+from proc.importers.factory import ImporterFactory
+from proc.importers.layouts import RegistroLayouts, ler_com_layout
+from proc.importers.utils import safe_read_file
+
+
+@pytest.fixture()
+def registro(monkeypatch, tmp_path):
+    reg = RegistroLayouts(str(tmp_path / "layouts.json"))
+    monkeypatch.setattr(layouts, "_registro", reg)
+    return reg
+
+
+def _importer(path):
+    return ImporterFactory.get_importer(None, path, "100", 1, "", "teste")
+
+
+def _sem_deteccao(monkeypatch):
+    def falhar(*args, **kwargs):
+        raise AssertionError("detecção completa não deveria rodar")
+
+    for importer_cls in ImporterFactory._importers:
+        monkeypatch.setattr(importer_cls, "detect_score", staticmethod(falhar))
+    monkeypatch.setattr(layouts, "safe_read_file", falhar)
+
+
+class TestRegistroLayouts:
+    def test_arquivo_do_mesmo_layout_pula_deteccao(self, registro, tmp_path, monkeypatch):
+        primeiro = gerar_cielo_xlsx(str(tmp_path / "jan.xlsx"), 30, seed=1)
+        importer = _importer(primeiro)
+        assert importer.__class__.__name__ == "CieloHistoricoDetalheImporter"
+        assert importer.layout.header_idx == 3 and len(registro) == 1
+
+        # Outro mês, outro volume: mesma fingerprint, leitura única e mesmo resultado
+        segundo = gerar_cielo_xlsx(str(tmp_path / "fev.xlsx"), 80, seed=2)
+        esperado, header_idx, colunas = safe_read_file(segundo)
+        _sem_deteccao(monkeypatch)
+
+        importer = _importer(segundo)
+        assert importer.__class__.__name__ == "CieloHistoricoDetalheImporter"
+        importer.read(segundo)
+        assert (importer.header_idx, importer.columns) == (header_idx, colunas)
+        pd.testing.assert_frame_equal(importer.df_raw, esperado)
+
+        # Persistido: outro processo reconhece o layout
+        assert len(RegistroLayouts(registro.caminho)) == 1
+
+    def test_preambulo_diferente_faz_deteccao_completa(self, registro, tmp_path):
+        _importer(gerar_cielo_xlsx(str(tmp_path / "jan.xlsx"), 30, seed=1))
+        path = str(tmp_path / "outro.xlsx")
+        df = pd.read_excel(gerar_cielo_xlsx(path, 30, seed=3), header=3, dtype=str)
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            df.to_excel(writer, index=False, startrow=1, sheet_name="Vendas")
+            writer.sheets["Vendas"].write(0, 0, "Layout novo")
+
+        importer = _importer(path)
+        assert importer.__class__.__name__ == "CieloHistoricoDetalheImporter"
+        assert importer.layout.header_idx == 1 and len(registro) == 2
+
+    def test_drift_na_leitura_volta_para_deteccao(self, registro, tmp_path):
+        path = gerar_cielo_xlsx(str(tmp_path / "jan.xlsx"), 30, seed=1)
+        layout = _importer(path).layout
+        layout.cabecalho = ["coluna que mudou"] + layout.cabecalho[1:]
+
+        df, header_idx, colunas = ler_com_layout(path, layout)
+
+        assert (header_idx, colunas[0]) == (3, "Data da venda") and len(df) == 30
+        assert len(registro) == 0
+
+    def test_gravacoes_concorrentes_de_processos_diferentes(self, tmp_path, monkeypatch):
+        avisos = []
+        monkeypatch.setattr(layouts, "log_with_time", lambda msg, nivel, *args: avisos.append(msg % args))
+        caminho = str(tmp_path / "layouts.json")
+        # Uma instância por "worker": cada uma com o próprio lock, mesmo arquivo
+        registros = [RegistroLayouts(caminho) for _ in range(4)]
+
+        def gravar(reg):
+            for _ in range(25):
+                reg._salvar()
+
+        threads = [threading.Thread(target=gravar, args=(reg,)) for reg in registros]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert avisos == []
+        assert [p.name for p in tmp_path.iterdir()] == ["layouts.json"]
+        assert len(RegistroLayouts(caminho)) == 0
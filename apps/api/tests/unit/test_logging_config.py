@@ -0,0 +1,76 @@
+"""Testes unitários para app.core.logging_config."""
+
+import logging
+import queue
+
+from app.core.logging_config import _DeferredQueueHandler, parse_module_levels
+
+
+class TestParseModuleLevels:
+    def test_parse_varios_modulos(self):
+        levels = parse_module_levels("proc=WARNING, app.services.import_service=debug")
+        assert levels == {"proc": logging.WARNING, "app.services.import_service": logging.DEBUG}
+
+    def test_ignora_entradas_invalidas(self):
+        assert parse_module_levels("semigual,proc=NAOEXISTE,=INFO") == {}
+
+    def test_vazio(self):
+        assert parse_module_levels("") == {}
+        assert parse_module_levels(None) == {}
+
+
+class _Caro:
+    """Objeto cujo __str__ conta quantas vezes foi formatado."""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def __str__(self):
+        self.chamadas += 1
+        return "caro"
+
+
+class TestDeferredQueueHandler:
+    def _logger(self, q):
+        log = logging.getLogger("tests.logging_config")
+        log.propagate = False
+        log.handlers = [_DeferredQueueHandler(q)]
+        return log
+
+    def test_nao_formata_na_thread_chamadora(self):
+        q = queue.SimpleQueue()
+        log = self._logger(q)
+        log.setLevel(logging.INFO)
+        arg = _Caro()
+
+        log.info("valor=%s", arg)
+
+        record = q.get_nowait()
+        assert arg.chamadas == 0
+        assert record.args == (arg,)
+        assert record.getMessage() == "valor=caro"
+
+    def test_abaixo_do_nivel_nao_enfileira(self):
+        q = queue.SimpleQueue()
+        log = self._logger(q)
+        log.setLevel(logging.INFO)
+        arg = _Caro()
+
+        log.debug("valor=%s", arg)
+
+        assert q.empty()
+        assert arg.chamadas == 0
+
+    def test_traceback_vira_texto(self):
+        q = queue.SimpleQueue()
+        log = self._logger(q)
+        log.setLevel(logging.INFO)
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("falhou")
+
+        record = q.get_nowait()
+        assert record.exc_info is None
+        assert "ValueError: boom" in record.exc_text
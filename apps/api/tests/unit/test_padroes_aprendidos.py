@@ -0,0 +1,105 @@
+"""Testes unitários para o cache de layouts aprendidos do fallback do conversor."""
+
+import re
+
+import pytest
+
+from app.services.conversor.gemini_fallback import processar_linhas_nao_reconhecidas
+from app.services.conversor.padroes_aprendidos import PadroesAprendidos, assinatura
+
+_RE_STUB = re.compile(r'(\d{2}/\d{2}/\d{2}) VENDA (\w+ \w+) (\d+) ([A-Z]{2}) ([\d\.]+,\d{2}) ([\d\.]+,\d{2})')
+
+LINHAS = [
+    (10, "05/01/24 VENDA AVULSA BALCAO 123456 MC 1.234,56 1.200,00"),
+    (11, "=== linha sem dados ==="),
+    (12, "06/01/24 VENDA AVULSA BALCAO 123457 VI 99,90 97,00"),
+    (13, "07/01/24 VENDA AVULSA BALCAO 123458 EL 10,00 9,70"),
+]
+
+
+class StubResolvedor:
+    """Resolvedor determinístico no lugar do Gemini: regex fixa + registro das chamadas."""
+
+    def __init__(self, valor_bruto_fixo=None):
+        self.chamadas = []
+        self.valor_bruto_fixo = valor_bruto_fixo
+
+    def __call__(self, linhas, secao):
+        self.chamadas.append([n for n, _ in linhas])
+        registros = []
+        for numero, texto in linhas:
+            m = _RE_STUB.search(texto)
+            if not m:
+                continue
+            dia, mes, ano = m.group(1).split("/")
+            registros.append({
+                "linha": numero,
+                "data_venda": f"{dia}/{mes}/20{ano}",
+                "modalidade": m.group(2),
+                "resumo_vendas": m.group(3),
+                "bandeira": m.group(4),
+                "valor_bruto": self.valor_bruto_fixo or float(m.group(5).replace(".", "").replace(",", ".")),
+                "valor_liquido": float(m.group(6).replace(".", "").replace(",", ".")),
+                "tipo_lancamento": "EFETUADO",
+            })
+        return registros
+
+
+class TestAssinatura:
+    def test_ignora_valores_e_separa_secao(self):
+        a, b = LINHAS[0][1], LINHAS[2][1]
+        assert assinatura("credito", a) == assinatura("credito", b) == "credito|D A A A N A V V"
+        assert assinatura("debito", a) != assinatura("credito", a)
+
+
+class TestPadroesAprendidos:
+    def test_resolve_um_por_formato_e_extrai_o_resto_localmente(self, tmp_path):
+        padroes = PadroesAprendidos(str(tmp_path / "padroes.json"))
+        stub = StubResolvedor()
+
+        registros = processar_linhas_nao_reconhecidas(LINHAS, "credito", "123", "x.txt", stub, padroes)
+
+        assert stub.chamadas == [[10, 11]]
+        assert [r["linha"] for r in registros] == [10, 12, 13]
+        local = registros[1]
+        assert local == {
+            "linha": 12, "data_venda": "06/01/24", "modalidade": "AVULSA BALCAO", "resumo_vendas": "123457",
+            "bandeira": "VI", "valor_bruto": 99.9, "valor_liquido": 97.0, "tipo_lancamento": "EFETUADO",
+            "estabelecimento": "123", "origem_arquivo": "x.txt",
+        }
+
+        # Persistido: outro processo não chama o resolvedor para o mesmo formato
+        def sem_rede(linhas, secao):
+            assert [n for n, _ in linhas] == [11]
+            return []
+
+        recarregado = PadroesAprendidos(str(tmp_path / "padroes.json"))
+        assert len(recarregado) == 1
+        registros = processar_linhas_nao_reconhecidas(LINHAS, "credito", "123", "", sem_rede, recarregado)
+        assert [r["valor_bruto"] for r in registros] == [1234.56, 99.9, 10.0]
+
+    def test_formato_nao_aprendido_vai_linha_a_linha(self):
+        padroes = PadroesAprendidos()
+        stub = StubResolvedor(valor_bruto_fixo=555.0)  # valor que não aparece na linha
+
+        registros = processar_linhas_nao_reconhecidas(LINHAS, "credito", "123", "", stub, padroes)
+
+        assert stub.chamadas == [[10, 11], [12, 13]]
+        assert len(registros) == 3 and len(padroes) == 0
+
+    def test_texto_livre_fora_da_linha_nao_vira_constante(self):
+        padroes = PadroesAprendidos()
+        linha = LINHAS[0][1]
+        registro = StubResolvedor()([(10, linha)], "credito")[0]
+
+        # Bandeira inferida pelo resolvedor, sem token na linha: não aprende
+        assert padroes.aprender("credito", linha, {**registro, "bandeira": "MASTERCARD"}) is False
+        assert len(padroes) == 0
+        # tipo_lancamento é de domínio fechado: pode ser constante
+        assert padroes.aprender("credito", linha, registro) is True
+
+    @pytest.mark.parametrize("conteudo", ["{corrompido", '{"versao": 0, "padroes": {"x": {}}}'])
+    def test_arquivo_invalido_ou_de_outra_versao_e_ignorado(self, tmp_path, conteudo):
+        caminho = tmp_path / "padroes.json"
+        caminho.write_text(conteudo, encoding="utf-8")
+        assert len(PadroesAprendidos(str(caminho))) == 0
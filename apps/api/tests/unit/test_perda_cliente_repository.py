@@ -0,0 +1,130 @@
+"""Testes unitários para o rollup perdas_cliente (app.repositories.perda_cliente_repository)."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cliente import Cliente, ECCliente
+from app.models.perda_cliente import PerdaCliente
+from app.models.vendas_calculos import VendasCalculos
+from app.repositories.perda_cliente_repository import (
+    PerdaClienteRepository,
+    atualizar_perdas_calculo,
+    popular_se_vazio,
+    reconstruir_perdas,
+)
+
+
+@pytest.fixture()
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'perdas.db'}")
+    for model in (VendasCalculos, PerdaCliente, Cliente, ECCliente):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Cliente(cliente_id=1, cnpj="11111111000111", razao_social="Loja Um LTDA", nome_fantasia="Loja Um"),
+        Cliente(cliente_id=2, cnpj="22222222000122", razao_social="Loja Dois LTDA"),
+        ECCliente(cliente_id=1, ec_id="100"),
+        ECCliente(cliente_id=1, ec_id="101"),
+        ECCliente(cliente_id=2, ec_id="200"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _venda(calc_id, ec_id, perda, vl_venda=100, perda_rr=0, calc_tipo="log_mensal"):
+    return VendasCalculos(
+        calc_id=calc_id, calc_tipo=calc_tipo, ec_id=ec_id, perda=perda,
+        perda_rr=perda_rr, vl_venda=vl_venda, calc_data=datetime(2026, 1, 10),
+    )
+
+
+class TestManutencaoRollup:
+    def test_agrega_por_calculo_e_ec(self, db):
+        db.add_all([
+            _venda("c1", 100, 5, perda_rr=1),
+            _venda("c1", 100, -2),
+            _venda("c1", 101, 3),
+            _venda("c1", 200, 0),
+        ])
+        db.flush()
+        atualizar_perdas_calculo(db, "c1", "log_mensal")
+        db.commit()
+
+        linhas = {p.ec_id: p for p in db.query(PerdaCliente).all()}
+        assert set(linhas) == {"100", "101", "200"}
+        assert float(linhas["100"].perda) == 5 and linhas["100"].qtd_perda == 1
+        assert linhas["100"].qtd_transacoes == 2 and float(linhas["100"].volume) == 200
+        assert linhas["200"].qtd_perda == 0
+
+    def test_recalculo_apos_remocao(self, db):
+        db.add_all([_venda("c1", 100, 5), _venda("c1", 101, 3)])
+        db.flush()
+        atualizar_perdas_calculo(db, "c1")
+        db.query(VendasCalculos).filter(VendasCalculos.ec_id == 101).delete()
+        atualizar_perdas_calculo(db, "c1")
+        db.commit()
+
+        assert [p.ec_id for p in db.query(PerdaCliente).all()] == ["100"]
+
+    def test_reconstruir_perdas(self, db):
+        db.add_all([_venda("c1", 100, 5), _venda("c2", 200, 7, calc_tipo="log_anual")])
+        db.commit()
+        reconstruir_perdas(db)
+        db.commit()
+
+        assert {(p.calc_id, p.calc_tipo) for p in db.query(PerdaCliente).all()} == {
+            ("c1", "log_mensal"),
+            ("c2", "log_anual"),
+        }
+
+    def test_popular_se_vazio_so_no_primeiro_start(self, db):
+        assert popular_se_vazio(db) is False  # sem cálculos
+        db.add(_venda("c1", 100, 5))
+        db.commit()
+        assert popular_se_vazio(db) is True
+        db.commit()
+        db.add(_venda("c2", 100, 7))
+        db.commit()
+        # Rollup já existe: quem mantém é o caminho de escrita, não o startup
+        assert popular_se_vazio(db) is False
+        assert [p.calc_id for p in db.query(PerdaCliente).all()] == ["c1"]
+
+
+class TestLeitura:
+    def test_ranking_com_atributos_do_cliente(self, db):
+        db.add_all([
+            _venda("c1", 100, 5),
+            _venda("c1", 101, 3),
+            _venda("c2", 200, 10),
+            _venda("c2", 999, 50),  # EC sem cliente: fora do ranking
+        ])
+        db.commit()
+        reconstruir_perdas(db)
+        db.commit()
+        repo = PerdaClienteRepository(db)
+
+        ranking = repo.ranking(limit=10)
+        assert [(r["cliente_id"], float(r["total_perda"]), r["count_transacoes"]) for r in ranking] == [
+            (2, 10, 1),
+            (1, 8, 2),
+        ]
+        assert ranking[1]["nome_fantasia"] == "Loja Um"
+        assert repo.ranking_por_ec(limit=1)[0]["ec_id"] == "999"
+
+    def test_resumo_cliente(self, db):
+        db.add_all([_venda("c1", 100, 5, vl_venda=80), _venda("c1", 101, 3, vl_venda=20)])
+        db.commit()
+        reconstruir_perdas(db)
+        db.commit()
+        repo = PerdaClienteRepository(db)
+
+        resumo = repo.resumo_cliente(1)
+        assert resumo["cnpj"] == "11111111000111"
+        assert float(resumo["total_perda"]) == 8 and float(resumo["volume"]) == 100
+        assert float(repo.resumo_cliente(2)["total_perda"]) == 0
+        assert repo.resumo_cliente(42) is None
@@ -0,0 +1,113 @@
+"""Testes unitários para conf.perf_metrics e a instrumentação de PerformanceTimer."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from conf.debug_utils import PerformanceTimer, job_trace
+from conf.perf_metrics import REGISTRY, MetricsRegistry, current_span
+
+
+@pytest.fixture(autouse=True)
+def _registro_limpo():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+class TestSpans:
+    def test_timers_aninhados_formam_arvore(self):
+        with job_trace("importacao", "t1") as trace:
+            with PerformanceTimer("IMPORT", "Ler") as t:
+                t.set(rows=10, bytes=2048)
+                with PerformanceTimer("IMPORT", "Parse"):
+                    pass
+            for _ in range(3):
+                with PerformanceTimer("RECORD", "Gravar", {"rows": 5}):
+                    pass
+
+        assert current_span() is None
+        stages = {s["stage"]: s for s in trace.breakdown()}
+        assert list(stages) == ["Ler", "Ler > Parse", "Gravar"]
+        assert stages["Ler"]["rows"] == 10 and stages["Ler"]["bytes"] == 2048
+        assert stages["Ler > Parse"]["depth"] == 1
+        assert stages["Gravar"]["calls"] == 3 and stages["Gravar"]["rows"] == 15
+        assert trace.duration is not None
+
+    def test_excecao_marca_erro_e_propaga(self):
+        with pytest.raises(ValueError):
+            with job_trace("calculo") as trace:
+                with PerformanceTimer("RECONCILIATION", "Falha"):
+                    raise ValueError("boom")
+
+        assert trace.breakdown()[0]["errors"] == 1
+        assert 'concilie_stage_errors_total{category="RECONCILIATION",task="Falha"} 1' in REGISTRY.render_prometheus()
+
+    def test_span_propaga_para_run_in_threadpool(self):
+        def trabalho():
+            with PerformanceTimer("POLARS", "Normalizar"):
+                pass
+
+        async def job():
+            with job_trace("importacao") as trace:
+                await run_in_threadpool(trabalho)
+            return trace
+
+        trace = asyncio.run(job())
+        assert [s["stage"] for s in trace.breakdown()] == ["Normalizar"]
+
+
+class TestRegistry:
+    def test_histogramas_por_categoria_e_tarefa(self):
+        with PerformanceTimer("RECORD", "Gravação Vendas (Bulk Insert)", {"rows": 1500, "contexto": "cielo"}):
+            pass
+
+        assert REGISTRY.get("duration", "RECORD", "Gravação Vendas (Bulk Insert)").count == 1
+        rows = REGISTRY.get("rows", "RECORD", "Gravação Vendas (Bulk Insert)")
+        assert rows.sum == 1500
+        assert REGISTRY.get("bytes", "RECORD", "Gravação Vendas (Bulk Insert)") is None
+
+    def test_formato_prometheus(self):
+        reg = MetricsRegistry()
+        reg.observe("IMPORT", 'Ler "x"', 0.2, rows=50)
+        reg.observe("IMPORT", 'Ler "x"', 3.0, rows=5000)
+        texto = reg.render_prometheus()
+
+        labels = 'category="IMPORT",task="Ler \\"x\\""'
+        assert "# TYPE concilie_stage_duration_seconds histogram" in texto
+        assert f'concilie_stage_duration_seconds_bucket{{{labels},le="0.25"}} 1' in texto
+        assert f'concilie_stage_duration_seconds_bucket{{{labels},le="5"}} 2' in texto
+        assert f'concilie_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in texto
+        assert f"concilie_stage_duration_seconds_count{{{labels}}} 2" in texto
+        assert f"concilie_stage_rows_sum{{{labels}}} 5050" in texto
+        assert "concilie_stage_bytes" not in texto
+
+    def test_observe_concorrente(self):
+        def observar(_):
+            for _ in range(500):
+                REGISTRY.observe("X", "y", 0.001, rows=1)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(observar, range(4)))
+
+        assert REGISTRY.get("duration", "X", "y").count == 2000
+        assert REGISTRY.get("rows", "X", "y").sum == 2000
+
+
+class TestMetricsEndpoint:
+    def test_bloqueia_cliente_nao_local(self, client):
+        # TestClient se apresenta como host "testclient"
+        assert client.get("/metrics").status_code == 403
+
+    def test_expoe_texto_prometheus(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_ALLOWED_HOSTS", "testclient")
+        with PerformanceTimer("IMPORT", "Ler"):
+            pass
+
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'concilie_stage_duration_seconds_count{category="IMPORT",task="Ler"} 1' in resp.text
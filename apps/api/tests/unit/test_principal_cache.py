@@ -0,0 +1,104 @@
+"""Testes unitários para app.core.principal_cache (usuário autenticado sem ida ao banco)."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.core import principal_cache as modulo
+from app.core.principal_cache import PrincipalCache
+from app.core.security import create_access_token
+from app.models.usuario import Usuario
+from app.models.usuario_cliente import UsuarioCliente
+from app.models.usuario_contexto import UsuarioContexto
+from app.models.usuario_permissao import UsuarioPermissao
+from app.repositories.usuario_repository import UsuarioRepository
+from app.schemas.usuario import UsuarioUpdate
+
+
+@pytest.fixture()
+def sessao(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "_cache", PrincipalCache(ttl_s=60, max_itens=2))
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    for model in (Usuario, UsuarioPermissao, UsuarioContexto, UsuarioCliente):
+        model.__table__.create(engine)
+    Sessao = sessionmaker(bind=engine)
+    with Sessao() as db:
+        db.add_all([Usuario(id=1, usuario="ana", senha="x"), Usuario(id=2, usuario="rui", senha="x")])
+        db.add(UsuarioPermissao(usuario_id=1, perfil="operador"))
+        db.commit()
+    engine.consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: engine.consultas.append(a[2]))
+    yield Sessao, engine
+    engine.dispose()
+
+
+def _usuario(Sessao, token):
+    request = MagicMock(cookies={}, query_params={})
+    with Sessao() as db:
+        user = deps.get_current_user(request, db, token)
+        return user.id, user.usuario, deps.get_user_perfil(user)
+
+
+class TestPrincipalCache:
+    def test_requisicoes_seguintes_nao_consultam_o_banco(self, sessao):
+        Sessao, engine = sessao
+        token = create_access_token(1)
+
+        assert _usuario(Sessao, token) == (1, "ana", "operador")
+        consultas = len(engine.consultas)
+        assert consultas > 0
+
+        assert _usuario(Sessao, token) == (1, "ana", "operador")
+        assert len(engine.consultas) == consultas
+
+    def test_instancia_ligada_a_sessao_da_requisicao(self, sessao):
+        Sessao, _ = sessao
+        token = create_access_token(1)
+        _usuario(Sessao, token)
+
+        with Sessao() as db:
+            user = deps.get_current_user(MagicMock(cookies={}, query_params={}), db, token)
+            user.nome = "Ana"
+            db.commit()
+        with Sessao() as db:
+            assert db.get(Usuario, 1).nome == "Ana"
+
+    def test_escritas_no_usuario_invalidam(self, sessao):
+        Sessao, engine = sessao
+        token = create_access_token(1)
+        _usuario(Sessao, token)
+
+        with Sessao() as db:
+            UsuarioRepository(db).atualizar(1, UsuarioUpdate(usuario="ana.souza"))
+        assert _usuario(Sessao, token)[1] == "ana.souza"
+
+        with Sessao() as db:
+            UsuarioRepository(db).deletar(1)
+        with pytest.raises(HTTPException) as exc:
+            _usuario(Sessao, token)
+        assert exc.value.status_code == 404
+
+    def test_ttl_exp_do_token_e_limite(self, sessao, monkeypatch):
+        Sessao, engine = sessao
+        # Token vencido nunca é servido do cache
+        vencido = create_access_token(1, expires_delta=timedelta(seconds=-1))
+        with pytest.raises(HTTPException):
+            _usuario(Sessao, vencido)
+
+        tokens = [create_access_token(1), create_access_token(2), create_access_token(1, timedelta(minutes=5))]
+        for token in tokens:
+            _usuario(Sessao, token)
+        # max_itens=2: o primeiro token saiu do cache
+        consultas = len(engine.consultas)
+        _usuario(Sessao, tokens[0])
+        assert len(engine.consultas) > consultas
+
+        monkeypatch.setattr(modulo.principal_cache(), "ttl_s", 0)
+        consultas = len(engine.consultas)
+        _usuario(Sessao, tokens[0])
+        assert len(engine.consultas) > consultas
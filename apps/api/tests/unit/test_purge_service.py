@@ -0,0 +1,144 @@
+"""Testes unitários para app.services.purge_service (exclusão de processamentos em lotes)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.arquivo_importado import ArquivoImportado
+from app.models.legacy_processamento import LegacyProcessamento
+from app.models.perda_cliente import PerdaCliente
+from app.models.purge_task import PurgeTask
+from app.models.recebiveis import Recebivel, RecebivelFiltrado
+from app.models.vendas import Venda, VendaFiltrada
+from app.models.vendas_calculos import VendasCalculos
+from app.repositories.processamento_repository import ProcessamentoRepository
+from app.services.purge_service import PurgeService
+
+MODELOS = (
+    ArquivoImportado, LegacyProcessamento, PerdaCliente, PurgeTask, Recebivel, RecebivelFiltrado,
+    Venda, VendaFiltrada, VendasCalculos,
+)
+
+
+@pytest.fixture()
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 3)
+    engine = create_engine(f"sqlite:///{tmp_path / 'purge.db'}")
+    for model in MODELOS:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for pid in ("P1", "P2"):
+        session.add(LegacyProcessamento(id_processamento=pid, data_processamento=datetime(2026, 1, 1)))
+        for i in range(7):
+            venda = Venda(processamentoid=pid, ec_id=100)
+            session.add(venda)
+            session.flush()
+            session.add(VendasCalculos(calc_id=pid, calc_tipo="log_mensal", id_venda=venda.id, ec_id=100, perda=1))
+        session.add_all([VendaFiltrada(processamentoid=pid) for _ in range(4)])
+        session.add_all([Recebivel(processamentoid=pid) for _ in range(5)])
+        session.add(ArquivoImportado(processamento_id=pid, sha256="ab" * 32, tipo_arquivo="V"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _contar(db, model, **filtro):
+    return db.query(model).filter_by(**filtro).count()
+
+
+class TestPurgeService:
+    def test_exclui_em_lotes_e_reporta_progresso(self, db):
+        # Cálculo com calc_id próprio sobre vendas do P1: sai pela venda de origem
+        venda = db.query(Venda).filter_by(processamentoid="P1").first()
+        db.add(VendasCalculos(calc_id="C9", calc_tipo="log_anual", id_venda=venda.id, ec_id=100, perda=1))
+        db.commit()
+
+        ProcessamentoRepository(db).marcar_exclusao(["P1"])
+        service = PurgeService(db)
+        task = service.criar_task("P1")
+        service.executar(task)
+
+        assert task.status == "SUCCESS" and task.progress == 100
+        assert task.metadata_json["removidos"]["vendas_processadas"] == 7
+        assert task.metadata_json["removidos"]["vendas_calculos_por_venda"] == 1
+        assert task.metadata_json["calculos_afetados"] == [["C9", "log_anual"], ["P1", "log_mensal"]]
+        assert task.metadata_json["removidos"] == task.metadata_json["totais"]
+        assert _contar(db, Venda, processamentoid="P1") == 0
+        assert _contar(db, VendasCalculos, calc_id="P1") == 0
+        assert db.get(LegacyProcessamento, "P1") is None
+        assert _contar(db, ArquivoImportado, processamento_id="P1") == 0
+        # O outro processamento fica intacto
+        assert _contar(db, Venda, processamentoid="P2") == 7
+        assert _contar(db, VendasCalculos, calc_id="P2") == 7
+        assert _contar(db, ArquivoImportado, processamento_id="P2") == 1
+
+    def test_retoma_apos_interrupcao(self, db, monkeypatch):
+        service = PurgeService(db)
+        task = service.criar_task("P1")
+        original = PurgeService._atualizar_progresso
+        chamadas = {"n": 0}
+
+        def interromper(self, *args):
+            chamadas["n"] += 1
+            if chamadas["n"] == 5:
+                raise RuntimeError("conexão perdida")
+            return original(self, *args)
+
+        monkeypatch.setattr(PurgeService, "_atualizar_progresso", interromper)
+        with pytest.raises(RuntimeError):
+            service.executar(task)
+        db.rollback()
+        assert 0 < sum(task.metadata_json["removidos"].values()) < sum(task.metadata_json["totais"].values())
+
+        monkeypatch.setattr(PurgeService, "_atualizar_progresso", original)
+        # Worker que executava ainda com lease em dia: não é retomada
+        assert service.retomar_pendentes() == []
+        task.heartbeat = datetime.now() - timedelta(seconds=settings.PURGE_LEASE_S + 1)
+        db.commit()
+        assert service.retomar_pendentes() == [task.id]
+        service.executar(task)
+
+        assert task.status == "SUCCESS"
+        assert task.metadata_json["removidos"] == task.metadata_json["totais"]
+        assert _contar(db, VendasCalculos, calc_id="P1") == 0
+
+
+class TestLease:
+    def test_um_unico_worker_reivindica_a_task(self, db):
+        service = PurgeService(db)
+        task = service.criar_task("P1")
+
+        assert service.reivindicar(task.id, dono="w1")
+        assert not service.reivindicar(task.id, dono="w2")
+        db.refresh(task)
+        assert (task.status, task.owner) == ("PROCESSING", "w1")
+        assert service.em_execucao(task)
+
+        # Lease vencido (worker caiu): outro assume
+        task.heartbeat = datetime.now() - timedelta(seconds=settings.PURGE_LEASE_S + 1)
+        db.commit()
+        assert not service.em_execucao(task)
+        assert service.reivindicar(task.id, dono="w2")
+        db.refresh(task)
+        assert task.owner == "w2"
+
+    def test_concluida_nao_e_reivindicada(self, db):
+        service = PurgeService(db)
+        task = service.criar_task("P1")
+        service.executar(task)
+        assert task.status == "SUCCESS"
+        assert not service.reivindicar(task.id)
+
+
+class TestMarcarExclusao:
+    def test_processamento_some_da_listagem(self, db):
+        repo = ProcessamentoRepository(db)
+        assert repo.marcar_exclusao(["P1"]) == 1
+
+        ids = [p.id for p in repo.listar(simple=True)]
+        assert ids == ["P2"]
+        assert db.get(LegacyProcessamento, "P1").status == "deleting"
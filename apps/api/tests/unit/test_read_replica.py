@@ -0,0 +1,68 @@
+"""Testes unitários para o roteamento leitura/escrita de app.core.database (réplica de leitura)."""
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import RoutingSession, engine_leitura, ler_da_replica
+from app.models.usuario import Usuario
+
+
+@pytest.fixture()
+def bancos(tmp_path):
+    """Primário e uma "réplica" com dados diferentes, para saber de onde veio cada leitura."""
+    primario = create_engine(f"sqlite:///{tmp_path / 'primario.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, nome in ((primario, "primario"), (replica, "replica")):
+        Usuario.__table__.create(engine)
+        with engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {"id": 1, "usuario": nome, "senha": "x"})
+    Sessao = sessionmaker(class_=RoutingSession, autoflush=False, bind=primario, leitura=replica)
+    yield Sessao, primario, replica
+    primario.dispose()
+    replica.dispose()
+
+
+def _nome(db):
+    return db.execute(select(Usuario.usuario).where(Usuario.id == 1)).scalar_one()
+
+
+class TestRoteamento:
+    def test_sessao_marcada_le_da_replica(self, bancos):
+        Sessao, _, replica = bancos
+        with Sessao() as db:
+            assert _nome(db) == "primario"
+            ler_da_replica(db)
+            assert _nome(db) == "replica"
+            assert db.execute(text("SELECT count(*) FROM usuarios")).scalar_one() == 1
+            assert engine_leitura(db) is replica
+
+    def test_escrita_fixa_a_sessao_no_primario(self, bancos):
+        Sessao, primario, _ = bancos
+        with Sessao() as db:
+            ler_da_replica(db)
+            db.add(Usuario(id=2, usuario="novo", senha="x"))
+            db.commit()
+            # Read-your-writes: a linha recém-gravada não existe na réplica
+            assert db.execute(select(Usuario.usuario).where(Usuario.id == 2)).scalar_one() == "novo"
+            assert engine_leitura(db) is primario
+
+        with Sessao() as db:
+            ler_da_replica(db)
+            db.execute(text("UPDATE usuarios SET usuario = 'alterado' WHERE id = 1"))
+            assert _nome(db) == "alterado"
+
+    def test_select_for_update_vai_ao_primario(self, bancos):
+        Sessao, _, _ = bancos
+        with Sessao() as db:
+            ler_da_replica(db)
+            assert db.execute(select(Usuario.usuario).with_for_update()).scalar_one() == "primario"
+            assert _nome(db) == "primario"
+
+    def test_sem_replica_configurada(self, bancos):
+        _, primario, _ = bancos
+        Sessao = sessionmaker(class_=RoutingSession, bind=primario)
+        with Sessao() as db:
+            ler_da_replica(db)
+            assert _nome(db) == "primario"
+            assert engine_leitura(db) is primario
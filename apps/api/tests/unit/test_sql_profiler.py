@@ -0,0 +1,88 @@
+"""Testes unitários para app.core.sql_profiler."""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.sql_profiler import SqlProfiler, fingerprint, fingerprint_id
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'prof.db'}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE vendas (id INTEGER PRIMARY KEY, ec_id TEXT, valor REAL)"))
+        conn.execute(
+            text("INSERT INTO vendas (ec_id, valor) VALUES (:ec, :v)"),
+            [{"ec": f"{i % 5}", "v": i * 1.5} for i in range(50)],
+        )
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture()
+def profiler(engine):
+    prof = SqlProfiler(slow_ms=10_000, explain=True)
+    prof.instalar(engine)
+    yield prof
+    prof.desinstalar()
+
+
+class TestFingerprint:
+    def test_literais_e_parametros_viram_placeholder(self):
+        a = fingerprint("SELECT * FROM vendas WHERE ec_id = '123' AND valor > 10.5 -- comentário")
+        b = fingerprint("select *  from vendas\n WHERE ec_id = :ec AND valor > ?")
+        assert a == b == "select * from vendas where ec_id = ? and valor > ?"
+
+    def test_listas_in_e_values_colapsam(self):
+        assert fingerprint("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == fingerprint("SELECT 1 FROM t WHERE id IN (%s)")
+        assert fingerprint("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')") == "insert into t (a, b) values (?+)"
+
+    def test_preserva_digitos_em_identificadores(self):
+        assert fingerprint('SELECT "col2", t1.x FROM tab_2024 t1') == 'select "col2", t1.x from tab_2024 t1'
+
+
+class TestSqlProfiler:
+    def test_agrega_por_fingerprint(self, engine, profiler):
+        with engine.connect() as conn:
+            for ec in ("1", "2", "3"):
+                conn.execute(text("SELECT * FROM vendas WHERE ec_id = :ec"), {"ec": ec}).fetchall()
+            conn.execute(text("UPDATE vendas SET valor = valor WHERE ec_id = '1'"))
+
+        resumo = {q["fingerprint"]: q for q in profiler.resumo(ordenar="count")}
+        select = resumo["select * from vendas where ec_id = ?"]
+        assert select["count"] == 3
+        assert select["p95_ms"] >= select["media_ms"] * 0.5
+        assert resumo["update vendas set valor = valor where ec_id = ?"]["rows"] == 10
+        assert profiler.totais()["execucoes"] == 4
+
+    def test_max_por_requisicao_aponta_n_mais_1(self, engine, profiler):
+        with profiler.escopo_requisicao():
+            with engine.connect() as conn:
+                for i in range(7):
+                    conn.execute(text("SELECT valor FROM vendas WHERE id = :id"), {"id": i}).fetchall()
+        with profiler.escopo_requisicao():
+            with engine.connect() as conn:
+                conn.execute(text("SELECT valor FROM vendas WHERE id = :id"), {"id": 1}).fetchall()
+
+        topo = profiler.resumo(ordenar="n_mais_1", limite=1)[0]
+        assert topo["fingerprint"] == "select valor from vendas where id = ?"
+        assert topo["max_por_requisicao"] == 7
+
+    def test_explain_da_query_lenta(self, engine, profiler):
+        profiler.slow_s = 0.0
+        with engine.connect() as conn:
+            conn.execute(text("SELECT SUM(valor) FROM vendas WHERE ec_id = :ec"), {"ec": "2"}).fetchall()
+        profiler.aguardar_explains()
+
+        fp = "select sum(valor) from vendas where ec_id = ?"
+        detalhe = profiler.detalhe(fingerprint_id(fp))
+        assert detalhe["lentas"] == 1
+        assert "SCAN" in str(detalhe["explain"]["plano"]).upper()
+        # As queries do próprio EXPLAIN não entram nas estatísticas
+        assert not any(q["fingerprint"].startswith("explain") for q in profiler.resumo(limite=100))
+
+    def test_reset(self, engine, profiler):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1")).fetchall()
+        profiler.reset()
+        assert profiler.resumo() == []
@@ -0,0 +1,87 @@
+"""Testes unitários para conf.sqlite_escrita (escritor serializado, lotes e carga em massa no SQLite)."""
+
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from conf import funcoesbd, sqlite_escrita
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'escrita.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE vendas (id INTEGER PRIMARY KEY, nsu TEXT, valor REAL)"))
+        conn.execute(text("CREATE INDEX ix_vendas_nsu ON vendas (nsu)"))
+        conn.execute(text("CREATE UNIQUE INDEX ux_vendas_valor ON vendas (valor)"))
+    yield engine
+    engine.dispose()
+
+
+def _indices(engine):
+    with engine.connect() as conn:
+        return set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'vendas'")).scalars())
+
+
+def _estatisticas(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM sqlite_stat1 WHERE tbl = 'vendas'")).scalar_one()
+
+
+class TestCargaEmMassa:
+    def test_adia_indices_secundarios_e_roda_analyze(self, engine):
+        with sqlite_escrita.carga_em_massa(engine, ["vendas"]):
+            # Índice único continua valendo durante a carga
+            assert _indices(engine) == {"ux_vendas_valor"}
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO vendas (nsu, valor) VALUES ('1', 10), ('2', 20)"))
+
+        assert _indices(engine) == {"ix_vendas_nsu", "ux_vendas_valor"}
+        assert _estatisticas(engine) > 0
+
+    def test_falha_na_carga_recria_indices(self, engine):
+        with pytest.raises(RuntimeError):
+            with sqlite_escrita.carga_em_massa(engine, ["vendas"]):
+                raise RuntimeError("arquivo inválido")
+        assert "ix_vendas_nsu" in _indices(engine)
+
+    def test_restaura_indices_de_carga_interrompida(self, engine):
+        carga = sqlite_escrita.carga_em_massa(engine, ["vendas"])
+        carga.__enter__()  # processo "caiu" antes do __exit__
+        assert "ix_vendas_nsu" not in _indices(engine)
+
+        assert sqlite_escrita.restaurar_indices(engine) == 1
+        assert "ix_vendas_nsu" in _indices(engine)
+        assert sqlite_escrita.restaurar_indices(engine) == 0
+        carga.__exit__(None, None, None)
+
+
+class TestGravacaoEmLotes:
+    def test_lotes_grandes_e_carga_acima_do_limite(self, engine, monkeypatch):
+        monkeypatch.setattr(sqlite_escrita, "LOTE_ESCRITA", 4)
+        monkeypatch.setattr(sqlite_escrita, "CARGA_MIN_LINHAS", 5)
+        commits = []
+        df = pd.DataFrame({"nsu": [str(i) for i in range(7)], "valor": [float(i) for i in range(7)]})
+
+        inseridas = funcoesbd._gravar_em_lotes(
+            engine, df, "vendas", method="multi", progress_callback=lambda pct, msg: commits.append(pct),
+            rotulo="vendas", chunksize=2,
+        )
+
+        assert inseridas == 7
+        assert commits == [57, 100]
+        assert _indices(engine) == {"ix_vendas_nsu", "ux_vendas_valor"}
+        assert _estatisticas(engine) > 0
+
+    def test_escritor_serializa_gravacoes_no_mesmo_arquivo(self, engine):
+        escritor = sqlite_escrita.escritor(engine)
+        assert escritor is sqlite_escrita.escritor(create_engine(engine.url))
+
+        dentro = []
+        with escritor:
+            thread = threading.Thread(target=lambda: dentro.append(escritor.acquire(timeout=0.1)))
+            thread.start()
+            thread.join()
+        assert dentro == [False]
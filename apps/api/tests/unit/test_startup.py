@@ -0,0 +1,82 @@
+"""Testes de startup: bibliotecas pesadas fora do import da API e create_all só quando necessário."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core import database
+
+_API_DIR = Path(__file__).resolve().parents[2]
+
+# Carregadas só no primeiro uso (relatórios, cálculo, importação, conversor, IA)
+PESADAS = (
+    "pandas", "polars", "numpy", "pyarrow", "plotly", "panel", "openpyxl", "weasyprint",
+    "kaleido", "langchain_openai", "langchain_community", "openai", "httpx", "jinja2",
+    "modules.reports", "proc.proc_importacao",
+)
+
+
+def _perfil_import(modulo: str):
+    """[(microssegundos acumulados, módulo)] de ``python -X importtime -c 'import <modulo>'``."""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=_API_DIR, env=dict(os.environ), capture_output=True, text=True, timeout=120,
+    )
+    assert resultado.returncode == 0, resultado.stderr[-2000:]
+    perfil = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        perfil.append((int(acumulado), nome.strip()))
+    return perfil
+
+
+class TestImportDaApi:
+    def test_startup_nao_carrega_bibliotecas_pesadas(self):
+        perfil = _perfil_import("app.main")
+        carregados = {nome for _, nome in perfil}
+
+        mais_lentos = "\n".join(f"{us / 1000:8.1f} ms  {nome}" for us, nome in sorted(perfil, reverse=True)[:15])
+        assert "app.main" in carregados
+        assert carregados.isdisjoint(PESADAS), (
+            f"Importadas no startup: {sorted(carregados & set(PESADAS))}\n{mais_lentos}"
+        )
+
+
+class TestInitDb:
+    @pytest.fixture()
+    def engine(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        monkeypatch.setattr(database, "engine", engine)
+        yield engine
+        engine.dispose()
+
+    def _versao(self, engine, versao):
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM alembic_version"))
+            conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": versao})
+
+    def test_head_do_alembic_dispensa_create_all(self, engine):
+        heads = database._heads_alembic()
+        assert len(heads) == 1
+
+        self._versao(engine, heads.pop())
+        database.init_db()
+
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+
+    def test_revisao_antiga_ou_banco_sem_alembic_cria_tabelas(self, engine):
+        self._versao(engine, "0001")
+        database.init_db()
+        assert "usuarios" in inspect(engine).get_table_names()
+
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+        assert not database.schema_na_head(engine)
@@ -0,0 +1,128 @@
+"""Testes unitários para app.services.taxas_snapshot (taxas normalizadas em memória)."""
+
+from datetime import date
+
+import polars as pl
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.taxa import Taxa
+from app.models.taxa_contratada import TaxaContratada
+from app.models.taxas_versao import TaxasVersao
+from app.repositories.taxas_repository import TaxasRepository
+from app.schemas.taxa import TaxaUpdate
+from app.schemas.taxa_contratada import TaxaContratadaCreate
+from app.services import taxa_contratada_service
+from app.services import taxas_snapshot as modulo
+from app.services.taxas_snapshot import TaxasSnapshot
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'taxas.db'}")
+    Taxa.__table__.create(engine)
+    TaxaContratada.__table__.create(engine)
+    TaxasVersao.__table__.create(engine)
+    engine.consultas = []
+    event.listen(engine, "before_cursor_execute", lambda *a: engine.consultas.append(a[2]))
+    with engine.begin() as conn:
+        conn.execute(Taxa.__table__.insert(), [
+            _taxa("10", "Visa", "Crédito à Vista", 1.5, "cielo"),
+            _taxa("10", None, "Débito", 0.9, "padrao"),
+            _taxa("20", "Master", "Crédito", 2.1, "Padrao"),
+            _taxa("30", "Elo", "Débito", 1.1, None),
+        ])
+        conn.execute(TaxaContratada.__table__.insert(), [
+            {"cliente_id": 7, "bandeira": " VISA ", "modalidade": "Crédito à Vista",
+             "taxa_contratada": 1.2, "vigencia_inicio": date(2024, 1, 1), "vigencia_fim": None},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def _taxa(ec, bandeira, forma, taxa, contexto):
+    return {
+        "ec": ec, "bandeira": bandeira, "forma_pagamento": forma, "parcelado": "N", "parcelas_ini": 1,
+        "parcelas_fim": 1, "data_ini": date(2024, 1, 1), "data_fim": date(2024, 12, 31), "taxa": taxa,
+        "contexto": contexto,
+    }
+
+
+def _leituras(engine, tabela):
+    return sum(1 for sql in engine.consultas if f"FROM {tabela} " in sql)
+
+
+class TestTaxasSnapshot:
+    def test_so_busca_particoes_que_faltam(self, engine):
+        snapshot = TaxasSnapshot(ttl_s=300)
+
+        df = snapshot.taxas(engine, ["10", "20", "99"])
+        assert sorted(df["ec_str"].to_list()) == ["10", "10", "20"]
+        visa = df.filter(pl.col("bandeira_clean") == "visa").row(0, named=True)
+        assert visa["forma_pgto_clean"] == "credito a vista" and visa["contexto_clean"] == "cielo"
+        assert visa["data_ini"] == date(2024, 1, 1) and visa["taxa"] == 1.5
+        assert df.filter(pl.col("forma_pgto_clean") == "debito")["bandeira_clean"].to_list() == ["desconhecida"]
+        assert _leituras(engine, "taxas") == 1
+
+        # EC sem taxas (99) também fica no snapshot; só o 30 é novo
+        df = snapshot.taxas(engine, [10, "30", "99"])
+        assert sorted(df["ec_str"].to_list()) == ["10", "10", "30"]
+        assert df.filter(pl.col("ec_str") == "30")["contexto_clean"].to_list() == [None]
+        assert _leituras(engine, "taxas") == 2
+        assert snapshot.taxas(engine, ["99"]).schema == pl.Schema(modulo.SCHEMA_TAXAS)
+        assert _leituras(engine, "taxas") == 2
+
+    def test_invalidar_e_ttl_releem_do_banco(self, engine):
+        snapshot = TaxasSnapshot(ttl_s=300)
+        snapshot.taxas(engine, ["20"])
+        with engine.begin() as conn:
+            conn.execute(Taxa.__table__.insert(), [_taxa("20", "Elo", "Débito", 1.0, "padrao")])
+        assert len(snapshot.taxas(engine, ["20"])) == 1
+
+        snapshot.invalidar()
+        assert len(snapshot.taxas(engine, ["20"])) == 2
+
+        sem_cache = TaxasSnapshot(ttl_s=0)
+        sem_cache.taxas(engine, ["20"])
+        sem_cache.taxas(engine, ["20"])
+        assert _leituras(engine, "taxas") == 4
+
+    def test_contratadas_por_cliente_e_invalidacao_pelo_crud(self, engine, monkeypatch):
+        snapshot = TaxasSnapshot(ttl_s=300)
+        monkeypatch.setattr(modulo, "_snapshot", snapshot)
+
+        df = snapshot.taxas_contratadas(engine, 7)
+        assert df.row(0, named=True)["bandeira_clean"] == "visa"
+        assert df.row(0, named=True)["forma_pgto_clean"] == "credito a vista"
+        assert snapshot.taxas_contratadas(engine, 8).is_empty()
+        snapshot.taxas_contratadas(engine, 7)
+        assert _leituras(engine, "taxas_contratadas") == 2
+
+        with sessionmaker(bind=engine)() as db:
+            taxa_contratada_service.criar(7, TaxaContratadaCreate(
+                bandeira="Master", modalidade="Débito", taxa_contratada=0.8, vigencia_inicio=date(2024, 1, 1),
+            ), db)
+        assert snapshot.versao == 1
+        assert len(snapshot.taxas_contratadas(engine, 7)) == 2
+
+    def test_escrita_em_outro_worker_invalida_pela_versao_do_banco(self, engine, monkeypatch):
+        worker_a, worker_b = TaxasSnapshot(ttl_s=300), TaxasSnapshot(ttl_s=300)
+        assert worker_b.taxas(engine, ["20"])["taxa"].to_list() == [2.1]
+        worker_b.taxas_contratadas(engine, 7)
+
+        # CRUD atendido pelo worker A: só o snapshot dele é invalidado em memória
+        monkeypatch.setattr(modulo, "_snapshot", worker_a)
+        with sessionmaker(bind=engine)() as db:
+            taxa_id = db.query(Taxa.id).filter(Taxa.ec == "20").scalar()
+            assert TaxasRepository(db).atualizar(taxa_id, TaxaUpdate(taxa=1.9))
+            assert db.query(TaxasVersao.versao).scalar() == 1
+
+        assert worker_b.taxas(engine, ["20"])["taxa"].to_list() == [1.9]
+        leituras = _leituras(engine, "taxas_contratadas")
+        worker_b.taxas_contratadas(engine, 7)
+        assert _leituras(engine, "taxas_contratadas") == leituras + 1
+        # Versão inalterada: volta a servir da memória
+        leituras = _leituras(engine, "taxas")
+        worker_b.taxas(engine, ["20"])
+        assert _leituras(engine, "taxas") == leituras
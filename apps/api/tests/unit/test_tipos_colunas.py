@@ -0,0 +1,62 @@
+"""Testes unitários para conf.tipos_colunas (Categorical/Enum nas colunas de baixa cardinalidade)."""
+
+from datetime import datetime
+
+import pandas as pd
+import polars as pl
+import pytest
+
+from conf.tipos_colunas import categorizar_polars, decodificar_pandas, decodificar_polars
+
+from app.services.reconciliation_core import ReconciliationCore
+
+
+class TestConversao:
+    def test_categoriza_so_as_colunas_declaradas(self):
+        df = pl.DataFrame({
+            "Bandeira": ["Visa", "Elo", None], "calc_origem": ["cad", None, "log"],
+            "NSU": ["1", "2", "3"], "bandeira_clean": ["visa", "elo", None],
+        })
+
+        tipado = categorizar_polars(df, ["Bandeira", "calc_origem", "NSU"])
+
+        assert tipado.schema["Bandeira"] == pl.Categorical
+        assert isinstance(tipado.schema["calc_origem"], pl.Enum)
+        assert tipado.schema["NSU"] == pl.String
+        assert tipado.schema["bandeira_clean"] == pl.String
+        assert categorizar_polars(df.lazy()).collect_schema()["bandeira_clean"] == pl.Categorical
+        assert decodificar_polars(tipado).equals(df)
+
+    def test_enum_recusa_valor_fora_do_dominio(self):
+        with pytest.raises(pl.exceptions.InvalidOperationError):
+            categorizar_polars(pl.DataFrame({"calc_origem": ["manual"]}))
+
+    def test_decodificar_pandas_devolve_none_nos_nulos(self):
+        df = categorizar_polars(pl.DataFrame({"bandeira": ["Visa", None]})).to_pandas()
+        assert isinstance(df["bandeira"].dtype, pd.CategoricalDtype)
+
+        assert decodificar_pandas(df)["bandeira"].tolist() == ["Visa", None]
+
+
+class TestMotor:
+    def test_cenario_agrupa_por_codigos(self):
+        vendas = pl.DataFrame({
+            "id_venda": [1, 2, 3], "Bandeira": ["Visa", "Visa", "Elo"],
+            "Forma_de_pagamento": ["Crédito"] * 3, "Adquirente": ["Cielo"] * 3,
+            "arquivo_origem": ["a.csv"] * 3, "NSU": ["1", "2", "3"], "cod_autor_orig": ["X"] * 3,
+            "Data_da_venda": pl.Series(["2024-01-05", "2024-01-20", "2024-01-07"]).str.to_date(),
+            "ec_id": ["10"] * 3, "Valor_da_venda": [100.0] * 3, "Valor_líquido_da_venda": [98.0, 98.5, 97.0],
+            "Taxas_Perc": [2.0, 1.5, 3.0], "Valor_descontado": [-2.0, -1.5, -3.0], "Taxas_RR": [0.0] * 3,
+            "Valor_RR": [0.0] * 3, "bandeira_clean": ["visa", "visa", "elo"], "forma_pgto_clean": ["credito"] * 3,
+            "adquirente_clean": ["cielo"] * 3, "tx_calc": [None, None, None], "tx_rr_calc": [None, None, None],
+            "calc_origem": [None, None, None],
+        }, schema_overrides={"tx_calc": pl.Float64, "tx_rr_calc": pl.Float64, "calc_origem": pl.String})
+
+        final = ReconciliationCore._calcular_cenario(
+            categorizar_polars(vendas), "log_mensal", "C1", False, datetime(2024, 2, 1)
+        )
+
+        assert final["tx_calc"].to_list() == [1.5, 1.5, 3.0]
+        assert final.schema["bandeira"] == pl.Categorical
+        assert isinstance(final.schema["calc_origem"], pl.Enum)
+        assert final["calc_origem"].cast(pl.String).to_list() == ["log"] * 3
@@ -0,0 +1,91 @@
+"""Testes unitários para app.services.upload_store (arquivo repetido no mesmo processamento)."""
+
+import hashlib
+import io
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.arquivo_importado import ArquivoImportado
+from app.services import import_service
+from app.services.import_service import ImportService
+from app.services.upload_store import hash_arquivo, salvar_com_hash
+
+CONTEUDO_JAN = b"Data;Valor\n01/01/2024;10,00\n"
+CONTEUDO_FEV = b"Data;Valor\n01/02/2024;20,00\n"
+
+
+@pytest.fixture()
+def service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "IMPORT_SPILL_ENABLED", False)
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    ArquivoImportado.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    service = ImportService(session)
+    service.temp_dir = tmp_path
+    yield service
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture()
+def gravacoes(monkeypatch):
+    """Leitura e gravação do legado substituídas: registra quais arquivos chegaram ao INSERT."""
+    arquivos = []
+    monkeypatch.setattr(import_service, "preparar_dataframe_de_arquivo", lambda path, **kwargs: (path, {}, 0))
+
+    def gravar(**kwargs):
+        arquivos.append(kwargs["arquivo_origem"])
+        return {"processadas": 3, "filtradas": 1, "total": 4, "processamentoid": kwargs["processamentoid"] or "P1"}
+
+    monkeypatch.setattr(import_service, "classificar_e_gravar_vendas", gravar)
+    return arquivos
+
+
+def _lote(service, nome, **arquivos):
+    batch_dir = service.temp_dir / nome
+    batch_dir.mkdir()
+    for arquivo, conteudo in arquivos.items():
+        salvar_com_hash(io.BytesIO(conteudo), batch_dir / f"{arquivo}.csv")
+    return nome
+
+
+def _confirmar(service, lote, processamentoid=None):
+    return service.confirm_import_v2(lote, 1, "100", "CIELO", "V", "teste", processamentoid=processamentoid)["data"]
+
+
+class TestUploadStore:
+    def test_hash_calculado_na_gravacao(self, tmp_path):
+        destino = tmp_path / "a.csv"
+        digest = salvar_com_hash(io.BytesIO(CONTEUDO_JAN), destino)
+
+        assert digest == hashlib.sha256(CONTEUDO_JAN).hexdigest()
+        assert destino.read_bytes() == CONTEUDO_JAN
+        assert hash_arquivo(destino) == digest
+
+    def test_reimportacao_no_mesmo_processamento_e_ignorada(self, service, gravacoes):
+        primeiro = _confirmar(service, _lote(service, "l1", jan=CONTEUDO_JAN))
+        assert primeiro["processamentoid"] == "P1" and gravacoes == ["jan.csv"]
+
+        # Mesmo export renomeado + um arquivo novo, no mesmo processamento
+        dados = _confirmar(service, _lote(service, "l2", jan_de_novo=CONTEUDO_JAN, fev=CONTEUDO_FEV), "P1")
+
+        assert gravacoes == ["jan.csv", "fev.csv"]
+        assert (dados["files_processed"], dados["files_skipped"], dados["processadas"]) == (1, 1, 3)
+        decisoes = {d["arquivo"]: d for d in dados["arquivos"]}
+        assert decisoes["fev.csv"]["decisao"] == "importado"
+        assert decisoes["jan_de_novo.csv"]["decisao"] == "duplicado"
+        assert decisoes["jan_de_novo.csv"]["importado_como"] == "jan.csv"
+        assert decisoes["jan_de_novo.csv"]["linhas_importadas"] == 4
+
+    def test_duplicado_no_mesmo_lote_e_outro_processamento(self, service, gravacoes):
+        dados = _confirmar(service, _lote(service, "l1", a=CONTEUDO_JAN, b=CONTEUDO_JAN))
+        assert (dados["files_processed"], dados["files_skipped"]) == (1, 1)
+
+        # Outro processamento não contém o arquivo: importa normalmente
+        dados = _confirmar(service, _lote(service, "l2", a=CONTEUDO_JAN), "P2")
+        assert (dados["files_processed"], dados["files_skipped"]) == (1, 0)
+        assert len(gravacoes) == 2
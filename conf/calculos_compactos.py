@@ -0,0 +1,118 @@
+"""
+Layout compacto (opcional) de ``vendas_calculos``.
+
+Com a migração 0009 aplicada sob ``VENDAS_CALCULOS_COMPACTO=true``, os textos
+repetidos em toda linha (bandeira, forma de pagamento, adquirente, arquivo de
+origem, usuário e origem do cálculo) vão para tabelas de dimensão pequenas e a
+tabela física ``vendas_calculos_fato`` guarda só as chaves inteiras.
+``vendas_calculos`` vira uma view com as colunas de sempre: leituras e UPDATEs
+das colunas do cálculo (``tx_calc``, ``perda``...) não mudam.
+
+INSERT e DELETE vão para a tabela física: ``gravar_calculos`` e
+``tabela_calculos``. Valores de dimensão são imutáveis (a view não os altera).
+
+O layout é detectado pela existência da tabela física, uma vez por banco;
+depois de aplicar/reverter a migração com a API no ar, reinicie os processos.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Dict
+
+from sqlalchemy import bindparam, inspect, text
+
+if TYPE_CHECKING:  # pandas só entra quando há cálculo a gravar (tabela_calculos é usada no startup)
+    import pandas as pd
+
+TABELA_VISAO = "vendas_calculos"
+TABELA_FATO = "vendas_calculos_fato"
+
+# Coluna da view → tabela de dimensão (na física: <coluna>_id)
+DIMENSOES: Dict[str, str] = {
+    "bandeira": "dim_bandeiras",
+    "forma_pagamento": "dim_formas_pagamento",
+    "adquirente": "dim_adquirentes",
+    "arquivo_origem": "dim_arquivos_origem",
+    "calc_usuario": "dim_usuarios_calculo",
+    "calc_origem": "dim_origens_calculo",
+}
+
+# Linha semeada em toda dimensão para o valor nulo (a view usa INNER JOIN)
+ID_NULO = 1
+
+_ativo: Dict[str, bool] = {}
+_lock = threading.Lock()
+
+
+def _conexao(bind):
+    """Connection de uma Session/Connection/Engine (Engine é devolvido como está)."""
+    if hasattr(bind, "get_bind"):
+        return bind.connection()
+    return bind
+
+
+def compacto_ativo(bind) -> bool:
+    """True se o banco de ``bind`` está no layout compacto (cache por URL)."""
+    conn = _conexao(bind)
+    engine = getattr(conn, "engine", conn)
+    chave = engine.url.render_as_string(hide_password=True)
+    with _lock:
+        if chave not in _ativo:
+            _ativo[chave] = inspect(conn).has_table(TABELA_FATO)
+        return _ativo[chave]
+
+
+def limpar_cache() -> None:
+    """Esquece o layout detectado (após aplicar/reverter a migração no mesmo processo)."""
+    with _lock:
+        _ativo.clear()
+
+
+def tabela_calculos(bind) -> str:
+    """Tabela para INSERT/DELETE de cálculos: a física no layout compacto, senão ``vendas_calculos``."""
+    return TABELA_FATO if compacto_ativo(bind) else TABELA_VISAO
+
+
+def _ids_dimensao(conn, tabela: str, valores) -> Dict[str, int]:
+    """id de cada valor (não nulo) na dimensão, incluindo os que ainda não existiam."""
+    chaves = {str(v).encode("utf-8"): v for v in valores}
+    if not chaves:
+        return {}
+    consulta = text(f"SELECT id, chave FROM {tabela} WHERE chave IN :chaves").bindparams(
+        bindparam("chaves", expanding=True)
+    )
+    ids = {bytes(c): i for i, c in conn.execute(consulta, {"chaves": list(chaves)})}
+    novas = [c for c in chaves if c not in ids]
+    if novas:
+        # Outro cálculo pode inserir o mesmo valor ao mesmo tempo: ignora duplicata e relê
+        ignorar = "OR IGNORE" if conn.dialect.name == "sqlite" else "IGNORE"
+        conn.execute(
+            text(f"INSERT {ignorar} INTO {tabela} (valor, chave) VALUES (:valor, :chave)"),
+            [{"valor": str(chaves[c]), "chave": c} for c in novas],
+        )
+        ids.update({bytes(c): i for i, c in conn.execute(consulta, {"chaves": novas})})
+    return {v: ids[c] for c, v in chaves.items()}
+
+
+def codificar_dimensoes(conn, df: pd.DataFrame) -> pd.DataFrame:
+    """Troca as colunas de dimensão de ``df`` por ``<coluna>_id`` (cópia; cria valores novos)."""
+    df = df.copy()
+    for coluna, tabela in DIMENSOES.items():
+        if coluna not in df.columns:
+            continue
+        valores = df[coluna].astype(object).where(df[coluna].notna(), None)
+        ids = _ids_dimensao(conn, tabela, [v for v in valores.unique() if v is not None])
+        df[f"{coluna}_id"] = valores.map(lambda v: ID_NULO if v is None else ids[v]).astype("int64")
+        df = df.drop(columns=[coluna])
+    return df
+
+
+def gravar_calculos(conn, df: pd.DataFrame, chunksize: int = 10000) -> None:
+    """Anexa linhas de cálculo (colunas de ``vendas_calculos``) no layout em uso."""
+    from conf.tipos_colunas import decodificar_pandas
+
+    df = decodificar_pandas(df)
+    if compacto_ativo(conn):
+        df = codificar_dimensoes(conn, df)
+    df.to_sql(tabela_calculos(conn), con=conn, if_exists="append", index=False, chunksize=chunksize)
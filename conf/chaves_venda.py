@@ -0,0 +1,86 @@
+"""
+Chaves normalizadas de ``vendas_processadas`` (``bandeira_key``, ``forma_key``,
+``adquirente_key``).
+
+São o valor de ``Bandeira``/``Forma_de_pagamento``/``Adquirente`` já no formato
+usado nos joins com as tabelas de taxas (nulo → "desconhecida", minúsculas,
+sem espaços nas pontas e sem acentos — o mesmo ``_normalize_str`` do motor de
+reconciliação). Gravadas na importação (``vendas_processadas_bulk_insert``) e
+mantidas pelas correções; o cálculo não precisa normalizar milhões de linhas.
+
+Linhas sem chave (gravadas por caminho antigo) são completadas por
+``preencher_chaves`` — um UPDATE por valor distinto, não por linha.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Dict, Optional
+
+from sqlalchemy import text
+
+if TYPE_CHECKING:  # correções usam só normalizar_chave; pandas fica fora do startup
+    import pandas as pd
+
+# Coluna de origem → coluna da chave
+COLUNAS_CHAVE: Dict[str, str] = {
+    "Bandeira": "bandeira_key",
+    "Forma_de_pagamento": "forma_key",
+    "Adquirente": "adquirente_key",
+}
+
+_VALOR_NULO = "Desconhecida"
+_ACENTOS = [
+    (re.compile(r"[áàâã]"), "a"),
+    (re.compile(r"[éê]"), "e"),
+    (re.compile(r"í"), "i"),
+    (re.compile(r"[óôõ]"), "o"),
+    (re.compile(r"ú"), "u"),
+    (re.compile(r"ç"), "c"),
+]
+
+
+def normalizar_chave(valor: Optional[str]) -> str:
+    """Chave de um valor (mesmas regras do ``_normalize_str`` em Polars)."""
+    chave = (_VALOR_NULO if valor is None else str(valor)).lower().strip()
+    for padrao, troca in _ACENTOS:
+        chave = padrao.sub(troca, chave)
+    return chave
+
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    """Chaves de uma coluna inteira: normaliza cada valor distinto uma vez."""
+    valores = serie.astype(object).where(serie.notna(), None)
+    distintos = {v: normalizar_chave(v) for v in valores.unique()}
+    return valores.map(distintos)
+
+
+def adicionar_chaves(df: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta as colunas de chave para as colunas de origem presentes em ``df``."""
+    for origem, chave in COLUNAS_CHAVE.items():
+        if origem in df.columns:
+            df[chave] = normalizar_serie(df[origem])
+    return df
+
+
+def preencher_chaves(executor, processamentoid: Optional[str] = None) -> int:
+    """
+    Completa as chaves nulas (do processamento, ou de toda a tabela).
+
+    ``executor``: ``Session`` ou ``Connection``; o commit é do chamador.
+    Devolve o número de linhas atualizadas.
+    """
+    filtro = " AND processamentoid = :pid" if processamentoid is not None else ""
+    total = 0
+    for origem, chave in COLUNAS_CHAVE.items():
+        valores = executor.execute(
+            text(f"SELECT DISTINCT {origem} FROM vendas_processadas WHERE {chave} IS NULL{filtro}"),
+            {"pid": processamentoid},
+        ).scalars().all()
+        for valor in valores:
+            cond = f"{origem} IS NULL" if valor is None else f"{origem} = :valor"
+            total += executor.execute(
+                text(f"UPDATE vendas_processadas SET {chave} = :chave WHERE {cond} AND {chave} IS NULL{filtro}"),
+                {"chave": normalizar_chave(valor), "valor": valor, "pid": processamentoid},
+            ).rowcount
+    return total
@@ -15,15 +15,38 @@ Uso:
     debug_print("ERROR", "Erro crítico")  # Sempre aparece
 """
 
+import logging
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional
 
+from conf import perf_metrics as _perf_metrics
+
 # Estado global de debug
 _debug_enabled = os.environ.get("DEBUG", "False").lower() in ("true", "1", "yes")
 _verbose_enabled = os.environ.get("VERBOSE", "False").lower() in ("true", "1", "yes")
 
 
+_LOGGING_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "VERBOSE": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+
+def _sync_logger_level():
+    """Libera DEBUG no logger "concilie" quando debug/verbose estão ativos."""
+    logging.getLogger("concilie").setLevel(
+        logging.DEBUG if (_debug_enabled or _verbose_enabled) else logging.NOTSET
+    )
+
+
+_sync_logger_level()
+
+
 def set_debug_mode(enabled: bool):
     """
     Ativa ou desativa modo debug globalmente.
@@ -33,6 +56,7 @@ def set_debug_mode(enabled: bool):
     """
     global _debug_enabled
     _debug_enabled = enabled
+    _sync_logger_level()
 
 
 def set_verbose_mode(enabled: bool):
@@ -44,6 +68,7 @@ def set_verbose_mode(enabled: bool):
     """
     global _verbose_enabled
     _verbose_enabled = enabled
+    _sync_logger_level()
 
 
 def is_debug_enabled() -> bool:
@@ -88,33 +113,10 @@ def debug_print(level: str, message: str, category: Optional[str] = None):
     if not show_message:
         return
 
-    # Formata timestamp
-    timestamp = datetime.now().strftime("%H:%M:%S")
-
-    # Formata categoria
-    if category:
-        prefix = f"[{timestamp}][{level}][{category}]"
-    else:
-        prefix = f"[{timestamp}][{level}]"
-
-    # Define cor (se terminal suportar)
-    colors = {
-        "DEBUG": "\033[36m",  # Cyan
-        "VERBOSE": "\033[90m",  # Gray
-        "INFO": "\033[32m",  # Green
-        "WARNING": "\033[33m",  # Yellow
-        "ERROR": "\033[31m",  # Red
-        "RESET": "\033[0m",
-    }
-
-    # Tenta usar cor, mas funciona mesmo sem suporte
-    try:
-        color = colors.get(level, "")
-        reset = colors["RESET"]
-        print(f"{color}{prefix}{reset} {message}")
-    except:
-        # Fallback sem cor
-        print(f"{prefix} {message}")
+    # Saída via logging: formatação/escrita ficam com o handler configurado
+    # (no API, o QueueListener de app.core.logging_config)
+    logger_name = f"concilie.{category.lower()}" if category else "concilie"
+    logging.getLogger(logger_name).log(_LOGGING_LEVELS.get(level, logging.INFO), message)
 
 
 def debug_timer(func_name: str, start_time: float):
@@ -126,40 +128,99 @@ def debug_timer(func_name: str, start_time: float):
     debug_print("VERBOSE", f"{func_name}: {elapsed:.3f}s", "TIMER")
 
 
-def perf_log(category: str, task: str, duration: float, metadata: dict = None):
+def perf_log(category: str, task: str, duration: float, metadata: dict = None, erro: bool = False):
     """
     Log de performance de alta precisão (nível INFO).
     Sempre exibido para permitir avaliação de desempenho.
+
+    Também alimenta os histogramas de ``conf.perf_metrics`` (expostos em
+    ``/metrics``): ``metadata["rows"]``/``metadata["bytes"]``, quando presentes,
+    viram observações de linhas/bytes do par (category, task).
     """
+    meta = metadata or {}
+    _perf_metrics.REGISTRY.observe(
+        category.upper(), task, duration,
+        rows=_inteiro_ou_none(meta.get("rows")),
+        bytes=_inteiro_ou_none(meta.get("bytes")),
+        erro=erro,
+    )
     meta_str = f" | {metadata}" if metadata else ""
     debug_print("INFO", f"🚀 {task}: {duration:.4f}s{meta_str}", category.upper())
 
 
+def _inteiro_ou_none(valor) -> Optional[int]:
+    try:
+        return int(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 class PerformanceTimer:
     """
     Gerenciador de contexto para medição de performance de alta precisão.
-    
+
+    Cada timer abre um span (``conf.perf_metrics.Span``) pendurado no span
+    corrente do contexto, de modo que timers aninhados — inclusive em funções
+    chamadas — formam a árvore de estágios do job (ver ``job_trace``).
+    Use ``task`` fixo (sem ids/nomes de arquivo): ele é label dos histogramas;
+    detalhes variáveis vão em ``metadata``.
+
     Exemplo:
-        with PerformanceTimer("IMPORT", "Normalização de Vendas") as timer:
+        with PerformanceTimer("IMPORT", "Normalização de Vendas", {"rows": len(df)}) as timer:
             # ... código ...
+            timer.set(rows=len(df_final))
     """
     def __init__(self, category: str, task: str, metadata: dict = None):
-        import time
         self.category = category
         self.task = task
         self.metadata = metadata
         self.start_time = None
+        self.span = None
+        self._token = None
+
+    def set(self, rows: Optional[int] = None, bytes: Optional[int] = None):
+        """Registra linhas/bytes apurados dentro do bloco (sobrepõe ``metadata``)."""
+        self.metadata = dict(self.metadata or {})
+        if rows is not None:
+            self.metadata["rows"] = rows
+        if bytes is not None:
+            self.metadata["bytes"] = bytes
+        if self.span is not None:
+            self.span.set(rows=_inteiro_ou_none(rows), bytes=_inteiro_ou_none(bytes))
 
     def __enter__(self):
-        import time
-        self.start_time = time.perf_counter()
+        meta = self.metadata or {}
+        self.span = _perf_metrics.Span(
+            category=self.category.upper(),
+            task=self.task,
+            metadata=dict(meta),
+            rows=_inteiro_ou_none(meta.get("rows")),
+            bytes=_inteiro_ou_none(meta.get("bytes")),
+        )
+        self._token = _perf_metrics.push_span(self.span)
+        self.start_time = self.span.start
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        import time
-        if self.start_time is not None:
-            duration = time.perf_counter() - self.start_time
-            perf_log(self.category, self.task, duration, self.metadata)
+        if self.span is None:
+            return
+        _perf_metrics.pop_span(self._token)
+        duration = self.span.finish(erro=exc_type is not None)
+        perf_log(self.category, self.task, duration, self.metadata, erro=exc_type is not None)
+
+
+@contextmanager
+def job_trace(job_type: str, job_id: Optional[str] = None):
+    """
+    Span raiz de um job em background (importação, cálculo, relatório).
+
+    Todos os ``PerformanceTimer`` abertos dentro do bloco ficam pendurados no
+    span devolvido; ao final, ``span.breakdown()`` dá o detalhamento por
+    estágio para gravar junto da task. A duração total entra nos histogramas
+    como (``JOB``, ``job_type``). Exceções propagam normalmente.
+    """
+    with PerformanceTimer("JOB", job_type, {"job_id": job_id} if job_id else None) as timer:
+        yield timer.span
 
 
 def debug_sql(sql: str, params: dict = None):
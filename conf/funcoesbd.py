@@ -1,11 +1,16 @@
-from contextlib import contextmanager
+import logging
+from contextlib import contextmanager, nullcontext
 from typing import Any, Dict, List, Optional, Tuple, Any
 from sqlalchemy.engine import Engine
 from sqlalchemy import text
 from datetime import datetime
 
 # Importa adaptador SQL híbrido
-from conf import sql_adapter
+from conf import sql_adapter, sqlite_escrita
+from conf.calculos_compactos import tabela_calculos
+from conf.chaves_venda import COLUNAS_CHAVE, adicionar_chaves, normalizar_chave
+
+logger = logging.getLogger(__name__)
 
 
 # ==============================
@@ -129,6 +134,54 @@ def _upsert_sql(
 # ==============================
 
 
+def _gravar_em_lotes(
+    engine: Engine,
+    df,
+    tabela: str,
+    dtype_map=None,
+    method=None,
+    progress_callback=None,
+    rotulo: str = "",
+    chunksize: int = 1000,
+) -> int:
+    """
+    ``to_sql`` de ``df`` em ``tabela`` com commit por lote. No SQLite passa pelo
+    escritor serializado, com lotes de ``SQLITE_LOTE_ESCRITA`` linhas e, em
+    cargas grandes, índices adiados + ANALYZE (ver conf/sqlite_escrita.py).
+    """
+    total_rows = len(df)
+    lote = sqlite_escrita.linhas_por_transacao(engine, chunksize)
+    if method == "multi" and sqlite_escrita.eh_sqlite(engine):
+        # executemany do sqlite3 é mais rápido que INSERT multi-VALUES e não esbarra no limite de parâmetros
+        method = None
+    carga = (
+        sqlite_escrita.carga_em_massa(engine, [tabela])
+        if sqlite_escrita.usar_carga_em_massa(engine, total_rows)
+        else nullcontext()
+    )
+    inserted = 0
+
+    with sqlite_escrita.escritor(engine), carga, engine.connect() as conn:
+        for i in range(0, total_rows, lote):
+            chunk = df.iloc[i : i + lote]
+            chunk.to_sql(
+                name=tabela,
+                con=conn,
+                index=False,
+                if_exists="append",
+                chunksize=chunksize,
+                method=method,
+                dtype=dtype_map if dtype_map else None,
+            )
+            conn.commit()
+            inserted += len(chunk)
+            if progress_callback:
+                progress = int((inserted / total_rows) * 100)
+                progress_callback(progress, f"Gravando {rotulo} ({inserted}/{total_rows})...")
+
+    return inserted
+
+
 def recebiveis_processados_bulk_insert(engine: Engine, df, progress_callback=None) -> int:
     """Insere recebíveis processados em massa (MySQL/SQLite)"""
     # Usar tipo adequado ao banco
@@ -155,33 +208,19 @@ def recebiveis_processados_bulk_insert(engine: Engine, df, progress_callback=Non
 
                 dtype_map[col] = DECIMAL(18, 2)
             else:
+                from sqlalchemy.types import REAL
+
                 dtype_map[col] = REAL
 
     from sqlalchemy import inspect
     inspector = inspect(engine)
     valid_cols = [c["name"] for c in inspector.get_columns("recebiveis_processados")]
     total_rows = len(df)
-    inserted = 0
-    chunksize = 1000
-
-    with engine.connect() as conn:
-        for i in range(0, total_rows, chunksize):
-            chunk = df.iloc[i : i + chunksize]
-            chunk.to_sql(
-                name="recebiveis_processados",
-                con=conn,
-                index=False,
-                if_exists="append",
-                chunksize=chunksize,
-                dtype=dtype_map if dtype_map else None,
-            )
-            conn.commit()
-            inserted += len(chunk)
-            if progress_callback:
-                progress = int((inserted / total_rows) * 100)
-                progress_callback(progress, f"Gravando recebíveis processados ({inserted}/{total_rows})...")
-            print(f"[DEBUG][BULK_INSERT] Inseridos {inserted}/{total_rows} recebíveis processados...")
+    inserted = _gravar_em_lotes(
+        engine, df, "recebiveis_processados", dtype_map, progress_callback=progress_callback, rotulo="recebíveis processados"
+    )
 
+    logger.debug("[BULK_INSERT] Inseridos %d/%d recebíveis processados", inserted, total_rows)
     return inserted
 
 
@@ -211,33 +250,19 @@ def recebiveis_filtrados_bulk_insert(engine: Engine, df, progress_callback=None)
 
                 dtype_map[col] = DECIMAL(18, 2)
             else:
+                from sqlalchemy.types import REAL
+
                 dtype_map[col] = REAL
 
     from sqlalchemy import inspect
     inspector = inspect(engine)
     valid_cols = [c["name"] for c in inspector.get_columns("recebiveis_filtrados")]
     total_rows = len(df)
-    inserted = 0
-    chunksize = 1000
-
-    with engine.connect() as conn:
-        for i in range(0, total_rows, chunksize):
-            chunk = df.iloc[i : i + chunksize]
-            chunk.to_sql(
-                name="recebiveis_filtrados",
-                con=conn,
-                index=False,
-                if_exists="append",
-                chunksize=chunksize,
-                dtype=dtype_map if dtype_map else None,
-            )
-            conn.commit()
-            inserted += len(chunk)
-            if progress_callback:
-                progress = int((inserted / total_rows) * 100)
-                progress_callback(progress, f"Gravando recebíveis filtrados ({inserted}/{total_rows})...")
-            print(f"[DEBUG][BULK_INSERT] Inseridos {inserted}/{total_rows} recebíveis filtrados...")
+    inserted = _gravar_em_lotes(
+        engine, df, "recebiveis_filtrados", dtype_map, progress_callback=progress_callback, rotulo="recebíveis filtrados"
+    )
 
+    logger.debug("[BULK_INSERT] Inseridos %d/%d recebíveis filtrados", inserted, total_rows)
     return inserted
 
 
@@ -302,7 +327,7 @@ def recebiveis_remover_duplicadas(
         # 3. Remover tabela temporária
         sql_drop = "DROP TEMPORARY TABLE IF EXISTS tmp_ids_to_keep"
         
-        print(f"[DEBUG][DEDUP] Executando deduplicação otimizada (temp table) em {nome_tabela} para proc {processamento_id}...")
+        logger.debug("[DEDUP] Deduplicação (temp table) em %s para proc %s", nome_tabela, processamento_id)
         with engine.begin() as conn:
             # Aumentar timeout para esta transação específica
             conn.execute(text("SET SESSION innodb_lock_wait_timeout = 300"))
@@ -337,6 +362,7 @@ def listar_processamentos_detalhado(engine: Engine, limite: int = 100) -> list:
             descricao,
             data_processamento
         FROM controle_processamentos
+        WHERE status IS NULL OR status <> 'deleting'
         ORDER BY data_processamento DESC, id_processamento DESC
         LIMIT :limite
     """
@@ -422,6 +448,7 @@ def listar_processamentoids(engine: Engine) -> list:
         engine,
         """
         SELECT id_processamento FROM controle_processamentos
+        WHERE status IS NULL OR status <> 'deleting'
         ORDER BY data_processamento DESC, id_processamento DESC
         """,
     )
@@ -1008,9 +1035,35 @@ def processamento_salvar(
     )
 
 
+def _deletar_em_lotes(
+    engine: Engine, origem: str, tabela: str, coluna_id: str, params: Dict[str, Any], lote: int = 5000
+) -> int:
+    """
+    Apaga as linhas de ``origem`` (``FROM ... WHERE``) em lotes de ``lote`` ids,
+    em ordem de chave primária, uma transação curta por lote: evita segurar
+    locks do InnoDB até o ``innodb_lock_wait_timeout`` em processamentos grandes.
+    """
+    from sqlalchemy import bindparam
+
+    select_ids = text(
+        _adapt_sql(engine, f"SELECT {coluna_id} FROM {origem} AND {coluna_id} > :_ultimo ORDER BY {coluna_id} LIMIT :_lote")
+    )
+    delete = text(f"DELETE FROM {tabela} WHERE id IN :_ids").bindparams(bindparam("_ids", expanding=True))
+    total, ultimo = 0, 0
+    while True:
+        with get_conn(engine) as conn:
+            ids = conn.execute(select_ids, {**params, "_ultimo": ultimo, "_lote": lote}).scalars().all()
+            if not ids:
+                return total
+            conn.execute(delete, {"_ids": ids})
+        total += len(ids)
+        ultimo = ids[-1]
+
+
 def deletar_processamento(engine: Engine, id_processamento: str) -> Dict[str, int]:
     """
-    Deleta um processamento e todos os dados relacionados a ele.
+    Deleta um processamento e todos os dados relacionados a ele, em lotes
+    (ver ``_deletar_em_lotes``).
 
     Args:
         engine: Conexão com o banco de dados
@@ -1019,101 +1072,52 @@ def deletar_processamento(engine: Engine, id_processamento: str) -> Dict[str, in
     Returns:
         Dict[str, int]: Dicionário com contagem de registros excluídos
     """
+    params = {"id_processamento": id_processamento}
     try:
-        # Primeiro, conta quantos registros serão excluídos (VENDAS)
-        filtradas_count = fetch_one(
-            engine,
-            "SELECT COUNT(*) as total FROM vendas_filtradas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-        vendas_filtradas = filtradas_count["total"] if filtradas_count else 0
-
-        processadas_count = fetch_one(
-            engine,
-            "SELECT COUNT(*) as total FROM vendas_processadas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-        vendas_processadas = processadas_count["total"] if processadas_count else 0
-
-        diversas_count = fetch_one(
-            engine,
-            "SELECT COUNT(*) as total FROM vendas_diversas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-        vendas_diversas = diversas_count["total"] if diversas_count else 0
-
-        # Conta quantos registros serão excluídos (RECEBÍVEIS)
-        recebiveis_proc_count = fetch_one(
-            engine,
-            "SELECT COUNT(*) as total FROM recebiveis_processados WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-        recebiveis_processados = (
-            recebiveis_proc_count["total"] if recebiveis_proc_count else 0
-        )
-
-        recebiveis_filt_count = fetch_one(
-            engine,
-            "SELECT COUNT(*) as total FROM recebiveis_filtrados WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-        recebiveis_filtrados = (
-            recebiveis_filt_count["total"] if recebiveis_filt_count else 0
-        )
-
-        # Deleta as vendas filtradas relacionadas ao processamento
-        exec_sql(
-            engine,
-            "DELETE FROM vendas_filtradas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
-
-        # Deleta as vendas diversas relacionadas ao processamento
+        # Marca como em exclusão: some das listagens antes de as linhas saírem
         exec_sql(
             engine,
-            "DELETE FROM vendas_diversas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
+            "UPDATE controle_processamentos SET status = 'deleting' WHERE id_processamento = :id_processamento",
+            params,
         )
 
-        # Deleta os cálculos relacionados às vendas do processamento
-        exec_sql(
-            engine,
-            """
-            DELETE FROM vendas_calculos
-            WHERE id_venda IN (
-                SELECT id FROM vendas_processadas
-                WHERE processamentoid = :id_processamento
+        def por_processamento(tabela: str) -> int:
+            return _deletar_em_lotes(
+                engine, f"{tabela} WHERE processamentoid = :id_processamento", tabela, "id", params
             )
-            """,
-            {"id_processamento": id_processamento},
-        )
 
-        # Deleta as vendas processadas relacionadas ao processamento
-        exec_sql(
-            engine,
-            "DELETE FROM vendas_processadas WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
+        vendas_filtradas = por_processamento("vendas_filtradas")
+        vendas_diversas = por_processamento("vendas_diversas")
 
-        # Deleta os recebíveis processados relacionados ao processamento
-        exec_sql(
+        # Cálculos das vendas do processamento (antes das vendas)
+        _deletar_em_lotes(
             engine,
-            "DELETE FROM recebiveis_processados WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
+            "vendas_calculos vc JOIN vendas_processadas vp ON vp.id = vc.id_venda "
+            "WHERE vp.processamentoid = :id_processamento",
+            tabela_calculos(engine),
+            "vc.id",
+            params,
         )
 
-        # Deleta os recebíveis filtrados relacionados ao processamento
-        exec_sql(
-            engine,
-            "DELETE FROM recebiveis_filtrados WHERE processamentoid = :id_processamento",
-            {"id_processamento": id_processamento},
-        )
+        vendas_processadas = por_processamento("vendas_processadas")
+        recebiveis_processados = por_processamento("recebiveis_processados")
+        recebiveis_filtrados = por_processamento("recebiveis_filtrados")
+
+        # Hashes dos arquivos importados (tabela da API; pode não existir em bancos antigos)
+        try:
+            exec_sql(
+                engine,
+                "DELETE FROM arquivos_importados WHERE processamento_id = :id_processamento",
+                params,
+            )
+        except Exception as e:
+            print(f"[WARNING] arquivos_importados não limpo para {id_processamento}: {e}")
 
         # Por fim, deleta o registro do processamento
         exec_sql(
             engine,
             "DELETE FROM controle_processamentos WHERE id_processamento = :id_processamento",
-            {"id_processamento": id_processamento},
+            params,
         )
 
         return {
@@ -1164,33 +1168,21 @@ def vendas_processadas_bulk_insert(engine: Engine, df, progress_callback=None) -
             
     df = df.rename(columns=new_cols)
     actual_db_names = [v["name"] for v in db_cols]
+    if "bandeira_key" in actual_db_names:
+        # Chaves normalizadas dos joins com taxas (rename já copiou o df do chamador)
+        adicionar_chaves(df)
     df = df[[c for c in df.columns if c in actual_db_names]]
     
-    print(f"[DEBUG][BULK_INSERT] Inserindo {len(df)} linhas com colunas: {list(df.columns)}")
+    logger.debug("[BULK_INSERT] Inserindo %d linhas com colunas: %s", len(df), list(df.columns))
 
     total_rows = len(df)
-    inserted = 0
-    chunksize = 1000 # Further reduced chunksize to prevent lock timeouts and long-running transactions
-
-    with engine.connect() as conn:
-        for i in range(0, total_rows, chunksize):
-            chunk = df.iloc[i : i + chunksize]
-            chunk.to_sql(
-                name="vendas_processadas",
-                con=conn,
-                index=False,
-                if_exists="append",
-                chunksize=chunksize,
-                method="multi",
-                dtype=dtype_map if dtype_map else None,
-            )
-            conn.commit()
-            inserted += len(chunk)
-            if progress_callback:
-                progress = int((inserted / total_rows) * 100)
-                progress_callback(progress, f"Gravando vendas processadas ({inserted}/{total_rows})...")
-            print(f"[DEBUG][BULK_INSERT] Inseridas {inserted}/{total_rows} vendas processadas...")
+    # Lotes de 1000 no MySQL: evita lock timeouts e transações longas
+    inserted = _gravar_em_lotes(
+        engine, df, "vendas_processadas", dtype_map, method="multi",
+        progress_callback=progress_callback, rotulo="vendas processadas",
+    )
 
+    logger.debug("[BULK_INSERT] Inseridas %d/%d vendas processadas", inserted, total_rows)
     return inserted
 
 
@@ -1233,27 +1225,11 @@ def vendas_filtradas_bulk_insert(engine: Engine, df, progress_callback=None) ->
     df = df[[c for c in df.columns if c in actual_db_names]]
 
     total_rows = len(df)
-    inserted = 0
-    chunksize = 1000
-
-    with engine.connect() as conn:
-        for i in range(0, total_rows, chunksize):
-            chunk = df.iloc[i : i + chunksize]
-            chunk.to_sql(
-                name="vendas_filtradas",
-                con=conn,
-                index=False,
-                if_exists="append",
-                chunksize=chunksize,
-                dtype=dtype_map if dtype_map else None,
-            )
-            conn.commit()
-            inserted += len(chunk)
-            if progress_callback:
-                progress = int((inserted / total_rows) * 100)
-                progress_callback(progress, f"Gravando vendas filtradas ({inserted}/{total_rows})...")
-            print(f"[DEBUG][BULK_INSERT] Inseridas {inserted}/{total_rows} vendas filtradas...")
+    inserted = _gravar_em_lotes(
+        engine, df, "vendas_filtradas", dtype_map, progress_callback=progress_callback, rotulo="vendas filtradas"
+    )
 
+    logger.debug("[BULK_INSERT] Inseridas %d/%d vendas filtradas", inserted, total_rows)
     return inserted
 
 
@@ -1286,7 +1262,7 @@ def vendas_diversas_bulk_insert(engine: Engine, df) -> int:
     valid_cols = [c["name"] for c in inspector.get_columns("vendas_diversas")]
     df = df[[c for c in df.columns if c in valid_cols]]
 
-    with engine.connect() as conn:
+    with sqlite_escrita.escritor(engine), engine.connect() as conn:
         df.to_sql(
             name="vendas_diversas",
             con=conn,
@@ -1367,7 +1343,7 @@ def vendas_remover_duplicadas(
         # 4. Criar índice para melhorar a performance absurda do JOIN no DELETE
         sql_idx = "CREATE INDEX idx_keep_id ON tmp_vendas_to_keep(keep_id)"
         
-        print(f"[DEBUG][DEDUP] Executando deduplicação otimizada (temp table) em {nome_tabela} para proc {processamento_id}...")
+        logger.debug("[DEDUP] Deduplicação (temp table) em %s para proc %s", nome_tabela, processamento_id)
         with engine.begin() as conn:
             # Aumentar timeout para esta transação específica
             conn.execute(text("SET SESSION innodb_lock_wait_timeout = 300"))
@@ -2636,6 +2612,20 @@ def agregar_recebiveis_db(engine: Engine, processamentoid: str) -> List[Dict[str
 # ==============================
 
 
+def _atualizar_chave_venda(engine: Engine, processamentoid: str, coluna: str, valor_novo: str) -> None:
+    """Acompanha a correção na chave normalizada (ver conf/chaves_venda.py)."""
+    chave = COLUNAS_CHAVE[coluna]
+    try:
+        exec_sql(
+            engine,
+            f"UPDATE vendas_processadas SET {chave} = :chave WHERE processamentoid = :pid AND {coluna} = :valor",
+            {"chave": normalizar_chave(valor_novo), "pid": processamentoid, "valor": valor_novo},
+        )
+    except Exception as e:
+        # Banco sem a migração 0008 (sem colunas de chave)
+        logger.debug("Chave %s não atualizada: %s", chave, e)
+
+
 def atualizar_forma_pagamento_processamento(
     engine: Engine,
     processamentoid: str,
@@ -2673,6 +2663,7 @@ def atualizar_forma_pagamento_processamento(
             "forma_antiga": forma_pagamento_antiga,
             "forma_nova": forma_pagamento_nova
         })
+        _atualizar_chave_venda(engine, processamentoid, "Forma_de_pagamento", forma_pagamento_nova)
 
         # Registrar log
         sql_log = f"""
@@ -2732,6 +2723,7 @@ def atualizar_bandeira_processamento(
             "bandeira_antiga": bandeira_antiga,
             "bandeira_nova": bandeira_nova
         })
+        _atualizar_chave_venda(engine, processamentoid, "Bandeira", bandeira_nova)
 
         # Registrar log
         sql_log = f"""
@@ -2870,8 +2862,8 @@ def remover_linhas_forma_pagamento(
             )
 
         # ⚠️ CRÍTICO: Deletar cálculos primeiro (FK constraint)
-        sql_delete_calculos = """
-            DELETE FROM vendas_calculos
+        sql_delete_calculos = f"""
+            DELETE FROM {tabela_calculos(engine)}
             WHERE id_venda IN (
                 SELECT id FROM vendas_processadas
                 WHERE processamentoid = :pid AND Forma_de_pagamento = :forma_pag
@@ -2994,8 +2986,8 @@ def remover_linhas_bandeira(
             return False, f"Nenhuma linha encontrada com bandeira '{bandeira}'", 0
 
         # ⚠️ CRÍTICO: Deletar cálculos primeiro (FK constraint)
-        sql_delete_calculos = """
-            DELETE FROM vendas_calculos
+        sql_delete_calculos = f"""
+            DELETE FROM {tabela_calculos(engine)}
             WHERE id_venda IN (
                 SELECT id FROM vendas_processadas
                 WHERE processamentoid = :pid AND Bandeira = :bandeira
@@ -3635,8 +3627,8 @@ def remover_linhas_status(
             )
 
         # ⚠️ CRÍTICO: Deletar cálculos primeiro (FK constraint)
-        sql_delete_calculos = """
-            DELETE FROM vendas_calculos
+        sql_delete_calculos = f"""
+            DELETE FROM {tabela_calculos(engine)}
             WHERE id_venda IN (
                 SELECT id FROM vendas_processadas
                 WHERE processamentoid = :pid AND status_da_venda = :status
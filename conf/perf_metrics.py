@@ -0,0 +1,236 @@
+"""
+Instrumentação leve de desempenho: spans aninhados e histogramas em memória.
+
+- ``Span``: um estágio medido (categoria, tarefa, duração, linhas, bytes) com
+  seus sub-estágios. O span corrente fica em um ``ContextVar``, então estágios
+  abertos dentro de um job (inclusive em ``run_in_threadpool``, que copia o
+  contexto) são pendurados no span do job automaticamente.
+- ``REGISTRY``: histogramas por (categoria, tarefa) de duração, linhas e bytes,
+  expostos em formato texto do Prometheus por ``render_prometheus``.
+
+A API pública para o código de negócio continua sendo
+``conf.debug_utils.PerformanceTimer``/``perf_log``/``job_trace``; este módulo
+não depende de nada do projeto para poder ser usado por ``proc``/``modules``.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Limites (le) dos histogramas, no estilo dos buckets padrão do Prometheus
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+ROWS_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTES_BUCKETS = (1024, 65_536, 1_048_576, 16_777_216, 134_217_728, 1_073_741_824)
+
+# Um job com laço por arquivo/seção pode abrir milhares de spans; o breakdown
+# agrega por caminho, mas a árvore em memória também precisa de teto
+_MAX_FILHOS_POR_SPAN = 500
+
+
+@dataclass
+class Span:
+    category: str
+    task: str
+    metadata: Dict[str, object] = field(default_factory=dict)
+    start: float = field(default_factory=time.perf_counter)
+    duration: Optional[float] = None
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    status: str = "ok"  # ok | erro
+    children: List["Span"] = field(default_factory=list)
+
+    def set(self, rows: Optional[int] = None, bytes: Optional[int] = None) -> None:
+        """Atualiza linhas/bytes conhecidos só ao final do bloco."""
+        if rows is not None:
+            self.rows = int(rows)
+        if bytes is not None:
+            self.bytes = int(bytes)
+
+    def finish(self, erro: bool = False) -> float:
+        self.duration = time.perf_counter() - self.start
+        if erro:
+            self.status = "erro"
+        return self.duration
+
+    def breakdown(self) -> List[dict]:
+        """
+        Lista plana de estágios agregados por caminho (``"A > B"``), na ordem
+        em que apareceram: repetições do mesmo estágio somam tempo/linhas e
+        contam ``calls``. O próprio span não entra (é o total do job).
+        """
+        agregados: Dict[str, dict] = {}
+
+        def visitar(span: "Span", caminho: str, depth: int) -> None:
+            for filho in span.children:
+                chave = f"{caminho} > {filho.task}" if caminho else filho.task
+                item = agregados.get(chave)
+                if item is None:
+                    item = agregados[chave] = {
+                        "stage": chave,
+                        "category": filho.category,
+                        "depth": depth,
+                        "calls": 0,
+                        "duration_s": 0.0,
+                        "rows": None,
+                        "bytes": None,
+                        "errors": 0,
+                    }
+                item["calls"] += 1
+                item["duration_s"] = round(item["duration_s"] + (filho.duration or 0.0), 4)
+                if filho.rows is not None:
+                    item["rows"] = (item["rows"] or 0) + filho.rows
+                if filho.bytes is not None:
+                    item["bytes"] = (item["bytes"] or 0) + filho.bytes
+                if filho.status != "ok":
+                    item["errors"] += 1
+                visitar(filho, chave, depth + 1)
+
+        visitar(self, "", 0)
+        return list(agregados.values())
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("concilie_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def push_span(span: Span):
+    """Pendura ``span`` no span corrente e o torna corrente. Retorna o token do ContextVar."""
+    pai = _current_span.get()
+    if pai is not None and len(pai.children) < _MAX_FILHOS_POR_SPAN:
+        pai.children.append(span)
+    return _current_span.set(span)
+
+
+def pop_span(token) -> None:
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Token de outro contexto (span fechado em outra thread/task): só limpa
+        _current_span.set(None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, limite in enumerate(self.buckets):
+            if value <= limite:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total, saida = 0, []
+        for limite, n in zip(self.buckets, self.counts):
+            total += n
+            saida.append((limite, total))
+        return saida
+
+
+# (nome, help, buckets) de cada família de histogramas
+_FAMILIAS = {
+    "duration": ("concilie_stage_duration_seconds", "Duração dos estágios medidos por PerformanceTimer.", DURATION_BUCKETS),
+    "rows": ("concilie_stage_rows", "Linhas processadas por estágio.", ROWS_BUCKETS),
+    "bytes": ("concilie_stage_bytes", "Bytes processados por estágio.", BYTES_BUCKETS),
+}
+
+
+class MetricsRegistry:
+    """Histogramas por (família, categoria, tarefa) e contador de erros, thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[Tuple[str, str, str], Histogram] = {}
+        self._erros: Dict[Tuple[str, str], int] = {}
+
+    def _observar(self, familia: str, category: str, task: str, valor: float) -> None:
+        chave = (familia, category, task)
+        hist = self._hist.get(chave)
+        if hist is None:
+            hist = self._hist[chave] = Histogram(_FAMILIAS[familia][2])
+        hist.observe(valor)
+
+    def observe(
+        self,
+        category: str,
+        task: str,
+        duration: float,
+        rows: Optional[int] = None,
+        bytes: Optional[int] = None,
+        erro: bool = False,
+    ) -> None:
+        with self._lock:
+            self._observar("duration", category, task, duration)
+            if rows is not None:
+                self._observar("rows", category, task, rows)
+            if bytes is not None:
+                self._observar("bytes", category, task, bytes)
+            if erro:
+                self._erros[(category, task)] = self._erros.get((category, task), 0) + 1
+
+    def get(self, familia: str, category: str, task: str) -> Optional[Histogram]:
+        return self._hist.get((familia, category, task))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._erros.clear()
+
+    def render_prometheus(self) -> str:
+        """Exposição em formato texto do Prometheus (version 0.0.4)."""
+        with self._lock:
+            # Copia sob o lock: observe() concorrente não pode deixar buckets inconsistentes
+            hist = sorted((k, h.cumulative(), h.sum, h.count) for k, h in self._hist.items())
+            erros = sorted(self._erros.items())
+
+        linhas: List[str] = []
+        for familia, (nome, ajuda, _b) in _FAMILIAS.items():
+            itens = [item for item in hist if item[0][0] == familia]
+            if not itens:
+                continue
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} histogram")
+            for (_f, category, task), acumulados, soma, total in itens:
+                labels = f'category="{_escape(category)}",task="{_escape(task)}"'
+                for limite, acumulado in acumulados:
+                    linhas.append(f'{nome}_bucket{{{labels},le="{_fmt(limite)}"}} {acumulado}')
+                linhas.append(f'{nome}_bucket{{{labels},le="+Inf"}} {total}')
+                linhas.append(f"{nome}_sum{{{labels}}} {_fmt(soma)}")
+                linhas.append(f"{nome}_count{{{labels}}} {total}")
+
+        if erros:
+            linhas.append("# HELP concilie_stage_errors_total Estágios encerrados com exceção.")
+            linhas.append("# TYPE concilie_stage_errors_total counter")
+            for (category, task), n in erros:
+                linhas.append(
+                    f'concilie_stage_errors_total{{category="{_escape(category)}",task="{_escape(task)}"}} {n}'
+                )
+        return "\n".join(linhas) + "\n"
+
+
+def _escape(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(valor: float) -> str:
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render_prometheus()
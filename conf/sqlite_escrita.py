@@ -0,0 +1,143 @@
+"""
+Perfil de escrita para instalações SQLite (um nó, um arquivo).
+
+O SQLite aceita um escritor por vez no arquivo inteiro. Com os jobs em
+background gravando em paralelo (importação, cálculo, exclusão), cada thread
+abria sua transação e as outras esperavam o lock até "database is locked";
+commits a cada 1000 linhas multiplicavam os fsyncs do WAL.
+
+- ``escritor(bind)``: lock do processo por arquivo de banco. As gravações em
+  massa passam por ele uma de cada vez, em vez de disputar o lock do SQLite
+  (entre processos vale o ``busy_timeout`` de ``app.core.database``);
+- ``linhas_por_transacao``: lotes grandes (``SQLITE_LOTE_ESCRITA``) por commit;
+- ``carga_em_massa(engine, tabelas)``: modo explícito de carga — remove os
+  índices secundários das tabelas, grava, recria os índices de uma vez e roda
+  ``ANALYZE``. Usado a partir de ``SQLITE_CARGA_MIN_LINHAS`` linhas. Durante a
+  carga as consultas nessas tabelas ficam sem índice; o DDL dos índices fica
+  em ``_carga_indices_adiados`` até a recriação e ``restaurar_indices`` o
+  reaplica se o processo caiu no meio.
+
+Em MySQL tudo aqui é no-op (o lock de linha do InnoDB já resolve).
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+LOTE_ESCRITA = int(os.environ.get("SQLITE_LOTE_ESCRITA", "50000"))  # linhas por transação
+CARGA_MIN_LINHAS = int(os.environ.get("SQLITE_CARGA_MIN_LINHAS", "200000"))  # 0 = nunca adiar índices
+
+TABELA_PENDENTES = "_carga_indices_adiados"
+
+_escritores: Dict[str, threading.RLock] = {}
+_lock = threading.Lock()
+
+
+def _engine(bind):
+    """Engine de uma Session/Connection/Engine."""
+    if hasattr(bind, "get_bind"):
+        bind = bind.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def eh_sqlite(bind) -> bool:
+    return _engine(bind).dialect.name == "sqlite"
+
+
+def escritor(bind):
+    """
+    Context manager que serializa as gravações no arquivo SQLite de ``bind``
+    dentro do processo (reentrante). Em MySQL não faz nada.
+    """
+    engine = _engine(bind)
+    if engine.dialect.name != "sqlite":
+        return nullcontext()
+    chave = engine.url.render_as_string(hide_password=True)
+    with _lock:
+        if chave not in _escritores:
+            _escritores[chave] = threading.RLock()
+        return _escritores[chave]
+
+
+def linhas_por_transacao(bind, padrao: int) -> int:
+    """Linhas por commit nas gravações em massa: ``padrao`` no MySQL, ``LOTE_ESCRITA`` no SQLite."""
+    return max(padrao, LOTE_ESCRITA) if eh_sqlite(bind) else padrao
+
+
+def usar_carga_em_massa(bind, linhas: int) -> bool:
+    """True se uma carga de ``linhas`` linhas compensa adiar os índices."""
+    return eh_sqlite(bind) and CARGA_MIN_LINHAS > 0 and linhas >= CARGA_MIN_LINHAS
+
+
+def _indices_secundarios(conn, tabela: str) -> List[Tuple[str, str]]:
+    """(nome, DDL) dos índices não-únicos criados por CREATE INDEX (os autoindex não têm DDL)."""
+    linhas = conn.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"),
+        {"t": tabela},
+    ).all()
+    return [(nome, sql) for nome, sql in linhas if not sql.lstrip().upper().startswith("CREATE UNIQUE")]
+
+
+def _recriar(conn, nome: str, ddl: str) -> None:
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :n"), {"n": nome}).first() is None:
+        conn.execute(text(ddl))
+
+
+def restaurar_indices(engine) -> int:
+    """Recria índices de uma carga interrompida; devolve quantos. Chamado no startup e a cada carga."""
+    if not eh_sqlite(engine):
+        return 0
+    with escritor(engine), engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :n"), {"n": TABELA_PENDENTES}).first() is None:
+            return 0
+        pendentes = conn.execute(text(f"SELECT nome, tabela, ddl FROM {TABELA_PENDENTES}")).all()
+        for nome, _, ddl in pendentes:
+            _recriar(conn, nome, ddl)
+        for tabela in {t for _, t, _ in pendentes}:
+            conn.execute(text(f'ANALYZE "{tabela}"'))
+        conn.execute(text(f"DELETE FROM {TABELA_PENDENTES}"))
+    if pendentes:
+        logger.warning("[SQLITE] %d índice(s) de carga interrompida recriado(s)", len(pendentes))
+    return len(pendentes)
+
+
+@contextmanager
+def carga_em_massa(engine, tabelas: Iterable[str]) -> Iterator[None]:
+    """
+    Modo de carga em massa: segura o escritor, remove os índices secundários de
+    ``tabelas``, executa o bloco e recria os índices + ``ANALYZE`` (também se o
+    bloco falhar). Em MySQL só executa o bloco.
+    """
+    if not eh_sqlite(engine):
+        yield
+        return
+    tabelas = list(tabelas)
+    with escritor(engine):
+        restaurar_indices(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"CREATE TABLE IF NOT EXISTS {TABELA_PENDENTES} (nome TEXT PRIMARY KEY, tabela TEXT, ddl TEXT)")
+            )
+            adiados = [(nome, t, ddl) for t in tabelas for nome, ddl in _indices_secundarios(conn, t)]
+            for nome, tabela, ddl in adiados:
+                conn.execute(
+                    text(f"INSERT INTO {TABELA_PENDENTES} (nome, tabela, ddl) VALUES (:n, :t, :d)"),
+                    {"n": nome, "t": tabela, "d": ddl},
+                )
+                conn.execute(text(f'DROP INDEX "{nome}"'))
+        logger.info("[SQLITE] Carga em massa em %s: %d índice(s) adiado(s)", tabelas, len(adiados))
+        try:
+            yield
+        finally:
+            with engine.begin() as conn:
+                for nome, _, ddl in adiados:
+                    _recriar(conn, nome, ddl)
+                for tabela in tabelas:
+                    conn.execute(text(f'ANALYZE "{tabela}"'))
+                conn.execute(text(f"DELETE FROM {TABELA_PENDENTES}"))
@@ -0,0 +1,74 @@
+"""
+Tipos das colunas de baixa cardinalidade nos pipelines em memória.
+
+Bandeira, forma de pagamento, adquirente, arquivo de origem, tipo e origem do
+cálculo se repetem em milhões de linhas com poucas dezenas de valores. Como
+``Categorical``/``Enum`` (Polars) ou ``category`` (pandas) cada linha guarda um
+código inteiro: group_by e joins comparam inteiros e o frame ocupa uma fração
+da memória.
+
+Regra de uso: categorizar logo após ler/normalizar e decodificar só na saída
+(gravação no banco, JSON). Colunas usadas em join com frames de outra origem
+(ex.: taxas) ficam String até depois do join. Um frame Polars categorizado
+vira ``category`` no ``to_pandas()``; ``decodificar_pandas`` antes de gravar.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import polars as pl
+
+# Domínios fechados (valores gerados pelo próprio sistema): Enum
+ORIGENS_CALCULO: Tuple[str, ...] = ("contrato", "cad", "log")
+ENUMS: Dict[str, pl.Enum] = {
+    "calc_origem": pl.Enum(ORIGENS_CALCULO),
+}
+
+# Domínios abertos (valores vindos dos arquivos): Categorical.
+# Nomes como aparecem em vendas_processadas, vendas_calculos e no motor de cálculo.
+CATEGORICAS = frozenset({
+    "Bandeira", "Forma_de_pagamento", "Adquirente", "status_da_venda",
+    "bandeira", "forma_pagamento", "adquirente", "arquivo_origem",
+    "calc_id", "calc_tipo", "calc_usuario",
+    "bandeira_clean", "forma_pgto_clean", "adquirente_clean",
+})
+
+
+def tipo_polars(coluna: str) -> Optional[pl.DataType]:
+    """Tipo Polars declarado para ``coluna`` (None = não é de baixa cardinalidade)."""
+    if coluna in ENUMS:
+        return ENUMS[coluna]
+    if coluna in CATEGORICAS:
+        return pl.Categorical
+    return None
+
+
+def _nomes(schema, colunas: Optional[Iterable[str]]):
+    return [c for c in (schema if colunas is None else colunas) if c in schema]
+
+
+def categorizar_polars(df, colunas: Optional[Iterable[str]] = None):
+    """Converte as colunas declaradas (ou ``colunas``) presentes em ``df``; aceita DataFrame e LazyFrame."""
+    schema = df.collect_schema()
+    casts = []
+    for coluna in _nomes(schema, colunas):
+        tipo = tipo_polars(coluna)
+        if tipo is not None and schema[coluna] in (pl.String, pl.Null):
+            casts.append(pl.col(coluna).cast(tipo))
+    return df.with_columns(casts) if casts else df
+
+
+def decodificar_polars(df):
+    """Categorical/Enum → String (saída: banco, JSON)."""
+    schema = df.collect_schema()
+    casts = [pl.col(c).cast(pl.String) for c, t in schema.items() if isinstance(t, (pl.Categorical, pl.Enum))]
+    return df.with_columns(casts) if casts else df
+
+
+def decodificar_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """``category`` → object com None nos nulos (in-place; devolve ``df``)."""
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            serie = df[coluna].astype(object)
+            df[coluna] = serie.where(serie.notna(), None)
+    return df
@@ -1,3 +1,4 @@
+import logging
 import polars as pl
 import pandas as pd
 from sqlalchemy import text, Engine
@@ -6,6 +7,8 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from conf.debug_utils import PerformanceTimer
 
+logger = logging.getLogger(__name__)
+
 class ReconciliationCore:
     @staticmethod
     def calculate_rates(engine: Engine, proc_id: str, tipo_taxa: str, usar_taxa_cad: bool = True, tem_receba_rapido: bool = False, progress_callback=None, custom_calc_id: Optional[str] = None) -> Dict[str, Any]:
@@ -15,7 +18,7 @@ class ReconciliationCore:
         """
         with PerformanceTimer("RECONCILIATION", "Cálculo de Taxas (Polars) - TOTAL", {"proc_id": proc_id, "tipo": tipo_taxa}):
             t_start = time.time()
-            print(f"[RECON-CORE] Iniciando cálculo Polars para Processamento {proc_id} ({tipo_taxa})")
+            logger.info("[RECON-CORE] Iniciando cálculo Polars para Processamento %s (%s)", proc_id, tipo_taxa)
             if progress_callback: progress_callback(5, "Iniciando reconciliação...")
 
             try:
@@ -65,7 +68,7 @@ class ReconciliationCore:
                         # Converter para Polars com schema forçado
                         df_vendas = pl.from_pandas(df_pd, schema_overrides=schema_vendas)
 
-                    print(f"[RECON-CORE] {len(df_vendas)} vendas carregadas.")
+                    logger.info("[RECON-CORE] %d vendas carregadas.", len(df_vendas))
                 if progress_callback: progress_callback(20, f"{len(df_vendas)} vendas carregadas.")
 
                 # 2. Normalizar e Preparar Dados
@@ -99,7 +102,7 @@ class ReconciliationCore:
                 ])
 
                 if usar_taxa_cad:
-                    print("[RECON-CORE] Aplicando Taxas CAD...")
+                    logger.info("[RECON-CORE] Aplicando Taxas CAD...")
                     if progress_callback: progress_callback(40, "Cruzando com Taxas Cadastradas...")
                     
                     with engine.connect() as conn:
@@ -142,7 +145,7 @@ class ReconciliationCore:
                             ]).drop(["taxa"])
 
                 # 5. Lógica de LOG (Min Taxa do Período)
-                print("[RECON-CORE] Aplicando lógica de LOG...")
+                logger.info("[RECON-CORE] Aplicando lógica de LOG...")
                 if progress_callback: progress_callback(60, "Aplicando lógica de menor taxa (LOG)...")
                 
                 # Calcular a menor taxa por grupo
@@ -166,7 +169,7 @@ class ReconciliationCore:
                 ])
 
                 # 6. Cálculos Financeiros Finais
-                print("[RECON-CORE] Calculando valores financeiros...")
+                logger.info("[RECON-CORE] Calculando valores financeiros...")
                 if progress_callback: progress_callback(80, "Calculando discrepâncias e perdas...")
                 df_vendas = df_vendas.with_columns([
                     (pl.col("Valor_da_venda") * pl.col("tx_calc").fill_null(0) / 100).alias("desc_calc"),
@@ -220,7 +223,7 @@ class ReconciliationCore:
                     pl.col("perda_rr")
                 ])
 
-                print(f"[RECON-CORE] Preparado para inserir {len(df_final)} registros.")
+                logger.info("[RECON-CORE] Preparado para inserir %d registros.", len(df_final))
                 if progress_callback: progress_callback(90, "Salvando resultados no banco de dados...")
 
                 with PerformanceTimer("RECONCILIATION", "Salvar Resultados (DB)", {"rows": len(df_final)}):
@@ -244,7 +247,7 @@ class ReconciliationCore:
                         )
 
                 t_total = time.time() - t_start
-                print(f"[RECON-CORE] Concluido com Sucesso in {t_total:.2f}s!")
+                logger.info("[RECON-CORE] Concluido com Sucesso in %.2fs!", t_total)
                 if progress_callback: progress_callback(100, f"Cálculo concluído em {t_total:.2f}s.")
 
                 return {
@@ -13,6 +13,7 @@ from jinja2 import Environment, FileSystemLoader
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from conf.debug_utils import PerformanceTimer
 from conf.funcoesbd import (
     fetch_all,
     fetch_one,
@@ -305,6 +306,25 @@ def debug_to_file(msg: str):
         pass
 
 
+_RE_SQLITE_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}:\d{2}(\.\d+)?)?$")
+
+
+def _parse_sqlite_datetimes(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    SQLite devolve DATETIME como texto ("2024-01-05 00:00:00.000000") em SQL cru;
+    converte essas colunas para Datetime, como o MySQL já entrega, para que os
+    ``cast(pl.Date)`` das seções funcionem nos dois bancos.
+    """
+    conversoes = []
+    for nome, dtype in df.schema.items():
+        if dtype != pl.String:
+            continue
+        amostra = df.get_column(nome).drop_nulls().head(1)
+        if len(amostra) and _RE_SQLITE_DATETIME.match(amostra[0]):
+            conversoes.append(pl.col(nome).str.to_datetime(strict=False))
+    return df.with_columns(conversoes) if conversoes else df
+
+
 def read_sql_polars(
     sql: str,
     engine: Engine,
@@ -315,7 +335,15 @@ def read_sql_polars(
     ao Polars — elimina o triple-copy anterior (chunks → concat → from_pandas numpy).
 
     Fallback automático para chunked Pandas caso o backend Arrow falhe.
+    Cada leitura vira um estágio ("REPORT", "Leitura SQL (Polars)") no job corrente.
     """
+    with PerformanceTimer("REPORT", "Leitura SQL (Polars)") as timer:
+        df = _read_sql_polars(sql, engine, params)
+        timer.set(rows=len(df))
+    return df
+
+
+def _read_sql_polars(sql: str, engine: Engine, params: tuple = None) -> pl.DataFrame:
     # Converter %s → :p1, :p2... para SQLAlchemy text()
     params_dict = {}
     if params:
@@ -335,7 +363,8 @@ def read_sql_polars(
             print("[DEBUG_READ_SQL] Lendo com PyArrow backend (zero-copy)...")
             df_pd = pd.read_sql(text(sql), conn, params=params, dtype_backend="pyarrow")
             debug_to_file(f"read_sql_polars success: {len(df_pd)} rows")
-            return pl.from_pandas(df_pd)
+            df_pl = pl.from_pandas(df_pd)
+            return _parse_sqlite_datetimes(df_pl) if engine.dialect.name == "sqlite" else df_pl
     except Exception as e:
         debug_to_file(f"read_sql_polars ERROR: {e}")
         print(f"[DEBUG_READ_SQL] PyArrow backend falhou ({e}), usando chunked fallback...")
@@ -353,7 +382,8 @@ def read_sql_polars(
         if not chunks:
             return pl.DataFrame()
         print(f"[DEBUG_READ_SQL] Concatenando {len(chunks)} chunks e convertendo para Polars...")
-        return pl.from_pandas(pd.concat(chunks, ignore_index=True))
+        df_pl = pl.from_pandas(pd.concat(chunks, ignore_index=True))
+        return _parse_sqlite_datetimes(df_pl) if engine.dialect.name == "sqlite" else df_pl
     except Exception as e:
         print(f"[DEBUG_READ_SQL] FAILED: {e}")
         import traceback
@@ -423,7 +453,9 @@ def load_vendas_calculos_cached(
         age_hours = (time.time() - os.path.getmtime(cache_file)) / 3600
         if age_hours < cache_ttl_hours:
             print(f"[CACHE] Hit: {cache_file} ({age_hours:.1f}h atrás)")
-            df = _normalizar_bandeira(pl.read_parquet(cache_file))
+            with PerformanceTimer("REPORT", "Cache Parquet (hit)", {"bytes": os.path.getsize(cache_file)}) as timer:
+                df = _normalizar_bandeira(pl.read_parquet(cache_file))
+                timer.set(rows=len(df))
             if columns:
                 df = df.select([c for c in columns if c in df.columns])
             return df
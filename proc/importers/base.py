@@ -1,7 +1,8 @@
 import pandas as pd
 import os
 from typing import Optional, Dict, Any, List
-from .utils import log_with_time, safe_read_file
+from .layouts import Layout, ler_com_layout
+from .utils import log_with_time, logger, safe_read_file
 from sqlalchemy.engine import Engine
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -26,15 +27,19 @@ class BaseImporter:
         self.df_filt: Optional[pd.DataFrame] = None
         self.arquivo_origem: str = ""
         self.processamentoid: Optional[int] = None
+        self.layout: Optional[Layout] = None  # preenchido pelo ImporterFactory (registro de layouts)
 
-    def log(self, message: str, type: str = "INFO"):
-        log_with_time(f"[{self.__class__.__name__}] {message}", type)
+    def log(self, message: str, type: str = "INFO", *args):
+        log_with_time(f"[{self.__class__.__name__}] {message}", type, *args)
 
     def read(self, path: str, nrows: Optional[int] = None, progress_callback=None):
         self.log(f"Iniciando leitura de {path}...")
         if progress_callback: progress_callback(10, "Lendo arquivo...")
         self.arquivo_origem = os.path.basename(path)
-        self.df_raw, self.header_idx, self.columns = safe_read_file(path, nrows=nrows)
+        if self.layout is not None:
+            self.df_raw, self.header_idx, self.columns = ler_com_layout(path, self.layout, nrows=nrows)
+        else:
+            self.df_raw, self.header_idx, self.columns = safe_read_file(path, nrows=nrows)
         self.log(f"Leitura concluída. {len(self.df_raw)} linhas encontradas.")
         if progress_callback: progress_callback(30, "Arquivo lido.")
 
@@ -55,7 +60,7 @@ class BaseImporter:
             
             self.log(f"Aplicando {len(regras)} regras de De-Para...")
             if progress_callback: progress_callback(50, "Mapeando colunas...")
-            print(f"[DEBUG][BASE_IMPORTER] Realizando mapeamento... df_raw shape: {self.df_raw.shape}")
+            self.log("Realizando mapeamento... df_raw shape: %s", "DEBUG", self.df_raw.shape)
             self.df_proc, self.transformacoes = aplicar_regras_depara(self.df_raw, regras)
             self.log(f"Mapeamento concluído. {len(self.df_proc)} linhas resultantes.")
             if progress_callback: progress_callback(70, "Mapeamento concluído.")
@@ -146,10 +151,7 @@ class BaseImporter:
 
             # 2. Bulk Insert
             if progress_callback: progress_callback(97, "Gravando no banco de dados...")
-            print(f"[DEBUG][BASE_IMPORTER] Colunas preparadas para gravação: {list(self.df_proc.columns)}")
-            print(f"[DEBUG][BASE_IMPORTER] Tipos de dados:\n{self.df_proc.dtypes}")
-            if not self.df_proc.empty:
-                print(f"[DEBUG][BASE_IMPORTER] Primeira linha (processada):\n{self.df_proc.iloc[0].to_dict()}")
+            self.log("Colunas preparadas para gravação: %s", "DEBUG", list(self.df_proc.columns))
             
             if self.tipo_arquivo == "V":
                 if not self.df_proc.empty:
@@ -197,7 +199,5 @@ class BaseImporter:
             self.normalize(progress_callback)
             return self.save(progress_callback)
         except Exception as e:
-            self.log(f"Erro fatal no processamento: {str(e)}", "ERROR")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[%s] Erro fatal no processamento: %s", self.__class__.__name__, e)
             raise e
@@ -3,6 +3,7 @@ from .cielo import CieloHistoricoDetalheImporter
 from .rede import RedeImporter
 from .stone import StoneImporter
 from .generic import GenericDeParaImporter
+from .layouts import eh_multiplanilha, ler_cabeca, registro_layouts
 from .utils import log_with_time, safe_read_file
 import os
 from typing import Optional, List, Type
@@ -15,24 +16,45 @@ class ImporterFactory:
         GenericDeParaImporter, # Fallback strategy
     ]
 
+    @classmethod
+    def _por_nome(cls, nome: str) -> Optional[Type[BaseImporter]]:
+        return next((imp for imp in cls._importers if imp.__name__ == nome), None)
+
     @classmethod
     def get_importer(cls, engine, path, ec_id, cliente_id, contexto, usuario, tipo_arquivo="V") -> Optional[BaseImporter]:
         """Detects the best matching importer for the file."""
-        log_with_time(f"Tentando detectar layout modular para {path}...", "DEBUG")
-        
+        log_with_time("Tentando detectar layout modular para %s...", "DEBUG", path)
+
+        # Layout já visto (mesma fingerprint): pula a detecção e lê numa passada só
+        registro = registro_layouts()
+        cabeca = ler_cabeca(path)
+        layout = registro.procurar(cabeca) if cabeca is not None else None
+        importer_cls = cls._por_nome(layout.importador) if layout else None
+        if importer_cls:
+            log_with_time(
+                "Layout conhecido: %s (cabeçalho na linha %s, engine %s)", "SUCCESS",
+                importer_cls.__name__, layout.header_idx, layout.engine,
+            )
+            importer = importer_cls(engine, ec_id, cliente_id, contexto, usuario, tipo_arquivo)
+            importer.layout = layout
+            return importer
+
         # Read the first few rows to detect layout
         try:
             # We only need a small chunk for detection
-            df_head, _, _ = safe_read_file(path, nrows=100)
-            log_with_time(f"[DEBUG][FACTORY] Arquivo: {os.path.basename(path)} - Colunas lidas: {list(df_head.columns)[:10]}...", "DEBUG")
+            if cabeca is not None:
+                df_head, header_idx = cabeca.detectar()
+            else:
+                df_head, header_idx, _ = safe_read_file(path, nrows=100)
+            log_with_time("[FACTORY] Arquivo: %s - Colunas lidas: %s...", "DEBUG", os.path.basename(path), list(df_head.columns)[:10])
         except Exception as e:
-            log_with_time(f"Erro ao ler cabeçalho para detecção: {str(e)}", "ERROR")
+            log_with_time("Erro ao ler cabeçalho para detecção: %s", "ERROR", e)
             return None
 
         best_match = (0, None)
         for importer_cls in cls._importers:
             score = importer_cls.detect_score(path, df_head)
-            log_with_time(f"Score para {importer_cls.__name__}: {score}", "DEBUG")
+            log_with_time("Score para %s: %s", "DEBUG", importer_cls.__name__, score)
             if score > best_match[0]:
                 best_match = (score, importer_cls)
 
@@ -40,8 +62,11 @@ class ImporterFactory:
             # Reduced threshold from 10 to 3 to be more flexible with header variations
             is_generic = best_match[1] == GenericDeParaImporter
             if best_match[0] >= 3 or is_generic:
-                log_with_time(f"Layout detectado: {best_match[1].__name__} (score: {best_match[0]})", "SUCCESS")
-                return best_match[1](engine, ec_id, cliente_id, contexto, usuario, tipo_arquivo)
+                log_with_time("Layout detectado: %s (score: %s)", "SUCCESS", best_match[1].__name__, best_match[0])
+                importer = best_match[1](engine, ec_id, cliente_id, contexto, usuario, tipo_arquivo)
+                if cabeca is not None and not eh_multiplanilha(cabeca.abas):
+                    importer.layout = registro.registrar(cabeca, header_idx, list(df_head.columns), best_match[1].__name__)
+                return importer
         
-        log_with_time(f"Nenhum layout compatível detectado para {os.path.basename(path)}.", "WARNING")
+        log_with_time("Nenhum layout compatível detectado para %s.", "WARNING", os.path.basename(path))
         return None
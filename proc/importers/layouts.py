@@ -0,0 +1,213 @@
+"""
+Registro de layouts de arquivo já vistos.
+
+Arquivos mensais da mesma credenciadora têm o mesmo layout. Na primeira vez o
+``ImporterFactory`` faz a detecção completa (cabeçalho por palavras-chave +
+score de todos os importadores); o resultado fica registrado pela *fingerprint*
+do arquivo — extensão, nomes das abas, linhas antes do cabeçalho (dígitos
+mascarados, para datas/períodos não mudarem a chave) e a assinatura das colunas.
+
+Nas próximas vezes, se a fingerprint bate, o importador, a linha de cabeçalho,
+a engine de leitura e o mapa de colunas vêm do registro e o arquivo é lido numa
+passada só (``ler_com_layout``). Essa leitura confere de novo o cabeçalho; se o
+layout mudou, volta para ``safe_read_file`` (detecção completa).
+
+Só arquivos Excel de uma planilha passam por aqui (CSV/TXT seguem o caminho normal).
+O arquivo do registro fica em ``data/layouts_importacao.json`` (ou
+``CONCILIE_LAYOUTS_PATH``; vazio = só memória).
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .utils import EXTENSOES_EXCEL, aplicar_cabecalho, detectar_cabecalho, ler_excel_bruto, log_with_time, safe_read_file
+
+_VERSAO = 1
+LINHAS_CABECA = 100  # mesmas 100 linhas que o factory já lia para detectar
+
+_CAMINHO_PADRAO = os.path.join(os.path.dirname(__file__), "..", "..", "data", "layouts_importacao.json")
+_RE_DIGITOS = re.compile(r"\d+")
+
+
+@dataclass
+class Layout:
+    fingerprint: str
+    importador: str  # nome da classe em ImporterFactory._importers
+    header_idx: int
+    engine: str  # calamine | openpyxl | xml
+    colunas: List[str]  # nomes finais (com Coluna_i nos vazios)
+    cabecalho: List[str]  # linha de cabeçalho normalizada, conferida na leitura
+    ext: str = ""
+    abas: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CabecaArquivo:
+    """As primeiras linhas brutas (header=None) de um Excel, lidas uma vez só."""
+    df: pd.DataFrame
+    engine: str
+    ext: str
+    abas: List[str]
+
+    def detectar(self) -> Tuple[pd.DataFrame, int]:
+        """Mesmo resultado de ``safe_read_file(path, nrows=100)``, sem reler o arquivo."""
+        header_idx, _score = detectar_cabecalho(self.df)
+        return aplicar_cabecalho(self.df, header_idx), header_idx
+
+
+def _normalizar(valor) -> str:
+    return _RE_DIGITOS.sub("#", str(valor).strip().lower())
+
+
+def _linha(df: pd.DataFrame, idx: int) -> List[str]:
+    return [_normalizar(v) for v in df.iloc[idx]]
+
+
+def calcular_fingerprint(ext: str, abas: List[str], df_bruto: pd.DataFrame, header_idx: int) -> Optional[str]:
+    """Hash de extensão + abas + linhas até o cabeçalho (inclusive). None se o df é curto."""
+    if header_idx >= len(df_bruto):
+        return None
+    partes = [ext, "|".join(abas)] + ["\x1f".join(_linha(df_bruto, i)) for i in range(header_idx + 1)]
+    return hashlib.sha1("\x1e".join(partes).encode("utf-8")).hexdigest()
+
+
+def _nomes_abas(path: str) -> List[str]:
+    try:
+        from python_calamine import CalamineWorkbook
+
+        return list(CalamineWorkbook.from_path(path).sheet_names)
+    except Exception:
+        return []
+
+
+def eh_multiplanilha(abas: List[str]) -> bool:
+    """Mesmo critério de ``is_multisheet_rede_file`` (aba "capa" + 2 ou mais abas): fica fora do registro."""
+    return len(abas) >= 2 and "capa" in (a.lower() for a in abas)
+
+
+def ler_cabeca(path: str) -> Optional[CabecaArquivo]:
+    """Primeiras linhas brutas de um Excel (None para CSV/TXT ou falha de leitura)."""
+    ext = Path(path).suffix.lower()
+    if ext not in EXTENSOES_EXCEL:
+        return None
+    try:
+        df, engine = ler_excel_bruto(path, nrows=LINHAS_CABECA)
+    except Exception as e:
+        log_with_time("[LAYOUT] Falha ao ler cabeça de %s: %s", "DEBUG", os.path.basename(path), e)
+        return None
+    return CabecaArquivo(df=df, engine=engine, ext=ext, abas=_nomes_abas(path))
+
+
+def ler_com_layout(path: str, layout: Layout, nrows: Optional[int] = None) -> Tuple[pd.DataFrame, int, List[str]]:
+    """
+    Leitura em uma passada com o layout registrado (mesmo retorno de ``safe_read_file``).
+    Se o cabeçalho do arquivo não confere com o layout (drift), faz a detecção completa.
+    """
+    try:
+        df, _engine = ler_excel_bruto(path, nrows, engine=layout.engine)
+        if len(df) > layout.header_idx and _linha(df, layout.header_idx) == layout.cabecalho:
+            df_final = aplicar_cabecalho(df, layout.header_idx, list(layout.colunas))
+            return df_final, layout.header_idx, df_final.columns.tolist()
+        log_with_time("[LAYOUT] Cabeçalho de %s mudou — detecção completa.", "WARNING", os.path.basename(path))
+    except Exception as e:
+        log_with_time("[LAYOUT] Leitura com layout falhou (%s) — detecção completa.", "WARNING", e)
+    registro_layouts().remover(layout.fingerprint)
+    return safe_read_file(path, nrows=nrows)
+
+
+class RegistroLayouts:
+    """Fingerprint → ``Layout``. ``caminho=None`` mantém só em memória."""
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._layouts: Dict[str, Layout] = {}
+        self._lock = threading.Lock()
+        if caminho and os.path.exists(caminho):
+            try:
+                with open(caminho, "r", encoding="utf-8") as f:
+                    dados = json.load(f)
+                if dados.get("versao") == _VERSAO:
+                    self._layouts = {fp: Layout(**l) for fp, l in dados.get("layouts", {}).items()}
+            except (OSError, ValueError, TypeError) as e:
+                log_with_time("[LAYOUT] Registro ignorado (%s): %s", "WARNING", caminho, e)
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def procurar(self, cabeca: CabecaArquivo) -> Optional[Layout]:
+        """Layout cuja fingerprint bate com a cabeça do arquivo (testa cada linha de cabeçalho conhecida)."""
+        with self._lock:
+            candidatos = sorted({
+                l.header_idx for l in self._layouts.values() if l.ext == cabeca.ext and l.abas == cabeca.abas
+            })
+        for header_idx in candidatos:
+            fingerprint = calcular_fingerprint(cabeca.ext, cabeca.abas, cabeca.df, header_idx)
+            layout = self._layouts.get(fingerprint)
+            if layout is not None:
+                return layout
+        return None
+
+    def registrar(self, cabeca: CabecaArquivo, header_idx: int, colunas: List[str], importador: str) -> Optional[Layout]:
+        fingerprint = calcular_fingerprint(cabeca.ext, cabeca.abas, cabeca.df, header_idx)
+        if fingerprint is None:
+            return None
+        layout = Layout(
+            fingerprint=fingerprint,
+            importador=importador,
+            header_idx=header_idx,
+            engine=cabeca.engine,
+            colunas=list(colunas),
+            cabecalho=_linha(cabeca.df, header_idx),
+            ext=cabeca.ext,
+            abas=list(cabeca.abas),
+        )
+        with self._lock:
+            self._layouts[fingerprint] = layout
+        self._salvar()
+        return layout
+
+    def remover(self, fingerprint: str) -> None:
+        with self._lock:
+            removido = self._layouts.pop(fingerprint, None)
+        if removido is not None:
+            self._salvar()
+
+    def _salvar(self) -> None:
+        if not self.caminho:
+            return
+        with self._lock:
+            dados = {"versao": _VERSAO, "layouts": {fp: asdict(l) for fp, l in self._layouts.items()}}
+            tmp = None
+            try:
+                pasta = os.path.dirname(self.caminho) or "."
+                os.makedirs(pasta, exist_ok=True)
+                # Temporário único por gravação: vários workers gravam o mesmo registro
+                fd, tmp = tempfile.mkstemp(dir=pasta, prefix=".layouts_", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.caminho)
+            except OSError as e:
+                if tmp is not None and os.path.exists(tmp):
+                    os.unlink(tmp)
+                log_with_time("[LAYOUT] Não foi possível gravar o registro: %s", "WARNING", e)
+
+
+_registro: Optional[RegistroLayouts] = None
+
+
+def registro_layouts() -> RegistroLayouts:
+    """Instância do processo (arquivo em ``CONCILIE_LAYOUTS_PATH`` ou ``data/``)."""
+    global _registro
+    if _registro is None:
+        caminho = os.environ.get("CONCILIE_LAYOUTS_PATH", os.path.normpath(_CAMINHO_PADRAO))
+        _registro = RegistroLayouts(caminho or None)
+    return _registro
@@ -0,0 +1,133 @@
+"""
+Parsers tipados para colunas de data (BR/ISO) e valores decimais no formato brasileiro.
+
+Colunas de arquivos de adquirentes têm poucos valores distintos (datas de um
+mês, valores repetidos), então cada parser:
+1) fatoriza a coluna e trabalha só sobre os valores únicos;
+2) detecta o formato exato a partir de uma amostra e converte com formato fixo
+   (caminho vetorizado, sem inferência por elemento);
+3) replica o resultado para todas as linhas via os códigos da fatoração.
+
+Se nenhum formato fixo cobre a amostra (colunas com formatos misturados), cai
+para o parse elemento a elemento — ainda assim apenas sobre os valores únicos.
+
+Usados por ``proc.importers.utils`` e pelos normalizadores legados de
+``proc.proc_importacao``.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Ordem importa: formatos com hora antes dos só-data, BR antes de ISO
+DATE_FORMATS = (
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%d/%m/%y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+)
+
+_SAMPLE_SIZE = 200
+_MIN_DATE = pd.Timestamp(1000, 1, 1)
+_EMPTY_STRINGS = {"", "nan", "none", "nat", "null"}
+
+
+def _non_empty(values: Iterable[str]) -> list:
+    return [v for v in values if v.lower() not in _EMPTY_STRINGS]
+
+
+def detect_date_format(sample: Iterable[str]) -> Optional[str]:
+    """
+    Retorna o primeiro formato de ``DATE_FORMATS`` que converte todos os valores
+    não vazios da amostra, ou ``None`` se nenhum formato fixo serve.
+    """
+    values = _non_empty(sample)
+    if not values:
+        return None
+    probe = pd.Series(values, dtype=object)
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(probe, format=fmt, errors="coerce")
+        if parsed.notna().all():
+            return fmt
+    return None
+
+
+def _parse_unique_dates(uniques: pd.Series) -> pd.Series:
+    """Converte valores únicos (já ``str.strip``) para datetime."""
+    fmt = detect_date_format(uniques.iloc[:_SAMPLE_SIZE])
+    if fmt is not None:
+        parsed = pd.to_datetime(uniques, format=fmt, errors="coerce")
+        non_empty = ~uniques.str.lower().isin(_EMPTY_STRINGS)
+        # Amostra pode não representar a cauda: só aceita se cobriu todos os valores
+        if parsed[non_empty].notna().all():
+            return parsed
+        logger.debug("Formato %s não cobre todos os valores; usando parse misto", fmt)
+
+    # Fallback seguro: ISO sem dayfirst, demais com dayfirst (regra legada)
+    iso_mask = uniques.str.match(r"^\d{4}[-/]")
+    res = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    if iso_mask.any():
+        res[iso_mask] = pd.to_datetime(uniques[iso_mask], errors="coerce", format="mixed", dayfirst=False)
+    if (~iso_mask).any():
+        res[~iso_mask] = pd.to_datetime(uniques[~iso_mask], errors="coerce", format="mixed", dayfirst=True)
+    return res
+
+
+def parse_dates_br(s: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas BR (DD/MM/AAAA) ou ISO para ``datetime64``.
+    Valores inválidos viram NaT; datas anteriores a 1000-01-01 (fora do range
+    do MySQL) também.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        res = s.copy()
+    elif s.empty:
+        res = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    else:
+        # Fatoriza antes de qualquer operação de string: strip/parse só nos únicos
+        codes, uniques = pd.factorize(s)
+        parsed_uniques = _parse_unique_dates(pd.Series(uniques, dtype=object).astype(str).str.strip())
+        values = parsed_uniques.to_numpy(dtype="datetime64[ns]")
+        out = values.take(np.where(codes >= 0, codes, 0)) if len(values) else np.full(len(s), np.datetime64("NaT"), "datetime64[ns]")
+        out[codes < 0] = np.datetime64("NaT")
+        res = pd.Series(out, index=s.index, dtype="datetime64[ns]")
+
+    if not res.empty:
+        res = res.where(~(res < _MIN_DATE), other=pd.NaT)
+    return res
+
+
+def parse_decimal_br(s: pd.Series) -> pd.Series:
+    """
+    Converte valores monetários/percentuais no formato brasileiro ("1.234,56")
+    ou com ponto decimal ("1234.56") para float. Inválidos viram NaN.
+    """
+    if pd.api.types.is_float_dtype(s):
+        return s.replace([np.inf, -np.inf], np.nan)
+    if pd.api.types.is_integer_dtype(s):
+        return s.astype(float)
+    if s.empty:
+        return pd.Series([], index=s.index, dtype=float)
+
+    codes, uniques = pd.factorize(s)
+    u = pd.Series(uniques, dtype=object).astype(str)
+    # Só remove pontos (milhar) quando há vírgula decimal
+    has_comma = u.str.contains(",", regex=False)
+    u = u.where(~has_comma, u.str.replace(".", "", regex=False))
+    parsed = pd.to_numeric(u.str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=float)
+    parsed[~np.isfinite(parsed)] = np.nan
+
+    out = parsed.take(np.where(codes >= 0, codes, 0)) if len(parsed) else np.full(len(s), np.nan)
+    out[codes < 0] = np.nan
+    return pd.Series(out, index=s.index, dtype=float)
@@ -34,7 +34,8 @@ class RedeImporter(BaseImporter):
         
         try:
             from proc.proc_importacao import is_multisheet_rede_file, safe_read_multisheet_file
-            self.is_multisheet = is_multisheet_rede_file(path)
+            # Layout registrado nunca é multi-planilhas (ver layouts.eh_multiplanilha)
+            self.is_multisheet = self.layout is None and is_multisheet_rede_file(path)
             
             if self.is_multisheet:
                 self.log("Arquivo multi-planilhas detectado. Processando todas as abas.")
@@ -1,3 +1,4 @@
+import logging
 import pandas as pd
 import numpy as np
 import os
@@ -5,67 +6,34 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple, List, Any, Dict
 
-def log_with_time(message: str, type: str = "INFO"):
-    """Logs a message with a visual timestamp indicator."""
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    msg = f"[{now}][{type}] {message}"
-    try:
-        print(msg)
-    except UnicodeEncodeError:
-        # Fallback for Windows consoles that don't support UTF-8 emojis/chars
-        print(msg.encode('ascii', 'replace').decode())
-    log_to_debug_file(msg)
+from .parsers import parse_dates_br, parse_decimal_br
 
-def log_to_debug_file(message: str):
-    try:
-        # Explicitly use encoding='utf-8' to prevent crashes on Windows with emojis or special chars
-        with open("e:/Financial_P/apps/api/debug_import.log", "a", encoding="utf-8") as f:
-            f.write(message + "\n")
-    except Exception as e:
-        print(f"CRITICAL: Failed to write to debug log: {e}")
-
-def _to_datetime_pt(s: pd.Series) -> pd.Series:
-    # Se já é datetime, apenas valida o range
-    if pd.api.types.is_datetime64_any_dtype(s):
-        res = s.copy()
-    else:
-        s_str = s.astype(str).str.strip()
-        # Formato ISO começa com 4 dígitos seguido de '-' ou '/' (ex: 2022-01-13)
-        iso_mask = s_str.str.match(r'^\d{4}[-/]')
-
-        if iso_mask.all():
-            res = pd.to_datetime(s, errors="coerce", dayfirst=False)
-        elif (~iso_mask).all():
-            res = pd.to_datetime(s, errors="coerce", dayfirst=True)
-        else:
-            res = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
-            if iso_mask.any():
-                res[iso_mask] = pd.to_datetime(s[iso_mask], errors="coerce", dayfirst=False)
-            if (~iso_mask).any():
-                res[~iso_mask] = pd.to_datetime(s[~iso_mask], errors="coerce", dayfirst=True)
-
-    # MySQL datetime range is 1000-01-01 to 9999-12-31
-    if not res.empty:
-        mask_too_early = res < pd.Timestamp(1000, 1, 1)
-        res = res.where(~mask_too_early, other=pd.NaT)
-    return res
-
-def _to_float_br(s: pd.Series) -> pd.Series:
-    if pd.api.types.is_float_dtype(s):
-        return s.replace([np.inf, -np.inf], np.nan)
-    if pd.api.types.is_integer_dtype(s):
-        return s.astype(float)
-    s = s.astype(str)
-    if not s.empty:
-        has_comma = s.str.contains(",")
-        s1 = s.copy()
-        if has_comma.any():
-            s1[has_comma] = s1[has_comma].str.replace(".", "", regex=False)
-        s1 = s1.str.replace(",", ".", regex=False)
-        result = pd.to_numeric(s1, errors="coerce")
-    else:
-        result = pd.Series([], dtype=float)
-    return result.replace([np.inf, -np.inf], np.nan)
+logger = logging.getLogger("proc.importers")
+
+# Tipos legados usados pelos importadores → níveis do logging
+_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "SUCCESS": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+def log_with_time(message: str, type: str = "INFO", *args):
+    """
+    Registra uma mensagem no logger ``proc.importers``.
+    ``args`` são interpolados em ``message`` apenas se o nível estiver ativo
+    (timestamp e destino ficam a cargo da configuração de logging).
+    """
+    logger.log(_LOG_LEVELS.get(type.upper(), logging.INFO), message, *args)
+
+def log_to_debug_file(message: str, *args):
+    """Mensagens de diagnóstico da importação (nível DEBUG do logger ``proc.importers``)."""
+    logger.debug(message, *args)
+
+# Conversores de coluna compartilhados (ver proc/importers/parsers.py)
+_to_datetime_pt = parse_dates_br
+_to_float_br = parse_decimal_br
 
 def detectar_cabecalho(df: pd.DataFrame, max_scan: int = 50) -> Tuple[int, int]:
     """
@@ -101,12 +69,113 @@ def detectar_cabecalho(df: pd.DataFrame, max_scan: int = 50) -> Tuple[int, int]:
             
     return best_idx, max_score
 
+EXTENSOES_EXCEL = (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls")
+
+def ler_excel_bruto(path: str, nrows: Optional[int] = None, engine: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Lê a primeira planilha sem cabeçalho (tudo como texto). Retorna (df, engine usada).
+    Tenta calamine → openpyxl → XML interno do xlsx; ``engine`` (de um layout
+    conhecido) só muda qual é tentada primeiro.
+    """
+    if engine in ("calamine", "openpyxl"):
+        try:
+            return pd.read_excel(
+                path, header=None, engine=engine, dtype=str, keep_default_na=False, na_filter=False, nrows=nrows
+            ), engine
+        except Exception:
+            pass
+    elif engine == "xml":
+        return _ler_xlsx_xml(path), "xml"
+
+    options = {
+        "header": None,
+        "engine": "calamine",
+        "dtype": str,
+        "keep_default_na": False,
+        "na_filter": False,
+        "nrows": nrows,
+    }
+    try:
+        return pd.read_excel(path, **options), "calamine"
+    except Exception:
+        try:
+            options["engine"] = "openpyxl"
+            return pd.read_excel(path, **options), "openpyxl"
+        except Exception:
+            return _ler_xlsx_xml(path), "xml"
+
+def _ler_xlsx_xml(path: str) -> pd.DataFrame:
+    # Fallback final: leitura direta do XML interno do xlsx via zipfile
+    # Bypassa completamente o openpyxl (evita erros de estilos/inf/NaN)
+    import zipfile, xml.etree.ElementTree as ET
+    NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+    with zipfile.ZipFile(path, "r") as z:
+        # Shared strings
+        shared: list[str] = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            with z.open("xl/sharedStrings.xml") as f:
+                root_ss = ET.parse(f).getroot()
+                for si in root_ss.findall(f"{{{NS}}}si"):
+                    t_el = si.find(f".//{{{NS}}}t")
+                    shared.append(t_el.text if t_el is not None and t_el.text else "")
+
+        # Primeira planilha — busca flexível (qualquer case/nome)
+        all_files = z.namelist()
+        sheet_names = [n for n in all_files if n.lower().startswith("xl/worksheets/") and n.lower().endswith(".xml") and "sheet" in n.lower()]
+        if not sheet_names:
+            # Último recurso: qualquer XML dentro de worksheets/
+            sheet_names = [n for n in all_files if "worksheets" in n.lower() and n.lower().endswith(".xml")]
+        if not sheet_names:
+            raise ValueError(f"Nenhuma planilha encontrada. Arquivos no ZIP: {all_files}")
+        with z.open(sorted(sheet_names)[0]) as f:
+            root_ws = ET.parse(f).getroot()
+
+    rows = []
+    for row_el in root_ws.findall(f".//{{{NS}}}row"):
+        row_data: list[str] = []
+        for c in row_el.findall(f"{{{NS}}}c"):
+            t = c.get("t", "")
+            v_el = c.find(f"{{{NS}}}v")
+            if v_el is None or v_el.text is None:
+                row_data.append("")
+            elif t == "s":
+                try:
+                    row_data.append(shared[int(v_el.text)])
+                except (IndexError, ValueError):
+                    row_data.append(v_el.text)
+            elif t == "inlineStr":
+                t_el = c.find(f".//{{{NS}}}t")
+                row_data.append(t_el.text if t_el is not None and t_el.text else "")
+            elif t == "b":
+                row_data.append("TRUE" if v_el.text == "1" else "FALSE")
+            else:
+                row_data.append(v_el.text)
+        rows.append(row_data)
+
+    if not rows:
+        raise ValueError("Planilha vazia após leitura via XML.")
+    max_cols = max(len(r) for r in rows)
+    rows = [r + [""] * (max_cols - len(r)) for r in rows]
+    return pd.DataFrame(rows, dtype=str)
+
+def aplicar_cabecalho(df: pd.DataFrame, header_idx: int, header_names: Optional[List[str]] = None) -> pd.DataFrame:
+    """Usa a linha ``header_idx`` do df bruto como cabeçalho (vazios viram ``Coluna_i``)."""
+    if header_names is None:
+        header_row = df.iloc[header_idx]
+        header_names = [str(col).strip() if str(col).strip() and str(col).strip().lower() not in ["nan", "none"] else f"Coluna_{i}" for i, col in enumerate(header_row)]
+
+    df_final = df.iloc[header_idx + 1 :].astype(str)
+    df_final.columns = header_names
+    df_final.reset_index(drop=True, inplace=True)
+    return df_final.fillna("")
+
 def safe_read_file(path: str, nrows: Optional[int] = None) -> Tuple[pd.DataFrame, int, List[str]]:
     """
     Lê um arquivo de forma robusta, detectando cabeçalho.
     """
     ext = Path(path).suffix.lower()
-    log_with_time(f"Lendo arquivo: {path} (extensão: {ext})", "DEBUG")
+    log_with_time("Lendo arquivo: %s (extensão: %s)", "DEBUG", path, ext)
 
     if not os.path.exists(path):
         raise FileNotFoundError(f"Arquivo não encontrado: {path}")
@@ -123,96 +192,22 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> Tuple[pd.DataFrame
 
     # 1) Tenta Excel
     excel_error: Exception | None = None
-    if ext in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
+    if ext in EXTENSOES_EXCEL:
         try:
-            options = {
-                "header": None,
-                "engine": "calamine",
-                "dtype": str,
-                "keep_default_na": False,
-                "na_filter": False,
-                "nrows": nrows,
-            }
-            try:
-                df = pd.read_excel(path, **options)
-            except Exception:
-                try:
-                    options["engine"] = "openpyxl"
-                    df = pd.read_excel(path, **options)
-                except Exception:
-                    # Fallback final: leitura direta do XML interno do xlsx via zipfile
-                    # Bypassa completamente o openpyxl (evita erros de estilos/inf/NaN)
-                    import zipfile, xml.etree.ElementTree as ET
-                    NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-
-                    with zipfile.ZipFile(path, "r") as z:
-                        # Shared strings
-                        shared: list[str] = []
-                        if "xl/sharedStrings.xml" in z.namelist():
-                            with z.open("xl/sharedStrings.xml") as f:
-                                root_ss = ET.parse(f).getroot()
-                                for si in root_ss.findall(f"{{{NS}}}si"):
-                                    t_el = si.find(f".//{{{NS}}}t")
-                                    shared.append(t_el.text if t_el is not None and t_el.text else "")
-
-                        # Primeira planilha — busca flexível (qualquer case/nome)
-                        all_files = z.namelist()
-                        sheet_names = [n for n in all_files if n.lower().startswith("xl/worksheets/") and n.lower().endswith(".xml") and "sheet" in n.lower()]
-                        if not sheet_names:
-                            # Último recurso: qualquer XML dentro de worksheets/
-                            sheet_names = [n for n in all_files if "worksheets" in n.lower() and n.lower().endswith(".xml")]
-                        if not sheet_names:
-                            raise ValueError(f"Nenhuma planilha encontrada. Arquivos no ZIP: {all_files}")
-                        with z.open(sorted(sheet_names)[0]) as f:
-                            root_ws = ET.parse(f).getroot()
-
-                    rows = []
-                    for row_el in root_ws.findall(f".//{{{NS}}}row"):
-                        row_data: list[str] = []
-                        for c in row_el.findall(f"{{{NS}}}c"):
-                            t = c.get("t", "")
-                            v_el = c.find(f"{{{NS}}}v")
-                            if v_el is None or v_el.text is None:
-                                row_data.append("")
-                            elif t == "s":
-                                try:
-                                    row_data.append(shared[int(v_el.text)])
-                                except (IndexError, ValueError):
-                                    row_data.append(v_el.text)
-                            elif t == "inlineStr":
-                                t_el = c.find(f".//{{{NS}}}t")
-                                row_data.append(t_el.text if t_el is not None and t_el.text else "")
-                            elif t == "b":
-                                row_data.append("TRUE" if v_el.text == "1" else "FALSE")
-                            else:
-                                row_data.append(v_el.text)
-                        rows.append(row_data)
-
-                    if not rows:
-                        raise ValueError("Planilha vazia após leitura via XML.")
-                    max_cols = max(len(r) for r in rows)
-                    rows = [r + [""] * (max_cols - len(r)) for r in rows]
-                    df = pd.DataFrame(rows, dtype=str)
-
-            log_with_time(f"[DEBUG][SAFE_READ] Excel lido. Shape bruto: {df.shape}", "DEBUG")
+            df, _engine = ler_excel_bruto(path, nrows)
+            log_with_time("[SAFE_READ] Excel lido. Shape bruto: %s", "DEBUG", df.shape)
 
             # Detectar cabeçalho
             header_idx, score = detectar_cabecalho(df)
-            log_with_time(f"[DEBUG][SAFE_READ] Heurística: Linha {header_idx} (score {score})", "DEBUG")
-
-            header_row = df.iloc[header_idx]
-            header_names = [str(col).strip() if str(col).strip() and str(col).strip().lower() not in ["nan", "none"] else f"Coluna_{i}" for i, col in enumerate(header_row)]
-
-            df_final = df.iloc[header_idx + 1 :].astype(str)
-            df_final.columns = header_names
-            df_final.reset_index(drop=True, inplace=True)
+            log_with_time("[SAFE_READ] Heurística: Linha %s (score %s)", "DEBUG", header_idx, score)
 
-            log_with_time(f"[DEBUG][SAFE_READ] DataFrame finalizado. Linhas: {len(df_final)} | Cols: {list(df_final.columns)[:5]}...", "DEBUG")
-            return df_final.fillna(""), header_idx, df_final.columns.tolist()
+            df_final = aplicar_cabecalho(df, header_idx)
+            log_with_time("[SAFE_READ] DataFrame finalizado. Linhas: %d | Cols: %s...", "DEBUG", len(df_final), list(df_final.columns)[:5])
+            return df_final, header_idx, df_final.columns.tolist()
 
         except Exception as e:
             excel_error = e
-            log_with_time(f"Falha na leitura Excel: {e}", "ERROR")
+            log_with_time("Falha na leitura Excel: %s", "ERROR", e)
 
     # 2) Tenta ler como texto (CSV/TXT)
     try:
@@ -236,7 +231,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> Tuple[pd.DataFrame
                     df = pd.DataFrame(data, columns=valores)
                     return df.fillna(""), i, valores
     except Exception as e:
-        log_with_time(f"Falha ao ler como texto: {e}", "ERROR")
+        log_with_time("Falha ao ler como texto: %s", "ERROR", e)
 
     # Detectar arquivo protegido por senha (padrão do openpyxl)
     nome_arquivo = Path(path).name
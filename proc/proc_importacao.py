@@ -1,4 +1,5 @@
 from __future__ import annotations
+import logging
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Any, Protocol, Optional
 import pandas as pd
@@ -14,6 +15,7 @@ from pathlib import Path
 from sqlalchemy.engine import Engine
 from proc.importers.factory import ImporterFactory
 from proc.importers.utils import log_to_debug_file
+from proc.importers.parsers import parse_dates_br, parse_decimal_br
 
 from conf.funcoesbd import (
     depara_carregar_mapa_completo,
@@ -31,6 +33,8 @@ from conf.funcoesbd import (
 )
 from conf.debug_utils import PerformanceTimer
 
+logger = logging.getLogger(__name__)
+
 
 # Função para processar, filtrar e gravar recebíveis
 def classificar_e_gravar_recebiveis(
@@ -70,7 +74,10 @@ def classificar_e_gravar_recebiveis(
                 df = df.drop_duplicates(subset=cols_dedup).copy()
                 len_depois = len(df)
                 if len_antes > len_depois:
-                    print(f"[DEBUG][DEDUP] Removidas {len_antes - len_depois} duplicadas em memória antes da gravação.")
+                    logger.debug(
+                        "[DEDUP] Removidas %s duplicadas em memória antes da gravação.",
+                        len_antes - len_depois,
+                    )
     
             # Se já tem coluna 'Filtrado', refaz a filtragem com os termos atuais do banco
             if "Filtrado" in df.columns:
@@ -210,14 +217,14 @@ def classificar_e_gravar_recebiveis(
             mask = pd.to_numeric(df_proc_db['ec_id'], errors='coerce').notna()
             removed = (~mask).sum()
             if removed:
-                print(f"[DEBUG][RECEB] Removendo {removed} linha(s) de rodapé em df_proc_db.")
+                logger.debug("[RECEB] Removendo %s linha(s) de rodapé em df_proc_db.", removed)
             df_proc_db = df_proc_db[mask].copy()
 
         if 'ec_id' in df_filt_db.columns:
             mask = pd.to_numeric(df_filt_db['ec_id'], errors='coerce').notna()
             removed = (~mask).sum()
             if removed:
-                print(f"[DEBUG][RECEB] Removendo {removed} linha(s) de rodapé em df_filt_db.")
+                logger.debug("[RECEB] Removendo %s linha(s) de rodapé em df_filt_db.", removed)
             df_filt_db = df_filt_db[mask].copy()
 
         n_proc, n_filt = len(df_proc_db), len(df_filt_db)
@@ -242,7 +249,10 @@ def classificar_e_gravar_recebiveis(
                 df_proc_db.columns.tolist(),
             )
         elif n_proc and was_fresh:
-            print(f"[DEBUG][DEDUP] Pulando remoção SQL de duplicadas para fresh import (processamentoid: {processamentoid})")
+            logger.debug(
+                "[DEDUP] Pulando remoção SQL de duplicadas para fresh import (processamentoid: %s)",
+                processamentoid,
+            )
             if progress_callback: progress_callback(95, "Deduplicação em memória concluída.")
     
         if n_filt and not was_fresh:
@@ -293,12 +303,8 @@ def normalizar_dataframe_recebiveis(
             # ⚠️ CORREÇÃO CRÍTICA: Detectar formato ISO 8601 (YYYY-MM-DD) vs brasileiro (DD/MM/YYYY)
             # - Se string contém '-' → formato ISO (não usar dayfirst)
             # - Se string contém '/' → formato brasileiro (usar dayfirst=True)
-            sample_value = (
-                str(df[col].dropna().iloc[0]) if len(df[col].dropna()) > 0 else ""
-            )
-            use_dayfirst = "/" in sample_value  # Apenas para formato DD/MM/YYYY
-            
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=use_dayfirst)
+            # (parse_dates_br detecta o formato pela amostra e converte por valores únicos)
+            df[col] = parse_dates_br(df[col])
 
         # Conversão explícita de colunas numéricas/monetárias
         colunas_numericas_candidatas = [
@@ -477,9 +483,7 @@ def safe_read_multisheet_file(
     4) Para mapeamento usa formato [nomedaplanilha]_[col_cabecalho]
     """
     ext = Path(path).suffix.lower()
-    print(
-        f"[DEBUG][MULTISHEET] Lendo arquivo multi-planilhas: {path} (extensão: {ext})"
-    )
+    logger.debug("[MULTISHEET] Lendo arquivo multi-planilhas: %s (extensão: %s)", path, ext)
 
     if ext not in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
         raise ValueError(f"Arquivo {path} não é Excel válido para multi-planilhas")
@@ -514,12 +518,8 @@ def safe_read_multisheet_file(
                     prefixo_aba = col_origem.split("_")[0]
                     abas_configuradas.add(prefixo_aba.lower())
 
-            print(
-                f"[DEBUG][MULTISHEET] Regras ativas encontradas: {len(regras_validas)}"
-            )
-            print(
-                f"[DEBUG][MULTISHEET] Abas configuradas no depara: {sorted(abas_configuradas)}"
-            )
+            logger.debug("[MULTISHEET] Regras ativas encontradas: %s", len(regras_validas))
+            logger.debug("[MULTISHEET] Abas configuradas no depara: %s", sorted(abas_configuradas))
         else:
             abas_configuradas = None
 
@@ -527,29 +527,26 @@ def safe_read_multisheet_file(
         all_sheets = excel_file.sheet_names
         sheet_names = []
 
-        print(f"[DEBUG][MULTISHEET] 📋 TODAS AS ABAS ENCONTRADAS: {all_sheets}")
+        logger.debug("[MULTISHEET] 📋 TODAS AS ABAS ENCONTRADAS: %s", all_sheets)
 
         for name in all_sheets:
             name_lower = name.lower().strip()
-            print(
-                f"[DEBUG][MULTISHEET] 🔍 Processando aba: '{name}' (lower: '{name_lower}')"
-            )
+            logger.debug("[MULTISHEET] 🔍 Processando aba: '%s' (lower: '%s')", name, name_lower)
 
             # Excluir capa
             if name_lower == "capa":
-                print(f"[DEBUG][MULTISHEET] ❌ Excluindo aba capa: {name}")
+                logger.debug("[MULTISHEET] ❌ Excluindo aba capa: %s", name)
                 continue
 
             # Para recebíveis, verificar se a aba tem configuração no depara
             if tipo_origem == "R" and abas_configuradas is not None:
-                print(
-                    f"[DEBUG][MULTISHEET] 📊 Verificando configuração para aba '{name}'..."
-                )
+                logger.debug("[MULTISHEET] 📊 Verificando configuração para aba '%s'...", name)
 
                 # Se não há abas configuradas, não processar nenhuma
                 if not abas_configuradas:
-                    print(
-                        f"[DEBUG][MULTISHEET] ❌ Excluindo aba '{name}' - nenhuma configuração ativa encontrada no depara"
+                    logger.debug(
+                        "[MULTISHEET] ❌ Excluindo aba '%s' - nenhuma configuração ativa encontrada no depara",
+                        name,
                     )
                     continue
 
@@ -559,16 +556,19 @@ def safe_read_multisheet_file(
                 )
                 aba_tem_config = False
 
-                print(
-                    f"[DEBUG][MULTISHEET] 🔍 Testando '{name}' (clean: '{nome_aba_clean}') contra abas configuradas: {abas_configuradas}"
+                logger.debug(
+                    "[MULTISHEET] 🔍 Testando '%s' (clean: '%s') contra abas configuradas: %s",
+                    name,
+                    nome_aba_clean,
+                    abas_configuradas,
                 )
 
                 # Tentar várias formas de matching
                 for aba_config in abas_configuradas:
-                    print(f"[DEBUG][MULTISHEET] 🔄 Testando matching:")
-                    print(f"[DEBUG][MULTISHEET]   - aba_config: '{aba_config}'")
-                    print(f"[DEBUG][MULTISHEET]   - nome_aba_clean: '{nome_aba_clean}'")
-                    print(f"[DEBUG][MULTISHEET]   - name_lower: '{name_lower}'")
+                    logger.debug("[MULTISHEET] 🔄 Testando matching:")
+                    logger.debug("[MULTISHEET]   - aba_config: '%s'", aba_config)
+                    logger.debug("[MULTISHEET]   - nome_aba_clean: '%s'", nome_aba_clean)
+                    logger.debug("[MULTISHEET]   - name_lower: '%s'", name_lower)
 
                     condicao1 = aba_config in nome_aba_clean
                     condicao2 = nome_aba_clean in aba_config
@@ -577,49 +577,61 @@ def safe_read_multisheet_file(
                         "_", " "
                     )
 
-                    print(
-                        f"[DEBUG][MULTISHEET]   - Test1 ('{aba_config}' in '{nome_aba_clean}'): {condicao1}"
+                    logger.debug(
+                        "[MULTISHEET]   - Test1 ('%s' in '%s'): %s",
+                        aba_config,
+                        nome_aba_clean,
+                        condicao1,
                     )
-                    print(
-                        f"[DEBUG][MULTISHEET]   - Test2 ('{nome_aba_clean}' in '{aba_config}'): {condicao2}"
+                    logger.debug(
+                        "[MULTISHEET]   - Test2 ('%s' in '%s'): %s",
+                        nome_aba_clean,
+                        aba_config,
+                        condicao2,
                     )
-                    print(
-                        f"[DEBUG][MULTISHEET]   - Test3 ('{aba_config.replace('_', ' ')}' in '{name_lower}'): {condicao3}"
+                    logger.debug(
+                        "[MULTISHEET]   - Test3 ('%s' in '%s'): %s",
+                        aba_config.replace('_', ' '),
+                        name_lower,
+                        condicao3,
                     )
-                    print(
-                        f"[DEBUG][MULTISHEET]   - Test4 ('{nome_aba_clean.replace('_', ' ')}' == '{aba_config.replace('_', ' ')}'): {condicao4}"
+                    logger.debug(
+                        "[MULTISHEET]   - Test4 ('%s' == '%s'): %s",
+                        nome_aba_clean.replace('_', ' '),
+                        aba_config.replace('_', ' '),
+                        condicao4,
                     )
 
                     if condicao1 or condicao2 or condicao3 or condicao4:
                         aba_tem_config = True
-                        print(
-                            f"[DEBUG][MULTISHEET] ✅ MATCH! Aba '{name}' corresponde ao depara '{aba_config}'"
+                        logger.debug(
+                            "[MULTISHEET] ✅ MATCH! Aba '%s' corresponde ao depara '%s'",
+                            name,
+                            aba_config,
                         )
                         break
                     else:
-                        print(f"[DEBUG][MULTISHEET] ❌ Sem match com '{aba_config}'")
+                        logger.debug("[MULTISHEET] ❌ Sem match com '%s'", aba_config)
 
                 if not aba_tem_config:
-                    print(
-                        f"[DEBUG][MULTISHEET] Excluindo aba sem configuração no depara: {name}"
-                    )
-                    print(
-                        f"[DEBUG][MULTISHEET] Abas configuradas disponíveis: {sorted(abas_configuradas)}"
+                    logger.debug("[MULTISHEET] Excluindo aba sem configuração no depara: %s", name)
+                    logger.debug(
+                        "[MULTISHEET] Abas configuradas disponíveis: %s", sorted(abas_configuradas)
                     )
                     continue
 
             # Incluir aba aprovada
             sheet_names.append(name)
 
-        print(f"[DEBUG][MULTISHEET] Planilhas selecionadas: {sheet_names}")
-        print(
-            f"[DEBUG][MULTISHEET] Planilhas excluídas: {[s for s in all_sheets if s not in sheet_names]}"
+        logger.debug("[MULTISHEET] Planilhas selecionadas: %s", sheet_names)
+        logger.debug(
+            "[MULTISHEET] Planilhas excluídas: %s", [s for s in all_sheets if s not in sheet_names]
         )
 
         resultado = {}
 
         for sheet_name in sheet_names:
-            print(f"[DEBUG][MULTISHEET] Processando planilha: {sheet_name}")
+            logger.debug("[MULTISHEET] Processando planilha: %s", sheet_name)
             try:
                 # Ler planilha como DataFrame
                 # ⚠️ CRÍTICO: keep_default_na=False para evitar conversão automática de datas
@@ -638,8 +650,8 @@ def safe_read_multisheet_file(
                 header_row_idx = 0
                 headers = []
 
-                print(
-                    f"[DEBUG][MULTISHEET] {sheet_name} - Analisando primeiras 10 linhas para cabeçalho..."
+                logger.debug(
+                    "[MULTISHEET] %s - Analisando primeiras 10 linhas para cabeçalho...", sheet_name
                 )
 
                 def is_likely_header_row(row):
@@ -790,23 +802,24 @@ def safe_read_multisheet_file(
                     try:
                         is_header, score = is_likely_header_row(row)
 
-                        print(
-                            f"[DEBUG][MULTISHEET] Linha {idx}: score={score}, é_cabeçalho={is_header}"
+                        logger.debug(
+                            "[MULTISHEET] Linha %s: score=%s, é_cabeçalho=%s", idx, score, is_header
                         )
-                        print(f"[DEBUG][MULTISHEET] Conteúdo: {list(row[:5])}...")
+                        logger.debug("[MULTISHEET] Conteúdo: %s...", list(row[:5]))
 
                         if is_header and score > best_score:
                             best_header_idx = idx
                             best_score = score
                     except Exception as e:
-                        print(f"[DEBUG][MULTISHEET] Erro ao analisar linha {idx}: {e}")
-                        print(f"[DEBUG][MULTISHEET] Conteúdo da linha: {list(row[:5])}")
+                        logger.debug("[MULTISHEET] Erro ao analisar linha %s: %s", idx, e)
+                        logger.debug("[MULTISHEET] Conteúdo da linha: %s", list(row[:5]))
                         # Continuar com próxima linha
 
                 # Para arquivos REDE, se não detectou cabeçalho automático, tentar linha 1 manualmente
                 if best_score == 0 and len(df) > 1:
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Tentando linha 1 manualmente como cabeçalho REDE"
+                    logger.debug(
+                        "[MULTISHEET] %s - Tentando linha 1 manualmente como cabeçalho REDE",
+                        sheet_name,
                     )
                     # Verificar linha 1 especificamente para arquivos REDE
                     row1 = df.iloc[1]
@@ -829,18 +842,22 @@ def safe_read_multisheet_file(
                     ):
                         best_header_idx = 1
                         best_score = 5
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Forçando linha 1 como cabeçalho: {list(row1[:5])}"
+                        logger.debug(
+                            "[MULTISHEET] %s - Forçando linha 1 como cabeçalho: %s",
+                            sheet_name,
+                            list(row1[:5]),
                         )
                     else:
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Linha 1 não parece cabeçalho, criando genérico"
+                        logger.debug(
+                            "[MULTISHEET] %s - Linha 1 não parece cabeçalho, criando genérico",
+                            sheet_name,
                         )
                         best_header_idx = -1
                         best_score = 1
                 elif best_score == 0:
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Nenhum cabeçalho detectado, assumindo dados começam na linha 0"
+                    logger.debug(
+                        "[MULTISHEET] %s - Nenhum cabeçalho detectado, assumindo dados começam na linha 0",
+                        sheet_name,
                     )
                     best_header_idx = -1  # Indica que não há linha de cabeçalho
                     best_score = 1
@@ -848,23 +865,26 @@ def safe_read_multisheet_file(
                 if best_score > 0:
                     if best_header_idx == -1:
                         # Não há linha de cabeçalho, criar headers genéricos
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Sem cabeçalho, criando headers genéricos"
+                        logger.debug(
+                            "[MULTISHEET] %s - Sem cabeçalho, criando headers genéricos", sheet_name
                         )
                         header_row_idx = -1
                         num_cols = len(df.columns)
                         headers = [
                             f"{sheet_name}_Coluna_{i+1}" for i in range(num_cols)
                         ]
-                        print(f"[DEBUG][MULTISHEET] Headers criados: {headers}")
+                        logger.debug("[MULTISHEET] Headers criados: %s", headers)
                     else:
                         header_row_idx = best_header_idx
                         row = df.iloc[header_row_idx]
 
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Cabeçalho detectado na linha {header_row_idx} (score: {best_score})"
+                        logger.debug(
+                            "[MULTISHEET] %s - Cabeçalho detectado na linha %s (score: %s)",
+                            sheet_name,
+                            header_row_idx,
+                            best_score,
                         )
-                        print(f"[DEBUG][MULTISHEET] Conteúdo: {list(row)}")
+                        logger.debug("[MULTISHEET] Conteúdo: %s", list(row))
 
                         # Criar headers usando nome da planilha + valor real da célula
                         headers = []
@@ -885,14 +905,15 @@ def safe_read_multisheet_file(
                             else:
                                 header_name = f"{sheet_name}_Coluna_{i+1}"
                             headers.append(header_name)
-                            print(
-                                f"[DEBUG][MULTISHEET] Coluna {i}: '{col_value}' -> '{header_name}'"
+                            logger.debug(
+                                "[MULTISHEET] Coluna %s: '%s' -> '%s'", i, col_value, header_name
                             )
 
                 if not headers:
                     # Se não encontrou cabeçalho com a nova lógica, tentar fallback
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Cabeçalho não detectado, usando primeira linha como fallback"
+                    logger.debug(
+                        "[MULTISHEET] %s - Cabeçalho não detectado, usando primeira linha como fallback",
+                        sheet_name,
                     )
 
                     if len(df) > 0:
@@ -900,7 +921,7 @@ def safe_read_multisheet_file(
                         first_row = df.iloc[0]
                         headers = []
 
-                        print(f"[DEBUG][MULTISHEET] Primeira linha: {list(first_row)}")
+                        logger.debug("[MULTISHEET] Primeira linha: %s", list(first_row))
 
                         for i, col_value in enumerate(first_row):
                             col_str = str(col_value).strip()
@@ -925,8 +946,10 @@ def safe_read_multisheet_file(
                         num_cols = (
                             len(df.columns) if len(df) > 0 else 10
                         )  # Default 10 colunas
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Último recurso: usando {num_cols} nomes de colunas por índice"
+                        logger.debug(
+                            "[MULTISHEET] %s - Último recurso: usando %s nomes de colunas por índice",
+                            sheet_name,
+                            num_cols,
                         )
                         headers = [
                             f"{sheet_name}_Coluna_{i+1}" for i in range(num_cols)
@@ -943,9 +966,7 @@ def safe_read_multisheet_file(
                 else:
                     start_row = header_row_idx + 1 if best_score > 0 else 0
 
-                print(
-                    f"[DEBUG][MULTISHEET] {sheet_name} - Iniciando dados na linha {start_row}"
-                )
+                logger.debug("[MULTISHEET] %s - Iniciando dados na linha %s", sheet_name, start_row)
 
                 if start_row < len(df):
                     data_values = df.iloc[start_row:].values
@@ -964,9 +985,7 @@ def safe_read_multisheet_file(
 
                 # Limpar linhas que são claramente texto de relatório, não dados
                 if not data_df.empty:
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Limpando linhas de relatório..."
-                    )
+                    logger.debug("[MULTISHEET] %s - Limpando linhas de relatório...", sheet_name)
 
                     # Detectar e remover linhas que são texto de relatório
                     mask_dados_validos = pd.Series([True] * len(data_df))
@@ -1006,8 +1025,8 @@ def safe_read_multisheet_file(
 
                         if is_report_line:
                             mask_dados_validos[idx] = False
-                            print(
-                                f"[DEBUG][MULTISHEET] Removendo linha de relatório: {first_cell}"
+                            logger.debug(
+                                "[MULTISHEET] Removendo linha de relatório: %s", first_cell
                             )
                         elif exact_header_match:
                             mask_dados_validos[idx] = False
@@ -1017,8 +1036,11 @@ def safe_read_multisheet_file(
                             columns_count = sum(
                                 1 for val in row_values if val in header_values
                             )
-                            print(
-                                f"[DEBUG][MULTISHEET] Removendo linha de cabeçalho duplicada: {row_values} (frases: {phrases_count}, colunas: {columns_count})"
+                            logger.debug(
+                                "[MULTISHEET] Removendo linha de cabeçalho duplicada: %s (frases: %s, colunas: %s)",
+                                row_values,
+                                phrases_count,
+                                columns_count,
                             )
 
                     # Aplicar limpeza
@@ -1027,14 +1049,17 @@ def safe_read_multisheet_file(
                     linhas_removidas = linhas_antes - len(data_df)
 
                     if linhas_removidas > 0:
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Removidas {linhas_removidas} linhas de cabeçalho de relatório"
+                        logger.debug(
+                            "[MULTISHEET] %s - Removidas %s linhas de cabeçalho de relatório",
+                            sheet_name,
+                            linhas_removidas,
                         )
 
                         # Se limpeza removeu todos os dados, reverter para dados originais
                         if len(data_df) == 0 and linhas_antes > 0:
-                            print(
-                                f"[DEBUG][MULTISHEET] {sheet_name} - Limpeza removeu todos os dados, mantendo originais"
+                            logger.debug(
+                                "[MULTISHEET] %s - Limpeza removeu todos os dados, mantendo originais",
+                                sheet_name,
                             )
                             data_df = pd.DataFrame(
                                 data_values,
@@ -1129,8 +1154,11 @@ def safe_read_multisheet_file(
                             if (
                                 header_phrase_count >= 1 or is_column_names >= 2
                             ) and not has_actual_dates:
-                                print(
-                                    f"[DEBUG][MULTISHEET] Removendo linha de cabeçalho duplicada: {row_values[:5]} (frases: {header_phrase_count}, colunas: {is_column_names})"
+                                logger.debug(
+                                    "[MULTISHEET] Removendo linha de cabeçalho duplicada: %s (frases: %s, colunas: %s)",
+                                    row_values[:5],
+                                    header_phrase_count,
+                                    is_column_names,
                                 )
                                 return True
 
@@ -1141,14 +1169,17 @@ def safe_read_multisheet_file(
                     data_df_clean = data_df_clean[~mask_report]
 
                     if mask_report.any():
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Removidas {mask_report.sum()} linhas de cabeçalho de relatório"
+                        logger.debug(
+                            "[MULTISHEET] %s - Removidas %s linhas de cabeçalho de relatório",
+                            sheet_name,
+                            mask_report.sum(),
                         )
 
                 # Se ficou vazio após limpeza, tentar manter dados originais (mas sem cabeçalhos de relatório)
                 if data_df_clean.empty and not data_df.empty:
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Limpeza removeu todos os dados, mantendo originais"
+                    logger.debug(
+                        "[MULTISHEET] %s - Limpeza removeu todos os dados, mantendo originais",
+                        sheet_name,
                     )
                     data_df_clean = data_df
 
@@ -1183,8 +1214,9 @@ def safe_read_multisheet_file(
                             ):
                                 colunas_pagamento.append(col)
 
-                        print(
-                            f"[DEBUG][MULTISHEET] PAGAMENTOS - Colunas identificadas para distinct: {colunas_pagamento}"
+                        logger.debug(
+                            "[MULTISHEET] PAGAMENTOS - Colunas identificadas para distinct: %s",
+                            colunas_pagamento,
                         )
 
                         if colunas_pagamento:
@@ -1199,14 +1231,12 @@ def safe_read_multisheet_file(
                         linhas_depois = len(data_df_clean)
                         linhas_removidas = linhas_antes - linhas_depois
 
-                        print(f"[DEBUG][MULTISHEET] PAGAMENTOS - DISTINCT aplicado:")
-                        print(f"[DEBUG][MULTISHEET] - Linhas antes: {linhas_antes}")
-                        print(f"[DEBUG][MULTISHEET] - Linhas depois: {linhas_depois}")
-                        print(
-                            f"[DEBUG][MULTISHEET] - Duplicatas removidas: {linhas_removidas}"
-                        )
-                        print(
-                            f"[DEBUG][MULTISHEET] - Colunas usadas no distinct: {colunas_pagamento}"
+                        logger.debug("[MULTISHEET] PAGAMENTOS - DISTINCT aplicado:")
+                        logger.debug("[MULTISHEET] - Linhas antes: %s", linhas_antes)
+                        logger.debug("[MULTISHEET] - Linhas depois: %s", linhas_depois)
+                        logger.debug("[MULTISHEET] - Duplicatas removidas: %s", linhas_removidas)
+                        logger.debug(
+                            "[MULTISHEET] - Colunas usadas no distinct: %s", colunas_pagamento
                         )
 
                     resultado[sheet_name] = {
@@ -1214,27 +1244,30 @@ def safe_read_multisheet_file(
                         "headers": list(data_df_clean.columns),
                         "header_row_idx": header_row_idx,
                     }
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name}: {len(data_df_clean)} linhas, {len(data_df_clean.columns)} colunas"
+                    logger.debug(
+                        "[MULTISHEET] %s: %s linhas, %s colunas",
+                        sheet_name,
+                        len(data_df_clean),
+                        len(data_df_clean.columns),
                     )
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name} - Primeira linha de dados: {data_df_clean.iloc[0].tolist()}"
+                    logger.debug(
+                        "[MULTISHEET] %s - Primeira linha de dados: %s",
+                        sheet_name,
+                        data_df_clean.iloc[0].tolist(),
                     )
                 else:
-                    print(
-                        f"[DEBUG][MULTISHEET] {sheet_name}: planilha vazia após limpeza, ignorando"
+                    logger.debug(
+                        "[MULTISHEET] %s: planilha vazia após limpeza, ignorando", sheet_name
                     )
 
             except Exception as e:
-                print(
-                    f"[DEBUG][MULTISHEET] Erro ao processar planilha {sheet_name}: {e}"
-                )
+                logger.warning("[MULTISHEET] Erro ao processar planilha %s: %s", sheet_name, e)
                 continue
 
         # Verificação final: se não há resultados, tentar salvar pelo menos uma planilha com dados brutos
         if not resultado and sheet_names:
-            print(
-                f"[DEBUG][MULTISHEET] Nenhuma planilha processada com sucesso, tentativa de recuperação..."
+            logger.debug(
+                "[MULTISHEET] Nenhuma planilha processada com sucesso, tentativa de recuperação..."
             )
 
             # Tentar ler a primeira planilha disponível de forma mais simples
@@ -1277,8 +1310,8 @@ def safe_read_multisheet_file(
                                 ]
                             ):
                                 header_row_idx = idx
-                                print(
-                                    f"[DEBUG][MULTISHEET] Recuperação: cabeçalho detectado na linha {idx}"
+                                logger.debug(
+                                    "[MULTISHEET] Recuperação: cabeçalho detectado na linha %s", idx
                                 )
 
                                 # Criar headers baseado nos valores da linha
@@ -1306,9 +1339,7 @@ def safe_read_multisheet_file(
 
                         # Se não encontrou cabeçalho, usar genéricos
                         if not headers:
-                            print(
-                                f"[DEBUG][MULTISHEET] Recuperação: usando headers genéricos"
-                            )
+                            logger.debug("[MULTISHEET] Recuperação: usando headers genéricos")
                             headers = [
                                 f"{sheet_name}_Col_{i+1}"
                                 for i in range(len(df_raw.columns))
@@ -1357,8 +1388,9 @@ def safe_read_multisheet_file(
                                     ):
                                         colunas_pagamento.append(col)
 
-                                print(
-                                    f"[DEBUG][MULTISHEET] RECUPERAÇÃO PAGAMENTOS - Colunas identificadas para distinct: {colunas_pagamento}"
+                                logger.debug(
+                                    "[MULTISHEET] RECUPERAÇÃO PAGAMENTOS - Colunas identificadas para distinct: %s",
+                                    colunas_pagamento,
                                 )
 
                                 if colunas_pagamento:
@@ -1373,20 +1405,17 @@ def safe_read_multisheet_file(
                                 linhas_depois = len(df_clean)
                                 linhas_removidas = linhas_antes - linhas_depois
 
-                                print(
-                                    f"[DEBUG][MULTISHEET] RECUPERAÇÃO PAGAMENTOS - DISTINCT aplicado:"
-                                )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Linhas antes: {linhas_antes}"
+                                logger.debug(
+                                    "[MULTISHEET] RECUPERAÇÃO PAGAMENTOS - DISTINCT aplicado:"
                                 )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Linhas depois: {linhas_depois}"
+                                logger.debug("[MULTISHEET] - Linhas antes: %s", linhas_antes)
+                                logger.debug("[MULTISHEET] - Linhas depois: %s", linhas_depois)
+                                logger.debug(
+                                    "[MULTISHEET] - Duplicatas removidas: %s", linhas_removidas
                                 )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Duplicatas removidas: {linhas_removidas}"
-                                )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Colunas usadas no distinct: {colunas_pagamento}"
+                                logger.debug(
+                                    "[MULTISHEET] - Colunas usadas no distinct: %s",
+                                    colunas_pagamento,
                                 )
 
                             resultado[sheet_name] = {
@@ -1394,21 +1423,23 @@ def safe_read_multisheet_file(
                                 "headers": headers,
                                 "header_row_idx": 0,
                             }
-                            print(
-                                f"[DEBUG][MULTISHEET] Recuperação: {sheet_name} salva com {len(df_clean)} linhas"
+                            logger.debug(
+                                "[MULTISHEET] Recuperação: %s salva com %s linhas",
+                                sheet_name,
+                                len(df_clean),
                             )
                             break
 
                 except Exception as e:
-                    print(
-                        f"[DEBUG][MULTISHEET] Erro na recuperação da planilha {sheet_name}: {e}"
+                    logger.debug(
+                        "[MULTISHEET] Erro na recuperação da planilha %s: %s", sheet_name, e
                     )
                     continue
 
         return resultado
 
     except Exception as e:
-        print(f"[DEBUG][MULTISHEET] Erro ao processar arquivo multi-planilhas: {e}")
+        logger.warning("[MULTISHEET] Erro ao processar arquivo multi-planilhas: %s", e)
         raise
     finally:
         # Garantir que o arquivo Excel seja fechado
@@ -1429,14 +1460,14 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
     - Lista com os nomes das colunas
     """
     ext = Path(path).suffix.lower()
-    print(f"[DEBUG] Lendo arquivo: {path} (extensão: {ext})")
+    logger.debug("Lendo arquivo: %s (extensão: %s)", path, ext)
 
     # 🔥 VALIDAÇÃO INICIAL: Verificar se arquivo existe e tem tamanho válido
     if not os.path.exists(path):
         raise FileNotFoundError(f"Arquivo não encontrado: {path}")
 
     file_size = os.path.getsize(path)
-    print(f"[DEBUG] Tamanho do arquivo: {file_size:,} bytes")
+    logger.debug("Tamanho do arquivo: %s bytes", format(file_size, ','))
 
     if file_size == 0:
         raise ValueError("Arquivo está vazio (0 bytes)")
@@ -1450,7 +1481,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                 raise ValueError(
                     f"Arquivo Excel corrompido ou inválido. Assinatura esperada: 'PK', encontrada: {magic[:2].hex()}"
                 )
-            print(f"[DEBUG] ✓ Assinatura válida de arquivo ZIP/Excel: {magic[:2]}")
+            logger.debug("✓ Assinatura válida de arquivo ZIP/Excel: %s", magic[:2])
 
     elif ext == ".xls":
         with open(path, "rb") as f:
@@ -1460,7 +1491,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                 raise ValueError(
                     f"Arquivo Excel antigo (.xls) corrompido. Assinatura esperada: 'D0CF11A0', encontrada: {magic[:4].hex()}"
                 )
-            print(f"[DEBUG] ✓ Assinatura válida de arquivo Excel antigo (.xls)")
+            logger.debug("✓ Assinatura válida de arquivo Excel antigo (.xls)")
 
     # Detecta se é arquivo binário (possível .tmp ou corrompido)
     def is_binary_string(bytes_data):
@@ -1481,7 +1512,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                 "nrows": nrows,
             }
             df = pd.read_excel(path, **options)
-            print("[DEBUG] Leitura inicial bem sucedida, procurando cabeçalho...")
+            logger.debug("Leitura inicial bem sucedida, procurando cabeçalho...")
 
             # Procura o cabeçalho nas primeiras linhas (aumentado para 50 para suportar informativos longos)
             for idx in range(min(50, len(df))):
@@ -1493,7 +1524,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                         and "valor" in row_text
                         and "data" in row_text
                     ):
-                        print(f"[DEBUG] Cabeçalho encontrado na linha {idx}")
+                        logger.debug("Cabeçalho encontrado na linha %s", idx)
                         # Usar esta linha como cabeçalho
                         header_row = [
                             str(x).strip() if str(x).strip() else f"Coluna_{i}"
@@ -1506,7 +1537,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                         return result_df.fillna(""), 0, result_df.columns.tolist()
 
         except Exception as e:
-            print(f"[DEBUG] Falha na primeira tentativa: {e}")
+            logger.debug("Falha na primeira tentativa: %s", e)
 
         # Se falhou, tenta as outras variações
         excel_errors = []
@@ -1522,10 +1553,10 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                         "nrows": nrows,
                     }
                     df = pd.read_excel(path, **options)
-                    print(
-                        f"[DEBUG] Primeiras linhas lidas do Excel (engine={engine}, header={header}):"
+                    logger.debug(
+                        "Primeiras linhas lidas do Excel (engine=%s, header=%s):", engine, header
                     )
-                    print(df.head(5))
+                    logger.debug("%s", df.head(5))
 
                     # Se encontramos um cabeçalho válido, vamos usar ele
                     if header == 1:  # header está na linha 1
@@ -1536,19 +1567,17 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                         df = df.iloc[
                             1:
                         ]  # Remove a primeira linha que agora é cabeçalho
-                        print("[DEBUG] Usando cabeçalho encontrado na linha 1")
-                        print("[DEBUG] Colunas:", df.columns.tolist())
+                        logger.debug("Usando cabeçalho encontrado na linha 1")
+                        logger.debug("Colunas: %s", df.columns.tolist())
                         df.dropna(how="all", inplace=True)
                         df.dropna(how="all", axis=1, inplace=True)
                         return df.fillna(""), 1, df.columns.tolist()
 
                     # ⚠️ CRÍTICO: Quando header=None, detectar cabeçalho manualmente
                     if header is None:
-                        print(
-                            "[DEBUG] Detectando cabeçalho automaticamente (header=None)..."
-                        )
+                        logger.debug("Detectando cabeçalho automaticamente (header=None)...")
                         idx_header = detectar_cabecalho(df)
-                        print(f"[DEBUG] Cabeçalho detectado na linha: {idx_header}")
+                        logger.debug("Cabeçalho detectado na linha: %s", idx_header)
 
                         if idx_header >= 0 and idx_header < len(df):
                             # Extrair nomes das colunas da linha detectada
@@ -1562,9 +1591,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                 )
                                 for i, col in enumerate(header_row)
                             ]
-                            print(
-                                f"[DEBUG] Nomes das colunas extraídos: {header_names[:10]}..."
-                            )
+                            logger.debug("Nomes das colunas extraídos: %s...", header_names[:10])
 
                             # Aplicar cabeçalho e remover linhas antes dele
                             # ⚠️ CRÍTICO: Converter para string para evitar conversão automática de datas
@@ -1572,12 +1599,10 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                             df_with_header.columns = header_names
                             df_with_header.reset_index(drop=True, inplace=True)
 
-                            print(
-                                f"[DEBUG] DataFrame com cabeçalho aplicado - shape: {df_with_header.shape}"
-                            )
-                            print(
-                                f"[DEBUG] Primeiras colunas: {list(df_with_header.columns)[:10]}"
+                            logger.debug(
+                                "DataFrame com cabeçalho aplicado - shape: %s", df_with_header.shape
                             )
+                            logger.debug("Primeiras colunas: %s", list(df_with_header.columns)[:10])
 
                             df_with_header.dropna(how="all", inplace=True)
                             df_with_header.dropna(how="all", axis=1, inplace=True)
@@ -1592,30 +1617,30 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                     return df.fillna(""), 0, df.columns.tolist()
                 except Exception as e:
                     excel_errors.append(f"engine={engine}, header={header}: {e}")
-        print("[DEBUG] Falha ao ler Excel em todas as variações:")
+        logger.debug("Falha ao ler Excel em todas as variações:")
         for err in excel_errors:
-            print(f"  - {err}")
+            logger.debug("  - %s", err)
             # Fallback: leitura forçada via zipfile + xml (apenas para .xlsx)
             import zipfile
             import xml.etree.ElementTree as ET
 
             try:
                 with zipfile.ZipFile(path) as z:
-                    print("[DEBUG][FALLBACK] Arquivos no zip:")
+                    logger.debug("[FALLBACK] Arquivos no zip:")
                     for name in z.namelist():
-                        print(f"  - {name}")
+                        logger.debug("  - %s", name)
                     sheet_names = [
                         n
                         for n in z.namelist()
                         if n.startswith("xl/worksheets/") and n.endswith(".xml")
                     ]
-                    print(f"[DEBUG][FALLBACK] Worksheets encontrados: {sheet_names}")
+                    logger.debug("[FALLBACK] Worksheets encontrados: %s", sheet_names)
                     if not sheet_names:
                         raise ValueError("Nenhuma worksheet encontrada no xlsx")
-                    print(f"[DEBUG][FALLBACK] Usando worksheet: {sheet_names[0]}")
+                    logger.debug("[FALLBACK] Usando worksheet: %s", sheet_names[0])
 
                     # Primeiro carregar shared strings
-                    print("[DEBUG][FALLBACK] Carregando shared strings...")
+                    logger.debug("[FALLBACK] Carregando shared strings...")
                     shared_strings = []
                     if "xl/sharedStrings.xml" in z.namelist():
                         with z.open("xl/sharedStrings.xml") as ssf:
@@ -1631,21 +1656,19 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                     )
                                 )
                                 shared_strings.append(text)
-                    print(
-                        f"[DEBUG][FALLBACK] {len(shared_strings)} shared strings carregadas"
-                    )
+                    logger.debug("[FALLBACK] %s shared strings carregadas", len(shared_strings))
 
                     # Agora ler o worksheet
-                    print("[DEBUG][FALLBACK] Lendo conteúdo do worksheet...")
+                    logger.debug("[FALLBACK] Lendo conteúdo do worksheet...")
                     with z.open(sheet_names[0]) as f:
                         tree = ET.parse(f)
                         root = tree.getroot()
                         ns = {
                             "a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
                         }
-                        print("[DEBUG][FALLBACK] Iniciando leitura das células...")
+                        logger.debug("[FALLBACK] Iniciando leitura das células...")
                         rows = []
-                        print("[DEBUG][FALLBACK] Primeiras 5 linhas do arquivo:")
+                        logger.debug("[FALLBACK] Primeiras 5 linhas do arquivo:")
                         for i, row in enumerate(root.findall(".//a:row", ns)):
                             if nrows and i > (nrows + 50): # some buffer for header search
                                 break
@@ -1668,9 +1691,9 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
 
                             # Mostrar as primeiras 5 linhas com seus valores
                             if i < 5:
-                                print(f"[DEBUG][FALLBACK] Linha {i}:", values)
+                                logger.debug("[FALLBACK] Linha %s: %s", i, values)
 
-                        print("[DEBUG][FALLBACK] Procurando linha de cabeçalho...")
+                        logger.debug("[FALLBACK] Procurando linha de cabeçalho...")
 
                         header = None
                         data_start = 0
@@ -1681,21 +1704,19 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                             if not row or all(not cell for cell in row):
                                 continue
 
-                            print(f"\n[DEBUG][FALLBACK] === Verificando linha {i} ===")
-                            print(f"Número de colunas: {len(row)}")
-                            print(
-                                f"Conteúdo: {row[:5]}..."
+                            logger.debug("[FALLBACK] === Verificando linha %s ===", i)
+                            logger.debug("Número de colunas: %s", len(row))
+                            logger.debug(
+                                "Conteúdo: %s...", row[:5]
                             )  # Mostra as 5 primeiras colunas
 
                             # Primeiro critério: mais de 10 colunas não vazias
                             non_empty = [v for v in row if v not in (None, "", "None")]
                             if len(non_empty) < 10:
-                                print(
-                                    "Linha descartada: menos de 10 colunas não vazias"
-                                )
+                                logger.debug("Linha descartada: menos de 10 colunas não vazias")
                                 continue
 
-                            print("✓ Tem mais de 10 colunas não vazias")
+                            logger.debug("✓ Tem mais de 10 colunas não vazias")
 
                             # Segundo critério: procura por palavras-chave específicas
                             row_text = " ".join(
@@ -1715,13 +1736,13 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                 "data" in str(cell).lower() for cell in row
                             )
 
-                            print(f"Encontrou CPF/CNPJ: {found_cpf}")
-                            print(f"Encontrou Valor: {found_valor}")
-                            print(f"Encontrou Data: {found_data}")
+                            logger.debug("Encontrou CPF/CNPJ: %s", found_cpf)
+                            logger.debug("Encontrou Valor: %s", found_valor)
+                            logger.debug("Encontrou Data: %s", found_data)
 
                             matches_count = sum([found_cpf, found_valor, found_data])
                             if matches_count >= 2:
-                                print("✓ Encontrou as palavras-chave necessárias")
+                                logger.debug("✓ Encontrou as palavras-chave necessárias")
 
                                 # Preservar nomes exatos das colunas do cabeçalho
                                 header_fixed = []
@@ -1731,9 +1752,9 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                     else:
                                         header_fixed.append(str(h).strip())
 
-                                print("[DEBUG] Colunas identificadas:")
+                                logger.debug("Colunas identificadas:")
                                 for idx, col in enumerate(header_fixed):
-                                    print(f"   {idx}: {col}")
+                                    logger.debug("   %s: %s", idx, col)
 
                                 # Normalizar todas as linhas de dados para ter o mesmo número de colunas
                                 data = rows[i + 1 :]
@@ -1749,20 +1770,20 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
 
                                 # Criar DataFrame com os nomes de colunas preservados
                                 df = pd.DataFrame(normalized_data, columns=header_fixed)
-                                print(
-                                    f"[DEBUG] DataFrame criado com {len(df)} linhas e {len(df.columns)} colunas"
+                                logger.debug(
+                                    "DataFrame criado com %s linhas e %s colunas",
+                                    len(df),
+                                    len(df.columns),
                                 )
 
                                 # Verificar primeira linha de dados
-                                print("\n[DEBUG] Amostra da primeira linha:")
+                                logger.debug("Amostra da primeira linha:")
                                 for col in header_fixed[:5]:
                                     val = df[col].iloc[0] if len(df) > 0 else "N/A"
-                                    print(f"   {col}: {val}")
+                                    logger.debug("   %s: %s", col, val)
 
                                 return df.fillna(""), i, list(df.columns)
-                                print(
-                                    f"[DEBUG] Criando DataFrame com cabeçalho da linha {i}"
-                                )
+                                logger.debug("Criando DataFrame com cabeçalho da linha %s", i)
 
                                 # Criar DataFrame com os dados a partir do cabeçalho
                                 data = rows[
@@ -1778,29 +1799,25 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
 
                                 # Criar DataFrame com as colunas corretas
                                 df = pd.DataFrame(data, columns=header_fixed)
-                                print(
-                                    f"[DEBUG] DataFrame criado com {len(df)} linhas e {len(df.columns)} colunas"
+                                logger.debug(
+                                    "DataFrame criado com %s linhas e %s colunas",
+                                    len(df),
+                                    len(df.columns),
                                 )
                                 return df.fillna(""), data_start - 1, header_fixed
                             else:
-                                print(
-                                    "✗ Não encontrou todas as palavras-chave necessárias"
-                                )
+                                logger.debug("✗ Não encontrou todas as palavras-chave necessárias")
 
                             # Se encontrarmos pelo menos 2 dos indicadores principais
                             if sum(matches.values()) >= 2:
-                                print(
-                                    f"[DEBUG][FALLBACK] >>> Encontrado cabeçalho na linha {i}"
-                                )
-                                print("[DEBUG][FALLBACK] Conteúdo do cabeçalho:")
+                                logger.debug("[FALLBACK] >>> Encontrado cabeçalho na linha %s", i)
+                                logger.debug("[FALLBACK] Conteúdo do cabeçalho:")
                                 for idx, val in enumerate(row):
-                                    print(f"   Coluna {idx}: {val}")
+                                    logger.debug("   Coluna %s: %s", idx, val)
                                 header = row
                                 data_start = i + 1
                                 max_cols = len(row)
-                                print(
-                                    f"[DEBUG][FALLBACK] Total de {max_cols} colunas encontradas"
-                                )
+                                logger.debug("[FALLBACK] Total de %s colunas encontradas", max_cols)
                                 data = rows[
                                     data_start:
                                 ]  # Pega todas as linhas após o cabeçalho
@@ -1812,28 +1829,28 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                         h = f"Coluna_{i}"
                                     header_fixed.append(h)
 
-                                print(
-                                    "\n[DEBUG][FALLBACK] Cabeçalho após correção de nomes vazios:"
-                                )
+                                logger.debug("[FALLBACK] Cabeçalho após correção de nomes vazios:")
                                 for i, h in enumerate(header_fixed):
-                                    print(f"   {i}: {h}")
+                                    logger.debug("   %s: %s", i, h)
 
                                 # Cria DataFrame mantendo todas as colunas
                                 df = pd.DataFrame(data, columns=header_fixed)
-                                print(
-                                    f"\n[DEBUG][FALLBACK] DataFrame criado com {len(df)} linhas e {len(df.columns)} colunas"
+                                logger.debug(
+                                    "[FALLBACK] DataFrame criado com %s linhas e %s colunas",
+                                    len(df),
+                                    len(df.columns),
                                 )
-                                print("[DEBUG][FALLBACK] Colunas do DataFrame:")
+                                logger.debug("[FALLBACK] Colunas do DataFrame:")
                                 for i, col in enumerate(df.columns):
-                                    print(f"   {i}: {col}")
-                                print("\n[DEBUG][FALLBACK] Primeiras 3 linhas:")
-                                print(df.head(3))
+                                    logger.debug("   %s: %s", i, col)
+                                logger.debug("[FALLBACK] Primeiras 3 linhas:")
+                                logger.debug("%s", df.head(3))
                                 return df.fillna(""), data_start - 1, header_fixed
 
                         # Se não encontrou cabeçalho nas primeiras 20 linhas, continua procurando
                         if not header:
-                            print(
-                                "\n[DEBUG][FALLBACK] Cabeçalho não encontrado nas primeiras 20 linhas, continuando busca..."
+                            logger.debug(
+                                "[FALLBACK] Cabeçalho não encontrado nas primeiras 20 linhas, continuando busca...",
                             )
                             for i, row in enumerate(rows[20:], 20):
                                 if not row or all(not cell for cell in row):
@@ -1848,14 +1865,14 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                                 }
 
                                 if sum(matches.values()) >= 2:
-                                    print(
-                                        f"[DEBUG][FALLBACK] >>> Encontrado cabeçalho na linha {i}"
+                                    logger.debug(
+                                        "[FALLBACK] >>> Encontrado cabeçalho na linha %s", i
                                     )
                                     header = row
                                     data_start = i + 1
                                     max_cols = len(row)
-                                    print(
-                                        f"[DEBUG][FALLBACK] Total de {max_cols} colunas encontradas"
+                                    logger.debug(
+                                        "[FALLBACK] Total de %s colunas encontradas", max_cols
                                     )
                                     data = rows[data_start:]
 
@@ -1897,7 +1914,7 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                             )
                     # ...não faz sentido usar sep aqui, removido bloco inválido...
             except Exception as e:
-                print(f"[DEBUG] Falha na leitura forçada via zipfile/xml: {e}")
+                logger.debug("Falha na leitura forçada via zipfile/xml: %s", e)
                 # 🔥 SE É EXCEL VÁLIDO MAS TODAS AS TENTATIVAS FALHARAM, NÃO TENTE LER COMO TEXTO
                 if ext in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
                     raise ValueError(
@@ -1916,77 +1933,67 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
     # 3) Tenta ler como texto puro (último recurso - APENAS PARA CSV/TXT)
     if ext not in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
         try:
-            print("\n[DEBUG] Iniciando leitura de arquivo texto...", flush=True)
+            logger.debug("Iniciando leitura de arquivo texto...")
             if nrows:
                 # Read only a chunk if nrows is provided (e.g. 1MB should be enough for few hundred rows)
                 with open(path, "rb") as f:
                     raw = f.read(1024 * 1024) 
-                print(f"[DEBUG] Bytes lidos (limitado): {len(raw)}", flush=True)
+                logger.debug("Bytes lidos (limitado): %s", len(raw))
             else:
                 with open(path, "rb") as f:
                     raw = f.read()
-                print(f"[DEBUG] Bytes lidos: {len(raw)}", flush=True)
+                logger.debug("Bytes lidos: %s", len(raw))
 
             text = raw.decode("utf-8", errors="replace")
             text = raw.decode("utf-8", errors="replace")
             linhas = [l.strip() for l in text.splitlines() if l.strip()]
 
-            print("\n[DEBUG] === ANÁLISE DE TEXTO PURO ===", flush=True)
-            print(f"[DEBUG] Total de linhas não vazias: {len(linhas)}", flush=True)
-            print("\n[DEBUG] Primeiras 5 linhas do arquivo:", flush=True)
+            logger.debug("=== ANÁLISE DE TEXTO PURO ===")
+            logger.debug("Total de linhas não vazias: %s", len(linhas))
+            logger.debug("Primeiras 5 linhas do arquivo:")
 
             # Vamos examinar cada byte das primeiras linhas
             for i, l in enumerate(linhas[:5]):
-                print(f"\n[DEBUG] Linha {i}:", flush=True)
-                print(f"Conteúdo (ASCII): {l[:150]}", flush=True)
-                print(
-                    f"Bytes (hex): {' '.join(hex(ord(c))[2:] for c in l[:50])}",
-                    flush=True,
+                logger.debug("Linha %s:", i)
+                logger.debug("Conteúdo (ASCII): %s", l[:150])
+                logger.debug(
+                    "Bytes (hex): %s", ' '.join(hex(ord(c))[2:] for c in l[:50])
                 )  # Palavras-chave críticas que indicam uma linha de cabeçalho
             header_indicators = {
                 "cpf": ["cpf", "cnpj"],
                 "venda": ["valor", "venda", "transacao", "transação"],
                 "ec": ["estabelecimento", "ec", "loja", "número do ec"],
             }
-            print("\n[DEBUG] Procurando por palavras-chave no texto:", flush=True)
+            logger.debug("Procurando por palavras-chave no texto:")
             for categoria, palavras in header_indicators.items():
-                print(f"- {categoria}: {', '.join(palavras)}", flush=True)
+                logger.debug("- %s: %s", categoria, ', '.join(palavras))
 
             # Tenta identificar o delimitador mais provável nas primeiras linhas
             for sep in [";", ",", "\t", "|"]:
-                print(f"\n[DEBUG] === Testando separador: '{sep}' ===", flush=True)
+                logger.debug("=== Testando separador: '%s' ===", sep)
                 # Analisa apenas as primeiras 20 linhas
                 for i, linha in enumerate(linhas[:20]):
                     if not linha:
-                        print(f"[DEBUG] Linha {i}: vazia, pulando...", flush=True)
+                        logger.debug("Linha %s: vazia, pulando...", i)
                         continue
 
                     # Divide a linha pelo separador
                     valores = linha.split(sep)
-                    print(
-                        f"\n[DEBUG] Linha {i}: encontradas {len(valores)} colunas",
-                        flush=True,
-                    )
+                    logger.debug("Linha %s: encontradas %s colunas", i, len(valores))
 
                     if len(valores) <= 1:
-                        print(
-                            "[DEBUG] Insuficiente (precisa > 1), pulando...", flush=True
-                        )
+                        logger.debug("Insuficiente (precisa > 1), pulando...")
                         continue
 
                     # Verifica se tem células suficientes e indicadores de cabeçalho
                     if len(valores) >= 5:  # Mínimo de 5 colunas para ser considerado
-                        print(
-                            f"\n[DEBUG] >>> Linha {i} é candidata (tem {len(valores)} colunas):",
-                            flush=True,
-                        )
+                        logger.debug(">>> Linha %s é candidata (tem %s colunas):", i, len(valores))
                         for j, val in enumerate(valores[:5]):
-                            print(f"   Col {j}: {val}", flush=True)
+                            logger.debug("   Col %s: %s", j, val)
 
                         texto_linha = " ".join(str(v).lower() for v in valores)
-                        print(
-                            "[DEBUG] Texto da linha (primeiros 150 caracteres):",
-                            texto_linha[:150],
+                        logger.debug(
+                            "Texto da linha (primeiros 150 caracteres): %s", texto_linha[:150]
                         )
 
                         matches = {
@@ -1994,42 +2001,27 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                             for key, keywords in header_indicators.items()
                         }
                         matches_count = sum(matches.values())
-                        print(
-                            f"\n[DEBUG] Quantidade de matches encontrados: {matches_count}/3",
-                            flush=True,
-                        )
-                        print(f"[DEBUG] Detalhe dos matches: {matches}", flush=True)
+                        logger.debug("Quantidade de matches encontrados: %s/3", matches_count)
+                        logger.debug("Detalhe dos matches: %s", matches)
 
                         if matches_count >= 2:
-                            print(
-                                f"\n[DEBUG] >>>>>>> CABEÇALHO ENCONTRADO NA LINHA {i} <<<<<<<",
-                                flush=True,
-                            )
-                            print("\n[DEBUG] Detalhamento do cabeçalho:", flush=True)
+                            logger.debug(">>>>>>> CABEÇALHO ENCONTRADO NA LINHA %s <<<<<<<", i)
+                            logger.debug("Detalhamento do cabeçalho:")
                             for j, v in enumerate(valores):
-                                print(f"   Coluna {j}: '{v}'", flush=True)
+                                logger.debug("   Coluna %s: '%s'", j, v)
 
                             # Usa esta linha como cabeçalho
                             header = valores
                             # Pega as linhas seguintes como dados
-                            print(
-                                "\n[DEBUG] Iniciando processamento das linhas de dados...",
-                                flush=True,
-                            )
+                            logger.debug("Iniciando processamento das linhas de dados...")
                             data = [linha.split(sep) for linha in linhas[i + 1 :]]
-                            print(
-                                f"[DEBUG] Total de {len(data)} linhas de dados encontradas",
-                                flush=True,
-                            )
+                            logger.debug("Total de %s linhas de dados encontradas", len(data))
 
                             if data:
-                                print(
-                                    "\n[DEBUG] Amostra da primeira linha de dados:",
-                                    flush=True,
-                                )
+                                logger.debug("Amostra da primeira linha de dados:")
                                 primeira_linha = data[0]
                                 for j, v in enumerate(primeira_linha[:5]):
-                                    print(f"   Col {j}: '{v}'", flush=True)
+                                    logger.debug("   Col %s: '%s'", j, v)
                             # Normaliza número de colunas
                             max_cols = len(header)
                             data = [
@@ -2045,23 +2037,21 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                             df = df.dropna(how="all", axis=1)
                             return df.fillna(""), i, header
             # Se não encontrou nenhum padrão com separadores conhecidos
-            print(
-                "\n[DEBUG] Nenhum separador comum encontrado, tentando divisão por espaços..."
-            )
+            logger.debug("Nenhum separador comum encontrado, tentando divisão por espaços...")
             # Tenta usar a primeira linha não vazia como cabeçalho
             for i, linha in enumerate(linhas):
                 valores = linha.split()  # divide por espaços
                 if len(valores) >= 5:  # se tiver pelo menos 5 colunas
-                    print(
-                        f"\n[DEBUG] Encontrada linha {i} com {len(valores)} colunas usando espaços como separador"
+                    logger.debug(
+                        "Encontrada linha %s com %s colunas usando espaços como separador",
+                        i,
+                        len(valores),
                     )
-                    print("[DEBUG] Conteúdo da linha:", valores)
+                    logger.debug("Conteúdo da linha: %s", valores)
                     header = valores
                     data = [l.split() for l in linhas[i + 1 :]]
                     max_cols = len(header)
-                    print(
-                        f"[DEBUG] Encontradas {len(data)} linhas de dados após esta linha"
-                    )
+                    logger.debug("Encontradas %s linhas de dados após esta linha", len(data))
                     data = [
                         (
                             row[:max_cols]
@@ -2076,12 +2066,12 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
                     return df.fillna(""), i, header
 
             # Se não encontrou estrutura tabular, retorna DataFrame vazio e header vazio
-            print(
-                "[DEBUG] Não foi possível identificar estrutura tabular no arquivo. Retornando DataFrame vazio."
+            logger.debug(
+                "Não foi possível identificar estrutura tabular no arquivo. Retornando DataFrame vazio.",
             )
             return pd.DataFrame(), 0, []
         except Exception as e:
-            print(f"[DEBUG] Falha ao ler como texto puro: {e}")
+            logger.debug("Falha ao ler como texto puro: %s", e)
             # Sempre retorna 3 valores mesmo em erro
             return pd.DataFrame(), 0, []
 
@@ -2094,58 +2084,10 @@ def safe_read_file(path: str, nrows: Optional[int] = None) -> tuple[pd.DataFrame
     )
 
 
-def _to_datetime_pt(s: pd.Series) -> pd.Series:
-    # Se já é datetime, apenas valida o range
-    if pd.api.types.is_datetime64_any_dtype(s):
-        res = s.copy()
-    else:
-        s_str = s.astype(str).str.strip()
-        # Formato ISO começa com 4 dígitos seguido de '-' ou '/' (ex: 2022-01-13)
-        # Formato BR começa com 1-2 dígitos (ex: 13/01/2022)
-        iso_mask = s_str.str.match(r'^\d{4}[-/]')
-
-        if iso_mask.all():
-            # Todos ISO: dayfirst=False preserva YYYY-MM-DD corretamente
-            res = pd.to_datetime(s, errors="coerce", dayfirst=False)
-        elif (~iso_mask).all():
-            # Todos BR: dayfirst=True para DD/MM/YYYY
-            res = pd.to_datetime(s, errors="coerce", dayfirst=True)
-        else:
-            # Mistura: processa cada grupo separadamente
-            res = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
-            if iso_mask.any():
-                res[iso_mask] = pd.to_datetime(s[iso_mask], errors="coerce", dayfirst=False)
-            if (~iso_mask).any():
-                res[~iso_mask] = pd.to_datetime(s[~iso_mask], errors="coerce", dayfirst=True)
-
-    if not res.empty:
-        # MySQL datetimes must be between 1000-01-01 and 9999-12-31
-        mask_too_early = res < pd.Timestamp(1000, 1, 1)
-        res = res.where(~mask_too_early, other=pd.NaT)
-    return res
-
-
-def _to_float_br(s: pd.Series) -> pd.Series:
-    # Se já for float, limpa infinitos e retorna
-    if pd.api.types.is_float_dtype(s):
-        return s.replace([np.inf, -np.inf], np.nan)
-    # Se for inteiro, converte para float
-    if pd.api.types.is_integer_dtype(s):
-        return s.astype(float)
-    # Se for string, trata formato brasileiro
-    s = s.astype(str)
-    # Só remove pontos se houver vírgula (milhar)
-    if not s.empty:
-        has_comma = s.str.contains(",")
-        s1 = s.copy()
-        if has_comma.any():
-            s1[has_comma] = s1[has_comma].str.replace(".", "", regex=False)
-        s1 = s1.str.replace(",", ".", regex=False)
-        result = pd.to_numeric(s1, errors="coerce")
-    else:
-        result = pd.Series([], dtype=float)
-    # Limpar valores infinitos do resultado
-    return result.replace([np.inf, -np.inf], np.nan)
+# Conversores de coluna compartilhados com proc/importers (formato detectado
+# por amostra + parse por valores únicos)
+_to_datetime_pt = parse_dates_br
+_to_float_br = parse_decimal_br
 
 
 def detectar_cabecalho(df: pd.DataFrame, max_scan: int = 100) -> int:
@@ -2204,9 +2146,7 @@ def detectar_cabecalho(df: pd.DataFrame, max_scan: int = 100) -> int:
 
     best = (0, 0)  # (score, idx)
 
-    print(
-        f"[DEBUG][DETECTAR_CABECALHO] Analisando {min(max_scan, len(df))} linhas para cabeçalho..."
-    )
+    logger.debug("[DETECTAR_CABECALHO] Analisando %d linhas para cabeçalho...", min(max_scan, len(df)))
 
     for i in range(min(max_scan, len(df))):
         row = df.iloc[i]
@@ -2254,18 +2194,11 @@ def detectar_cabecalho(df: pd.DataFrame, max_scan: int = 100) -> int:
 
         score -= data_penalty
 
-        print(
-            f"[DEBUG][DETECTAR_CABECALHO] Linha {i}: score={score} (keywords={keyword_matches}, penalty={data_penalty})"
-        )
-        print(f"[DEBUG][DETECTAR_CABECALHO] Conteúdo: {non_empty_vals[:5]}...")
-
         if score > best[0]:
             best = (score, i)
 
     detected_idx = best[1]
-    print(
-        f"[DEBUG][DETECTAR_CABECALHO] Cabeçalho detectado na linha {detected_idx} (score: {best[0]})"
-    )
+    logger.debug("[DETECTAR_CABECALHO] Cabeçalho detectado na linha %d (score: %s)", detected_idx, best[0])
 
     return detected_idx
 
@@ -2315,14 +2248,12 @@ class CieloHistoricoDetalheParser:
             keep_default_na=False,
             nrows=nrows,
         )
-        print("[DEBUG][CieloHistoricoDetalheParser] Primeiras linhas do arquivo:")
-        print(df_raw.head(5))
+        logger.debug("[CieloHistoricoDetalheParser] Primeiras linhas do arquivo:")
+        logger.debug("%s", df_raw.head(5))
         idx = detectar_cabecalho(df_raw)
-        print(
-            f"[DEBUG][CieloHistoricoDetalheParser] Índice do cabeçalho detectado: {idx}"
-        )
-        print(
-            f"[DEBUG][CieloHistoricoDetalheParser] Linha do cabeçalho: {df_raw.iloc[idx].tolist()}"
+        logger.debug("[CieloHistoricoDetalheParser] Índice do cabeçalho detectado: %s", idx)
+        logger.debug(
+            "[CieloHistoricoDetalheParser] Linha do cabeçalho: %s", df_raw.iloc[idx].tolist()
         )
         headers = [str(h).strip() if h is not None else "" for h in df_raw.iloc[idx]]
         df = df_raw.iloc[idx + 1 :].reset_index(drop=True).copy()
@@ -2453,8 +2384,10 @@ class FaturamentoECParser:
                     .str.contains("REDE", na=False)
                 )
                 df.loc[mask_rede, c] = df.loc[mask_rede, c] * 100
-                print(
-                    f"[DEBUG][REDE] Taxa {c} multiplicada por 100 para {mask_rede.sum()} registros da REDE"
+                logger.debug(
+                    "[REDE] Taxa %s multiplicada por 100 para %s registros da REDE",
+                    c,
+                    mask_rede.sum(),
                 )
 
         meta = {
@@ -2529,19 +2462,10 @@ def is_multisheet_rede_file(path: str) -> bool:
     Critérios: arquivo Excel + múltiplas planilhas + planilha "capa"
     """
     ext = Path(path).suffix.lower()
-    print(f"[DEBUG][MULTISHEET_DETECT] Verificando arquivo: {path}")
-    print(f"[DEBUG][MULTISHEET_DETECT] Extensão: {ext}")
-
-    try:
-        with open("debug_detection.txt", "a") as f:
-            f.write(f"\nis_multisheet_rede_file called at {datetime.now()}\n")
-            f.write(f"Path: {path}\n")
-            f.write(f"Ext: {ext}\n")
-    except:
-        pass
+    logger.debug("[MULTISHEET_DETECT] Verificando arquivo: %s (extensão: %s)", path, ext)
 
     if ext not in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
-        print(f"[DEBUG][MULTISHEET_DETECT] Extensão não suportada: {ext}")
+        logger.debug("[MULTISHEET_DETECT] Extensão não suportada: %s", ext)
         return False
 
     try:
@@ -2549,25 +2473,21 @@ def is_multisheet_rede_file(path: str) -> bool:
         sheet_names = excel_file.sheet_names
         sheet_names_lower = [name.lower() for name in sheet_names]
 
-        print(f"[DEBUG][MULTISHEET_DETECT] Planilhas encontradas: {sheet_names}")
-        print(f"[DEBUG][MULTISHEET_DETECT] Planilhas (lowercase): {sheet_names_lower}")
+        logger.debug("[MULTISHEET_DETECT] Planilhas encontradas: %s", sheet_names)
 
         # Critérios: tem planilha "capa" e pelo menos 2 planilhas no total
         has_capa = "capa" in sheet_names_lower
         multiple_sheets = len(sheet_names) >= 2
 
-        print(f"[DEBUG][MULTISHEET_DETECT] Tem capa: {has_capa}")
-        print(
-            f"[DEBUG][MULTISHEET_DETECT] Múltiplas planilhas: {multiple_sheets} (total: {len(sheet_names)})"
-        )
-
         result = has_capa and multiple_sheets
-        print(f"[DEBUG][MULTISHEET_DETECT] Resultado final: {result}")
+        logger.debug(
+            "[MULTISHEET_DETECT] capa=%s, planilhas=%d → multi-sheet=%s", has_capa, len(sheet_names), result
+        )
 
         return result
 
     except Exception as e:
-        print(f"[DEBUG][MULTISHEET_DETECT] Erro ao verificar multi-planilhas: {e}")
+        logger.warning("[MULTISHEET_DETECT] Erro ao verificar multi-planilhas: %s", e)
         return False
 
 
@@ -2590,7 +2510,8 @@ def preparar_dataframe_de_arquivo(
     log_callback: função(msg:str) para atualizar logs na UI
     """
 
-    with PerformanceTimer("IO_ORCHESTRATOR", "Preparar DataFrame de Arquivo", {"file": os.path.basename(path), "contexto": contexto}):
+    tamanho = os.path.getsize(path) if os.path.isfile(path) else None
+    with PerformanceTimer("IO_ORCHESTRATOR", "Preparar DataFrame de Arquivo", {"file": os.path.basename(path), "contexto": contexto, "bytes": tamanho}) as timer:
         # Inicializar variáveis que podem ser usadas no return
         meta = {"source": "Unknown", "header_row": 0, "columns_raw": []}
         df_final = pd.DataFrame()
@@ -2619,17 +2540,15 @@ def preparar_dataframe_de_arquivo(
         log_to_debug_file(f"Contexto: {contexto}")
         log_to_debug_file(f"Tipo: {tipo_origem}")
         
-        print(f"[DEBUG][PROCESSAR] 🚀 INICIANDO preparar_dataframe_de_arquivo")
-        print(f"[DEBUG][PROCESSAR] - Arquivo: {path}")
-        print(f"[DEBUG][PROCESSAR] - Contexto: '{contexto}'")
-        print(f"[DEBUG][PROCESSAR] - Tipo origem: '{tipo_origem}'")
+        logger.debug("[PROCESSAR] 🚀 INICIANDO preparar_dataframe_de_arquivo")
+        logger.debug("[PROCESSAR] - Arquivo: %s", path)
+        logger.debug("[PROCESSAR] - Contexto: '%s'", contexto)
+        logger.debug("[PROCESSAR] - Tipo origem: '%s'", tipo_origem)
     
         try:
             # Verificar se é arquivo multi-planilhas (independente de contexto)
-            print(f"[DEBUG][PROCESSAR] 🔍 Verificando se é multi-sheet...")
-            print(
-                f"[DEBUG][PROCESSAR] - Contexto: '{contexto}' (upper: '{contexto.upper()}')"
-            )
+            logger.debug("[PROCESSAR] 🔍 Verificando se é multi-sheet...")
+            logger.debug("[PROCESSAR] - Contexto: '%s' (upper: '%s')", contexto, contexto.upper())
             is_multisheet = is_multisheet_rede_file(path)
             log_to_debug_file(f"IS_MULTISHEET: {is_multisheet}")
             
@@ -2650,6 +2569,7 @@ def preparar_dataframe_de_arquivo(
                     
                     update_progress(100)
                     # Formato esperado: (df_final, transformacoes, header_row)
+                    timer.set(rows=len(importer.df_proc))
                     return importer.df_proc, getattr(importer, 'transformacoes', {}), getattr(importer, 'header_idx', 0)
                 else:
                     raise ValueError("Nenhum motor de importação compatível encontrado para este arquivo.")
@@ -2658,7 +2578,7 @@ def preparar_dataframe_de_arquivo(
                 log(
                     f"Processando arquivo (2/10): Detectado arquivo multi-planilhas, processando todas as abas..."
                 )
-                print("[DEBUG][PROCESSAR] Arquivo multi-planilhas detectado")
+                logger.debug("[PROCESSAR] Arquivo multi-planilhas detectado")
     
                 multisheet_data = safe_read_multisheet_file(
                     path, tipo_origem, engine, contexto, nrows=nrows
@@ -2673,20 +2593,20 @@ def preparar_dataframe_de_arquivo(
                 combined_dfs = []
                 all_transformacoes = {}
     
-                print(f"[DEBUG][MULTISHEET] 📊 COMBINANDO PLANILHAS")
-                print(
-                    f"[DEBUG][MULTISHEET] - Total de planilhas para processar: {len(multisheet_data)}"
+                logger.debug("[MULTISHEET] 📊 COMBINANDO PLANILHAS")
+                logger.debug(
+                    "[MULTISHEET] - Total de planilhas para processar: %s", len(multisheet_data)
                 )
-                print(
-                    f"[DEBUG][MULTISHEET] - Planilhas encontradas: {list(multisheet_data.keys())}"
+                logger.debug(
+                    "[MULTISHEET] - Planilhas encontradas: %s", list(multisheet_data.keys())
                 )
     
                 for sheet_name, sheet_info in multisheet_data.items():
                     df_sheet = sheet_info["df"]
                     headers_sheet = sheet_info["headers"]
     
-                    print(
-                        f"[DEBUG][MULTISHEET] Processando planilha {sheet_name}: {len(df_sheet)} linhas"
+                    logger.debug(
+                        "[MULTISHEET] Processando planilha %s: %s linhas", sheet_name, len(df_sheet)
                     )
     
                     log_to_debug_file(f"[DEBUG][MULTISHEET] {sheet_name} - Carregando regras de de/para...")
@@ -2697,20 +2617,14 @@ def preparar_dataframe_de_arquivo(
                     log_to_debug_file(f"[DEBUG][MULTISHEET] {sheet_name} - Total de regras carregadas: {len(regras)}")
     
                     if df_sheet is not None and not df_sheet.empty:
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - DataFrame antes do de/para:"
-                        )
-                        print(f"[DEBUG][MULTISHEET] {sheet_name} - Linhas: {len(df_sheet)}")
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Colunas: {list(df_sheet.columns)}"
-                        )
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Regras carregadas: {len(regras)}"
+                        logger.debug("[MULTISHEET] %s - DataFrame antes do de/para:", sheet_name)
+                        logger.debug("[MULTISHEET] %s - Linhas: %s", sheet_name, len(df_sheet))
+                        logger.debug(
+                            "[MULTISHEET] %s - Colunas: %s", sheet_name, list(df_sheet.columns)
                         )
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - Primeiras 3 linhas do DataFrame:"
+                        logger.debug(
+                            "[MULTISHEET] %s - Regras carregadas: %s", sheet_name, len(regras)
                         )
-                        print(df_sheet.head(3))
     
                         df_sheet_final, transformacoes_sheet = aplicar_regras_depara(
                             df_sheet, regras
@@ -2726,16 +2640,19 @@ def preparar_dataframe_de_arquivo(
                             combined_dfs.append(df_sheet_final)
                             all_transformacoes.update(transformacoes_sheet)
     
-                            print(
-                                f"[DEBUG][MULTISHEET] {sheet_name} processada: {len(df_sheet_final)} linhas"
+                            logger.debug(
+                                "[MULTISHEET] %s processada: %s linhas",
+                                sheet_name,
+                                len(df_sheet_final),
                             )
                         else:
-                            print(
-                                f"[DEBUG][MULTISHEET] {sheet_name} - DataFrame final está vazio após de/para!"
+                            logger.debug(
+                                "[MULTISHEET] %s - DataFrame final está vazio após de/para!",
+                                sheet_name,
                             )
                     else:
-                        print(
-                            f"[DEBUG][MULTISHEET] {sheet_name} - DataFrame original está vazio ou é None"
+                        logger.debug(
+                            "[MULTISHEET] %s - DataFrame original está vazio ou é None", sheet_name
                         )
     
                 if not combined_dfs:
@@ -2744,21 +2661,22 @@ def preparar_dataframe_de_arquivo(
                     )
     
                 # Combinar todos os DataFrames
-                print(f"[DEBUG][MULTISHEET] 🔄 COMBINANDO DATAFRAMES FINAIS")
-                print(
-                    f"[DEBUG][MULTISHEET] - DataFrames para combinar: {len(combined_dfs)}"
-                )
+                logger.debug("[MULTISHEET] 🔄 COMBINANDO DATAFRAMES FINAIS")
+                logger.debug("[MULTISHEET] - DataFrames para combinar: %s", len(combined_dfs))
     
                 for i, df in enumerate(combined_dfs):
-                    print(
-                        f"[DEBUG][MULTISHEET] - DataFrame {i}: {len(df)} linhas, {len(df.columns)} colunas"
+                    logger.debug(
+                        "[MULTISHEET] - DataFrame %s: %s linhas, %s colunas",
+                        i,
+                        len(df),
+                        len(df.columns),
                     )
                     if len(df) > 0:
-                        print(f"[DEBUG][MULTISHEET]   Colunas: {list(df.columns)}")
+                        logger.debug("[MULTISHEET]   Colunas: %s", list(df.columns))
     
                 if combined_dfs:
                     # Antes de combinar, limpar campos que cada aba não deve preencher
-                    print(f"[DEBUG][MULTISHEET] 🧹 Limpando campos específicos por aba...")
+                    logger.debug("[MULTISHEET] 🧹 Limpando campos específicos por aba...")
     
                     for i, df in enumerate(combined_dfs):
                         if "planilha_origem" in df.columns:
@@ -2780,20 +2698,20 @@ def preparar_dataframe_de_arquivo(
                                 for campo in campos_para_limpar:
                                     if campo in df.columns:
                                         df[campo] = None
-                                        print(
-                                            f"[DEBUG][MULTISHEET] - Pagamentos: limpando campo '{campo}'"
+                                        logger.debug(
+                                            "[MULTISHEET] - Pagamentos: limpando campo '%s'", campo
                                         )
     
                             elif planilha_origem == "ajustes":
                                 # Aba AJUSTES: pode preencher todos os campos principais
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Ajustes: mantendo todos os campos preenchidos"
+                                logger.debug(
+                                    "[MULTISHEET] - Ajustes: mantendo todos os campos preenchidos"
                                 )
     
                             elif planilha_origem == "cancelamentos e contestações":
                                 # Aba CANCELAMENTOS: manter os campos que já tem mapeados
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Cancelamentos: mantendo campos mapeados"
+                                logger.debug(
+                                    "[MULTISHEET] - Cancelamentos: mantendo campos mapeados"
                                 )
     
                     df_final = pd.concat(combined_dfs, ignore_index=True, sort=False)
@@ -2822,19 +2740,20 @@ def preparar_dataframe_de_arquivo(
                                 )
                                 linhas_depois_pag = len(df_pagamentos_distinct)
     
-                                print(f"[DEBUG][MULTISHEET] 🎯 DISTINCT FINAL APLICADO:")
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Registros pagamentos antes: {linhas_antes_pag}"
-                                )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Registros pagamentos depois: {linhas_depois_pag}"
+                                logger.debug("[MULTISHEET] 🎯 DISTINCT FINAL APLICADO:")
+                                logger.debug(
+                                    "[MULTISHEET] - Registros pagamentos antes: %s",
+                                    linhas_antes_pag,
                                 )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Duplicatas pagamentos removidas: {linhas_antes_pag - linhas_depois_pag}"
+                                logger.debug(
+                                    "[MULTISHEET] - Registros pagamentos depois: %s",
+                                    linhas_depois_pag,
                                 )
-                                print(
-                                    f"[DEBUG][MULTISHEET] - Colunas usadas: {colunas_distinct}"
+                                logger.debug(
+                                    "[MULTISHEET] - Duplicatas pagamentos removidas: %s",
+                                    linhas_antes_pag - linhas_depois_pag,
                                 )
+                                logger.debug("[MULTISHEET] - Colunas usadas: %s", colunas_distinct)
     
                                 # Recombinar
                                 df_final = pd.concat(
@@ -2843,27 +2762,21 @@ def preparar_dataframe_de_arquivo(
                                     sort=False,
                                 )
     
-                    print(f"[DEBUG][MULTISHEET] ✅ COMBINAÇÃO CONCLUÍDA")
-                    print(
-                        f"[DEBUG][MULTISHEET] - DataFrame final: {len(df_final)} linhas, {len(df_final.columns)} colunas"
+                    logger.debug("[MULTISHEET] ✅ COMBINAÇÃO CONCLUÍDA")
+                    logger.debug(
+                        "[MULTISHEET] - DataFrame final: %s linhas, %s colunas",
+                        len(df_final),
+                        len(df_final.columns),
                     )
-                    print(f"[DEBUG][MULTISHEET] - Colunas finais: {list(df_final.columns)}")
+                    logger.debug("[MULTISHEET] - Colunas finais: %s", list(df_final.columns))
                     linhas_depois_final = len(df_final)
-                    print(
-                        f"[DEBUG][MULTISHEET] - Total de duplicatas removidas no processo final: {linhas_antes_final - linhas_depois_final}"
+                    logger.debug(
+                        "[MULTISHEET] - Total de duplicatas removidas no processo final: %s",
+                        linhas_antes_final - linhas_depois_final,
                     )
     
-                    # Mostrar primeiras linhas do resultado final
-                    if len(df_final) > 0:
-                        print(
-                            f"[DEBUG][MULTISHEET] - Primeiras 3 linhas do resultado final (após limpeza por aba):"
-                        )
-                        for idx, row in df_final.head(3).iterrows():
-                            print(f"[DEBUG][MULTISHEET]   Linha {idx}: {dict(row)}")
                 else:
-                    print(
-                        f"[DEBUG][MULTISHEET] ❌ ERRO: Nenhum DataFrame válido para combinar!"
-                    )
+                    logger.warning("[MULTISHEET] ❌ ERRO: Nenhum DataFrame válido para combinar!")
                     df_final = pd.DataFrame()
                     transformacoes = {}
     
@@ -2875,23 +2788,23 @@ def preparar_dataframe_de_arquivo(
                     "sheets_processed": len(multisheet_data),
                 }
     
-                print(f"[DEBUG][MULTISHEET] 📋 RESUMO FINAL:")
-                print(
-                    f"[DEBUG][MULTISHEET] - Resultado final: {len(df_final)} linhas de {len(multisheet_data)} planilhas"
-                )
-                print(
-                    f"[DEBUG][MULTISHEET] - Transformações: {len(transformacoes)} aplicadas"
+                logger.debug("[MULTISHEET] 📋 RESUMO FINAL:")
+                logger.debug(
+                    "[MULTISHEET] - Resultado final: %s linhas de %s planilhas",
+                    len(df_final),
+                    len(multisheet_data),
                 )
+                logger.debug("[MULTISHEET] - Transformações: %s aplicadas", len(transformacoes))
     
         except Exception as e:
             log(f"Erro na leitura do arquivo: {e}")
-            print(f"[DEBUG][PROCESSAR][ERRO] {e}")
+            logger.warning("[PROCESSAR][ERRO] %s", e)
             raise Exception(f"Falha na leitura do arquivo: {e}")
     
         # --- Lógica comum para ambos os casos (multi-sheet e single-sheet) ---
     
         # --- REGRA ESPECÍFICA DA REDE: CONCATENAR MODALIDADE + TIPO = FORMA_DE_PAGAMENTO ---
-        print("[DEBUG][REDE] Verificando necessidade de concatenar modalidade + tipo...")
+        logger.debug("[REDE] Verificando necessidade de concatenar modalidade + tipo...")
     
         # Verificar se é arquivo da REDE e tem as colunas necessárias
         tem_modalidade = any("modalidade" in str(col).lower() for col in df_final.columns)
@@ -2903,15 +2816,15 @@ def preparar_dataframe_de_arquivo(
                 if pd.api.types.is_object_dtype(df_final[col])
             )
         except Exception as e:
-            print(f"[DEBUG][REDE] Erro ao verificar REDE: {e}")
+            logger.warning("[REDE] Erro ao verificar REDE: %s", e)
             tem_rede = False
     
         # Verificar se já existe coluna Forma_de_pagamento (criada pelo mapeamento)
         tem_forma_pagamento = "Forma_de_pagamento" in df_final.columns
     
         if tem_rede and tem_modalidade and tem_tipo and not tem_forma_pagamento:
-            print(
-                "[DEBUG][REDE] Detectado arquivo REDE com colunas modalidade e tipo - criando Forma_de_pagamento"
+            logger.debug(
+                "[REDE] Detectado arquivo REDE com colunas modalidade e tipo - criando Forma_de_pagamento",
             )
     
             # Encontrar as colunas exatas
@@ -2921,10 +2834,10 @@ def preparar_dataframe_de_arquivo(
             for col in df_final.columns:
                 if "modalidade" in str(col).lower():
                     col_modalidade = col
-                    print(f"[DEBUG][REDE] Coluna modalidade encontrada: {col}")
+                    logger.debug("[REDE] Coluna modalidade encontrada: %s", col)
                 elif "tipo" in str(col).lower():
                     col_tipo = col
-                    print(f"[DEBUG][REDE] Coluna tipo encontrada: {col}")
+                    logger.debug("[REDE] Coluna tipo encontrada: %s", col)
     
             if col_modalidade and col_tipo:
                 # Concatenar modalidade + " " + tipo
@@ -2950,8 +2863,8 @@ def preparar_dataframe_de_arquivo(
                     .str.replace("  ", " ", regex=False)  # Remove espaços duplos
                 )
         elif tem_rede and tem_modalidade and tem_tipo and tem_forma_pagamento:
-            print(
-                "[DEBUG][REDE] Arquivo REDE já possui coluna Forma_de_pagamento - concatenando modalidade+tipo na coluna existente"
+            logger.debug(
+                "[REDE] Arquivo REDE já possui coluna Forma_de_pagamento - concatenando modalidade+tipo na coluna existente",
             )
     
             # Encontrar as colunas exatas
@@ -2961,10 +2874,10 @@ def preparar_dataframe_de_arquivo(
             for col in df_final.columns:
                 if "modalidade" in str(col).lower() and col != "Forma_de_pagamento":
                     col_modalidade = col
-                    print(f"[DEBUG][REDE] Coluna modalidade encontrada: {col}")
+                    logger.debug("[REDE] Coluna modalidade encontrada: %s", col)
                 elif "tipo" in str(col).lower() and col != "Forma_de_pagamento":
                     col_tipo = col
-                    print(f"[DEBUG][REDE] Coluna tipo encontrada: {col}")
+                    logger.debug("[REDE] Coluna tipo encontrada: %s", col)
     
             if col_modalidade and col_tipo:
                 # Sobrescrever a coluna Forma_de_pagamento existente com modalidade + " " + tipo
@@ -2993,23 +2906,22 @@ def preparar_dataframe_de_arquivo(
                 # Remover as colunas originais modalidade e tipo para evitar duplicatas
                 if col_modalidade in df_final.columns:
                     df_final = df_final.drop(columns=[col_modalidade])
-                    print(
-                        f"[DEBUG][REDE] Removida coluna {col_modalidade} após concatenação"
-                    )
+                    logger.debug("[REDE] Removida coluna %s após concatenação", col_modalidade)
                 if col_tipo in df_final.columns:
                     df_final = df_final.drop(columns=[col_tipo])
-                    print(f"[DEBUG][REDE] Removida coluna {col_tipo} após concatenação")
-        print(
-            f"[DEBUG][PROCESSAR] DataFrame final: {df_final.shape[0]} linhas, {df_final.shape[1]} colunas"
+                    logger.debug("[REDE] Removida coluna %s após concatenação", col_tipo)
+        logger.debug(
+            "[PROCESSAR] DataFrame final: %s linhas, %s colunas",
+            df_final.shape[0],
+            df_final.shape[1],
         )
-        print(f"[DEBUG][PROCESSAR] Colunas finais: {list(df_final.columns)}")
-        print(f"[DEBUG][PROCESSAR] Primeiras 3 linhas finais:\n{df_final.head(3)}")
-        print(f"[DEBUG][PROCESSAR] Transformações aplicadas: {transformacoes}")
+        logger.debug("[PROCESSAR] Colunas finais: %s", list(df_final.columns))
+        logger.debug("[PROCESSAR] Transformações aplicadas: %s", transformacoes)
     
         # --- NORMALIZAÇÃO FINAL DE FORMA_DE_PAGAMENTO ---
         if "Forma_de_pagamento" in df_final.columns:
-            print(
-                "[DEBUG][PROCESSAR] Aplicando normalização final em Forma_de_pagamento (pré-pago → à vista)"
+            logger.debug(
+                "[PROCESSAR] Aplicando normalização final em Forma_de_pagamento (pré-pago → à vista)",
             )
     
             def normalizar_forma_pagamento_final(valor):
@@ -3046,8 +2958,8 @@ def preparar_dataframe_de_arquivo(
             )
             valores_depois = df_final["Forma_de_pagamento"].unique()
     
-            print(f"[DEBUG][PROCESSAR] Valores antes: {valores_antes}")
-            print(f"[DEBUG][PROCESSAR] Valores depois: {valores_depois}")
+            logger.debug("[PROCESSAR] Valores antes: %s", valores_antes)
+            logger.debug("[PROCESSAR] Valores depois: %s", valores_depois)
     
         update_progress(80)
         # Pequena pausa para garantir atualização visual
@@ -3055,6 +2967,7 @@ def preparar_dataframe_de_arquivo(
     
         time.sleep(0.1)
         update_progress(100)
+        timer.set(rows=len(df_final))
         return df_final, transformacoes, meta.get("header_row", 0)
 
 
@@ -3062,16 +2975,11 @@ def aplicar_regras_depara(
     df_origem: pd.DataFrame, regras: List[Dict[str, Any]]
 ) -> Tuple[pd.DataFrame, Dict[str, str]]:
     with PerformanceTimer("TRANSFORM", "Aplicação de Regras De-Para", {"rows": len(df_origem), "regras": len(regras) if regras else 0}):
-        print(
-            "[DEBUG][aplicar_regras_depara] Início do processamento com lógica de agrupamento."
-        )
-        print(
-            f"[DEBUG][aplicar_regras_depara] Regras recebidas: {len(regras) if regras else 0}"
-        )
-        print(
-            f"[DEBUG][aplicar_regras_depara] Colunas do DataFrame origem: {list(df_origem.columns)}"
+        logger.debug("[aplicar_regras_depara] Início do processamento com lógica de agrupamento.")
+        logger.debug("[aplicar_regras_depara] Regras recebidas: %s", len(regras) if regras else 0)
+        logger.debug(
+            "[aplicar_regras_depara] Colunas do DataFrame origem: %s", list(df_origem.columns)
         )
-        print(f"[DEBUG][aplicar_regras_depara] DF Origem (primeiras 5 linhas):\n{df_origem.head(5)}")
 
         if not isinstance(regras, list) or (regras and not isinstance(regras[0], dict)):
             raise TypeError("O argumento 'regras' deve ser uma lista de dicts.")
@@ -3087,16 +2995,11 @@ def aplicar_regras_depara(
         destino_primary_origem: dict = {}  # {destino_lower: origem_lower}
 
         if regras:
-            print(f"[DEBUG][aplicar_regras_depara] Primeiras 3 regras: {regras[:3]}")
+            logger.debug("[aplicar_regras_depara] Primeiras 3 regras: %s", regras[:3])
             for i, regra in enumerate(regras):
                 origem_nome = regra.get("origem_nome")
                 destino_nome = regra.get("destino_nome")
 
-                if i < 3:  # Debug das primeiras 3 regras
-                    print(
-                        f"[DEBUG][aplicar_regras_depara] Regra {i}: origem='{origem_nome}', destino='{destino_nome}'"
-                    )
-
                 # Regras já vêm filtradas por ativo=1 do banco
                 tipo_preench = regra.get("tipo_preenchimento", "importado")
                 if origem_nome and destino_nome:
@@ -3115,7 +3018,6 @@ def aplicar_regras_depara(
                     # Regras com tipo_preenchimento='formula': guardar separado
                     if tipo_preench == "formula":
                         formulas_depara[destino] = origem
-                        print(f"[DEBUG][aplicar_regras_depara] Fórmula registrada: '{destino}' = '{origem}'")
                         continue
 
                     # Acumular múltiplos destinos para a mesma origem
@@ -3130,7 +3032,7 @@ def aplicar_regras_depara(
 
                     transformacoes[origem] = destino  # Manter compatibilidade
 
-            print(f"[DEBUG][aplicar_regras_depara] Mapeamento básico criado: {mapeamento}")
+            logger.debug("[aplicar_regras_depara] Mapeamento básico criado: %s", mapeamento)
 
             # CORREÇÃO TEMPORÁRIA: Adicionar regras faltantes para todas as abas
             # Detectar tipo de aba pelas colunas presentes
@@ -3152,11 +3054,12 @@ def aplicar_regras_depara(
 
             # Regras para PAGAMENTOS - APENAS banco, agencia, conta
             if colunas_pagamentos:
-                print(
-                    f"[DEBUG][aplicar_regras_depara] Detectada aba PAGAMENTOS com {len(colunas_pagamentos)} colunas"
+                logger.debug(
+                    "[aplicar_regras_depara] Detectada aba PAGAMENTOS com %s colunas",
+                    len(colunas_pagamentos),
                 )
-                print(
-                    f"[DEBUG][aplicar_regras_depara] PAGAMENTOS: Mapeando APENAS banco/agencia/conta (outros campos ficam vazios)"
+                logger.debug(
+                    "[aplicar_regras_depara] PAGAMENTOS: Mapeando APENAS banco/agencia/conta (outros campos ficam vazios)",
                 )
                 # Aba pagamentos só deve preencher banco, agencia, conta
                 # Outros campos como data_pagamento, data_recebivel devem vir apenas da aba AJUSTES
@@ -3164,8 +3067,9 @@ def aplicar_regras_depara(
 
             # Regras para AJUSTES
             if colunas_ajustes:
-                print(
-                    f"[DEBUG][aplicar_regras_depara] Detectada aba AJUSTES com {len(colunas_ajustes)} colunas"
+                logger.debug(
+                    "[aplicar_regras_depara] Detectada aba AJUSTES com %s colunas",
+                    len(colunas_ajustes),
                 )
                 regras_faltantes = {
                     "ajustes_data_do_ajuste": "data_pagamento",
@@ -3176,16 +3080,15 @@ def aplicar_regras_depara(
                 }
                 for origem, destino in regras_faltantes.items():
                     if origem in df_origem.columns and origem not in mapeamento:
-                        print(
-                            f"[DEBUG][aplicar_regras_depara] AJUSTES: {origem} -> {destino}"
-                        )
+                        logger.debug("[aplicar_regras_depara] AJUSTES: %s -> %s", origem, destino)
                         mapeamento[origem] = [destino]  # LISTA
                         transformacoes[origem] = destino
 
             # Regras para CANCELAMENTOS
             if colunas_cancelamentos:
-                print(
-                    f"[DEBUG][aplicar_regras_depara] Detectada aba CANCELAMENTOS com {len(colunas_cancelamentos)} colunas"
+                logger.debug(
+                    "[aplicar_regras_depara] Detectada aba CANCELAMENTOS com %s colunas",
+                    len(colunas_cancelamentos),
                 )
                 regras_faltantes = {
                     "cancelamentos e contestações_data_do_débito": "data_pagamento",
@@ -3195,8 +3098,8 @@ def aplicar_regras_depara(
                 }
                 for origem, destino in regras_faltantes.items():
                     if origem in df_origem.columns and origem not in mapeamento:
-                        print(
-                            f"[DEBUG][aplicar_regras_depara] CANCELAMENTOS: {origem} -> {destino}"
+                        logger.debug(
+                            "[aplicar_regras_depara] CANCELAMENTOS: %s -> %s", origem, destino
                         )
                         mapeamento[origem] = [destino]  # LISTA
                         transformacoes[origem] = destino
@@ -3208,8 +3111,9 @@ def aplicar_regras_depara(
                     "cancelamentos e contestações_valor_original_da_venda" in origem
                     and "valor_liquido" in destinos
                 ):
-                    print(
-                        f"[DEBUG][aplicar_regras_depara] Corrigindo mapeamento: {origem} -> valor_recebivel (era valor_liquido)"
+                    logger.debug(
+                        "[aplicar_regras_depara] Corrigindo mapeamento: %s -> valor_recebivel (era valor_liquido)",
+                        origem,
                     )
                     mapeamento[origem] = ["valor_recebivel"]  # LISTA
                     transformacoes[origem] = "valor_recebivel"
@@ -3226,11 +3130,11 @@ def aplicar_regras_depara(
             )
 
             if ambos_mapeiam_forma_pagamento:
-                print(
-                    "[DEBUG][aplicar_regras_depara] Detectado mapeamento duplicado modalidade+tipo -> Forma_de_pagamento"
+                logger.debug(
+                    "[aplicar_regras_depara] Detectado mapeamento duplicado modalidade+tipo -> Forma_de_pagamento",
                 )
-                print(
-                    "[DEBUG][aplicar_regras_depara] Concatenando modalidade+tipo ANTES do mapeamento para evitar duplicatas"
+                logger.debug(
+                    "[aplicar_regras_depara] Concatenando modalidade+tipo ANTES do mapeamento para evitar duplicatas",
                 )
 
                 # Concatenar modalidade + " " + tipo na própria coluna modalidade
@@ -3246,11 +3150,11 @@ def aplicar_regras_depara(
                 if "tipo" in mapeamento:
                     del mapeamento["tipo"]
                     del transformacoes["tipo"]
-                    print(
-                        "[DEBUG][aplicar_regras_depara] Removido mapeamento de 'tipo' - dados concatenados em 'modalidade'"
+                    logger.debug(
+                        "[aplicar_regras_depara] Removido mapeamento de 'tipo' - dados concatenados em 'modalidade'",
                     )
 
-            print(f"[DEBUG][aplicar_regras_depara] Mapeamento final: {mapeamento}")
+            logger.debug("[aplicar_regras_depara] Mapeamento final: %s", mapeamento)
 
         # Remover colunas auxiliares
         columns_to_remove = ["Filtrado", "planilha_origem"]
@@ -3264,11 +3168,9 @@ def aplicar_regras_depara(
             log_to_debug_file("AVISO: NENHUM MAPEAMENTO CRIADO!")
 
         if not mapeamento:
-            print(
-                "[DEBUG][aplicar_regras_depara] AVISO: Nenhum mapeamento ativo encontrado!"
-            )
-            print(
-                "[DEBUG][aplicar_regras_depara] SEM regras ativas, retornando DataFrame vazio para evitar importação incorreta..."
+            logger.debug("[aplicar_regras_depara] AVISO: Nenhum mapeamento ativo encontrado!")
+            logger.debug(
+                "[aplicar_regras_depara] SEM regras ativas, retornando DataFrame vazio para evitar importação incorreta...",
             )
 
             # Retornar DataFrame vazio se não há regras ativas
@@ -3280,8 +3182,8 @@ def aplicar_regras_depara(
             colunas_validas = listar_colunas_recebiveis_processados(engine_vazio)
             df_vazio = pd.DataFrame(columns=colunas_validas)
 
-            print(
-                "[DEBUG][aplicar_regras_depara] Retornando DataFrame vazio - configure regras depara ativas primeiro!"
+            logger.debug(
+                "[aplicar_regras_depara] Retornando DataFrame vazio - configure regras depara ativas primeiro!",
             )
             return df_vazio, {}
 
@@ -3295,12 +3197,10 @@ def aplicar_regras_depara(
     colunas_mapeadas = [orig_col for lower_col, orig_col in col_map_orig_to_lower.items() if lower_col in mapeamento_lower]
 
     if not colunas_mapeadas:
-        print(
-            "[DEBUG][aplicar_regras_depara] AVISO: Nenhuma coluna do DataFrame tem mapeamento específico!"
-        )
-        print(
-            "[DEBUG][aplicar_regras_depara] SEM colunas mapeadas, retornando DataFrame vazio..."
+        logger.debug(
+            "[aplicar_regras_depara] AVISO: Nenhuma coluna do DataFrame tem mapeamento específico!"
         )
+        logger.debug("[aplicar_regras_depara] SEM colunas mapeadas, retornando DataFrame vazio...")
 
         # Retornar DataFrame vazio se não há colunas mapeadas
         from conf.colunas_recebiveis import listar_colunas_recebiveis_processados
@@ -3310,8 +3210,8 @@ def aplicar_regras_depara(
         colunas_validas = listar_colunas_recebiveis_processados(engine)
         df_vazio = pd.DataFrame(columns=colunas_validas)
 
-        print(
-            "[DEBUG][aplicar_regras_depara] Retornando DataFrame vazio - configure mapeamentos específicos primeiro!"
+        logger.debug(
+            "[aplicar_regras_depara] Retornando DataFrame vazio - configure mapeamentos específicos primeiro!",
         )
         return df_vazio, {}
 
@@ -3395,12 +3295,10 @@ def aplicar_regras_depara(
             # Fim do bloco desabilitado
             pass
 
-    print(f"[DEBUG][aplicar_regras_depara] Colunas com mapeamento: {colunas_mapeadas}")
+    logger.debug("[aplicar_regras_depara] Colunas com mapeamento: %s", colunas_mapeadas)
 
     # mapeamento já está no formato {origem: [destino1, destino2, ...]}
-    print(
-        f"[DEBUG][aplicar_regras_depara] Mapeamento com múltiplos destinos: {mapeamento}"
-    )
+    logger.debug("[aplicar_regras_depara] Mapeamento com múltiplos destinos: %s", mapeamento)
 
     # Criar lista de todos os destinos únicos
     destinos_unicos = set()
@@ -3548,16 +3446,20 @@ def aplicar_regras_depara(
             
             # Se tiver múltiplos destinos, logar
             if len(destinos) > 1:
-                print(
-                    f"[DEBUG][aplicar_regras_depara] ⚡ Duplicando coluna '{orig_col_name}' para {len(destinos)} destinos: {destinos}"
+                logger.debug(
+                    "[aplicar_regras_depara] ⚡ Duplicando coluna '%s' para %s destinos: %s",
+                    orig_col_name,
+                    len(destinos),
+                    destinos,
                 )
 
             # 🔥 LÓGICA ESPECIAL: Dividir "Produto cielo" em Bandeira e Forma_de_pagamento
             if lower_col == "produto cielo" and set(
                 ["Bandeira", "Forma_de_pagamento"]
             ).issubset(set(destinos)):
-                print(
-                    f"[DEBUG][aplicar_regras_depara] 🎯 DIVISÃO ESPECIAL: '{orig_col_name}' será dividido em Bandeira e Forma_de_pagamento"
+                logger.debug(
+                    "[aplicar_regras_depara] 🎯 DIVISÃO ESPECIAL: '%s' será dividido em Bandeira e Forma_de_pagamento",
+                    orig_col_name,
                 )
 
                 # Aplicar divisão
@@ -3573,14 +3475,18 @@ def aplicar_regras_depara(
                 # Atribuir resultados
                 if "Bandeira" in destinos:
                     df_resultado["Bandeira"] = bandeiras
-                    print(
-                        f"[DEBUG][aplicar_regras_depara]    '{orig_col_name}' → 'Bandeira' (extraído: {len([b for b in bandeiras if b])} valores)"
+                    logger.debug(
+                        "[aplicar_regras_depara]    '%s' → 'Bandeira' (extraído: %s valores)",
+                        orig_col_name,
+                        len([b for b in bandeiras if b]),
                     )
 
                 if "Forma_de_pagamento" in destinos:
                     df_resultado["Forma_de_pagamento"] = formas
-                    print(
-                        f"[DEBUG][aplicar_regras_depara]    '{orig_col_name}' → 'Forma_de_pagamento' (extraído: {len([f for f in formas if f])} valores)"
+                    logger.debug(
+                        "[aplicar_regras_depara]    '%s' → 'Forma_de_pagamento' (extraído: %s valores)",
+                        orig_col_name,
+                        len([f for f in formas if f]),
                     )
             else:
                 # Copiar dados da origem para cada destino (comportamento normal)
@@ -3599,17 +3505,25 @@ def aplicar_regras_depara(
                         mask_vazio = df_resultado[destino].isna() | (df_resultado[destino].astype(str).str.strip() == "")
                         if mask_vazio.any():
                             df_resultado.loc[mask_vazio, destino] = df_limpo.loc[mask_vazio, orig_col_name]
-                            print(
-                                f"[DEBUG][aplicar_regras_depara]    '{orig_col_name}' → '{destino}' (FALLBACK id>primário: preencheu {mask_vazio.sum()} células vazias)"
+                            logger.debug(
+                                "[aplicar_regras_depara]    '%s' → '%s' (FALLBACK id>primário: preencheu %s células vazias)",
+                                orig_col_name,
+                                destino,
+                                mask_vazio.sum(),
                             )
                         else:
-                            print(
-                                f"[DEBUG][aplicar_regras_depara]    '{orig_col_name}' → '{destino}' (FALLBACK id>primário: destino completo, ignorado)"
+                            logger.debug(
+                                "[aplicar_regras_depara]    '%s' → '%s' (FALLBACK id>primário: destino completo, ignorado)",
+                                orig_col_name,
+                                destino,
                             )
                     else:
                         df_resultado[destino] = df_limpo[orig_col_name].copy()
-                        print(
-                            f"[DEBUG][aplicar_regras_depara]    '{orig_col_name}' → '{destino}' ({len(df_limpo[orig_col_name].dropna())} valores não-nulos)"
+                        logger.debug(
+                            "[aplicar_regras_depara]    '%s' → '%s' (%s valores não-nulos)",
+                            orig_col_name,
+                            destino,
+                            len(df_limpo[orig_col_name].dropna()),
                         )
 
     # Aplicar fórmulas depara (tipo_preenchimento='formula')
@@ -3653,13 +3567,17 @@ def aplicar_regras_depara(
         for destino_formula, formula_str in formulas_depara.items():
             try:
                 df_resultado[destino_formula] = _eval_formula_depara(df_limpo, formula_str)
-                print(f"[DEBUG][aplicar_regras_depara] Fórmula aplicada: '{destino_formula}' = '{formula_str}'")
+                logger.debug(
+                    "[aplicar_regras_depara] Fórmula aplicada: '%s' = '%s'",
+                    destino_formula,
+                    formula_str,
+                )
             except Exception as e:
-                print(f"[DEBUG][aplicar_regras_depara] Erro na fórmula '{destino_formula}': {e}")
+                logger.warning("[aplicar_regras_depara] Erro na fórmula '%s': %s", destino_formula, e)
 
     # FILTRO DE DADOS INVÁLIDOS: Remover apenas linhas que são claramente cabeçalhos
     if not df_resultado.empty:
-        print(f"[DEBUG][aplicar_regras_depara] Filtrando dados inválidos...")
+        logger.debug("[aplicar_regras_depara] Filtrando dados inválidos...")
 
         # Detectar linhas com dados de cabeçalho/relatório - mais inteligente
         mask_dados_validos = pd.Series(
@@ -3714,8 +3632,10 @@ def aplicar_regras_depara(
 
             if is_header:
                 mask_dados_validos[idx] = False
-                print(
-                    f"[DEBUG][aplicar_regras_depara] Removendo linha {idx} (cabeçalho/relatório): {dict(row)}"
+                logger.debug(
+                    "[aplicar_regras_depara] Removendo linha %s (cabeçalho/relatório): %s",
+                    idx,
+                    dict(row),
                 )
 
         # Aplicar filtro
@@ -3723,13 +3643,15 @@ def aplicar_regras_depara(
         df_resultado = df_resultado[mask_dados_validos].copy()
         linhas_removidas = linhas_antes - len(df_resultado)
 
-        print(f"[DEBUG][aplicar_regras_depara] Filtro inteligente aplicado:")
-        print(f"[DEBUG][aplicar_regras_depara] - Linhas antes: {linhas_antes}")
-        print(f"[DEBUG][aplicar_regras_depara] - Linhas removidas: {linhas_removidas}")
-        print(f"[DEBUG][aplicar_regras_depara] - Linhas restantes: {len(df_resultado)}")
+        logger.debug("[aplicar_regras_depara] Filtro inteligente aplicado:")
+        logger.debug("[aplicar_regras_depara] - Linhas antes: %s", linhas_antes)
+        logger.debug("[aplicar_regras_depara] - Linhas removidas: %s", linhas_removidas)
+        logger.debug("[aplicar_regras_depara] - Linhas restantes: %s", len(df_resultado))
 
-    print(
-        f"[DEBUG][aplicar_regras_depara] Resultado final: {len(df_resultado)} linhas, colunas: {list(df_resultado.columns)}"
+    logger.debug(
+        "[aplicar_regras_depara] Resultado final: %s linhas, colunas: %s",
+        len(df_resultado),
+        list(df_resultado.columns),
     )
 
     return df_resultado, transformacoes
@@ -3766,7 +3688,7 @@ def normalizar_dataframe_vendas(
 
         # --- INÍCIO DO CÓDIGO DE NORMALIZAÇÃO ---
         # Limpeza de valores infinitos e fora do range permitido em todo o DataFrame
-        print(f"[DEBUG] Limpando valores infinitos do DataFrame...")
+        logger.debug("Limpando valores infinitos do DataFrame...")
         for col in df.columns:
             if pd.api.types.is_numeric_dtype(df[col]):
                 inf_count = (
@@ -3774,7 +3696,7 @@ def normalizar_dataframe_vendas(
                     - df[col].isna().sum()
                 )
                 if inf_count > 0:
-                    print(f"[DEBUG] Coluna {col}: removidos {inf_count} valores infinitos")
+                    logger.debug("Coluna %s: removidos %s valores infinitos", col, inf_count)
                     df[col] = df[col].replace([np.inf, -np.inf], np.nan)
     
         # Conversão de tipos de dados (datas e valores monetários)
@@ -3837,7 +3759,7 @@ def normalizar_dataframe_vendas(
             )
     
         # --- AJUSTE ESPECÍFICO: MULTIPLICAR TAXAS DA REDE POR 100 SE NECESSÁRIO ---
-        print("[DEBUG][REDE] Verificando necessidade de ajustar taxas da REDE...")
+        logger.debug("[REDE] Verificando necessidade de ajustar taxas da REDE...")
     
         # Identificar registros da REDE pela coluna Adquirente
         mask_rede_adquirente = pd.Series([False] * len(df), index=df.index)
@@ -3866,24 +3788,22 @@ def normalizar_dataframe_vendas(
                     df.loc[mask_ajuste, coluna_taxa] = (
                         df.loc[mask_ajuste, coluna_taxa] * 100
                     )
-                    print(
-                        f"[DEBUG][REDE] {coluna_taxa} multiplicada por 100 para {registros_afetados} registros da REDE (valores < 1)"
+                    logger.debug(
+                        "[REDE] %s multiplicada por 100 para %s registros da REDE (valores < 1)",
+                        coluna_taxa,
+                        registros_afetados,
                     )
                 else:
-                    print(
-                        f"[DEBUG][REDE] {coluna_taxa} já está no formato correto (valores >= 1)"
-                    )
+                    logger.debug("[REDE] %s já está no formato correto (valores >= 1)", coluna_taxa)
     
         # ⚠️ AGORA SIM: Arredondar todos os valores monetários e taxas para 2 casas decimais
-        print(
-            "[DEBUG] Aplicando arredondamento final (round(2)) em valores monetários e taxas..."
-        )
+        logger.debug("Aplicando arredondamento final (round(2)) em valores monetários e taxas...")
         for c in colunas_valores + colunas_taxa:
             if c in df.columns:
                 df[c] = df[c].round(2)
     
         # --- CÁLCULO DE VALOR_RR BASEADO EM TAXAS_RR ---
-        print("[DEBUG] Calculando Valor_RR baseado em Taxas_RR...")
+        logger.debug("Calculando Valor_RR baseado em Taxas_RR...")
     
         if "Taxas_RR" in df.columns and "Valor_da_venda" in df.columns:
             # Se Valor_RR não existe, criar coluna (todos NaN = não informado pela adquirente)
@@ -3916,8 +3836,9 @@ def normalizar_dataframe_vendas(
                 ).round(2)
     
                 registros_calculados = mask_calc_rr.sum()
-                print(
-                    f"[DEBUG] Valor_RR calculado para {registros_calculados} registros com Taxas_RR válidas"
+                logger.debug(
+                    "Valor_RR calculado para %s registros com Taxas_RR válidas",
+                    registros_calculados,
                 )
     
                 # Log de exemplo
@@ -3926,17 +3847,20 @@ def normalizar_dataframe_vendas(
                     valor_venda = df.loc[exemplo_idx, "Valor_da_venda"]
                     taxa_rr = df.loc[exemplo_idx, "Taxas_RR"]
                     valor_rr = df.loc[exemplo_idx, "Valor_RR"]
-                    print(
-                        f"[DEBUG] Exemplo cálculo: R$ {valor_venda:.2f} × {taxa_rr:.2f}% = R$ {valor_rr:.2f}"
+                    logger.debug(
+                        "Exemplo cálculo: R$ %.2f × %.2f%% = R$ %.2f",
+                        valor_venda,
+                        taxa_rr,
+                        valor_rr,
                     )
         else:
-            print("[DEBUG] Colunas Taxas_RR ou Valor_da_venda não encontradas para cálculo")
+            logger.debug("Colunas Taxas_RR ou Valor_da_venda não encontradas para cálculo")
     
         # --- FIM DO CÓDIGO DE NORMALIZAÇÃO ---
     
         # --- REGRA ESPECÍFICA DA REDE: PREVISÃO DE PAGAMENTO = DATA_DA_VENDA + 31 DIAS ---
-        print(
-            "[DEBUG][REDE] Verificando se existem dados da REDE para aplicar regra de previsão..."
+        logger.debug(
+            "[REDE] Verificando se existem dados da REDE para aplicar regra de previsão..."
         )
     
         # Identificar se há registros da REDE
@@ -3956,8 +3880,8 @@ def normalizar_dataframe_vendas(
                 )
                 if rede_count > 0:
                     tem_rede = True
-                    print(
-                        f"[DEBUG][REDE] Detectado {rede_count} registros da REDE na coluna {col}"
+                    logger.debug(
+                        "[REDE] Detectado %s registros da REDE na coluna %s", rede_count, col
                     )
                     break
     
@@ -4008,8 +3932,9 @@ def normalizar_dataframe_vendas(
                             ] + pd.Timedelta(days=31)
     
                             registros_atualizados = mask_aplicar.sum()
-                            print(
-                                f"[DEBUG][REDE] Previsão de pagamento calculada para {registros_atualizados} registros da REDE (Data_da_venda + 31 dias)"
+                            logger.debug(
+                                "[REDE] Previsão de pagamento calculada para %s registros da REDE (Data_da_venda + 31 dias)",
+                                registros_atualizados,
                             )
     
                             # Log de exemplo
@@ -4017,16 +3942,18 @@ def normalizar_dataframe_vendas(
                                 exemplo_idx = df[mask_aplicar].index[0]
                                 data_venda = df.loc[exemplo_idx, coluna_data_encontrada]
                                 previsao = df.loc[exemplo_idx, "Previsão_de_pagamento"]
-                                print(
-                                    f"[DEBUG][REDE] Exemplo: Venda {data_venda.strftime('%d/%m/%Y')} → Previsão {previsao.strftime('%d/%m/%Y')}"
+                                logger.debug(
+                                    "[REDE] Exemplo: Venda %s → Previsão %s",
+                                    data_venda.strftime('%d/%m/%Y'),
+                                    previsao.strftime('%d/%m/%Y'),
                                 )
     
                     except Exception as e:
-                        print(f"[DEBUG][REDE] Erro ao aplicar regra de previsão: {e}")
+                        logger.warning("[REDE] Erro ao aplicar regra de previsão: %s", e)
             else:
-                print(f"[DEBUG][REDE] Nenhuma coluna de data da venda encontrada")
+                logger.debug("[REDE] Nenhuma coluna de data da venda encontrada")
         else:
-            print(f"[DEBUG][REDE] Nenhum registro da REDE detectado")
+            logger.debug("[REDE] Nenhum registro da REDE detectado")
     
         # --- Lógica de vendas_diversas removida conforme solicitado ---
     
@@ -4055,15 +3982,15 @@ def normalizar_dataframe_vendas(
     
         termos_raw = termos_listar(engine, str(ec_id), contexto, tipo="v")
     
-        print("[DEBUG][VENDAS] Colunas do DataFrame:", list(df.columns))
-        print("[DEBUG][VENDAS] Coluna de lançamento detectada:", lancamento_col)
-        print("[DEBUG][VENDAS] termos_raw:", termos_raw)
+        logger.debug("[VENDAS] Colunas do DataFrame: %s", list(df.columns))
+        logger.debug("[VENDAS] Coluna de lançamento detectada: %s", lancamento_col)
+        logger.debug("[VENDAS] termos_raw: %s", termos_raw)
     
         termos = [
             norm(t["termo"]) if isinstance(t, dict) and "termo" in t else norm(t)
             for t in termos_raw
         ]
-        print("[DEBUG][VENDAS] termos normalizados:", termos)
+        logger.debug("[VENDAS] termos normalizados: %s", termos)
     
         padrao_termos = (
             re.compile("|".join(map(re.escape, termos)), flags=re.IGNORECASE)
@@ -4089,9 +4016,9 @@ def normalizar_dataframe_vendas(
                 break
     
         if status_col is not None:
-            print(f"[DEBUG][STATUS] Coluna de status encontrada: {status_col}")
-            print(f"[DEBUG][STATUS] Valores únicos de status: {df[status_col].unique()}")
-            print(f"[DEBUG][STATUS] EC: {ec_id}, Contexto: {contexto}")
+            logger.debug("[STATUS] Coluna de status encontrada: %s", status_col)
+            logger.debug("[STATUS] Valores únicos de status: %s", df[status_col].unique())
+            logger.debug("[STATUS] EC: %s, Contexto: %s", ec_id, contexto)
     
             # Buscar termos filtráveis para status da tabela termos_filtraveis
             # Usar os termos existentes do tipo 'v' para filtrar por status
@@ -4100,8 +4027,8 @@ def normalizar_dataframe_vendas(
                 termos_status_raw = termos_listar(engine, str(ec_id), contexto, tipo="v")
                 termos_status = [t["termo"] for t in termos_status_raw if t.get("termo")]
     
-                print(
-                    f"[DEBUG][STATUS] Termos filtráveis encontrados na tabela (tipo v): {termos_status}"
+                logger.debug(
+                    "[STATUS] Termos filtráveis encontrados na tabela (tipo v): %s", termos_status
                 )
     
                 if termos_status:
@@ -4110,15 +4037,15 @@ def normalizar_dataframe_vendas(
                         "|".join(map(re.escape, termos_status)), flags=re.IGNORECASE
                     )
     
-                    print(f"[DEBUG][STATUS] Padrão regex criado: {padrao_status.pattern}")
-                    print(f"[DEBUG][STATUS] Testando alguns valores normalizados:")
+                    logger.debug("[STATUS] Padrão regex criado: %s", padrao_status.pattern)
+                    logger.debug("[STATUS] Testando alguns valores normalizados:")
     
                     # Debug de algumas comparações
                     for val in df[status_col].unique()[:5]:
                         val_norm = norm(val)
                         match = padrao_status.search(val_norm)
-                        print(
-                            f"[DEBUG][STATUS]   '{val}' -> norm: '{val_norm}' -> match: {bool(match)}"
+                        logger.debug(
+                            "[STATUS]   '%s' -> norm: '%s' -> match: %s", val, val_norm, bool(match)
                         )
     
                     # Aplicar filtro usando termos da tabela na coluna de status
@@ -4128,21 +4055,21 @@ def normalizar_dataframe_vendas(
                         .apply(lambda x: bool(padrao_status.search(norm(x))))
                     )
     
-                    print(
-                        f"[DEBUG][STATUS] Total filtradas por termos da tabela: {mask_status_filtravel.sum()}"
+                    logger.debug(
+                        "[STATUS] Total filtradas por termos da tabela: %s",
+                        mask_status_filtravel.sum(),
                     )
-                    print(
-                        f"[DEBUG][STATUS] Exemplos de valores que batem: {df[mask_status_filtravel][status_col].unique()[:5] if mask_status_filtravel.any() else 'Nenhum'}"
+                    logger.debug(
+                        "[STATUS] Exemplos de valores que batem: %s",
+                        df[mask_status_filtravel][status_col].unique()[:5] if mask_status_filtravel.any() else 'Nenhum',
                     )
                 else:
-                    print(
-                        "[DEBUG][STATUS] Nenhum termo encontrado na tabela termos_filtraveis"
-                    )
+                    logger.debug("[STATUS] Nenhum termo encontrado na tabela termos_filtraveis")
     
             except Exception as e:
-                print(f"[DEBUG][STATUS] Erro ao buscar termos de status: {e}")
+                logger.warning("[STATUS] Erro ao buscar termos de status: %s", e)
         else:
-            print("[DEBUG][STATUS] Nenhuma coluna de status encontrada")
+            logger.debug("[STATUS] Nenhuma coluna de status encontrada")
     
         mask_vazio = df[lancamento_col].isnull() | (
             df[lancamento_col].astype(str).str.strip() == ""
@@ -4174,10 +4101,8 @@ def normalizar_dataframe_vendas(
                 break
     
         if forma_pagamento_col and padrao_termos:
-            print(f"[DEBUG][FORMA_PAGAMENTO] Coluna encontrada: {forma_pagamento_col}")
-            print(
-                f"[DEBUG][FORMA_PAGAMENTO] Valores únicos: {df[forma_pagamento_col].unique()}"
-            )
+            logger.debug("[FORMA_PAGAMENTO] Coluna encontrada: %s", forma_pagamento_col)
+            logger.debug("[FORMA_PAGAMENTO] Valores únicos: %s", df[forma_pagamento_col].unique())
     
             mask_termo_forma_pagamento = (
                 df[forma_pagamento_col]
@@ -4186,11 +4111,13 @@ def normalizar_dataframe_vendas(
             )
     
             if mask_termo_forma_pagamento.any():
-                print(
-                    f"[DEBUG][FORMA_PAGAMENTO] ⚠️ {mask_termo_forma_pagamento.sum()} registros filtrados por forma de pagamento"
+                logger.debug(
+                    "[FORMA_PAGAMENTO] ⚠️ %s registros filtrados por forma de pagamento",
+                    mask_termo_forma_pagamento.sum(),
                 )
-                print(
-                    f"[DEBUG][FORMA_PAGAMENTO] Exemplos: {df[mask_termo_forma_pagamento][forma_pagamento_col].unique()[:5]}"
+                logger.debug(
+                    "[FORMA_PAGAMENTO] Exemplos: %s",
+                    df[mask_termo_forma_pagamento][forma_pagamento_col].unique()[:5],
                 )
     
         # Combinar todas as máscaras de termos
@@ -4204,20 +4131,21 @@ def normalizar_dataframe_vendas(
         df_filt = df.loc[mask_filt].copy()
     
         # Debug da separação
-        print(f"[DEBUG][SEPARAÇÃO] Total original: {len(df)}")
-        print(f"[DEBUG][SEPARAÇÃO] Processadas (aprovadas): {len(df_proc)}")
-        print(f"[DEBUG][SEPARAÇÃO] Filtradas (termos + status): {len(df_filt)}")
-        print(
-            f"[DEBUG][SEPARAÇÃO] Filtradas por termos no lançamento: {mask_termo_lancamento.sum()}"
+        logger.debug("[SEPARAÇÃO] Total original: %s", len(df))
+        logger.debug("[SEPARAÇÃO] Processadas (aprovadas): %s", len(df_proc))
+        logger.debug("[SEPARAÇÃO] Filtradas (termos + status): %s", len(df_filt))
+        logger.debug(
+            "[SEPARAÇÃO] Filtradas por termos no lançamento: %s", mask_termo_lancamento.sum()
         )
-        print(
-            f"[DEBUG][SEPARAÇÃO] Filtradas por termos na forma_de_pagamento: {mask_termo_forma_pagamento.sum()}"
+        logger.debug(
+            "[SEPARAÇÃO] Filtradas por termos na forma_de_pagamento: %s",
+            mask_termo_forma_pagamento.sum(),
         )
-        print(f"[DEBUG][SEPARAÇÃO] Filtradas por termos (total): {mask_termo.sum()}")
-        print(
-            f"[DEBUG][SEPARAÇÃO] Filtradas por status (tabela termos): {mask_status_filtravel.sum()}"
+        logger.debug("[SEPARAÇÃO] Filtradas por termos (total): %s", mask_termo.sum())
+        logger.debug(
+            "[SEPARAÇÃO] Filtradas por status (tabela termos): %s", mask_status_filtravel.sum()
         )
-        print(f"[DEBUG][SEPARAÇÃO] Vazias ignoradas: {mask_vazio.sum()}")
+        logger.debug("[SEPARAÇÃO] Vazias ignoradas: %s", mask_vazio.sum())
     
         # Adicionar metadados para todos os DataFrames
         for _df in (df_proc, df_filt):
@@ -4253,7 +4181,7 @@ def classificar_por_bandeira_e_termos(
         norm(t["termo"]) if isinstance(t, dict) and "termo" in t else norm(t)
         for t in termos_listar(engine, str(ec_id), contexto)
     ]
-    print("[DEBUG] termos normalizados:", termos)
+    logger.debug("termos normalizados: %s", termos)
     padrao_termos = (
         re.compile("|".join(map(re.escape, termos)), flags=re.IGNORECASE)
         if termos
@@ -4326,7 +4254,7 @@ def classificar_e_gravar_vendas(
     processamentoid: str = None,
     progress_callback = None
 ) -> Dict[str, Any]:
-    print(f"[RECORD][VENDAS] Colunas recebidas no DataFrame: {list(df.columns)}")
+    logger.debug("[RECORD][VENDAS] Colunas recebidas no DataFrame: %s", list(df.columns))
     
     try:
         with PerformanceTimer("RECORD", "Gravação Vendas (Bulk Insert)", {"rows": len(df), "contexto": contexto}):
@@ -4335,7 +4263,7 @@ def classificar_e_gravar_vendas(
 
             if processamentoid is None:
                 processamentoid, _ = processamento_gerar_novo_id(engine, ec_id, now)
-                print(f"[RECORD][VENDAS] Gerado novo ID: {processamentoid}")
+                logger.debug("[RECORD][VENDAS] Gerado novo ID: %s", processamentoid)
                 processamento_salvar(
                     engine,
                     ec_id=ec_id,
@@ -4345,7 +4273,9 @@ def classificar_e_gravar_vendas(
                     data_processamento=now,
                 )
             else:
-                print(f"[RECORD][VENDAS] Usando processamentoid existente: {processamentoid}")
+                logger.debug(
+                    "[RECORD][VENDAS] Usando processamentoid existente: %s", processamentoid
+                )
 
             # Garantir que df_proc e df_filt comecem definidos
             df_proc, df_filt = pd.DataFrame(), pd.DataFrame()
@@ -4398,9 +4328,12 @@ def classificar_e_gravar_vendas(
                 df_proc = df_proc.drop_duplicates(subset=cols_dedup_proc).copy()
                 n_proc = len(df_proc)
                 if len_antes > n_proc:
-                    print(f"[DEBUG][DEDUP] Removidas {len_antes - n_proc} duplicadas (Vendas Processadas) em memória.")
+                    logger.debug(
+                        "[DEDUP] Removidas %s duplicadas (Vendas Processadas) em memória.",
+                        len_antes - n_proc,
+                    )
 
-            print(f"[RECORD][VENDAS] Preparado para inserção bulk: {n_proc} linhas")
+            logger.debug("[RECORD][VENDAS] Preparado para inserção bulk: %s linhas", n_proc)
 
             if n_filt:
                 cols_dedup_filt = [c for c in _DEDUP_KEY_COLS if c in df_filt.columns]
@@ -4410,14 +4343,20 @@ def classificar_e_gravar_vendas(
                 df_filt = df_filt.drop_duplicates(subset=cols_dedup_filt).copy()
                 n_filt = len(df_filt)
                 if len_antes > n_filt:
-                    print(f"[DEBUG][DEDUP] Removidas {len_antes - n_filt} duplicadas (Vendas Filtradas) em memória.")
+                    logger.debug(
+                        "[DEDUP] Removidas %s duplicadas (Vendas Filtradas) em memória.",
+                        len_antes - n_filt,
+                    )
 
             # Filtrar linhas de rodapé/totais onde ec_id não é inteiro válido (ex: "Total", copyright)
             if n_proc and 'ec_id' in df_proc.columns:
                 mask_proc = pd.to_numeric(df_proc['ec_id'], errors='coerce').notna()
                 removidos_proc = (~mask_proc).sum()
                 if removidos_proc:
-                    print(f"[DEBUG][VENDAS] Removendo {removidos_proc} linha(s) de rodapé (ec_id não-inteiro) em df_proc.")
+                    logger.debug(
+                        "[VENDAS] Removendo %s linha(s) de rodapé (ec_id não-inteiro) em df_proc.",
+                        removidos_proc,
+                    )
                 df_proc = df_proc[mask_proc].copy()
                 n_proc = len(df_proc)
 
@@ -4425,7 +4364,10 @@ def classificar_e_gravar_vendas(
                 mask_filt = pd.to_numeric(df_filt['ec_id'], errors='coerce').notna()
                 removidos_filt = (~mask_filt).sum()
                 if removidos_filt:
-                    print(f"[DEBUG][VENDAS] Removendo {removidos_filt} linha(s) de rodapé (ec_id não-inteiro) em df_filt.")
+                    logger.debug(
+                        "[VENDAS] Removendo %s linha(s) de rodapé (ec_id não-inteiro) em df_filt.",
+                        removidos_filt,
+                    )
                 df_filt = df_filt[mask_filt].copy()
                 n_filt = len(df_filt)
 
@@ -4436,7 +4378,7 @@ def classificar_e_gravar_vendas(
                 vendas_processadas_bulk_insert(engine, df_proc, progress_callback=progress_callback)
             if n_filt:
                 if progress_callback: progress_callback(85, "Gravando vendas filtradas...")
-                print(f"[RECORD][VENDAS] Gravando {n_filt} vendas filtradas...")
+                logger.debug("[RECORD][VENDAS] Gravando %s vendas filtradas...", n_filt)
                 vendas_filtradas_bulk_insert(engine, df_filt, progress_callback=progress_callback)
 
             # Remover duplicadas
@@ -4444,13 +4386,13 @@ def classificar_e_gravar_vendas(
                 if progress_callback: progress_callback(90, "Removendo duplicadas SQL...")
                 vendas_remover_duplicadas(engine, "vendas_processadas", processamentoid, df_proc.columns.tolist())
             elif n_proc and was_fresh:
-                print(f"[DEBUG][DEDUP] Pulando remoção SQL de duplicadas para fresh import")
+                logger.debug("[DEDUP] Pulando remoção SQL de duplicadas para fresh import")
                 if progress_callback: progress_callback(95, "Deduplicação concluída.")
 
             if n_filt and not was_fresh:
                 vendas_remover_duplicadas(engine, "vendas_filtradas", processamentoid, df_filt.columns.tolist())
 
-            print(f"[DEBUG][VENDAS] Processadas: {n_proc}, Filtradas: {n_filt}")
+            logger.debug("[VENDAS] Processadas: %s, Filtradas: %s", n_proc, n_filt)
 
             return {
                 "processadas": n_proc,
@@ -4461,8 +4403,5 @@ def classificar_e_gravar_vendas(
             }
 
     except Exception as e:
-        print(f"\n[RECORD][VENDAS] !!! ERRO FATAL NA GRAVAÇÃO !!!")
-        print(f"Erro: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[RECORD][VENDAS] Erro fatal na gravação: %s", e)
         raise e